@@ -33,18 +33,43 @@ typedef enum _PyBindGenWrapperFlags {
 } PyBindGenWrapperFlags;
 #endif
 
+#if PY_VERSION_HEX >= 0x03070000 && !defined(PyEval_ThreadsInitialized)
+#define PyEval_ThreadsInitialized() 1
+#endif
+
 
 #include <stdio.h>
+#include <vector>
+#include <atomic>
+#include <thread>
+#include <chrono>
 #include <numpy/arrayobject.h>
+#include <numpy/ufuncobject.h>
 #include "chuck_def.h"
 #include "RtAudio.h"
 #include "chuck_audio.h"
 #include "chuck.h"
 #include "chuck_vm.h"
 #include "chuck_carrier.h"
+#include "audio_tap.h"
+#include "sndfile_writer.h"
+#include "chuck_host.h"
+#include "chuck_mixer.h"
+#include "py_ugen.h"
+#include "timing_stats.h"
 /* --- forward declarations --- */
 
 
+typedef struct {
+    PyObject_HEAD
+    SoundFileWriter *obj;
+    PyBindGenWrapperFlags flags:8;
+} PySoundFileWriter;
+
+
+extern PyTypeObject PySoundFileWriter_Type;
+
+
 typedef struct {
     PyObject_HEAD
     Chuck_Carrier *obj;
@@ -85,6 +110,16 @@ typedef struct {
 extern PyTypeObject PyChucK_Type;
 
 
+typedef struct {
+    PyObject_HEAD
+    ChuckMixer *obj;
+    PyBindGenWrapperFlags flags:8;
+} PyChuckMixer;
+
+
+extern PyTypeObject PyChuckMixer_Type;
+
+
 typedef struct {
     PyObject_HEAD
     RtAudio *obj;
@@ -95,6 +130,16 @@ typedef struct {
 extern PyTypeObject PyRtAudio_Type;
 
 
+typedef struct {
+    PyObject_HEAD
+    AudioTap *obj;
+    PyBindGenWrapperFlags flags:8;
+} PyAudioTap;
+
+
+extern PyTypeObject PyAudioTap_Type;
+
+
 typedef struct {
     PyObject_HEAD
     ChuckAudio *obj;
@@ -124,8 +169,17 @@ extern PyTypeObject Pystd__list__lt__std__string__gt__Iter_Type;
 
 int _wrap_convert_py2c__std__list__lt___std__string___gt__(PyObject *arg, std::list<std::string> *container);
 
-            PyObject* samples_to_numpy_array(SAMPLE * samples, t_CKUINT count, t_CKUINT shape);
-            SAMPLE* numpy_array_to_samples(PyObject * npy_samples);
+            PyObject* samples_to_numpy_array(SAMPLE * samples, t_CKUINT num_frames, t_CKUINT num_channels);
+            void numpy_array_rebind_samples(PyObject * npy_samples, SAMPLE * samples);
+            int samples_get_buffer(
+                PyObject * obj,
+                Py_buffer * view,
+                npy_intp min_frames,
+                t_CKUINT num_channels,
+                bool writeable,
+                bool allow_double,
+                const char * name
+            );
 
             // Wrapper for f_audio_cb which calls a Python function
             void _wrap_f_audio_cb(
@@ -134,140 +188,210 @@ int _wrap_convert_py2c__std__list__lt___std__string___gt__(PyObject *arg, std::l
                 t_CKUINT num_frames,
                 t_CKUINT num_in_chans,
                 t_CKUINT num_out_chans,
-                void * py_cb
+                void * target
             );
             static void log_obj(PyObject * o);
 
+            // Append an update of global name to value, an int, float or 1-D
+            // sequence of floats, to updates. Returns 0, or -1 with an exception set.
+            int globals_append_update(std::vector<GlobalUpdate> & updates, PyObject * name, PyObject * value);
 
-int _wrap_convert_py2c__std__string(PyObject *value, std::string *address);
+            // Raise OSError with the error of a writer, returning NULL
+            PyObject * sound_file_writer_set_error(SoundFileWriter * writer);
 
-/* --- module functions --- */
+            // The counters of stats as a dict, with late only if include_late
+            PyObject * timing_stats_to_dict(const TimingStats & stats, bool include_late);
 
+            inline bool chuck_host_init(ChucK * chuck)
+            {
+                return ((ChuckHost *)chuck)->init_host();
+            }
 
-PyObject *
-_wrap__chuck_set_error_message_log_level(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    t_CKUINT level;
-    const char *keywords[] = {"level", NULL};
+            inline bool chuck_host_replace_shred(ChucK * chuck, t_CKUINT xid, const std::string & code, const std::string & args_together, t_CKUINT fade_frames)
+            {
+                return ((ChuckHost *)chuck)->replace_shred(xid, code, args_together, fade_frames);
+            }
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k", (char **) keywords, &level)) {
-        return NULL;
-    }
-    EM_setlog(level);
-    Py_INCREF(Py_None);
-    py_retval = Py_None;
-    return py_retval;
-}
-PyObject * _wrap__chuck_set_error_message_log_level(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+            inline void chuck_host_remove_shred(ChucK * chuck, t_CKUINT xid, t_CKUINT fade_frames)
+            {
+                ((ChuckHost *)chuck)->remove_shred(xid, fade_frames);
+            }
 
+            inline t_CKUINT chuck_host_add_shred(ChucK * chuck, const std::string & code, const std::string & args_together)
+            {
+                return ((ChuckHost *)chuck)->add_shred(code, args_together);
+            }
 
-PyObject *
-_wrap__chuck_mtof(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    double retval;
-    double f;
-    const char *keywords[] = {"f", NULL};
+            inline t_CKUINT chuck_host_request_status(ChucK * chuck)
+            {
+                return ((ChuckHost *)chuck)->request_status();
+            }
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "d", (char **) keywords, &f)) {
-        return NULL;
-    }
-    retval = mtof(f);
-    py_retval = Py_BuildValue((char *) "d", retval);
-    return py_retval;
-}
-PyObject * _wrap__chuck_mtof(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+            inline bool chuck_host_shred_running(ChucK * chuck, t_CKUINT xid)
+            {
+                return ((ChuckHost *)chuck)->shred_running(xid);
+            }
 
+            inline void chuck_host_set_notify_fd(ChucK * chuck, int fd, t_CKUINT tick_frames)
+            {
+                ((ChuckHost *)chuck)->notifier().set_fd(fd, tick_frames);
+            }
 
-PyObject *
-_wrap__chuck_ftom(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    double retval;
-    double f;
-    const char *keywords[] = {"f", NULL};
+            inline void chuck_host_watch_shred(ChucK * chuck, t_CKUINT xid)
+            {
+                ((ChuckHost *)chuck)->notifier().watch(xid);
+            }
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "d", (char **) keywords, &f)) {
-        return NULL;
-    }
-    retval = ftom(f);
-    py_retval = Py_BuildValue((char *) "d", retval);
-    return py_retval;
-}
-PyObject * _wrap__chuck_ftom(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+            inline void chuck_host_watch_applied(ChucK * chuck, t_CKUINT number)
+            {
+                ((ChuckHost *)chuck)->notifier().watch_applied(number);
+            }
 
+            inline double chuck_host_now(ChucK * chuck)
+            {
+                return ((ChuckHost *)chuck)->now();
+            }
 
-PyObject *
-_wrap__chuck_powtodb(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    double retval;
-    double f;
-    const char *keywords[] = {"f", NULL};
+            inline void chuck_host_reset(ChucK * chuck)
+            {
+                ((ChuckHost *)chuck)->reset();
+            }
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "d", (char **) keywords, &f)) {
-        return NULL;
-    }
-    retval = powtodb(f);
-    py_retval = Py_BuildValue((char *) "d", retval);
-    return py_retval;
-}
-PyObject * _wrap__chuck_powtodb(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+            inline void chuck_host_clear_schedule(ChucK * chuck)
+            {
+                ((ChuckHost *)chuck)->schedule().clear();
+            }
 
+            inline void chuck_host_set_code_cache_size(ChucK * chuck, t_CKUINT size)
+            {
+                ((ChuckHost *)chuck)->code_cache().set_capacity(size);
+            }
 
-PyObject *
-_wrap__chuck_rmstodb(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    double retval;
-    double f;
-    const char *keywords[] = {"f", NULL};
+            inline void chuck_host_clear_code_cache(ChucK * chuck)
+            {
+                ((ChuckHost *)chuck)->code_cache().clear();
+            }
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "d", (char **) keywords, &f)) {
-        return NULL;
-    }
-    retval = rmstodb(f);
-    py_retval = Py_BuildValue((char *) "d", retval);
-    return py_retval;
-}
-PyObject * _wrap__chuck_rmstodb(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+            // The Chuck instance or mixer bound to chuck_audio, which is a
+            // singleton, so there is at most one
+            struct ChuckAudioTarget {
+                ChucK * chuck;
+                ChuckMixer * mixer;
+                t_CKUINT num_in_chans;
+                t_CKUINT num_out_chans;
+
+                // Or the Python callable, with the (input, output, num_frames,
+                // num_in_chans, num_out_chans) arguments it is called with. The
+                // tuple and the views in it are built once per stream and rebound
+                // to the current buffers in place on every callback.
+                PyObject * py_callback;
+                PyObject * py_callback_args;
+
+                // The Chuck, mixer or callable last bound, which this keeps
+                // alive until another one is
+                PyObject * py_bound;
+
+                // Optional tap receiving a copy of every output block. py_tap
+                // owns it; in_callback lets set_tap wait for the audio thread
+                // to let go of the previous tap before releasing it.
+                std::atomic<AudioTap *> tap;
+                std::atomic<bool> in_callback;
+                PyObject * py_tap;
+
+                // Timing of every callback, written only by the audio thread
+                TimingStats stats;
+                TimingStats::Clock::time_point last_callback;
+
+                TimingStats::Clock::time_point begin_callback(t_CKUINT num_frames)
+                {
+                    TimingStats::Clock::time_point now = TimingStats::Clock::now();
+                    // RtAudio's xrun status does not reach f_audio_cb, so infer
+                    // them: a callback more than half a buffer later than its
+                    // period after the previous one means the driver waited
+                    if (last_callback != TimingStats::Clock::time_point()) {
+                        double period = (double)num_frames / ChuckAudio::srate();
+                        if (std::chrono::duration<double>(now - last_callback).count() > period * 1.5) {
+                            stats.record_late();
+                        }
+                    }
+                    last_callback = now;
+                    return now;
+                }
 
+                void end_callback(TimingStats::Clock::time_point start, t_CKUINT num_frames)
+                {
+                    stats.record(start, num_frames, ChuckAudio::srate());
+                }
+            };
+            extern ChuckAudioTarget chuck_audio_target;
 
-PyObject *
-_wrap__chuck_dbtopow(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    double retval;
-    double f;
-    const char *keywords[] = {"f", NULL};
+            // Callback for chuck_audio which runs the bound ChucK instance
+            // without ever touching the interpreter
+            void _native_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            );
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "d", (char **) keywords, &f)) {
-        return NULL;
-    }
-    retval = dbtopow(f);
-    py_retval = Py_BuildValue((char *) "d", retval);
-    return py_retval;
-}
-PyObject * _wrap__chuck_dbtopow(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+            // Callback for chuck_audio which runs the bound mixer's VMs on its
+            // worker threads, again without touching the interpreter
+            void _mixer_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            );
+
+            // Choose the f_audio_cb for a Python callback argument of
+            // chuck_audio.initialize and set *data to its user data
+            f_audio_cb chuck_audio_bind(PyObject * callback, void ** data);
+
+
+            // Add mtof, ftom, powtodb, rmstodb, dbtopow and dbtorms to module
+            // as ufuncs. Returns 0, or -1 with an exception set.
+            int math_ufuncs_add(PyObject * module);
+
+
+            // The PyUGenCall behind Chuck.register_ugen: call callable as
+            // callable(input, output) with (num_frames,) float32 views
+            bool py_ugen_call(void * callable, SAMPLE * input, SAMPLE * output, t_CKUINT num_frames);
+
+
+            // A reference to obj that is released, with the GIL, when the last
+            // copy of the pointer goes
+            std::shared_ptr<void> py_object_owner(PyObject * obj);
+
+
+            PyObject * audio_tap_read(AudioTap * tap, t_CKUINT num_frames);
+            PyObject * _wrap_PyAudioTap__tp_iternext(PyAudioTap *self);
+
+
+int _wrap_convert_py2c__std__string(PyObject *value, std::string *address);
+
+/* --- module functions --- */
 
 
 PyObject *
-_wrap__chuck_dbtorms(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
+_wrap__chuck_set_error_message_log_level(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs)
 {
     PyObject *py_retval;
-    double retval;
-    double f;
-    const char *keywords[] = {"f", NULL};
+    t_CKUINT level;
+    const char *keywords[] = {"level", NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "d", (char **) keywords, &f)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k", (char **) keywords, &level)) {
         return NULL;
     }
-    retval = dbtorms(f);
-    py_retval = Py_BuildValue((char *) "d", retval);
+    EM_setlog(level);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
     return py_retval;
 }
-PyObject * _wrap__chuck_dbtorms(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
+PyObject * _wrap__chuck_set_error_message_log_level(PyObject * PYBINDGEN_UNUSED(dummy), PyObject *args, PyObject *kwargs);
 
 
 PyObject *
@@ -307,12 +431,6 @@ PyObject * _wrap__chuck_ensurepow2(PyObject * PYBINDGEN_UNUSED(dummy), PyObject
 
 static PyMethodDef _chuck_functions[] = {
     {(char *) "set_error_message_log_level", (PyCFunction) _wrap__chuck_set_error_message_log_level, METH_KEYWORDS|METH_VARARGS, "set_error_message_log_level(level)\n\ntype: level: t_CKUINT" },
-    {(char *) "mtof", (PyCFunction) _wrap__chuck_mtof, METH_KEYWORDS|METH_VARARGS, "mtof(f)\n\ntype: f: double" },
-    {(char *) "ftom", (PyCFunction) _wrap__chuck_ftom, METH_KEYWORDS|METH_VARARGS, "ftom(f)\n\ntype: f: double" },
-    {(char *) "powtodb", (PyCFunction) _wrap__chuck_powtodb, METH_KEYWORDS|METH_VARARGS, "powtodb(f)\n\ntype: f: double" },
-    {(char *) "rmstodb", (PyCFunction) _wrap__chuck_rmstodb, METH_KEYWORDS|METH_VARARGS, "rmstodb(f)\n\ntype: f: double" },
-    {(char *) "dbtopow", (PyCFunction) _wrap__chuck_dbtopow, METH_KEYWORDS|METH_VARARGS, "dbtopow(f)\n\ntype: f: double" },
-    {(char *) "dbtorms", (PyCFunction) _wrap__chuck_dbtorms, METH_KEYWORDS|METH_VARARGS, "dbtorms(f)\n\ntype: f: double" },
     {(char *) "nextpow2", (PyCFunction) _wrap__chuck_nextpow2, METH_KEYWORDS|METH_VARARGS, "nextpow2(i)\n\ntype: i: unsigned long" },
     {(char *) "ensurepow2", (PyCFunction) _wrap__chuck_ensurepow2, METH_KEYWORDS|METH_VARARGS, "ensurepow2(i)\n\ntype: i: unsigned long" },
     {NULL, NULL, 0, NULL}
@@ -321,106 +439,361 @@ static PyMethodDef _chuck_functions[] = {
 
 
 
-
 static int
-_wrap_PyChuck_Carrier__tp_init__0(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+_wrap_PySoundFileWriter__tp_init(PySoundFileWriter *self, PyObject *args, PyObject *kwargs)
 {
-    const char *keywords[] = {NULL};
+    const char *path = NULL;
+    Py_ssize_t path_len;
+    std::string path_std;
+    t_CKUINT sample_rate;
+    t_CKUINT num_channels;
+    int format;
+    t_CKUINT buffer_frames;
+    t_CKUINT num_buffers;
+    const char *keywords[] = {"path", "sample_rate", "num_channels", "format", "buffer_frames", "num_buffers", NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
-        {
-            PyObject *exc_type, *traceback;
-            PyErr_Fetch(&exc_type, return_exception, &traceback);
-            Py_XDECREF(exc_type);
-            Py_XDECREF(traceback);
-        }
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#kkikk", (char **) keywords, &path, &path_len, &sample_rate, &num_channels, &format, &buffer_frames, &num_buffers)) {
         return -1;
     }
-    self->obj = new Chuck_Carrier();
+    path_std = std::string(path, path_len);
+    self->obj = new SoundFileWriter(path_std, sample_rate, num_channels, format, buffer_frames, num_buffers);
     self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
     return 0;
 }
 
-static int
-_wrap_PyChuck_Carrier__tp_init__1(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+
+PyObject *
+_wrap_PySoundFileWriter_num_channels(PySoundFileWriter *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
-    PyChuck_Carrier *ctor_arg;
-    const char *keywords[] = {"ctor_arg", NULL};
+    PyObject *py_retval;
+    t_CKUINT retval;
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyChuck_Carrier_Type, &ctor_arg)) {
-        {
-            PyObject *exc_type, *traceback;
-            PyErr_Fetch(&exc_type, return_exception, &traceback);
-            Py_XDECREF(exc_type);
-            Py_XDECREF(traceback);
-        }
-        return -1;
-    }
-    self->obj = new Chuck_Carrier(*((PyChuck_Carrier *) ctor_arg)->obj);
-    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
-    return 0;
+    retval = self->obj->num_channels();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
 }
 
-static int
-_wrap_PyChuck_Carrier__tp_init__2(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+
+PyObject *
+_wrap_PySoundFileWriter_frames_written(PySoundFileWriter *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
-    const char *keywords[] = {NULL};
+    PyObject *py_retval;
+    t_CKUINT retval;
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
-        {
-            PyObject *exc_type, *traceback;
-            PyErr_Fetch(&exc_type, return_exception, &traceback);
-            Py_XDECREF(exc_type);
-            Py_XDECREF(traceback);
-        }
-        return -1;
-    }
-    self->obj = new Chuck_Carrier();
-    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
-    return 0;
+    retval = self->obj->frames_written();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
 }
 
-int _wrap_PyChuck_Carrier__tp_init(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs)
+
+PyObject *
+_wrap_PySoundFileWriter_failed(PySoundFileWriter *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
-    int retval;
-    PyObject *error_list;
-    PyObject *exceptions[3] = {0,};
-    retval = _wrap_PyChuck_Carrier__tp_init__0(self, args, kwargs, &exceptions[0]);
-    if (!exceptions[0]) {
-        return retval;
-    }
-    retval = _wrap_PyChuck_Carrier__tp_init__1(self, args, kwargs, &exceptions[1]);
-    if (!exceptions[1]) {
-        Py_DECREF(exceptions[0]);
-        return retval;
-    }
-    retval = _wrap_PyChuck_Carrier__tp_init__2(self, args, kwargs, &exceptions[2]);
-    if (!exceptions[2]) {
-        Py_DECREF(exceptions[0]);
-        Py_DECREF(exceptions[1]);
-        return retval;
-    }
-    error_list = PyList_New(3);
-    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
-    Py_DECREF(exceptions[0]);
-    PyList_SET_ITEM(error_list, 1, PyObject_Str(exceptions[1]));
-    Py_DECREF(exceptions[1]);
-    PyList_SET_ITEM(error_list, 2, PyObject_Str(exceptions[2]));
-    Py_DECREF(exceptions[2]);
-    PyErr_SetObject(PyExc_TypeError, error_list);
-    Py_DECREF(error_list);
-    return -1;
+    PyObject *py_retval;
+    bool retval;
+
+    retval = self->obj->failed();
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
 }
 
 
-static PyObject*
-_wrap_PyChuck_Carrier__copy__(PyChuck_Carrier *self)
+PyObject *
+_wrap_PySoundFileWriter_closed(PySoundFileWriter *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
+    PyObject *py_retval;
+    bool retval;
 
-    PyChuck_Carrier *py_copy;
-    py_copy = PyObject_New(PyChuck_Carrier, &PyChuck_Carrier_Type);
-    py_copy->obj = new Chuck_Carrier(*self->obj);
-    py_copy->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    retval = self->obj->closed();
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PySoundFileWriter_error(PySoundFileWriter *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    std::string retval;
+
+    retval = self->obj->error();
+    py_retval = Py_BuildValue((char *) "s#", (retval).c_str(), (retval).size());
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PySoundFileWriter_write__inner(
+            PySoundFileWriter *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* input_numpy_array;
+            const char *keywords[] = {"samples", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &input_numpy_array)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            SoundFileWriter * writer = self->obj;
+            Py_buffer input_view;
+            if (samples_get_buffer(input_numpy_array, &input_view, 0, writer->num_channels(), false, false, "samples") < 0) {
+                return NULL;
+            }
+            bool ok;
+            // Waits for the writer thread when the buffers are full
+            Py_BEGIN_ALLOW_THREADS
+            ok = writer->write((const SAMPLE *)input_view.buf, input_view.shape[0]);
+            Py_END_ALLOW_THREADS
+            PyBuffer_Release(&input_view);
+            if (!ok) {
+                return sound_file_writer_set_error(writer);
+            }
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PySoundFileWriter_write(PySoundFileWriter *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PySoundFileWriter_write__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PySoundFileWriter_close__inner(
+            PySoundFileWriter *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            bool ok;
+            Py_BEGIN_ALLOW_THREADS
+            ok = self->obj->close();
+            Py_END_ALLOW_THREADS
+            if (!ok) {
+                return sound_file_writer_set_error(self->obj);
+            }
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PySoundFileWriter_close(PySoundFileWriter *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PySoundFileWriter_close__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+static PyMethodDef PySoundFileWriter_methods[] = {
+    {(char *) "num_channels", (PyCFunction) _wrap_PySoundFileWriter_num_channels, METH_NOARGS, "num_channels()\n\n" },
+    {(char *) "frames_written", (PyCFunction) _wrap_PySoundFileWriter_frames_written, METH_NOARGS, "frames_written()\n\n" },
+    {(char *) "failed", (PyCFunction) _wrap_PySoundFileWriter_failed, METH_NOARGS, "failed()\n\n" },
+    {(char *) "closed", (PyCFunction) _wrap_PySoundFileWriter_closed, METH_NOARGS, "closed()\n\n" },
+    {(char *) "error", (PyCFunction) _wrap_PySoundFileWriter_error, METH_NOARGS, "error()\n\n" },
+    {(char *) "write", (PyCFunction) _wrap_PySoundFileWriter_write, METH_KEYWORDS|METH_VARARGS, "write(samples)\n\nQueue samples, a (frames, num_channels) float32 buffer, to be written. Raises OSError if the file is closed or a write has failed." },
+    {(char *) "close", (PyCFunction) _wrap_PySoundFileWriter_close, METH_KEYWORDS|METH_VARARGS, "close()\n\nWrite everything queued and close the file. Raises OSError if any write failed." },
+    {NULL, NULL, 0, NULL}
+};
+
+static void
+_wrap_PySoundFileWriter__tp_dealloc(PySoundFileWriter *self)
+{
+        SoundFileWriter *tmp = self->obj;
+        self->obj = NULL;
+        if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {
+            delete tmp;
+        }
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+PyTypeObject PySoundFileWriter_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "_chuck.SoundFileWriter",            /* tp_name */
+    sizeof(PySoundFileWriter),                  /* tp_basicsize */
+    0,                                 /* tp_itemsize */
+    /* methods */
+    (destructor)_wrap_PySoundFileWriter__tp_dealloc,        /* tp_dealloc */
+    (printfunc)0,                      /* tp_print */
+    (getattrfunc)NULL,       /* tp_getattr */
+    (setattrfunc)NULL,       /* tp_setattr */
+#if PY_MAJOR_VERSION >= 3
+    NULL,
+#else
+    (cmpfunc)NULL,           /* tp_compare */
+#endif
+    (reprfunc)NULL,             /* tp_repr */
+    (PyNumberMethods*)NULL,     /* tp_as_number */
+    (PySequenceMethods*)NULL, /* tp_as_sequence */
+    (PyMappingMethods*)NULL,   /* tp_as_mapping */
+    (hashfunc)NULL,             /* tp_hash */
+    (ternaryfunc)NULL,          /* tp_call */
+    (reprfunc)NULL,              /* tp_str */
+    (getattrofunc)NULL,     /* tp_getattro */
+    (setattrofunc)NULL,     /* tp_setattro */
+    (PyBufferProcs*)NULL,  /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                      /* tp_flags */
+    "SoundFileWriter(path, sample_rate, num_channels, format, buffer_frames, num_buffers)",                        /* Documentation string */
+    (traverseproc)NULL,     /* tp_traverse */
+    (inquiry)NULL,             /* tp_clear */
+    (richcmpfunc)NULL,   /* tp_richcompare */
+    0,             /* tp_weaklistoffset */
+    (getiterfunc)NULL,          /* tp_iter */
+    (iternextfunc)NULL,     /* tp_iternext */
+    (struct PyMethodDef*)PySoundFileWriter_methods, /* tp_methods */
+    (struct PyMemberDef*)0,              /* tp_members */
+    0,                     /* tp_getset */
+    NULL,                              /* tp_base */
+    NULL,                              /* tp_dict */
+    (descrgetfunc)NULL,    /* tp_descr_get */
+    (descrsetfunc)NULL,    /* tp_descr_set */
+    0,                 /* tp_dictoffset */
+    (initproc)_wrap_PySoundFileWriter__tp_init,             /* tp_init */
+    (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
+    (newfunc)PyType_GenericNew,               /* tp_new */
+    (freefunc)0,             /* tp_free */
+    (inquiry)NULL,             /* tp_is_gc */
+    NULL,                              /* tp_bases */
+    NULL,                              /* tp_mro */
+    NULL,                              /* tp_cache */
+    NULL,                              /* tp_subclasses */
+    NULL,                              /* tp_weaklist */
+    (destructor) NULL                  /* tp_del */
+};
+
+
+
+
+
+static int
+_wrap_PyChuck_Carrier__tp_init__0(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return -1;
+    }
+    self->obj = new Chuck_Carrier();
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+static int
+_wrap_PyChuck_Carrier__tp_init__1(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    PyChuck_Carrier *ctor_arg;
+    const char *keywords[] = {"ctor_arg", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyChuck_Carrier_Type, &ctor_arg)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return -1;
+    }
+    self->obj = new Chuck_Carrier(*((PyChuck_Carrier *) ctor_arg)->obj);
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+static int
+_wrap_PyChuck_Carrier__tp_init__2(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return -1;
+    }
+    self->obj = new Chuck_Carrier();
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+int _wrap_PyChuck_Carrier__tp_init(PyChuck_Carrier *self, PyObject *args, PyObject *kwargs)
+{
+    int retval;
+    PyObject *error_list;
+    PyObject *exceptions[3] = {0,};
+    retval = _wrap_PyChuck_Carrier__tp_init__0(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    retval = _wrap_PyChuck_Carrier__tp_init__1(self, args, kwargs, &exceptions[1]);
+    if (!exceptions[1]) {
+        Py_DECREF(exceptions[0]);
+        return retval;
+    }
+    retval = _wrap_PyChuck_Carrier__tp_init__2(self, args, kwargs, &exceptions[2]);
+    if (!exceptions[2]) {
+        Py_DECREF(exceptions[0]);
+        Py_DECREF(exceptions[1]);
+        return retval;
+    }
+    error_list = PyList_New(3);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyList_SET_ITEM(error_list, 1, PyObject_Str(exceptions[1]));
+    Py_DECREF(exceptions[1]);
+    PyList_SET_ITEM(error_list, 2, PyObject_Str(exceptions[2]));
+    Py_DECREF(exceptions[2]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return -1;
+}
+
+
+static PyObject*
+_wrap_PyChuck_Carrier__copy__(PyChuck_Carrier *self, PyObject *PYBINDGEN_UNUSED(_args))
+{
+
+    PyChuck_Carrier *py_copy;
+    py_copy = PyObject_New(PyChuck_Carrier, &PyChuck_Carrier_Type);
+    py_copy->obj = new Chuck_Carrier(*self->obj);
+    py_copy->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
     return (PyObject*) py_copy;
 }
 
@@ -590,7 +963,7 @@ int _wrap_PyChuck_Object__tp_init(PyChuck_Object *self, PyObject *args, PyObject
 
 
 static PyObject*
-_wrap_PyChuck_Object__copy__(PyChuck_Object *self)
+_wrap_PyChuck_Object__copy__(PyChuck_Object *self, PyObject *PYBINDGEN_UNUSED(_args))
 {
 
     PyChuck_Object *py_copy;
@@ -787,7 +1160,7 @@ _wrap_PyChuck_VM_initialize(PyChuck_VM *self, PyObject *args, PyObject *kwargs)
 
 
 PyObject *
-_wrap_PyChuck_VM_initialize_synthesis(PyChuck_VM *self)
+_wrap_PyChuck_VM_initialize_synthesis(PyChuck_VM *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -818,7 +1191,7 @@ _wrap_PyChuck_VM_set_carrier(PyChuck_VM *self, PyObject *args, PyObject *kwargs)
 
 
 PyObject *
-_wrap_PyChuck_VM_shutdown(PyChuck_VM *self)
+_wrap_PyChuck_VM_shutdown(PyChuck_VM *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -830,7 +1203,7 @@ _wrap_PyChuck_VM_shutdown(PyChuck_VM *self)
 
 
 PyObject *
-_wrap_PyChuck_VM_has_init(PyChuck_VM *self)
+_wrap_PyChuck_VM_has_init(PyChuck_VM *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -842,7 +1215,7 @@ _wrap_PyChuck_VM_has_init(PyChuck_VM *self)
 
 
 PyObject *
-_wrap_PyChuck_VM_start(PyChuck_VM *self)
+_wrap_PyChuck_VM_start(PyChuck_VM *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -854,7 +1227,7 @@ _wrap_PyChuck_VM_start(PyChuck_VM *self)
 
 
 PyObject *
-_wrap_PyChuck_VM_stop(PyChuck_VM *self)
+_wrap_PyChuck_VM_stop(PyChuck_VM *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -866,7 +1239,7 @@ _wrap_PyChuck_VM_stop(PyChuck_VM *self)
 
 
 static PyObject*
-_wrap_PyChuck_VM__copy__(PyChuck_VM *self)
+_wrap_PyChuck_VM__copy__(PyChuck_VM *self, PyObject *PYBINDGEN_UNUSED(_args))
 {
 
     PyChuck_VM *py_copy;
@@ -964,7 +1337,7 @@ _wrap_PyChucK__tp_init(PyChucK *self, PyObject *args, PyObject *kwargs)
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
         return -1;
     }
-    self->obj = new ChucK();
+    self->obj = new ChuckHost();
     self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
     return 0;
 }
@@ -1214,97 +1587,1988 @@ _wrap_PyChucK_compile_file(PyChucK *self, PyObject *args, PyObject *kwargs)
 }
 
 
-PyObject *
-_wrap_PyChucK_compile_code(PyChucK *self, PyObject *args, PyObject *kwargs)
-{
-    PyObject *py_retval;
-    bool retval;
-    const char *code = NULL;
-    Py_ssize_t code_len;
-    std::string code_std;
-    const char *argsTogether = NULL;
-    Py_ssize_t argsTogether_len;
-    std::string argsTogether_std;
-    int count;
-    const char *keywords[] = {"code", "argsTogether", "count", NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#s#i", (char **) keywords, &code, &code_len, &argsTogether, &argsTogether_len, &count)) {
-        return NULL;
-    }
-    code_std = std::string(code, code_len);
-    argsTogether_std = std::string(argsTogether, argsTogether_len);
-    retval = self->obj->compileCode(code_std, argsTogether_std, count);
-    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
-    return py_retval;
+
+        PyObject * _wrap_PyChucK_compile_code__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            const char *code = NULL;
+            Py_ssize_t code_len;
+            const char *argsTogether = "";
+            Py_ssize_t argsTogether_len = 0;
+            int count = 1;
+            const char *keywords[] = {"code", "argsTogether", "count", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#|s#i", (char **) keywords, &code, &code_len, &argsTogether, &argsTogether_len, &count)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (!chuck->compile_code(std::string(code, code_len), std::string(argsTogether, argsTogether_len), count)) {
+                return PyList_New(0);
+            }
+            const std::vector<t_CKUINT> & sporked = chuck->sporked();
+            PyObject * ids = PyList_New(sporked.size());
+            if (ids == NULL) {
+                return NULL;
+            }
+            for (size_t i = 0; i < sporked.size(); i++) {
+                PyList_SET_ITEM(ids, i, PyLong_FromUnsignedLong(sporked[i]));
+            }
+            return ids;
+        }
+
+
+PyObject * _wrap_PyChucK_compile_code(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_compile_code__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
 }
 
 
 PyObject *
-_wrap_PyChucK_init(PyChucK *self)
+_wrap__chuck_replace_shred(PyChucK *self, PyObject *args, PyObject *kwargs)
 {
     PyObject *py_retval;
     bool retval;
+    t_CKUINT shred_id;
+    const char *code = NULL;
+    Py_ssize_t code_len;
+    std::string code_std;
+    const char *argsTogether = NULL;
+    Py_ssize_t argsTogether_len;
+    std::string argsTogether_std;
+    t_CKUINT fade_frames = 0;
+    const char *keywords[] = {"shred_id", "code", "argsTogether", "fade_frames", NULL};
 
-    retval = self->obj->init();
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "ks#|s#k", (char **) keywords, &shred_id, &code, &code_len, &argsTogether, &argsTogether_len, &fade_frames)) {
+        return NULL;
+    }
+    code_std = std::string(code, code_len);
+    if (argsTogether)
+        argsTogether_std = std::string(argsTogether, argsTogether_len);
+    else
+        argsTogether_std = "";
+    retval = chuck_host_replace_shred(self->obj, shred_id, code_std, argsTogether_std, fade_frames);
     py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
     return py_retval;
 }
 
 
 PyObject *
-_wrap_PyChucK_start(PyChucK *self)
+_wrap__chuck_remove_shred(PyChucK *self, PyObject *args, PyObject *kwargs)
 {
     PyObject *py_retval;
-    bool retval;
+    t_CKUINT shred_id;
+    t_CKUINT fade_frames = 0;
+    const char *keywords[] = {"shred_id", "fade_frames", NULL};
 
-    retval = self->obj->start();
-    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k|k", (char **) keywords, &shred_id, &fade_frames)) {
+        return NULL;
+    }
+    chuck_host_remove_shred(self->obj, shred_id, fade_frames);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_add_shred(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+    const char *code = NULL;
+    Py_ssize_t code_len;
+    std::string code_std;
+    const char *argsTogether = NULL;
+    Py_ssize_t argsTogether_len;
+    std::string argsTogether_std;
+    const char *keywords[] = {"code", "argsTogether", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#|s#", (char **) keywords, &code, &code_len, &argsTogether, &argsTogether_len)) {
+        return NULL;
+    }
+    code_std = std::string(code, code_len);
+    if (argsTogether)
+        argsTogether_std = std::string(argsTogether, argsTogether_len);
+    else
+        argsTogether_std = "";
+    retval = chuck_host_add_shred(self->obj, code_std, argsTogether_std);
+    py_retval = Py_BuildValue((char *) "k", retval);
     return py_retval;
 }
 
 
+PyObject *
+_wrap__chuck_request_status(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+    const char *keywords[] = {NULL};
 
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return NULL;
+    }
+    retval = chuck_host_request_status(self->obj);
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
 
-        PyObject * _wrap_PyChucK_run__inner(
+
+
+
+        PyObject * _wrap_PyChucK_shreds__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                return PyList_New(0);
+            }
+            Chuck_VM_Status status;
+            chuck->vm()->shreduler()->status(&status);
+            PyObject * shreds = PyList_New(status.list.size());
+            if (shreds == NULL) {
+                return NULL;
+            }
+            for (size_t i = 0; i < status.list.size(); i++) {
+                Chuck_VM_Shred_Status * shred = status.list[i];
+                PyObject * item = Py_BuildValue(
+                    "{s:k,s:s,s:d,s:O}",
+                    "id", shred->xid,
+                    "name", shred->name.c_str(),
+                    "start", (double)(shred->start - chuck->epoch()),
+                    "waiting", shred->has_event ? Py_True : Py_False
+                );
+                if (item == NULL) {
+                    Py_DECREF(shreds);
+                    return NULL;
+                }
+                PyList_SET_ITEM(shreds, i, item);
+            }
+            return shreds;
+        }
+
+
+PyObject * _wrap_PyChucK_shreds(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_shreds__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_shred_status__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            ShredStatus status;
+            if (!chuck->shred_control().collect_status(status)) {
+                Py_INCREF(Py_None);
+                return Py_None;
+            }
+            PyObject * shreds = PyList_New(status.shreds.size());
+            PyObject * added = PyDict_New();
+            if (shreds == NULL || added == NULL) {
+                Py_XDECREF(shreds);
+                Py_XDECREF(added);
+                return NULL;
+            }
+            for (size_t i = 0; i < status.shreds.size(); i++) {
+                ShredInfo & shred = status.shreds[i];
+                PyObject * item = Py_BuildValue(
+                    "{s:k,s:s,s:d,s:O}",
+                    "id", shred.xid,
+                    "name", shred.name.c_str(),
+                    "start", (double)(shred.start - chuck->epoch()),
+                    "waiting", shred.waiting ? Py_True : Py_False
+                );
+                if (item == NULL) {
+                    Py_DECREF(shreds);
+                    Py_DECREF(added);
+                    return NULL;
+                }
+                PyList_SET_ITEM(shreds, i, item);
+            }
+            for (size_t i = 0; i < status.added.size(); i++) {
+                PyObject * number = PyLong_FromUnsignedLong(status.added[i].first);
+                PyObject * xid = PyLong_FromUnsignedLong(status.added[i].second);
+                bool failed = number == NULL || xid == NULL || PyDict_SetItem(added, number, xid) < 0;
+                Py_XDECREF(number);
+                Py_XDECREF(xid);
+                if (failed) {
+                    Py_DECREF(shreds);
+                    Py_DECREF(added);
+                    return NULL;
+                }
+            }
+            return Py_BuildValue(
+                "{s:k,s:d,s:N,s:N}",
+                "applied", status.applied,
+                "now", (double)(status.now - chuck->epoch()),
+                "shreds", shreds,
+                "added", added
+            );
+        }
+
+
+PyObject * _wrap_PyChucK_shred_status(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_shred_status__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_shred_control_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ShredControl & control = ((ChuckHost *)self->obj)->shred_control();
+            return Py_BuildValue(
+                "{s:k,s:k}",
+                "pending", control.pending(),
+                "applied", control.applied()
+            );
+        }
+
+
+PyObject * _wrap_PyChucK_shred_control_stats(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_shred_control_stats__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_set_globals__inner(
             PyChucK *self,
             PyObject *args,
             PyObject *kwargs,
             PyObject **return_exception
         )
         {
-            PyObject* input_numpy_array;
-            PyObject* output_numpy_array;
-            int numFrames;
-            const char *keywords[] = {"input", "output", "numFrames", NULL};
-            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "OOi", (char **) keywords, &input_numpy_array, &output_numpy_array, &numFrames)) {
+            PyObject* values;
+            const char *keywords[] = {"values", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyDict_Type, &values)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            std::vector<GlobalUpdate> updates;
+            updates.reserve(PyDict_Size(values));
+            PyObject * name;
+            PyObject * value;
+            Py_ssize_t pos = 0;
+            while (PyDict_Next(values, &pos, &name, &value)) {
+                if (globals_append_update(updates, name, value) < 0) {
+                    return NULL;
+                }
+            }
+            ((ChuckHost *)self->obj)->globals().commit(updates);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChucK_set_globals(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_set_globals__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_set_global_float_array__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* name;
+            PyObject* values;
+            const char *keywords[] = {"name", "values", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "UO", (char **) keywords, &name, &values)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            std::vector<GlobalUpdate> updates;
+            if (globals_append_update(updates, name, values) < 0) {
+                return NULL;
+            }
+            if (updates[0].kind != GlobalUpdate::FLOAT_ARRAY) {
+                PyErr_SetString(PyExc_TypeError, "values must be a 1-D array of floats");
+                return NULL;
+            }
+            ((ChuckHost *)self->obj)->globals().commit(updates);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChucK_set_global_float_array(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_set_global_float_array__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_track_globals__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_names;
+            const char *keywords[] = {"names", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_names)) {
                 PyObject *exc_type, *traceback;
                 PyErr_Fetch(&exc_type, return_exception, &traceback);
                 Py_XDECREF(exc_type);
                 Py_XDECREF(traceback);
                 return NULL;
             }
-            SAMPLE * input = numpy_array_to_samples(input_numpy_array);
-            SAMPLE * output = numpy_array_to_samples(output_numpy_array);
+            PyObject * seq = PySequence_Fast(py_names, "names must be a sequence of strings");
+            if (seq == NULL) {
+                return NULL;
+            }
+            std::vector<std::string> names;
+            for (Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(seq); i++) {
+                PyObject * name = PySequence_Fast_GET_ITEM(seq, i);
+                if (!PyUnicode_Check(name)) {
+                    PyErr_SetString(PyExc_TypeError, "names must be a sequence of strings");
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                names.push_back(PyUnicode_AsUTF8(name));
+            }
+            Py_DECREF(seq);
+            ((ChuckHost *)self->obj)->globals().track(names);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
 
-            Py_XINCREF(input_numpy_array);
-            Py_XINCREF(output_numpy_array);
 
-            //PyArray_UpdateFlags((PyArrayObject *)input_numpy_array, NPY_ARRAY_OWNDATA);
-            //PyArray_UpdateFlags((PyArrayObject *)output_numpy_array, NPY_ARRAY_OWNDATA);
+PyObject * _wrap_PyChucK_track_globals(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_track_globals__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_get_globals__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            GlobalsBridge & globals = ((ChuckHost *)self->obj)->globals();
+            npy_intp dims[1] = {(npy_intp)globals.num_tracked()};
+            PyObject * values = PyArray_SimpleNew(1, dims, NPY_FLOAT64);
+            if (values == NULL) {
+                return NULL;
+            }
+            globals.read((double *)PyArray_DATA((PyArrayObject *)values));
+            return values;
+        }
+
+
+PyObject * _wrap_PyChucK_get_globals(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_get_globals__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_schedule__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_events;
+            const char *keywords[] = {"events", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_events)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            PyObject * seq = PySequence_Fast(py_events, "events must be a sequence of (sample_time, name, value) tuples");
+            if (seq == NULL) {
+                return NULL;
+            }
+            Py_ssize_t num_events = PySequence_Fast_GET_SIZE(seq);
+            std::vector<ScheduledEvent> events(num_events);
+            std::vector<GlobalUpdate> updates;
+            for (Py_ssize_t i = 0; i < num_events; i++) {
+                PyObject * event = PySequence_Fast_GET_ITEM(seq, i);
+                if (!PyTuple_Check(event) || PyTuple_GET_SIZE(event) != 3) {
+                    PyErr_SetString(PyExc_TypeError, "events must be a sequence of (sample_time, name, value) tuples");
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                double frame = PyFloat_AsDouble(PyTuple_GET_ITEM(event, 0));
+                if (frame == -1.0 && PyErr_Occurred()) {
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                PyObject * name = PyTuple_GET_ITEM(event, 1);
+                PyObject * value = PyTuple_GET_ITEM(event, 2);
+                // Global events are triggered by the value "signal" or "broadcast"
+                if (PyUnicode_Check(value) && PyUnicode_Check(name)) {
+                    const char * action = PyUnicode_AsUTF8(value);
+                    GlobalUpdate update;
+                    update.name = PyUnicode_AsUTF8(name);
+                    if (strcmp(action, "signal") == 0) {
+                        update.kind = GlobalUpdate::SIGNAL_EVENT;
+                    } else if (strcmp(action, "broadcast") == 0) {
+                        update.kind = GlobalUpdate::BROADCAST_EVENT;
+                    } else {
+                        PyErr_Format(PyExc_ValueError, "event %s must be \"signal\" or \"broadcast\"", update.name.c_str());
+                        Py_DECREF(seq);
+                        return NULL;
+                    }
+                    updates.push_back(GlobalUpdate());
+                    std::swap(updates.back(), update);
+                } else if (globals_append_update(updates, name, value) < 0) {
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                events[i].frame = frame < 0 ? 0 : (t_CKUINT)(frame + 0.5);
+                std::swap(events[i].update, updates.back());
+                updates.pop_back();
+            }
+            Py_DECREF(seq);
+            ((ChuckHost *)self->obj)->schedule().post(events);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChucK_schedule(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_schedule__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+PyObject *
+_wrap__chuck_clear_schedule(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return NULL;
+    }
+    chuck_host_clear_schedule(self->obj);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_reset(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return NULL;
+    }
+    chuck_host_reset(self->obj);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_now(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    double retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return NULL;
+    }
+    retval = chuck_host_now(self->obj);
+    py_retval = Py_BuildValue((char *) "d", retval);
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_schedule_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            EventSchedule & schedule = ((ChuckHost *)self->obj)->schedule();
+            return Py_BuildValue(
+                "{s:k,s:k,s:k,s:k,s:k}",
+                "pending", schedule.pending(),
+                "splits", schedule.splits(),
+                "last_splits", schedule.last_splits(),
+                "blocks_split", schedule.blocks_split(),
+                "late", schedule.late()
+            );
+        }
+
+
+PyObject * _wrap_PyChucK_schedule_stats(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_schedule_stats__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_sporked__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            const std::vector<t_CKUINT> & sporked = ((ChuckHost *)self->obj)->sporked();
+            PyObject * ids = PyList_New(sporked.size());
+            if (ids == NULL) {
+                return NULL;
+            }
+            for (size_t i = 0; i < sporked.size(); i++) {
+                PyList_SET_ITEM(ids, i, PyLong_FromUnsignedLong(sporked[i]));
+            }
+            return ids;
+        }
+
+
+PyObject * _wrap_PyChucK_sporked(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_sporked__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+PyObject *
+_wrap__chuck_shred_running(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    bool retval;
+    t_CKUINT shred_id;
+    const char *keywords[] = {"shred_id", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k", (char **) keywords, &shred_id)) {
+        return NULL;
+    }
+    retval = chuck_host_shred_running(self->obj, shred_id);
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_set_notify_fd(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    int fd;
+    t_CKUINT tick_frames = 0;
+    const char *keywords[] = {"fd", "tick_frames", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "i|k", (char **) keywords, &fd, &tick_frames)) {
+        return NULL;
+    }
+    chuck_host_set_notify_fd(self->obj, fd, tick_frames);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_watch_shred(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    t_CKUINT shred_id;
+    const char *keywords[] = {"shred_id", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k", (char **) keywords, &shred_id)) {
+        return NULL;
+    }
+    chuck_host_watch_shred(self->obj, shred_id);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_watch_applied(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    t_CKUINT number;
+    const char *keywords[] = {"number", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k", (char **) keywords, &number)) {
+        return NULL;
+    }
+    chuck_host_watch_applied(self->obj, number);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_set_code_cache_size(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    t_CKUINT size;
+    const char *keywords[] = {"size", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k", (char **) keywords, &size)) {
+        return NULL;
+    }
+    chuck_host_set_code_cache_size(self->obj, size);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+PyObject *
+_wrap__chuck_clear_code_cache(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return NULL;
+    }
+    chuck_host_clear_code_cache(self->obj);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_code_cache_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            CodeCache & cache = ((ChuckHost *)self->obj)->code_cache();
+            return Py_BuildValue(
+                "{s:k,s:k,s:k,s:k,s:k}",
+                "hits", cache.hits(),
+                "misses", cache.misses(),
+                "evictions", cache.evictions(),
+                "size", cache.size(),
+                "capacity", cache.capacity()
+            );
+        }
+
+
+PyObject * _wrap_PyChucK_code_cache_stats(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_code_cache_stats__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+PyObject *
+_wrap__chuck_init(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    bool retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return NULL;
+    }
+    retval = chuck_host_init(self->obj);
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyChucK_start(PyChucK *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    bool retval;
+
+    retval = self->obj->start();
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_run__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* input_numpy_array;
+            PyObject* output_numpy_array;
+            int numFrames = -1;
+            const char *keywords[] = {"input", "output", "numFrames", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "OO|i", (char **) keywords, &input_numpy_array, &output_numpy_array, &numFrames)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before run()");
+                return NULL;
+            }
+
+            // Acquiring the buffers pins them for the duration of the call,
+            // since other threads may run while the VM computes without the GIL
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, numFrames < 0 ? 0 : numFrames, chuck->num_out_chans(), true, false, "output") < 0) {
+                return NULL;
+            }
+            if (numFrames < 0) {
+                numFrames = output_view.shape[0];
+            }
+
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            SAMPLE * input = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, numFrames, chuck->num_in_chans(), false, true, "input") < 0) {
+                    PyBuffer_Release(&output_view);
+                    return NULL;
+                }
+            }
+
+            Py_BEGIN_ALLOW_THREADS
+            if (input_view.obj == NULL) {
+                input = chuck->silence(numFrames);
+            } else if (input_view.itemsize != sizeof(SAMPLE)) {
+                input = chuck->convert_input((const double *)input_view.buf, numFrames);
+            } else {
+                input = (SAMPLE *)input_view.buf;
+            }
+            chuck->run_timed(input, (SAMPLE *)output_view.buf, numFrames);
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            PyBuffer_Release(&output_view);
+
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChucK_run(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_run__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        #define CHUCKPY_RENDER_BLOCK_SIZE_DEFAULT 256
+
+        PyObject * _wrap_PyChucK_render__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_seconds = Py_None;
+            PyObject* py_num_frames = Py_None;
+            PyObject* input_numpy_array = Py_None;
+            PyObject* output_numpy_array = Py_None;
+            unsigned long block_size = CHUCKPY_RENDER_BLOCK_SIZE_DEFAULT;
+            const char *keywords[] = {"seconds", "num_frames", "input", "out", "block_size", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "|OOOOk", (char **) keywords, &py_seconds, &py_num_frames, &input_numpy_array, &output_numpy_array, &block_size)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (block_size == 0) {
+                PyErr_SetString(PyExc_ValueError, "block_size must be positive");
+                return NULL;
+            }
+
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before render()");
+                return NULL;
+            }
+            t_CKUINT num_in_chans = chuck->num_in_chans();
+            t_CKUINT num_out_chans = chuck->num_out_chans();
+
+            // -1 means as many frames as out holds
+            npy_intp num_frames = -1;
+            if (py_num_frames != Py_None) {
+                num_frames = PyLong_AsSsize_t(py_num_frames);
+                if (num_frames == -1 && PyErr_Occurred()) {
+                    return NULL;
+                }
+            } else if (py_seconds != Py_None) {
+                double seconds = PyFloat_AsDouble(py_seconds);
+                if (seconds == -1.0 && PyErr_Occurred()) {
+                    return NULL;
+                }
+                num_frames = (npy_intp)(seconds * chuck->sample_rate() + 0.5);
+            } else if (output_numpy_array == Py_None) {
+                PyErr_SetString(PyExc_TypeError, "render() requires seconds, num_frames or out");
+                return NULL;
+            }
+            if (num_frames < 0 && (py_num_frames != Py_None || py_seconds != Py_None)) {
+                PyErr_SetString(PyExc_ValueError, "cannot render a negative number of frames");
+                return NULL;
+            }
+
+            if (output_numpy_array == Py_None) {
+                npy_intp dims[2] = {num_frames, (npy_intp)num_out_chans};
+                output_numpy_array = PyArray_ZEROS(2, dims, NPY_FLOAT32, 0);
+                if (output_numpy_array == NULL) {
+                    return NULL;
+                }
+            } else {
+                Py_INCREF(output_numpy_array);
+            }
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, num_frames < 0 ? 0 : num_frames, num_out_chans, true, false, "out") < 0) {
+                Py_DECREF(output_numpy_array);
+                return NULL;
+            }
+            if (num_frames < 0) {
+                num_frames = output_view.shape[0];
+            }
+
+            // Without an input buffer the adc is fed silence
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, num_frames, num_in_chans, false, true, "input") < 0) {
+                    PyBuffer_Release(&output_view);
+                    Py_DECREF(output_numpy_array);
+                    return NULL;
+                }
+            }
+            SAMPLE * output = (SAMPLE *)output_view.buf;
+
+            // Both buffers stay pinned while the GIL is released
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp frame = 0; frame < num_frames; frame += block_size) {
+                npy_intp n = num_frames - frame;
+                if (n > (npy_intp)block_size) {
+                    n = block_size;
+                }
+                SAMPLE * input;
+                if (input_view.obj == NULL) {
+                    input = chuck->silence(n);
+                } else if (input_view.itemsize != sizeof(SAMPLE)) {
+                    input = chuck->convert_input((const double *)input_view.buf + frame * num_in_chans, n);
+                } else {
+                    input = (SAMPLE *)input_view.buf + frame * num_in_chans;
+                }
+                chuck->run_timed(input, output + frame * num_out_chans, n);
+            }
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            PyBuffer_Release(&output_view);
+            return output_numpy_array;
+        }
+
+
+PyObject * _wrap_PyChucK_render(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_render__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            return timing_stats_to_dict(((ChuckHost *)self->obj)->run_stats(), false);
+        }
+
+
+PyObject * _wrap_PyChucK_stats(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_stats__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_set_profiling__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            int enabled;
+            unsigned long ring_rows = 0;
+            const char *keywords[] = {"enabled", "ring_rows", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "p|k", (char **) keywords, &enabled, &ring_rows)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ((ChuckHost *)self->obj)->profiler().set_enabled(enabled != 0, ring_rows);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChucK_set_profiling(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_set_profiling__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_profile__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ProfileSnapshot snapshot;
+            ((ChuckHost *)self->obj)->profiler().snapshot(snapshot);
+            PyObject * ugen_ns = PyDict_New();
+            PyObject * ugens = PyList_New(snapshot.ugens.size());
+            if (ugen_ns == NULL || ugens == NULL) {
+                Py_XDECREF(ugen_ns);
+                Py_XDECREF(ugens);
+                return NULL;
+            }
+            for (size_t i = 0; i < snapshot.ugen_ns.size(); i++) {
+                PyObject * xid = PyLong_FromUnsignedLong(snapshot.ugen_ns[i].first);
+                PyObject * ns = PyLong_FromUnsignedLong(snapshot.ugen_ns[i].second);
+                bool failed = xid == NULL || ns == NULL || PyDict_SetItem(ugen_ns, xid, ns) < 0;
+                Py_XDECREF(xid);
+                Py_XDECREF(ns);
+                if (failed) {
+                    Py_DECREF(ugen_ns);
+                    Py_DECREF(ugens);
+                    return NULL;
+                }
+            }
+            for (size_t i = 0; i < snapshot.ugens.size(); i++) {
+                UGenProfile & ugen = snapshot.ugens[i];
+                PyObject * item = Py_BuildValue(
+                    "{s:s,s:k,s:k,s:k}",
+                    "type", ugen.type.c_str(),
+                    "shred", ugen.shred,
+                    "ticks", ugen.ticks,
+                    "ns", ugen.ns
+                );
+                if (item == NULL) {
+                    Py_DECREF(ugen_ns);
+                    Py_DECREF(ugens);
+                    return NULL;
+                }
+                PyList_SET_ITEM(ugens, i, item);
+            }
+            return Py_BuildValue(
+                "{s:O,s:k,s:k,s:k,s:k,s:k,s:N,s:N}",
+                "enabled", ((ChuckHost *)self->obj)->profiler().enabled() ? Py_True : Py_False,
+                "blocks", snapshot.blocks,
+                "frames", snapshot.frames,
+                "total_ns", snapshot.total_ns,
+                "vm_ns", snapshot.vm_ns,
+                "dropped", snapshot.dropped,
+                "ugen_ns", ugen_ns,
+                "ugens", ugens
+            );
+        }
+
+
+PyObject * _wrap_PyChucK_profile(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_profile__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_read_profile__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            std::vector<ProfileRow> rows;
+            ((ChuckHost *)self->obj)->profiler().drain(rows);
+            npy_intp dims[2] = {(npy_intp)rows.size(), 3};
+            PyObject * array = PyArray_SimpleNew(2, dims, NPY_UINT64);
+            if (array == NULL) {
+                return NULL;
+            }
+            npy_uint64 * data = (npy_uint64 *)PyArray_DATA((PyArrayObject *)array);
+            for (size_t i = 0; i < rows.size(); i++) {
+                data[i * 3] = rows[i].now;
+                data[i * 3 + 1] = rows[i].shred;
+                data[i * 3 + 2] = rows[i].ns;
+            }
+            return array;
+        }
+
+
+PyObject * _wrap_PyChucK_read_profile(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_read_profile__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_render_to__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_writer;
+            PyObject* py_seconds = Py_None;
+            PyObject* py_num_frames = Py_None;
+            PyObject* input_numpy_array = Py_None;
+            unsigned long block_size = CHUCKPY_RENDER_BLOCK_SIZE_DEFAULT;
+            const char *keywords[] = {"writer", "seconds", "num_frames", "input", "block_size", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!|OOOk", (char **) keywords, &PySoundFileWriter_Type, &py_writer, &py_seconds, &py_num_frames, &input_numpy_array, &block_size)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (block_size == 0) {
+                PyErr_SetString(PyExc_ValueError, "block_size must be positive");
+                return NULL;
+            }
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before render_to()");
+                return NULL;
+            }
+            SoundFileWriter * writer = ((PySoundFileWriter *)py_writer)->obj;
+            t_CKUINT num_in_chans = chuck->num_in_chans();
+            t_CKUINT num_out_chans = chuck->num_out_chans();
+            if (writer->num_channels() != num_out_chans) {
+                PyErr_Format(PyExc_ValueError, "writer must have %lu channels", num_out_chans);
+                return NULL;
+            }
+
+            npy_intp num_frames;
+            if (py_num_frames != Py_None) {
+                num_frames = PyLong_AsSsize_t(py_num_frames);
+                if (num_frames == -1 && PyErr_Occurred()) {
+                    return NULL;
+                }
+            } else if (py_seconds != Py_None) {
+                double seconds = PyFloat_AsDouble(py_seconds);
+                if (seconds == -1.0 && PyErr_Occurred()) {
+                    return NULL;
+                }
+                num_frames = (npy_intp)(seconds * chuck->sample_rate() + 0.5);
+            } else {
+                PyErr_SetString(PyExc_TypeError, "render_to() requires seconds or num_frames");
+                return NULL;
+            }
+            if (num_frames < 0) {
+                PyErr_SetString(PyExc_ValueError, "cannot render a negative number of frames");
+                return NULL;
+            }
+
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, num_frames, num_in_chans, false, true, "input") < 0) {
+                    return NULL;
+                }
+            }
+
+            // Render straight into the writer's buffers, waiting for the
+            // writer thread whenever they are all full
+            npy_intp frame = 0;
+            Py_BEGIN_ALLOW_THREADS
+            while (frame < num_frames && !writer->failed()) {
+                t_CKUINT n = num_frames - frame;
+                if (n > block_size) {
+                    n = block_size;
+                }
+                SAMPLE * output = writer->reserve(n);
+                if (output == NULL) {
+                    break;
+                }
+                SAMPLE * input;
+                if (input_view.obj == NULL) {
+                    input = chuck->silence(n);
+                } else if (input_view.itemsize != sizeof(SAMPLE)) {
+                    input = chuck->convert_input((const double *)input_view.buf + frame * num_in_chans, n);
+                } else {
+                    input = (SAMPLE *)input_view.buf + frame * num_in_chans;
+                }
+                chuck->run_timed(input, output, n);
+                writer->commit(n);
+                frame += n;
+            }
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            if (frame < num_frames) {
+                return sound_file_writer_set_error(writer);
+            }
+            return PyLong_FromSsize_t(frame);
+        }
+
+
+PyObject * _wrap_PyChucK_render_to(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_render_to__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+PyObject *
+_wrap_PyChucK_running__0(PyChucK *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    PyObject *py_retval;
+    bool retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return NULL;
+    }
+    retval = self->obj->running();
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+PyObject *
+_wrap_PyChucK_running__1(PyChucK *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
+{
+    PyObject *py_retval;
+    bool retval;
+    const char *keywords[] = {NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        {
+            PyObject *exc_type, *traceback;
+            PyErr_Fetch(&exc_type, return_exception, &traceback);
+            Py_XDECREF(exc_type);
+            Py_XDECREF(traceback);
+        }
+        return NULL;
+    }
+    retval = self->obj->running();
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+PyObject * _wrap_PyChucK_running(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[2] = {0,};
+    retval = _wrap_PyChucK_running__0(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    retval = _wrap_PyChucK_running__1(self, args, kwargs, &exceptions[1]);
+    if (!exceptions[1]) {
+        Py_DECREF(exceptions[0]);
+        return retval;
+    }
+    error_list = PyList_New(2);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyList_SET_ITEM(error_list, 1, PyObject_Str(exceptions[1]));
+    Py_DECREF(exceptions[1]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+PyObject *
+_wrap_PyChucK_vm(PyChucK *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    Chuck_VM *retval;
+    PyChuck_VM *py_Chuck_VM;
+
+    retval = self->obj->vm();
+    if (!(retval)) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+    py_Chuck_VM = PyObject_New(PyChuck_VM, &PyChuck_VM_Type);
+    py_Chuck_VM->obj = retval;
+    py_Chuck_VM->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    py_retval = Py_BuildValue((char *) "N", py_Chuck_VM);
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyChucK_set_log_level(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject *py_retval;
+    t_CKINT level;
+    const char *keywords[] = {"level", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "l", (char **) keywords, &level)) {
+        return NULL;
+    }
+    self->obj->setLogLevel(level);
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_register_ugen__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            const char *name;
+            Py_ssize_t name_len;
+            PyObject* function;
+            unsigned long block_size = CHUCKPY_PY_UGEN_BLOCK_SIZE_DEFAULT;
+            PyObject* py_deadline = Py_None;
+            const char *keywords[] = {"name", "function", "block_size", "deadline", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#O|kO", (char **) keywords, &name, &name_len, &function, &block_size, &py_deadline)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (!PyCallable_Check(function)) {
+                PyErr_SetString(PyExc_TypeError, "function must be callable");
+                return NULL;
+            }
+            if (block_size == 0) {
+                PyErr_SetString(PyExc_ValueError, "block_size must be at least 1");
+                return NULL;
+            }
+            double deadline = CHUCKPY_PY_UGEN_DEADLINE_DEFAULT;
+            if (py_deadline != Py_None) {
+                deadline = PyFloat_AsDouble(py_deadline);
+                if (deadline == -1.0 && PyErr_Occurred()) {
+                    return NULL;
+                }
+                if (!(deadline > 0)) {
+                    PyErr_SetString(PyExc_ValueError, "deadline must be a positive number of seconds, math.inf or None");
+                    return NULL;
+                }
+            }
+            // The registry keeps function alive, and releases it with the GIL
+            std::shared_ptr<PyUGenFunction> ugen_function(
+                new PyUGenFunction(py_object_owner(function), py_ugen_call, block_size, deadline)
+            );
+            ((ChuckHost *)self->obj)->py_ugens().add(std::string(name, name_len), ugen_function);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChucK_register_ugen(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_register_ugen__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChucK_ugen_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            PyUGenRegistry & registry = ((ChuckHost *)self->obj)->py_ugens();
+            std::map<std::string, std::shared_ptr<PyUGenFunction>> functions = registry.functions();
+            PyObject * stats = PyDict_New();
+            if (stats == NULL) {
+                return NULL;
+            }
+            std::map<std::string, std::shared_ptr<PyUGenFunction>>::iterator it;
+            for (it = functions.begin(); it != functions.end(); ++it) {
+                PyUGenFunction & function = *it->second;
+                PyObject * entry = Py_BuildValue(
+                    "{s:k,s:k,s:k,s:k,s:d}",
+                    "calls", function.calls.load(),
+                    "overruns", function.overruns.load(),
+                    "errors", function.errors.load(),
+                    "block_size", function.block_size,
+                    "deadline", py_ugen_deadline(function, registry.frame_deadline())
+                );
+                if (entry == NULL || PyDict_SetItemString(stats, it->first.c_str(), entry) < 0) {
+                    Py_XDECREF(entry);
+                    Py_DECREF(stats);
+                    return NULL;
+                }
+                Py_DECREF(entry);
+            }
+            return stats;
+        }
+
+
+PyObject * _wrap_PyChucK_ugen_stats(PyChucK *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChucK_ugen_stats__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+static PyMethodDef PyChucK_methods[] = {
+    {(char *) "set_param", (PyCFunction) _wrap_PyChucK_set_param, METH_KEYWORDS|METH_VARARGS, NULL },
+    {(char *) "set_param_float", (PyCFunction) _wrap_PyChucK_set_param_float, METH_KEYWORDS|METH_VARARGS, "set_param_float(name, value)\n\ntype: name: std::string const &\ntype: value: t_CKFLOAT" },
+    {(char *) "get_param_int", (PyCFunction) _wrap_PyChucK_get_param_int, METH_KEYWORDS|METH_VARARGS, "get_param_int(key)\n\ntype: key: std::string const &" },
+    {(char *) "get_param_float", (PyCFunction) _wrap_PyChucK_get_param_float, METH_KEYWORDS|METH_VARARGS, "get_param_float(key)\n\ntype: key: std::string const &" },
+    {(char *) "get_param_string", (PyCFunction) _wrap_PyChucK_get_param_string, METH_KEYWORDS|METH_VARARGS, "get_param_string(key)\n\ntype: key: std::string const &" },
+    {(char *) "get_param_string_list", (PyCFunction) _wrap_PyChucK_get_param_string_list, METH_KEYWORDS|METH_VARARGS, "get_param_string_list(key)\n\ntype: key: std::string const &" },
+    {(char *) "compile_file", (PyCFunction) _wrap_PyChucK_compile_file, METH_KEYWORDS|METH_VARARGS, "compile_file(path, argsTogether, count)\n\ntype: path: std::string const &\ntype: argsTogether: std::string const &\ntype: count: int" },
+    {(char *) "compile_code", (PyCFunction) _wrap_PyChucK_compile_code, METH_KEYWORDS|METH_VARARGS, "compile_code(code, argsTogether='', count=1)\n\nCompile code and spork count shreds of it. Return the list of their ids, which is empty if the code does not compile. The shreds are sporked right away, so this is only safe while no other thread is running the VM; while one is, queue them with add_shred instead." },
+    {(char *) "replace_shred", (PyCFunction) _wrap__chuck_replace_shred, METH_KEYWORDS|METH_VARARGS, "replace_shred(chuck, shred_id, code, argsTogether, fade_frames)\n\ntype: chuck: ChucK *\ntype: shred_id: t_CKUINT\ntype: code: std::string const &\ntype: argsTogether: std::string const &\ntype: fade_frames: t_CKUINT" },
+    {(char *) "remove_shred", (PyCFunction) _wrap__chuck_remove_shred, METH_KEYWORDS|METH_VARARGS, "remove_shred(chuck, shred_id, fade_frames)\n\ntype: chuck: ChucK *\ntype: shred_id: t_CKUINT\ntype: fade_frames: t_CKUINT" },
+    {(char *) "add_shred", (PyCFunction) _wrap__chuck_add_shred, METH_KEYWORDS|METH_VARARGS, "add_shred(chuck, code, argsTogether)\n\ntype: chuck: ChucK *\ntype: code: std::string const &\ntype: argsTogether: std::string const &" },
+    {(char *) "request_status", (PyCFunction) _wrap__chuck_request_status, METH_KEYWORDS|METH_VARARGS, "request_status(chuck)\n\ntype: chuck: ChucK *" },
+    {(char *) "shreds", (PyCFunction) _wrap_PyChucK_shreds, METH_KEYWORDS|METH_VARARGS, "shreds()\n\nReturn a dict for every shred in the VM, with its id, name, start time in samples as returned by now(), and whether it is waiting on an event. Only safe while no other thread is running the VM." },
+    {(char *) "shred_status", (PyCFunction) _wrap_PyChucK_shred_status, METH_KEYWORDS|METH_VARARGS, "shred_status()\n\nReturn the snapshot taken by the last request_status applied, or None if there is none yet: a dict with the number of commands applied up to and including it, now(), a shreds() entry for every shred, and added, mapping the number of every add_shred applied since the last call to the id of its shred. Safe while another thread is running the VM." },
+    {(char *) "shred_control_stats", (PyCFunction) _wrap_PyChucK_shred_control_stats, METH_KEYWORDS|METH_VARARGS, "shred_control_stats()\n\nReturn a dict with the number of add_shred, remove_shred, replace_shred and request_status commands pending and applied so far." },
+    {(char *) "set_globals", (PyCFunction) _wrap_PyChucK_set_globals, METH_KEYWORDS|METH_VARARGS, "set_globals(values)\n\nSet the globals named by the keys of the dict values, which are ints, floats or 1-D arrays of floats, all at the start of the next block." },
+    {(char *) "set_global_float_array", (PyCFunction) _wrap_PyChucK_set_global_float_array, METH_KEYWORDS|METH_VARARGS, "set_global_float_array(name, values)\n\nSet the global float array name to values, a 1-D array, at the start of the next block." },
+    {(char *) "track_globals", (PyCFunction) _wrap_PyChucK_track_globals, METH_KEYWORDS|METH_VARARGS, "track_globals(names)\n\nSample the int or float globals names at the end of every block, for get_globals." },
+    {(char *) "get_globals", (PyCFunction) _wrap_PyChucK_get_globals, METH_KEYWORDS|METH_VARARGS, "get_globals()\n\nReturn the tracked globals as of the end of the last block, as a float64 array in the order given to track_globals, with NaN for any not declared yet." },
+    {(char *) "schedule", (PyCFunction) _wrap_PyChucK_schedule, METH_KEYWORDS|METH_VARARGS, "schedule(events)\n\nSchedule (sample_time, name, value) events, where sample_time is in samples as returned by now(). value is an int, float or 1-D float array to set the global name to, or 'signal' or 'broadcast' to trigger the global event name. Blocks are split so that each event lands on its exact sample." },
+    {(char *) "clear_schedule", (PyCFunction) _wrap__chuck_clear_schedule, METH_KEYWORDS|METH_VARARGS, "clear_schedule(chuck)\n\ntype: chuck: ChucK *" },
+    {(char *) "reset", (PyCFunction) _wrap__chuck_reset, METH_KEYWORDS|METH_VARARGS, "reset(chuck)\n\ntype: chuck: ChucK *" },
+    {(char *) "now", (PyCFunction) _wrap__chuck_now, METH_KEYWORDS|METH_VARARGS, "now(chuck)\n\ntype: chuck: ChucK *" },
+    {(char *) "schedule_stats", (PyCFunction) _wrap_PyChucK_schedule_stats, METH_KEYWORDS|METH_VARARGS, "schedule_stats()\n\nReturn a dict with the number of events pending, the sub-block splits they caused in total (splits) and in the last block (last_splits), the number of blocks split, and the number of events applied after their time (late)." },
+    {(char *) "sporked", (PyCFunction) _wrap_PyChucK_sporked, METH_KEYWORDS|METH_VARARGS, "sporked()\n\nReturn the ids of the shreds sporked by the last call to compile_code." },
+    {(char *) "shred_running", (PyCFunction) _wrap__chuck_shred_running, METH_KEYWORDS|METH_VARARGS, "shred_running(chuck, shred_id)\n\ntype: chuck: ChucK *\ntype: shred_id: t_CKUINT" },
+    {(char *) "set_notify_fd", (PyCFunction) _wrap__chuck_set_notify_fd, METH_KEYWORDS|METH_VARARGS, "set_notify_fd(chuck, fd, tick_frames)\n\ntype: chuck: ChucK *\ntype: fd: int\ntype: tick_frames: t_CKUINT" },
+    {(char *) "watch_shred", (PyCFunction) _wrap__chuck_watch_shred, METH_KEYWORDS|METH_VARARGS, "watch_shred(chuck, shred_id)\n\ntype: chuck: ChucK *\ntype: shred_id: t_CKUINT" },
+    {(char *) "watch_applied", (PyCFunction) _wrap__chuck_watch_applied, METH_KEYWORDS|METH_VARARGS, "watch_applied(chuck, number)\n\ntype: chuck: ChucK *\ntype: number: t_CKUINT" },
+    {(char *) "set_code_cache_size", (PyCFunction) _wrap__chuck_set_code_cache_size, METH_KEYWORDS|METH_VARARGS, "set_code_cache_size(chuck, size)\n\ntype: chuck: ChucK *\ntype: size: t_CKUINT" },
+    {(char *) "clear_code_cache", (PyCFunction) _wrap__chuck_clear_code_cache, METH_KEYWORDS|METH_VARARGS, "clear_code_cache(chuck)\n\ntype: chuck: ChucK *" },
+    {(char *) "code_cache_stats", (PyCFunction) _wrap_PyChucK_code_cache_stats, METH_KEYWORDS|METH_VARARGS, "code_cache_stats()\n\nReturn a dict of the compiled-program cache's hits, misses, evictions, size and capacity." },
+    {(char *) "init", (PyCFunction) _wrap__chuck_init, METH_KEYWORDS|METH_VARARGS, "init(chuck)\n\ntype: chuck: ChucK *" },
+    {(char *) "start", (PyCFunction) _wrap_PyChucK_start, METH_NOARGS, "start()\n\n" },
+    {(char *) "run", (PyCFunction) _wrap_PyChucK_run, METH_KEYWORDS|METH_VARARGS, "run(input, output, numFrames=None)\n\nCompute numFrames frames, by default as many as output holds. output is a C-contiguous (frames, OUTPUT_CHANNELS) float32 buffer; input is a (frames, INPUT_CHANNELS) float32 or float64 buffer, or None for silence." },
+    {(char *) "render", (PyCFunction) _wrap_PyChucK_render, METH_KEYWORDS|METH_VARARGS, "render(seconds=None, num_frames=None, input=None, out=None, block_size=256)\n\nRun the VM offline for the given duration and return the output as a (frames, OUTPUT_CHANNELS) float32 array, filling out if it is given. input, if given, is a (frames, INPUT_CHANNELS) float32 or float64 buffer fed to the adc." },
+    {(char *) "stats", (PyCFunction) _wrap_PyChucK_stats, METH_KEYWORDS|METH_VARARGS, "stats()\n\nReturn a dict of counters for the blocks computed so far by run, render and chuck_audio: calls, frames, total_ns, max_ns, avg_ns, overruns (blocks that took longer to compute than to play), and a histogram of block durations with the upper bound of each bucket in histogram_bounds_us." },
+    {(char *) "set_profiling", (PyCFunction) _wrap_PyChucK_set_profiling, METH_KEYWORDS|METH_VARARGS, "set_profiling(enabled, ring_rows=0)\n\nTurn profiling on or off from the next block. Turning it on starts the counts returned by profile() from zero, and keeps the last ring_rows rows for read_profile(); older rows are overwritten and counted in profile()'s dropped." },
+    {(char *) "profile", (PyCFunction) _wrap_PyChucK_profile, METH_KEYWORDS|METH_VARARGS, "profile()\n\nReturn a dict with the blocks, frames and total_ns profiled since set_profiling turned profiling on; ugen_ns, mapping shred ids to the ns spent ticking the UGens they created, with UGens no live shred owns under 0; vm_ns, the rest of total_ns, which includes running every shred's code, as ChucK cannot time shreds apart; ugens, the type, shred, ticks and ns of every UGen in the graph; and dropped, the ring rows lost before read_profile() read them." },
+    {(char *) "read_profile", (PyCFunction) _wrap_PyChucK_read_profile, METH_KEYWORDS|METH_VARARGS, "read_profile()\n\nDrain the profiling ring and return it as an (n, 3) uint64 array of rows (now, shred id, ns), oldest first: for each block profiled, one row per shred whose UGens took time, with now() at the start of the block and the ns spent ticking them." },
+    {(char *) "render_to", (PyCFunction) _wrap_PyChucK_render_to, METH_KEYWORDS|METH_VARARGS, "render_to(writer, seconds=None, num_frames=None, input=None, block_size=256)\n\nRun the VM offline for the given duration, streaming the output to writer, a SoundFileWriter with OUTPUT_CHANNELS channels, and return the number of frames rendered. Raises OSError if writing fails." },
+    {(char *) "running", (PyCFunction) _wrap_PyChucK_running, METH_KEYWORDS|METH_VARARGS, NULL },
+    {(char *) "vm", (PyCFunction) _wrap_PyChucK_vm, METH_NOARGS, "vm()\n\n" },
+    {(char *) "set_log_level", (PyCFunction) _wrap_PyChucK_set_log_level, METH_KEYWORDS|METH_VARARGS, "set_log_level(level)\n\ntype: level: t_CKINT" },
+    {(char *) "register_ugen", (PyCFunction) _wrap_PyChucK_register_ugen, METH_KEYWORDS|METH_VARARGS, "register_ugen(name, function, block_size=256, deadline=None)\n\nLet PyUGens in this VM that set func to name compute their output by calling function(input, output) once per block_size frames, with (block_size,) float32 views that are only valid during the call. A block whose call takes longer than deadline seconds plays as silence; math.inf waits for every call however long it takes. deadline defaults to half the block's duration if CHUCK_PARAM_HINT_IS_REALTIME_AUDIO is set when the VM is initialized, and to math.inf otherwise, so that render, render_to and process_file output never depends on how long calls take." },
+    {(char *) "ugen_stats", (PyCFunction) _wrap_PyChucK_ugen_stats, METH_KEYWORDS|METH_VARARGS, "ugen_stats()\n\nReturn a dict with an entry for every function registered with register_ugen, counting its calls, the blocks played as silence because a call was late (overruns) and the calls that raised (errors)." },
+    {NULL, NULL, 0, NULL}
+};
+
+static void
+_wrap_PyChucK__tp_dealloc(PyChucK *self)
+{
+        ChucK *tmp = self->obj;
+        self->obj = NULL;
+        if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {
+            delete tmp;
+        }
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+PyTypeObject PyChucK_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "_chuck.ChucK",            /* tp_name */
+    sizeof(PyChucK),                  /* tp_basicsize */
+    0,                                 /* tp_itemsize */
+    /* methods */
+    (destructor)_wrap_PyChucK__tp_dealloc,        /* tp_dealloc */
+    (printfunc)0,                      /* tp_print */
+    (getattrfunc)NULL,       /* tp_getattr */
+    (setattrfunc)NULL,       /* tp_setattr */
+#if PY_MAJOR_VERSION >= 3
+    NULL,
+#else
+    (cmpfunc)NULL,           /* tp_compare */
+#endif
+    (reprfunc)NULL,             /* tp_repr */
+    (PyNumberMethods*)NULL,     /* tp_as_number */
+    (PySequenceMethods*)NULL, /* tp_as_sequence */
+    (PyMappingMethods*)NULL,   /* tp_as_mapping */
+    (hashfunc)NULL,             /* tp_hash */
+    (ternaryfunc)NULL,          /* tp_call */
+    (reprfunc)NULL,              /* tp_str */
+    (getattrofunc)NULL,     /* tp_getattro */
+    (setattrofunc)NULL,     /* tp_setattro */
+    (PyBufferProcs*)NULL,  /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                      /* tp_flags */
+    "Chuck()",                        /* Documentation string */
+    (traverseproc)NULL,     /* tp_traverse */
+    (inquiry)NULL,             /* tp_clear */
+    (richcmpfunc)NULL,   /* tp_richcompare */
+    0,             /* tp_weaklistoffset */
+    (getiterfunc)NULL,          /* tp_iter */
+    (iternextfunc)NULL,     /* tp_iternext */
+    (struct PyMethodDef*)PyChucK_methods, /* tp_methods */
+    (struct PyMemberDef*)0,              /* tp_members */
+    0,                     /* tp_getset */
+    NULL,                              /* tp_base */
+    NULL,                              /* tp_dict */
+    (descrgetfunc)NULL,    /* tp_descr_get */
+    (descrsetfunc)NULL,    /* tp_descr_set */
+    0,                 /* tp_dictoffset */
+    (initproc)_wrap_PyChucK__tp_init,             /* tp_init */
+    (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
+    (newfunc)PyType_GenericNew,               /* tp_new */
+    (freefunc)0,             /* tp_free */
+    (inquiry)NULL,             /* tp_is_gc */
+    NULL,                              /* tp_bases */
+    NULL,                              /* tp_mro */
+    NULL,                              /* tp_cache */
+    NULL,                              /* tp_subclasses */
+    NULL,                              /* tp_weaklist */
+    (destructor) NULL                  /* tp_del */
+};
+
+
+
+
+static int
+_wrap_PyChuckMixer__tp_init(PyChuckMixer *self, PyObject *args, PyObject *kwargs)
+{
+    t_CKUINT num_threads;
+    bool pin;
+    PyObject *py_pin = NULL;
+    const char *keywords[] = {"num_threads", "pin", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "k|O", (char **) keywords, &num_threads, &py_pin)) {
+        return -1;
+    }
+    pin = py_pin? (bool) PyObject_IsTrue(py_pin) : true;
+    self->obj = new ChuckMixer(num_threads, pin);
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+
+PyObject *
+_wrap_PyChuckMixer_size(PyChuckMixer *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+
+    retval = self->obj->size();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyChuckMixer_num_threads(PyChuckMixer *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+
+    retval = self->obj->num_threads();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PyChuckMixer_add__inner(
+            PyChuckMixer *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_chuck;
+            float gain = 1.0;
+            const char *keywords[] = {"chuck", "gain", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!|f", (char **) keywords, &PyChucK_Type, &py_chuck, &gain)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckMixer * mixer = self->obj;
+            ChuckHost * chuck = (ChuckHost *)((PyChucK *)py_chuck)->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before adding it to a mixer");
+                return NULL;
+            }
+            // The mixer keeps the Chuck alive for as long as it exists
+            if (!mixer->add(chuck, gain, py_object_owner(py_chuck))) {
+                PyErr_SetString(PyExc_ValueError, "every Chuck in a mixer must have the same sample rate and channel counts");
+                return NULL;
+            }
+            return PyLong_FromUnsignedLong(mixer->size() - 1);
+        }
+
+
+PyObject * _wrap_PyChuckMixer_add(PyChuckMixer *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChuckMixer_add__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChuckMixer_set_gain__inner(
+            PyChuckMixer *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            unsigned long index;
+            float gain;
+            const char *keywords[] = {"index", "gain", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "kf", (char **) keywords, &index, &gain)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (index >= self->obj->size()) {
+                PyErr_SetString(PyExc_IndexError, "mixer index out of range");
+                return NULL;
+            }
+            self->obj->set_gain(index, gain);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChuckMixer_set_gain(PyChuckMixer *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChuckMixer_set_gain__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChuckMixer_run__inner(
+            PyChuckMixer *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* input_numpy_array;
+            PyObject* output_numpy_array;
+            int numFrames = -1;
+            const char *keywords[] = {"input", "output", "numFrames", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "OO|i", (char **) keywords, &input_numpy_array, &output_numpy_array, &numFrames)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckMixer * mixer = self->obj;
+            if (mixer->size() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "the mixer has no Chuck instances");
+                return NULL;
+            }
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, numFrames < 0 ? 0 : numFrames, mixer->num_out_chans(), true, false, "output") < 0) {
+                return NULL;
+            }
+            if (numFrames < 0) {
+                numFrames = output_view.shape[0];
+            }
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, numFrames, mixer->num_in_chans(), false, false, "input") < 0) {
+                    PyBuffer_Release(&output_view);
+                    return NULL;
+                }
+            }
 
-            self->obj->run(input, output, numFrames);
+            Py_BEGIN_ALLOW_THREADS
+            mixer->run(input_view.obj == NULL ? NULL : (SAMPLE *)input_view.buf, (SAMPLE *)output_view.buf, numFrames);
+            Py_END_ALLOW_THREADS
 
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            PyBuffer_Release(&output_view);
             Py_INCREF(Py_None);
             return Py_None;
         }
 
 
-PyObject * _wrap_PyChucK_run(PyChucK *self, PyObject *args, PyObject *kwargs)
+PyObject * _wrap_PyChuckMixer_run(PyChuckMixer *self, PyObject *args, PyObject *kwargs)
 {
     PyObject * retval;
     PyObject *error_list;
     PyObject *exceptions[1] = {0,};
-    retval = _wrap_PyChucK_run__inner(self, args, kwargs, &exceptions[0]);
+    retval = _wrap_PyChuckMixer_run__inner(self, args, kwargs, &exceptions[0]);
     if (!exceptions[0]) {
         return retval;
     }
@@ -1318,131 +3582,158 @@ PyObject * _wrap_PyChucK_run(PyChucK *self, PyObject *args, PyObject *kwargs)
 
 
 
-PyObject *
-_wrap_PyChucK_running__0(PyChucK *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
-{
-    PyObject *py_retval;
-    bool retval;
-    const char *keywords[] = {NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        PyObject * _wrap_PyChuckMixer_stats__inner(
+            PyChuckMixer *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
         {
-            PyObject *exc_type, *traceback;
-            PyErr_Fetch(&exc_type, return_exception, &traceback);
-            Py_XDECREF(exc_type);
-            Py_XDECREF(traceback);
+            ChuckMixer * mixer = self->obj;
+            PyObject * instances = PyList_New(mixer->size());
+            if (instances == NULL) {
+                return NULL;
+            }
+            for (t_CKUINT i = 0; i < mixer->size(); i++) {
+                PyObject * stats = timing_stats_to_dict(mixer->chuck(i)->run_stats(), false);
+                if (stats == NULL) {
+                    Py_DECREF(instances);
+                    return NULL;
+                }
+                PyList_SET_ITEM(instances, i, stats);
+                PyObject * gain = PyFloat_FromDouble(mixer->gain(i));
+                PyObject * missed = PyLong_FromUnsignedLong(mixer->missed(i));
+                int failed = gain == NULL || missed == NULL
+                    || PyDict_SetItemString(stats, "gain", gain) < 0
+                    || PyDict_SetItemString(stats, "missed", missed) < 0;
+                Py_XDECREF(gain);
+                Py_XDECREF(missed);
+                if (failed) {
+                    Py_DECREF(instances);
+                    return NULL;
+                }
+            }
+            return Py_BuildValue("{s:N,s:N}", "mix", timing_stats_to_dict(mixer->stats(), false), "instances", instances);
         }
-        return NULL;
-    }
-    retval = self->obj->running();
-    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
-    return py_retval;
-}
-
-PyObject *
-_wrap_PyChucK_running__1(PyChucK *self, PyObject *args, PyObject *kwargs, PyObject **return_exception)
-{
-    PyObject *py_retval;
-    bool retval;
-    const char *keywords[] = {NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
-        {
-            PyObject *exc_type, *traceback;
-            PyErr_Fetch(&exc_type, return_exception, &traceback);
-            Py_XDECREF(exc_type);
-            Py_XDECREF(traceback);
-        }
-        return NULL;
-    }
-    retval = self->obj->running();
-    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
-    return py_retval;
-}
 
-PyObject * _wrap_PyChucK_running(PyChucK *self, PyObject *args, PyObject *kwargs)
+PyObject * _wrap_PyChuckMixer_stats(PyChuckMixer *self, PyObject *args, PyObject *kwargs)
 {
     PyObject * retval;
     PyObject *error_list;
-    PyObject *exceptions[2] = {0,};
-    retval = _wrap_PyChucK_running__0(self, args, kwargs, &exceptions[0]);
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChuckMixer_stats__inner(self, args, kwargs, &exceptions[0]);
     if (!exceptions[0]) {
         return retval;
     }
-    retval = _wrap_PyChucK_running__1(self, args, kwargs, &exceptions[1]);
-    if (!exceptions[1]) {
-        Py_DECREF(exceptions[0]);
-        return retval;
-    }
-    error_list = PyList_New(2);
+    error_list = PyList_New(1);
     PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
     Py_DECREF(exceptions[0]);
-    PyList_SET_ITEM(error_list, 1, PyObject_Str(exceptions[1]));
-    Py_DECREF(exceptions[1]);
     PyErr_SetObject(PyExc_TypeError, error_list);
     Py_DECREF(error_list);
     return NULL;
 }
 
+static PyMethodDef PyChuckMixer_methods[] = {
+    {(char *) "size", (PyCFunction) _wrap_PyChuckMixer_size, METH_NOARGS, "size()\n\n" },
+    {(char *) "num_threads", (PyCFunction) _wrap_PyChuckMixer_num_threads, METH_NOARGS, "num_threads()\n\n" },
+    {(char *) "add", (PyCFunction) _wrap_PyChuckMixer_add, METH_KEYWORDS|METH_VARARGS, "add(chuck, gain=1.0)\n\nMix chuck, an initialized Chuck, in at gain, and return its index. Every Chuck must have the same sample rate and channel counts. Only call while nothing is running the mixer." },
+    {(char *) "set_gain", (PyCFunction) _wrap_PyChuckMixer_set_gain, METH_KEYWORDS|METH_VARARGS, "set_gain(index, gain)\n\nSet the gain of the Chuck at index, taking effect from the next block. Safe while the mixer is running." },
+    {(char *) "run", (PyCFunction) _wrap_PyChuckMixer_run, METH_KEYWORDS|METH_VARARGS, "run(input, output, numFrames=None)\n\nCompute numFrames frames of every Chuck in parallel and write their mix to output, a C-contiguous (frames, OUTPUT_CHANNELS) float32 buffer. input, a (frames, INPUT_CHANNELS) float32 buffer or None for silence, is fed to every Chuck." },
+    {(char *) "stats", (PyCFunction) _wrap_PyChuckMixer_stats, METH_KEYWORDS|METH_VARARGS, "stats()\n\nReturn a dict with the timing of whole mixed blocks under mix, like Chuck.stats(), and a list under instances with each Chuck's own stats plus its gain and the number of blocks it finished after their duration had elapsed (missed)." },
+    {NULL, NULL, 0, NULL}
+};
 
-PyObject *
-_wrap_PyChucK_vm(PyChucK *self)
+static void
+_wrap_PyChuckMixer__tp_dealloc(PyChuckMixer *self)
 {
-    PyObject *py_retval;
-    Chuck_VM *retval;
-    PyChuck_VM *py_Chuck_VM;
-
-    retval = self->obj->vm();
-    if (!(retval)) {
-        Py_INCREF(Py_None);
-        return Py_None;
-    }
-    py_Chuck_VM = PyObject_New(PyChuck_VM, &PyChuck_VM_Type);
-    py_Chuck_VM->obj = retval;
-    py_Chuck_VM->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
-    py_retval = Py_BuildValue((char *) "N", py_Chuck_VM);
-    return py_retval;
+        ChuckMixer *tmp = self->obj;
+        self->obj = NULL;
+        if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {
+            delete tmp;
+        }
+    Py_TYPE(self)->tp_free((PyObject*)self);
 }
 
+PyTypeObject PyChuckMixer_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    (char *) "_chuck.ChuckMixer",            /* tp_name */
+    sizeof(PyChuckMixer),                  /* tp_basicsize */
+    0,                                 /* tp_itemsize */
+    /* methods */
+    (destructor)_wrap_PyChuckMixer__tp_dealloc,        /* tp_dealloc */
+    (printfunc)0,                      /* tp_print */
+    (getattrfunc)NULL,       /* tp_getattr */
+    (setattrfunc)NULL,       /* tp_setattr */
+#if PY_MAJOR_VERSION >= 3
+    NULL,
+#else
+    (cmpfunc)NULL,           /* tp_compare */
+#endif
+    (reprfunc)NULL,             /* tp_repr */
+    (PyNumberMethods*)NULL,     /* tp_as_number */
+    (PySequenceMethods*)NULL, /* tp_as_sequence */
+    (PyMappingMethods*)NULL,   /* tp_as_mapping */
+    (hashfunc)NULL,             /* tp_hash */
+    (ternaryfunc)NULL,          /* tp_call */
+    (reprfunc)NULL,              /* tp_str */
+    (getattrofunc)NULL,     /* tp_getattro */
+    (setattrofunc)NULL,     /* tp_setattro */
+    (PyBufferProcs*)NULL,  /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,                      /* tp_flags */
+    "ChuckMixer(num_threads, pin)",                        /* Documentation string */
+    (traverseproc)NULL,     /* tp_traverse */
+    (inquiry)NULL,             /* tp_clear */
+    (richcmpfunc)NULL,   /* tp_richcompare */
+    0,             /* tp_weaklistoffset */
+    (getiterfunc)NULL,          /* tp_iter */
+    (iternextfunc)NULL,     /* tp_iternext */
+    (struct PyMethodDef*)PyChuckMixer_methods, /* tp_methods */
+    (struct PyMemberDef*)0,              /* tp_members */
+    0,                     /* tp_getset */
+    NULL,                              /* tp_base */
+    NULL,                              /* tp_dict */
+    (descrgetfunc)NULL,    /* tp_descr_get */
+    (descrsetfunc)NULL,    /* tp_descr_set */
+    0,                 /* tp_dictoffset */
+    (initproc)_wrap_PyChuckMixer__tp_init,             /* tp_init */
+    (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
+    (newfunc)PyType_GenericNew,               /* tp_new */
+    (freefunc)0,             /* tp_free */
+    (inquiry)NULL,             /* tp_is_gc */
+    NULL,                              /* tp_bases */
+    NULL,                              /* tp_mro */
+    NULL,                              /* tp_cache */
+    NULL,                              /* tp_subclasses */
+    NULL,                              /* tp_weaklist */
+    (destructor) NULL                  /* tp_del */
+};
+
 
-PyObject *
-_wrap_PyChucK_set_log_level(PyChucK *self, PyObject *args, PyObject *kwargs)
+
+
+static int
+_wrap_PyRtAudio__tp_init(PyRtAudio *self, PyObject *args, PyObject *kwargs)
 {
-    PyObject *py_retval;
-    t_CKINT level;
-    const char *keywords[] = {"level", NULL};
+    const char *keywords[] = {NULL};
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "l", (char **) keywords, &level)) {
-        return NULL;
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
+        return -1;
     }
-    self->obj->setLogLevel(level);
-    Py_INCREF(Py_None);
-    py_retval = Py_None;
-    return py_retval;
+    self->obj = new RtAudio();
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
 }
 
-static PyMethodDef PyChucK_methods[] = {
-    {(char *) "set_param", (PyCFunction) _wrap_PyChucK_set_param, METH_KEYWORDS|METH_VARARGS, NULL },
-    {(char *) "set_param_float", (PyCFunction) _wrap_PyChucK_set_param_float, METH_KEYWORDS|METH_VARARGS, "set_param_float(name, value)\n\ntype: name: std::string const &\ntype: value: t_CKFLOAT" },
-    {(char *) "get_param_int", (PyCFunction) _wrap_PyChucK_get_param_int, METH_KEYWORDS|METH_VARARGS, "get_param_int(key)\n\ntype: key: std::string const &" },
-    {(char *) "get_param_float", (PyCFunction) _wrap_PyChucK_get_param_float, METH_KEYWORDS|METH_VARARGS, "get_param_float(key)\n\ntype: key: std::string const &" },
-    {(char *) "get_param_string", (PyCFunction) _wrap_PyChucK_get_param_string, METH_KEYWORDS|METH_VARARGS, "get_param_string(key)\n\ntype: key: std::string const &" },
-    {(char *) "get_param_string_list", (PyCFunction) _wrap_PyChucK_get_param_string_list, METH_KEYWORDS|METH_VARARGS, "get_param_string_list(key)\n\ntype: key: std::string const &" },
-    {(char *) "compile_file", (PyCFunction) _wrap_PyChucK_compile_file, METH_KEYWORDS|METH_VARARGS, "compile_file(path, argsTogether, count)\n\ntype: path: std::string const &\ntype: argsTogether: std::string const &\ntype: count: int" },
-    {(char *) "compile_code", (PyCFunction) _wrap_PyChucK_compile_code, METH_KEYWORDS|METH_VARARGS, "compile_code(code, argsTogether, count)\n\ntype: code: std::string const &\ntype: argsTogether: std::string const &\ntype: count: int" },
-    {(char *) "init", (PyCFunction) _wrap_PyChucK_init, METH_NOARGS, "init()\n\n" },
-    {(char *) "start", (PyCFunction) _wrap_PyChucK_start, METH_NOARGS, "start()\n\n" },
-    {(char *) "run", (PyCFunction) _wrap_PyChucK_run, METH_KEYWORDS|METH_VARARGS, NULL },
-    {(char *) "running", (PyCFunction) _wrap_PyChucK_running, METH_KEYWORDS|METH_VARARGS, NULL },
-    {(char *) "vm", (PyCFunction) _wrap_PyChucK_vm, METH_NOARGS, "vm()\n\n" },
-    {(char *) "set_log_level", (PyCFunction) _wrap_PyChucK_set_log_level, METH_KEYWORDS|METH_VARARGS, "set_log_level(level)\n\ntype: level: t_CKINT" },
+static PyMethodDef PyRtAudio_methods[] = {
     {NULL, NULL, 0, NULL}
 };
 
 static void
-_wrap_PyChucK__tp_dealloc(PyChucK *self)
+_wrap_PyRtAudio__tp_dealloc(PyRtAudio *self)
 {
-        ChucK *tmp = self->obj;
+        RtAudio *tmp = self->obj;
         self->obj = NULL;
         if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {
             delete tmp;
@@ -1450,13 +3741,13 @@ _wrap_PyChucK__tp_dealloc(PyChucK *self)
     Py_TYPE(self)->tp_free((PyObject*)self);
 }
 
-PyTypeObject PyChucK_Type = {
+PyTypeObject PyRtAudio_Type = {
     PyVarObject_HEAD_INIT(NULL, 0)
-    (char *) "_chuck.ChucK",            /* tp_name */
-    sizeof(PyChucK),                  /* tp_basicsize */
+    (char *) "_chuck.RtAudio",            /* tp_name */
+    sizeof(PyRtAudio),                  /* tp_basicsize */
     0,                                 /* tp_itemsize */
     /* methods */
-    (destructor)_wrap_PyChucK__tp_dealloc,        /* tp_dealloc */
+    (destructor)_wrap_PyRtAudio__tp_dealloc,        /* tp_dealloc */
     (printfunc)0,                      /* tp_print */
     (getattrfunc)NULL,       /* tp_getattr */
     (setattrfunc)NULL,       /* tp_setattr */
@@ -1476,14 +3767,14 @@ PyTypeObject PyChucK_Type = {
     (setattrofunc)NULL,     /* tp_setattro */
     (PyBufferProcs*)NULL,  /* tp_as_buffer */
     Py_TPFLAGS_DEFAULT,                      /* tp_flags */
-    "Chuck()",                        /* Documentation string */
+    "RtAudio()",                        /* Documentation string */
     (traverseproc)NULL,     /* tp_traverse */
     (inquiry)NULL,             /* tp_clear */
     (richcmpfunc)NULL,   /* tp_richcompare */
     0,             /* tp_weaklistoffset */
     (getiterfunc)NULL,          /* tp_iter */
     (iternextfunc)NULL,     /* tp_iternext */
-    (struct PyMethodDef*)PyChucK_methods, /* tp_methods */
+    (struct PyMethodDef*)PyRtAudio_methods, /* tp_methods */
     (struct PyMemberDef*)0,              /* tp_members */
     0,                     /* tp_getset */
     NULL,                              /* tp_base */
@@ -1491,7 +3782,7 @@ PyTypeObject PyChucK_Type = {
     (descrgetfunc)NULL,    /* tp_descr_get */
     (descrsetfunc)NULL,    /* tp_descr_set */
     0,                 /* tp_dictoffset */
-    (initproc)_wrap_PyChucK__tp_init,             /* tp_init */
+    (initproc)_wrap_PyRtAudio__tp_init,             /* tp_init */
     (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
     (newfunc)PyType_GenericNew,               /* tp_new */
     (freefunc)0,             /* tp_free */
@@ -1507,27 +3798,202 @@ PyTypeObject PyChucK_Type = {
 
 
 
-static int
-_wrap_PyRtAudio__tp_init(PyRtAudio *self, PyObject *args, PyObject *kwargs)
+static int
+_wrap_PyAudioTap__tp_init(PyAudioTap *self, PyObject *args, PyObject *kwargs)
+{
+    t_CKUINT num_frames;
+    t_CKUINT num_channels;
+    const char *keywords[] = {"num_frames", "num_channels", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "kk", (char **) keywords, &num_frames, &num_channels)) {
+        return -1;
+    }
+    self->obj = new AudioTap(num_frames, num_channels);
+    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
+    return 0;
+}
+
+
+PyObject *
+_wrap_PyAudioTap_capacity(PyAudioTap *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+
+    retval = self->obj->capacity();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyAudioTap_num_channels(PyAudioTap *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+
+    retval = self->obj->num_channels();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyAudioTap_available(PyAudioTap *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+
+    retval = self->obj->available();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyAudioTap_overflows(PyAudioTap *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    t_CKUINT retval;
+
+    retval = self->obj->overflows();
+    py_retval = Py_BuildValue((char *) "k", retval);
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyAudioTap_closed(PyAudioTap *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+    bool retval;
+
+    retval = self->obj->closed();
+    py_retval = Py_BuildValue((char *) "N", PyBool_FromLong(retval));
+    return py_retval;
+}
+
+
+PyObject *
+_wrap_PyAudioTap_close(PyAudioTap *self, PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
+{
+    PyObject *py_retval;
+
+    self->obj->close();
+    Py_INCREF(Py_None);
+    py_retval = Py_None;
+    return py_retval;
+}
+
+
+
+
+        PyObject * _wrap_PyAudioTap_read__inner(
+            PyAudioTap *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_num_frames = Py_None;
+            const char *keywords[] = {"num_frames", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "|O", (char **) keywords, &py_num_frames)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            t_CKUINT num_frames = self->obj->capacity();
+            if (py_num_frames != Py_None) {
+                num_frames = PyLong_AsUnsignedLong(py_num_frames);
+                if (PyErr_Occurred()) {
+                    return NULL;
+                }
+            }
+            return audio_tap_read(self->obj, num_frames);
+        }
+
+
+PyObject * _wrap_PyAudioTap_read(PyAudioTap *self, PyObject *args, PyObject *kwargs)
 {
-    const char *keywords[] = {NULL};
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyAudioTap_read__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "", (char **) keywords)) {
-        return -1;
+
+
+
+        PyObject * _wrap_PyAudioTap_readinto__inner(
+            PyAudioTap *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* output_numpy_array;
+            const char *keywords[] = {"out", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &output_numpy_array)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, 0, self->obj->num_channels(), true, false, "out") < 0) {
+                return NULL;
+            }
+            t_CKUINT num_frames = self->obj->read((SAMPLE *)output_view.buf, output_view.shape[0]);
+            PyBuffer_Release(&output_view);
+            return PyLong_FromUnsignedLong(num_frames);
+        }
+
+
+PyObject * _wrap_PyAudioTap_readinto(PyAudioTap *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyAudioTap_readinto__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
     }
-    self->obj = new RtAudio();
-    self->flags = PYBINDGEN_WRAPPER_FLAG_NONE;
-    return 0;
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
 }
 
-static PyMethodDef PyRtAudio_methods[] = {
+static PyMethodDef PyAudioTap_methods[] = {
+    {(char *) "capacity", (PyCFunction) _wrap_PyAudioTap_capacity, METH_NOARGS, "capacity()\n\n" },
+    {(char *) "num_channels", (PyCFunction) _wrap_PyAudioTap_num_channels, METH_NOARGS, "num_channels()\n\n" },
+    {(char *) "available", (PyCFunction) _wrap_PyAudioTap_available, METH_NOARGS, "available()\n\n" },
+    {(char *) "overflows", (PyCFunction) _wrap_PyAudioTap_overflows, METH_NOARGS, "overflows()\n\n" },
+    {(char *) "closed", (PyCFunction) _wrap_PyAudioTap_closed, METH_NOARGS, "closed()\n\n" },
+    {(char *) "close", (PyCFunction) _wrap_PyAudioTap_close, METH_NOARGS, "close()\n\n" },
+    {(char *) "read", (PyCFunction) _wrap_PyAudioTap_read, METH_KEYWORDS|METH_VARARGS, "read(num_frames=None)\n\nReturn up to num_frames of the frames buffered so far, or all of them, as a (frames, num_channels) float32 array. Never blocks." },
+    {(char *) "readinto", (PyCFunction) _wrap_PyAudioTap_readinto, METH_KEYWORDS|METH_VARARGS, "readinto(out)\n\nFill out, a (frames, num_channels) float32 buffer, with as many buffered frames as are available and fit, and return how many were read. Never blocks." },
     {NULL, NULL, 0, NULL}
 };
 
 static void
-_wrap_PyRtAudio__tp_dealloc(PyRtAudio *self)
+_wrap_PyAudioTap__tp_dealloc(PyAudioTap *self)
 {
-        RtAudio *tmp = self->obj;
+        AudioTap *tmp = self->obj;
         self->obj = NULL;
         if (!(self->flags&PYBINDGEN_WRAPPER_FLAG_OBJECT_NOT_OWNED)) {
             delete tmp;
@@ -1535,13 +4001,13 @@ _wrap_PyRtAudio__tp_dealloc(PyRtAudio *self)
     Py_TYPE(self)->tp_free((PyObject*)self);
 }
 
-PyTypeObject PyRtAudio_Type = {
+PyTypeObject PyAudioTap_Type = {
     PyVarObject_HEAD_INIT(NULL, 0)
-    (char *) "_chuck.RtAudio",            /* tp_name */
-    sizeof(PyRtAudio),                  /* tp_basicsize */
+    (char *) "_chuck.AudioTap",            /* tp_name */
+    sizeof(PyAudioTap),                  /* tp_basicsize */
     0,                                 /* tp_itemsize */
     /* methods */
-    (destructor)_wrap_PyRtAudio__tp_dealloc,        /* tp_dealloc */
+    (destructor)_wrap_PyAudioTap__tp_dealloc,        /* tp_dealloc */
     (printfunc)0,                      /* tp_print */
     (getattrfunc)NULL,       /* tp_getattr */
     (setattrfunc)NULL,       /* tp_setattr */
@@ -1561,14 +4027,14 @@ PyTypeObject PyRtAudio_Type = {
     (setattrofunc)NULL,     /* tp_setattro */
     (PyBufferProcs*)NULL,  /* tp_as_buffer */
     Py_TPFLAGS_DEFAULT,                      /* tp_flags */
-    "RtAudio()",                        /* Documentation string */
+    "Tap(num_frames, num_channels)",                        /* Documentation string */
     (traverseproc)NULL,     /* tp_traverse */
     (inquiry)NULL,             /* tp_clear */
     (richcmpfunc)NULL,   /* tp_richcompare */
     0,             /* tp_weaklistoffset */
-    (getiterfunc)NULL,          /* tp_iter */
-    (iternextfunc)NULL,     /* tp_iternext */
-    (struct PyMethodDef*)PyRtAudio_methods, /* tp_methods */
+    (getiterfunc)PyObject_SelfIter,          /* tp_iter */
+    (iternextfunc)_wrap_PyAudioTap__tp_iternext,     /* tp_iternext */
+    (struct PyMethodDef*)PyAudioTap_methods, /* tp_methods */
     (struct PyMemberDef*)0,              /* tp_members */
     0,                     /* tp_getset */
     NULL,                              /* tp_base */
@@ -1576,7 +4042,7 @@ PyTypeObject PyRtAudio_Type = {
     (descrgetfunc)NULL,    /* tp_descr_get */
     (descrsetfunc)NULL,    /* tp_descr_set */
     0,                 /* tp_dictoffset */
-    (initproc)_wrap_PyRtAudio__tp_init,             /* tp_init */
+    (initproc)_wrap_PyAudioTap__tp_init,             /* tp_init */
     (allocfunc)PyType_GenericAlloc,           /* tp_alloc */
     (newfunc)PyType_GenericNew,               /* tp_new */
     (freefunc)0,             /* tp_free */
@@ -1716,25 +4182,132 @@ _wrap_PyChuckAudio_initialize(PyChuckAudio *PYBINDGEN_UNUSED(dummy), PyObject *a
     t_CKUINT buffer_size;
     t_CKUINT num_buffers;
     PyObject *callback;
+    f_audio_cb callback_fn;
+    void *callback_data;
     t_CKBOOL force_srate;
     const char *keywords[] = {"num_dac_channels", "num_adc_channels", "sample_rate", "buffer_size", "num_buffers", "callback", "force_srate", NULL};
 
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "kkkkkOk", (char **) keywords, &num_dac_channels, &num_adc_channels, &sample_rate, &buffer_size, &num_buffers, &callback, &force_srate)) {
         return NULL;
     }
-    if (!PyCallable_Check(callback)) {
-        PyErr_SetString(PyExc_TypeError, "f_audio_cb parameter must be callable");
+    if (!(callback_fn = chuck_audio_bind(callback, &callback_data))) {
         return NULL;
     }
-    Py_XINCREF(callback);
-    retval = ChuckAudio::initialize(num_dac_channels, num_adc_channels, sample_rate, buffer_size, num_buffers, _wrap_f_audio_cb, (void*)callback, force_srate);
+    retval = ChuckAudio::initialize(num_dac_channels, num_adc_channels, sample_rate, buffer_size, num_buffers, callback_fn, callback_data, force_srate);
     py_retval = Py_BuildValue((char *) "k", retval);
     return py_retval;
 }
 
 
+
+
+        PyObject * _wrap_PyChuckAudio_set_tap__inner(
+            PyChuckAudio *PYBINDGEN_UNUSED(dummy),
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_tap;
+            const char *keywords[] = {"tap", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_tap)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            AudioTap * tap = NULL;
+            if (py_tap == Py_None) {
+                py_tap = NULL;
+            } else {
+                if (!PyObject_TypeCheck(py_tap, &PyAudioTap_Type)) {
+                    PyErr_SetString(PyExc_TypeError, "tap must be a Tap or None");
+                    return NULL;
+                }
+                tap = ((PyAudioTap *)py_tap)->obj;
+                if (chuck_audio_target.chuck == NULL && chuck_audio_target.mixer == NULL) {
+                    PyErr_SetString(PyExc_RuntimeError, "taps require a Chuck instance or ChuckMixer bound with chuck_audio.initialize");
+                    return NULL;
+                }
+                if (tap->num_channels() != chuck_audio_target.num_out_chans) {
+                    PyErr_Format(PyExc_ValueError, "tap must have %lu channels", chuck_audio_target.num_out_chans);
+                    return NULL;
+                }
+                Py_INCREF(py_tap);
+            }
+
+            PyObject * previous = chuck_audio_target.py_tap;
+            chuck_audio_target.py_tap = py_tap;
+            chuck_audio_target.tap.store(tap);
+
+            // The audio thread may still be writing to the previous tap
+            Py_BEGIN_ALLOW_THREADS
+            while (chuck_audio_target.in_callback.load()) {
+                std::this_thread::yield();
+            }
+            Py_END_ALLOW_THREADS
+
+            if (previous != NULL) {
+                ((PyAudioTap *)previous)->obj->close();
+                Py_DECREF(previous);
+            }
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+
+
+PyObject * _wrap_PyChuckAudio_set_tap(PyChuckAudio *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChuckAudio_set_tap__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
+
+
+        PyObject * _wrap_PyChuckAudio_stats__inner(
+            PyChuckAudio *PYBINDGEN_UNUSED(dummy),
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            return timing_stats_to_dict(chuck_audio_target.stats, true);
+        }
+
+
+PyObject * _wrap_PyChuckAudio_stats(PyChuckAudio *self, PyObject *args, PyObject *kwargs)
+{
+    PyObject * retval;
+    PyObject *error_list;
+    PyObject *exceptions[1] = {0,};
+    retval = _wrap_PyChuckAudio_stats__inner(self, args, kwargs, &exceptions[0]);
+    if (!exceptions[0]) {
+        return retval;
+    }
+    error_list = PyList_New(1);
+    PyList_SET_ITEM(error_list, 0, PyObject_Str(exceptions[0]));
+    Py_DECREF(exceptions[0]);
+    PyErr_SetObject(PyExc_TypeError, error_list);
+    Py_DECREF(error_list);
+    return NULL;
+}
+
+
 PyObject *
-_wrap_PyChuckAudio_shutdown(void)
+_wrap_PyChuckAudio_shutdown(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
 
@@ -1746,7 +4319,7 @@ _wrap_PyChuckAudio_shutdown(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_start(void)
+_wrap_PyChuckAudio_start(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -1758,7 +4331,7 @@ _wrap_PyChuckAudio_start(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_stop(void)
+_wrap_PyChuckAudio_stop(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -1770,7 +4343,7 @@ _wrap_PyChuckAudio_stop(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_watchdog_start(void)
+_wrap_PyChuckAudio_watchdog_start(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -1782,7 +4355,7 @@ _wrap_PyChuckAudio_watchdog_start(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_watchdog_stop(void)
+_wrap_PyChuckAudio_watchdog_stop(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKBOOL retval;
@@ -1794,7 +4367,7 @@ _wrap_PyChuckAudio_watchdog_stop(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_probe(void)
+_wrap_PyChuckAudio_probe(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
 
@@ -1806,7 +4379,7 @@ _wrap_PyChuckAudio_probe(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_sample_rate(void)
+_wrap_PyChuckAudio_get_sample_rate(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1818,7 +4391,7 @@ _wrap_PyChuckAudio_get_sample_rate(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_num_channels_out(void)
+_wrap_PyChuckAudio_get_num_channels_out(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1830,7 +4403,7 @@ _wrap_PyChuckAudio_get_num_channels_out(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_num_channels_in(void)
+_wrap_PyChuckAudio_get_num_channels_in(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1842,7 +4415,7 @@ _wrap_PyChuckAudio_get_num_channels_in(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_dac_num(void)
+_wrap_PyChuckAudio_get_dac_num(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1854,7 +4427,7 @@ _wrap_PyChuckAudio_get_dac_num(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_adc_num(void)
+_wrap_PyChuckAudio_get_adc_num(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1866,7 +4439,7 @@ _wrap_PyChuckAudio_get_adc_num(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_buffer_size(void)
+_wrap_PyChuckAudio_get_buffer_size(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1878,7 +4451,7 @@ _wrap_PyChuckAudio_get_buffer_size(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_num_buffers(void)
+_wrap_PyChuckAudio_get_num_buffers(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     t_CKUINT retval;
@@ -1890,7 +4463,7 @@ _wrap_PyChuckAudio_get_num_buffers(void)
 
 
 PyObject *
-_wrap_PyChuckAudio_get_rt_audio(void)
+_wrap_PyChuckAudio_get_rt_audio(PyObject *PYBINDGEN_UNUSED(_self), PyObject *PYBINDGEN_UNUSED(_args), PyObject *PYBINDGEN_UNUSED(_kwargs))
 {
     PyObject *py_retval;
     RtAudio *retval;
@@ -1949,7 +4522,9 @@ _wrap_PyChuckAudio_cb(PyChuckAudio *PYBINDGEN_UNUSED(dummy), PyObject *args, PyO
 }
 
 static PyMethodDef PyChuckAudio_methods[] = {
-    {(char *) "initialize", (PyCFunction) _wrap_PyChuckAudio_initialize, METH_KEYWORDS|METH_VARARGS|METH_STATIC, "initialize(num_dac_channels, num_adc_channels, sample_rate, buffer_size, num_buffers, callback, force_srate)\n\ntype: num_dac_channels: t_CKUINT\ntype: num_adc_channels: t_CKUINT\ntype: sample_rate: t_CKUINT\ntype: buffer_size: t_CKUINT\ntype: num_buffers: t_CKUINT\ntype: callback: f_audio_cb\ntype: force_srate: t_CKBOOL" },
+    {(char *) "initialize", (PyCFunction) _wrap_PyChuckAudio_initialize, METH_KEYWORDS|METH_STATIC|METH_VARARGS, "initialize(num_dac_channels, num_adc_channels, sample_rate, buffer_size, num_buffers, callback, force_srate)\n\ntype: num_dac_channels: t_CKUINT\ntype: num_adc_channels: t_CKUINT\ntype: sample_rate: t_CKUINT\ntype: buffer_size: t_CKUINT\ntype: num_buffers: t_CKUINT\ntype: callback: f_audio_cb\ntype: force_srate: t_CKBOOL" },
+    {(char *) "set_tap", (PyCFunction) _wrap_PyChuckAudio_set_tap, METH_KEYWORDS|METH_STATIC|METH_VARARGS, "set_tap(tap)\n\nCopy every block the bound Chuck instance renders into tap, a Tap with OUTPUT_CHANNELS channels, replacing and closing any previous tap. Pass None to detach." },
+    {(char *) "stats", (PyCFunction) _wrap_PyChuckAudio_stats, METH_KEYWORDS|METH_STATIC|METH_VARARGS, "stats()\n\nReturn a dict of counters for the audio callbacks so far: calls, frames, total_ns, max_ns, avg_ns, overruns (callbacks that took longer than their buffer lasts), late (callbacks that arrived over half a buffer late), and a histogram of callback durations with the upper bound of each bucket in histogram_bounds_us." },
     {(char *) "shutdown", (PyCFunction) _wrap_PyChuckAudio_shutdown, METH_NOARGS|METH_STATIC, "shutdown()\n\n" },
     {(char *) "start", (PyCFunction) _wrap_PyChuckAudio_start, METH_NOARGS|METH_STATIC, "start()\n\n" },
     {(char *) "stop", (PyCFunction) _wrap_PyChuckAudio_stop, METH_NOARGS|METH_STATIC, "stop()\n\n" },
@@ -1964,8 +4539,8 @@ static PyMethodDef PyChuckAudio_methods[] = {
     {(char *) "get_buffer_size", (PyCFunction) _wrap_PyChuckAudio_get_buffer_size, METH_NOARGS|METH_STATIC, "get_buffer_size()\n\n" },
     {(char *) "get_num_buffers", (PyCFunction) _wrap_PyChuckAudio_get_num_buffers, METH_NOARGS|METH_STATIC, "get_num_buffers()\n\n" },
     {(char *) "get_rt_audio", (PyCFunction) _wrap_PyChuckAudio_get_rt_audio, METH_NOARGS|METH_STATIC, "get_rt_audio()\n\n" },
-    {(char *) "set_extern", (PyCFunction) _wrap_PyChuckAudio_set_extern, METH_KEYWORDS|METH_VARARGS|METH_STATIC, "set_extern(in, out)\n\ntype: in: SAMPLE *\ntype: out: SAMPLE *" },
-    {(char *) "cb", (PyCFunction) _wrap_PyChuckAudio_cb, METH_KEYWORDS|METH_VARARGS|METH_STATIC, "cb(output_buffer, input_buffer, buffer_size, streamTime, status, user_data)\n\ntype: output_buffer: SAMPLE *\ntype: input_buffer: SAMPLE *\ntype: buffer_size: unsigned int\ntype: streamTime: double\ntype: status: RtAudioStreamStatus\ntype: user_data: PyObject *" },
+    {(char *) "set_extern", (PyCFunction) _wrap_PyChuckAudio_set_extern, METH_KEYWORDS|METH_STATIC|METH_VARARGS, "set_extern(in, out)\n\ntype: in: SAMPLE *\ntype: out: SAMPLE *" },
+    {(char *) "cb", (PyCFunction) _wrap_PyChuckAudio_cb, METH_KEYWORDS|METH_STATIC|METH_VARARGS, "cb(output_buffer, input_buffer, buffer_size, streamTime, status, user_data)\n\ntype: output_buffer: SAMPLE *\ntype: input_buffer: SAMPLE *\ntype: buffer_size: unsigned int\ntype: streamTime: double\ntype: status: RtAudioStreamStatus\ntype: user_data: PyObject *" },
     {NULL, NULL, 0, NULL}
 };
 
@@ -2279,21 +4854,78 @@ PyTypeObject Pystd__list__lt__std__string__gt__Iter_Type = {
 
 
 
+            // Wrap interleaved samples, without copying, as a (frames, channels) float32 array
             PyObject* samples_to_numpy_array(SAMPLE * samples, t_CKUINT num_frames, t_CKUINT num_channels) {
-                npy_intp dims[num_frames];
-                for (int i=0; i<num_frames; i++) {
-                     dims[i] = num_channels;
-                }
-                PyObject* npy_samples = PyArray_SimpleNewFromData(num_channels, dims, NPY_DOUBLE, samples);
+                npy_intp dims[2] = {(npy_intp)num_frames, (npy_intp)num_channels};
+                PyObject* npy_samples = PyArray_SimpleNewFromData(2, dims, NPY_FLOAT32, samples);
                 return npy_samples;
             }
 
-            SAMPLE* numpy_array_to_samples(PyObject * npy_samples) {
-                SAMPLE * samples = (SAMPLE *)PyArray_DATA(npy_samples);
-                //npy_intp * dims = PyArray_DIMS(npy_samples);
-                //npy_int num_channels = dims[0];
-                //npy_int num_frames = dims[1];
-                return samples;
+            // Point an array made by samples_to_numpy_array at another buffer of the same shape
+            void numpy_array_rebind_samples(PyObject * npy_samples, SAMPLE * samples) {
+                ((PyArrayObject_fields *)npy_samples)->data = (char *)samples;
+            }
+
+            // The struct format character of a buffer with a single native-endian item type, else 0
+            static char samples_buffer_format(Py_buffer * view)
+            {
+                const char * format = view->format;
+                if (format == NULL) {
+                    return 'B';
+                }
+            #if PY_LITTLE_ENDIAN
+                if (*format == '@' || *format == '=' || *format == '<') {
+            #else
+                if (*format == '@' || *format == '=' || *format == '>' || *format == '!') {
+            #endif
+                    format++;
+                }
+                return format[0] != 0 && format[1] == 0 ? format[0] : 0;
+            }
+
+            // Get a view of obj, which must export a C-contiguous buffer of shape
+            // (frames, num_channels) with at least min_frames frames, i.e. the
+            // interleaved layout ChucK::run expects. Its items must be float32, or
+            // float64 as well if allow_double is set. Returns 0, or -1 with an
+            // exception set. On success the caller must PyBuffer_Release the view,
+            // which pins the memory until then.
+            int samples_get_buffer(
+                PyObject * obj,
+                Py_buffer * view,
+                npy_intp min_frames,
+                t_CKUINT num_channels,
+                bool writeable,
+                bool allow_double,
+                const char * name
+            )
+            {
+                int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+                if (writeable) {
+                    flags |= PyBUF_WRITABLE;
+                }
+                if (PyObject_GetBuffer(obj, view, flags) < 0) {
+                    return -1;
+                }
+                char format = samples_buffer_format(view);
+                if (!(format == 'f' && view->itemsize == 4) && !(allow_double && format == 'd' && view->itemsize == 8)) {
+                    PyErr_Format(
+                        PyExc_TypeError,
+                        allow_double ? "%s must contain float32 or float64 samples" : "%s must contain float32 samples",
+                        name
+                    );
+                } else if (view->ndim != 2 || view->shape[1] != (Py_ssize_t)num_channels) {
+                    PyErr_Format(PyExc_ValueError, "%s must have shape (frames, %lu)", name, num_channels);
+                } else if (view->shape[0] < min_frames) {
+                    PyErr_Format(
+                        PyExc_ValueError,
+                        "%s has %zd frames, at least %zd are required",
+                        name, view->shape[0], (Py_ssize_t)min_frames
+                    );
+                } else {
+                    return 0;
+                }
+                PyBuffer_Release(view);
+                return -1;
             }
 
             // Wrapper for f_audio_cb which calls a Python function
@@ -2303,29 +4935,235 @@ PyTypeObject Pystd__list__lt__std__string__gt__Iter_Type = {
                 t_CKUINT num_frames,
                 t_CKUINT num_in_chans,
                 t_CKUINT num_out_chans,
-                void * py_cb
+                void * target
             )
             {
+                ChuckAudioTarget * t = (ChuckAudioTarget *)target;
+                TimingStats::Clock::time_point start = t->begin_callback(num_frames);
+
                 // acquire the GIL prior to running the callback
                 PyGILState_STATE gil_state = PyGILState_Ensure();
-                PyObject* input_numpy_array = samples_to_numpy_array(input, num_frames, num_in_chans);
-                PyObject* output_numpy_array = samples_to_numpy_array(output, num_frames, num_out_chans);
 
-                //PyArray_UpdateFlags((PyArrayObject *)input_numpy_array, NPY_ARRAY_OWNDATA);
-                Py_XINCREF(input_numpy_array);
-                //PyArray_UpdateFlags((PyArrayObject *)output_numpy_array, NPY_ARRAY_OWNDATA);
-                Py_XINCREF(output_numpy_array);
+                PyObject * args = t->py_callback_args;
+                if (args != NULL && PyLong_AsUnsignedLong(PyTuple_GET_ITEM(args, 2)) == num_frames) {
+                    numpy_array_rebind_samples(PyTuple_GET_ITEM(args, 0), input);
+                    numpy_array_rebind_samples(PyTuple_GET_ITEM(args, 1), output);
+                } else {
+                    // First callback of the stream, or the buffer size changed
+                    Py_CLEAR(t->py_callback_args);
+                    PyObject* input_numpy_array = samples_to_numpy_array(input, num_frames, num_in_chans);
+                    PyObject* output_numpy_array = samples_to_numpy_array(output, num_frames, num_out_chans);
+                    if (input_numpy_array != NULL && output_numpy_array != NULL) {
+                        t->py_callback_args = Py_BuildValue("(OOkkk)", input_numpy_array, output_numpy_array, num_frames, num_in_chans, num_out_chans);
+                    }
+                    Py_XDECREF(input_numpy_array);
+                    Py_XDECREF(output_numpy_array);
+                    args = t->py_callback_args;
+                }
 
-                PyObject *callback = (PyObject*) py_cb;
-                //log_obj(callback);
-                PyObject *args = Py_BuildValue("(OOkkk)", input_numpy_array, output_numpy_array, num_frames, num_in_chans, num_out_chans);
+                PyObject * result = NULL;
+                if (args != NULL) {
+                    result = PyObject_Call(t->py_callback, args, NULL);
+                }
+                if (result == NULL) {
+                    // There is no caller to raise to from the audio thread
+                    PyErr_WriteUnraisable(t->py_callback);
+                    memset(output, 0, num_frames * num_out_chans * sizeof(SAMPLE));
+                }
+                Py_XDECREF(result);
+                PyGILState_Release(gil_state);
+                t->end_callback(start, num_frames);
+            }
 
-                PyEval_CallObject(callback, args);
+            // Zero-initialized, since it has static storage
+            ChuckAudioTarget chuck_audio_target;
 
-                Py_XDECREF(input_numpy_array);
-                Py_XDECREF(output_numpy_array);
-                Py_XDECREF(args);
-                PyGILState_Release(gil_state);
+            void _native_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            )
+            {
+                ChuckAudioTarget * t = (ChuckAudioTarget *)target;
+                TimingStats::Clock::time_point start = t->begin_callback(num_frames);
+                if (num_in_chans != t->num_in_chans || num_out_chans != t->num_out_chans) {
+                    // The VM would read and write past the ends of the buffers
+                    memset(output, 0, num_frames * num_out_chans * sizeof(SAMPLE));
+                    t->end_callback(start, num_frames);
+                    return;
+                }
+                ((ChuckHost *)t->chuck)->run_timed(input, output, num_frames);
+
+                t->in_callback.store(true);
+                AudioTap * tap = t->tap.load();
+                if (tap != NULL) {
+                    tap->write(output, num_frames);
+                }
+                t->in_callback.store(false);
+                t->end_callback(start, num_frames);
+            }
+
+            void _mixer_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            )
+            {
+                ChuckAudioTarget * t = (ChuckAudioTarget *)target;
+                TimingStats::Clock::time_point start = t->begin_callback(num_frames);
+                if (num_in_chans != t->num_in_chans || num_out_chans != t->num_out_chans) {
+                    memset(output, 0, num_frames * num_out_chans * sizeof(SAMPLE));
+                    t->end_callback(start, num_frames);
+                    return;
+                }
+                t->mixer->run(input, output, num_frames);
+
+                t->in_callback.store(true);
+                AudioTap * tap = t->tap.load();
+                if (tap != NULL) {
+                    tap->write(output, num_frames);
+                }
+                t->in_callback.store(false);
+                t->end_callback(start, num_frames);
+            }
+
+            f_audio_cb chuck_audio_bind(PyObject * callback, void ** data)
+            {
+                f_audio_cb cb;
+                if (PyObject_TypeCheck(callback, &PyChucK_Type)) {
+                    ChuckHost * chuck = (ChuckHost *)((PyChucK *)callback)->obj;
+                    if (chuck->sample_rate() == 0) {
+                        PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before binding it to chuck_audio");
+                        return NULL;
+                    }
+                    chuck_audio_target.chuck = chuck;
+                    chuck_audio_target.mixer = NULL;
+                    chuck_audio_target.num_in_chans = chuck->num_in_chans();
+                    chuck_audio_target.num_out_chans = chuck->num_out_chans();
+                    chuck_audio_target.py_callback = NULL;
+                    cb = _native_f_audio_cb;
+                } else if (PyObject_TypeCheck(callback, &PyChuckMixer_Type)) {
+                    ChuckMixer * mixer = ((PyChuckMixer *)callback)->obj;
+                    if (mixer->size() == 0) {
+                        PyErr_SetString(PyExc_RuntimeError, "a ChuckMixer needs at least one Chuck before binding it to chuck_audio");
+                        return NULL;
+                    }
+                    chuck_audio_target.chuck = NULL;
+                    chuck_audio_target.mixer = mixer;
+                    chuck_audio_target.num_in_chans = mixer->num_in_chans();
+                    chuck_audio_target.num_out_chans = mixer->num_out_chans();
+                    chuck_audio_target.py_callback = NULL;
+                    cb = _mixer_f_audio_cb;
+                } else if (PyCallable_Check(callback)) {
+                    chuck_audio_target.chuck = NULL;
+                    chuck_audio_target.mixer = NULL;
+                    chuck_audio_target.py_callback = callback;
+                    Py_CLEAR(chuck_audio_target.py_callback_args);
+                    cb = _wrap_f_audio_cb;
+                } else {
+                    PyErr_SetString(PyExc_TypeError, "f_audio_cb parameter must be a Chuck instance, a ChuckMixer or callable");
+                    return NULL;
+                }
+                Py_INCREF(callback);
+                Py_XDECREF(chuck_audio_target.py_bound);
+                chuck_audio_target.py_bound = callback;
+                *data = (void *)&chuck_audio_target;
+                return cb;
+            }
+
+            int globals_append_update(std::vector<GlobalUpdate> & updates, PyObject * name, PyObject * value)
+            {
+                if (!PyUnicode_Check(name)) {
+                    PyErr_SetString(PyExc_TypeError, "global names must be strings");
+                    return -1;
+                }
+                GlobalUpdate update;
+                update.name = PyUnicode_AsUTF8(name);
+                if (PyFloat_Check(value)) {
+                    update.kind = GlobalUpdate::FLOAT;
+                    update.float_value = PyFloat_AS_DOUBLE(value);
+                } else if (PyLong_Check(value)) {
+                    update.kind = GlobalUpdate::INT;
+                    update.int_value = PyLong_AsLong(value);
+                    if (update.int_value == -1 && PyErr_Occurred()) {
+                        return -1;
+                    }
+                } else if (PyArray_IsScalar(value, Floating) || PyArray_IsScalar(value, Integer)) {
+                    update.kind = PyArray_IsScalar(value, Integer) ? GlobalUpdate::INT : GlobalUpdate::FLOAT;
+                    update.float_value = PyFloat_AsDouble(value);
+                    update.int_value = (t_CKINT)update.float_value;
+                    if (update.float_value == -1.0 && PyErr_Occurred()) {
+                        return -1;
+                    }
+                } else {
+                    PyArrayObject * array = (PyArrayObject *)PyArray_FROM_OTF(value, NPY_FLOAT64, NPY_ARRAY_IN_ARRAY);
+                    if (array == NULL) {
+                        return -1;
+                    }
+                    if (PyArray_NDIM(array) != 1) {
+                        PyErr_Format(PyExc_ValueError, "global %s must be an int, a float or a 1-D array of floats", update.name.c_str());
+                        Py_DECREF(array);
+                        return -1;
+                    }
+                    update.kind = GlobalUpdate::FLOAT_ARRAY;
+                    const double * data = (const double *)PyArray_DATA(array);
+                    update.values.assign(data, data + PyArray_DIM(array, 0));
+                    Py_DECREF(array);
+                }
+                updates.push_back(GlobalUpdate());
+                std::swap(updates.back(), update);
+                return 0;
+            }
+
+            PyObject * sound_file_writer_set_error(SoundFileWriter * writer)
+            {
+                std::string error = writer->error();
+                PyErr_SetString(PyExc_OSError, error.empty() ? "sound file is closed" : error.c_str());
+                return NULL;
+            }
+
+            PyObject * timing_stats_to_dict(const TimingStats & stats, bool include_late)
+            {
+                PyObject * histogram = PyList_New(TimingStats::NUM_BUCKETS);
+                PyObject * bounds = PyList_New(TimingStats::NUM_BUCKETS);
+                if (histogram == NULL || bounds == NULL) {
+                    Py_XDECREF(histogram);
+                    Py_XDECREF(bounds);
+                    return NULL;
+                }
+                for (int i = 0; i < TimingStats::NUM_BUCKETS; i++) {
+                    PyList_SET_ITEM(histogram, i, PyLong_FromUnsignedLong(stats.histogram(i)));
+                    PyList_SET_ITEM(
+                        bounds, i,
+                        PyFloat_FromDouble(i < TimingStats::NUM_BUCKETS - 1 ? (double)(1UL << i) : Py_HUGE_VAL)
+                    );
+                }
+                t_CKUINT calls = stats.calls();
+                PyObject * dict = Py_BuildValue(
+                    "{s:k,s:k,s:k,s:k,s:d,s:k,s:N,s:N}",
+                    "calls", calls,
+                    "frames", stats.frames(),
+                    "total_ns", stats.total_ns(),
+                    "max_ns", stats.max_ns(),
+                    "avg_ns", calls ? (double)stats.total_ns() / calls : 0.0,
+                    "overruns", stats.overruns(),
+                    "histogram", histogram,
+                    "histogram_bounds_us", bounds
+                );
+                if (dict != NULL && include_late) {
+                    PyObject * late = PyLong_FromUnsignedLong(stats.late());
+                    if (late == NULL || PyDict_SetItemString(dict, "late", late) < 0) {
+                        Py_CLEAR(dict);
+                    }
+                    Py_XDECREF(late);
+                }
+                return dict;
             }
 
             static void log_obj(PyObject * o)
@@ -2342,6 +5180,167 @@ PyTypeObject Pystd__list__lt__std__string__gt__Iter_Type = {
             }
 
 
+
+            // The inner loop of a ufunc, applying F along a strided run of T.
+            // float32 is computed in double too, as ChucK computes, so every
+            // element gets exactly ChucK's result, rounded to T.
+            template <double (*F)(double), typename T>
+            static void math_ufunc_loop(
+                char ** args,
+                npy_intp const * dimensions,
+                npy_intp const * steps,
+                void * PYBINDGEN_UNUSED(data)
+            )
+            {
+                char * in = args[0];
+                char * out = args[1];
+                npy_intp in_step = steps[0];
+                npy_intp out_step = steps[1];
+                for (npy_intp i = 0; i < dimensions[0]; i++) {
+                    *(T *)out = (T)F((double)*(T *)in);
+                    in += in_step;
+                    out += out_step;
+                }
+            }
+
+            struct MathUfunc
+            {
+                const char * name;
+                PyUFuncGenericFunction loops[2];
+                const char * doc;
+            };
+
+            // Input and output types of each loop, in the order of MathUfunc::loops
+            static char math_ufunc_types[] = {NPY_FLOAT, NPY_FLOAT, NPY_DOUBLE, NPY_DOUBLE};
+            static void * math_ufunc_data[] = {NULL, NULL};
+
+            // NumPy keeps pointers into these for the life of the process
+            static MathUfunc math_ufuncs[] = {
+                {
+                    "mtof",
+                    {math_ufunc_loop<mtof, float>, math_ufunc_loop<mtof, double>},
+                    "Convert MIDI note numbers to frequencies in Hz, as ChucK's Std.mtof."
+                },
+                {
+                    "ftom",
+                    {math_ufunc_loop<ftom, float>, math_ufunc_loop<ftom, double>},
+                    "Convert frequencies in Hz to MIDI note numbers, as ChucK's Std.ftom."
+                },
+                {
+                    "powtodb",
+                    {math_ufunc_loop<powtodb, float>, math_ufunc_loop<powtodb, double>},
+                    "Convert power to decibels, 100 being unity, as ChucK's Std.powtodb."
+                },
+                {
+                    "rmstodb",
+                    {math_ufunc_loop<rmstodb, float>, math_ufunc_loop<rmstodb, double>},
+                    "Convert RMS amplitude to decibels, 100 being unity, as ChucK's Std.rmstodb."
+                },
+                {
+                    "dbtopow",
+                    {math_ufunc_loop<dbtopow, float>, math_ufunc_loop<dbtopow, double>},
+                    "Convert decibels, 100 being unity, to power, as ChucK's Std.dbtopow."
+                },
+                {
+                    "dbtorms",
+                    {math_ufunc_loop<dbtorms, float>, math_ufunc_loop<dbtorms, double>},
+                    "Convert decibels, 100 being unity, to RMS amplitude, as ChucK's Std.dbtorms."
+                },
+            };
+
+            int math_ufuncs_add(PyObject * module)
+            {
+                for (size_t i = 0; i < sizeof(math_ufuncs) / sizeof(math_ufuncs[0]); i++) {
+                    MathUfunc & u = math_ufuncs[i];
+                    PyObject * ufunc = PyUFunc_FromFuncAndData(
+                        u.loops, math_ufunc_data, math_ufunc_types, 2, 1, 1, PyUFunc_None, u.name, u.doc, 0
+                    );
+                    if (ufunc == NULL) {
+                        return -1;
+                    }
+                    if (PyModule_AddObject(module, u.name, ufunc) < 0) {
+                        Py_DECREF(ufunc);
+                        return -1;
+                    }
+                }
+                return 0;
+            }
+
+
+            bool py_ugen_call(void * callable, SAMPLE * input, SAMPLE * output, t_CKUINT num_frames)
+            {
+                PyGILState_STATE gil_state = PyGILState_Ensure();
+                npy_intp dims[1] = {(npy_intp)num_frames};
+                PyObject * py_input = PyArray_SimpleNewFromData(1, dims, NPY_FLOAT32, input);
+                PyObject * py_output = PyArray_SimpleNewFromData(1, dims, NPY_FLOAT32, output);
+                PyObject * result = NULL;
+                if (py_input != NULL && py_output != NULL) {
+                    // Only the output is the function's to write
+                    PyArray_CLEARFLAGS((PyArrayObject *)py_input, NPY_ARRAY_WRITEABLE);
+                    result = PyObject_CallFunctionObjArgs((PyObject *)callable, py_input, py_output, NULL);
+                }
+                bool ok = result != NULL;
+                if (!ok) {
+                    // There is no caller to raise to; print it like an exception in a thread
+                    PyErr_WriteUnraisable((PyObject *)callable);
+                }
+                Py_XDECREF(result);
+                Py_XDECREF(py_input);
+                Py_XDECREF(py_output);
+                PyGILState_Release(gil_state);
+                return ok;
+            }
+
+
+            static void py_object_owner_release(void * obj)
+            {
+                PyGILState_STATE gil_state = PyGILState_Ensure();
+                Py_DECREF((PyObject *)obj);
+                PyGILState_Release(gil_state);
+            }
+
+            std::shared_ptr<void> py_object_owner(PyObject * obj)
+            {
+                Py_INCREF(obj);
+                return std::shared_ptr<void>(obj, py_object_owner_release);
+            }
+
+
+            // Drain up to num_frames frames from the tap into a new (frames, channels) array
+            PyObject * audio_tap_read(AudioTap * tap, t_CKUINT num_frames)
+            {
+                t_CKUINT available = tap->available();
+                if (num_frames > available) {
+                    num_frames = available;
+                }
+                npy_intp dims[2] = {(npy_intp)num_frames, (npy_intp)tap->num_channels()};
+                PyObject * samples = PyArray_SimpleNew(2, dims, NPY_FLOAT32);
+                if (samples == NULL) {
+                    return NULL;
+                }
+                tap->read((SAMPLE *)PyArray_DATA((PyArrayObject *)samples), num_frames);
+                return samples;
+            }
+
+            // Iterating a tap yields whatever has been rendered since the previous
+            // block, waiting for the audio thread if nothing has, until it is closed
+            PyObject * _wrap_PyAudioTap__tp_iternext(PyAudioTap *self)
+            {
+                AudioTap * tap = self->obj;
+                while (tap->available() == 0) {
+                    if (tap->closed()) {
+                        return NULL;
+                    }
+                    Py_BEGIN_ALLOW_THREADS
+                    std::this_thread::sleep_for(std::chrono::milliseconds(1));
+                    Py_END_ALLOW_THREADS
+                    if (PyErr_CheckSignals()) {
+                        return NULL;
+                    }
+                }
+                return audio_tap_read(tap, tap->available());
+            }
+
 #if PY_VERSION_HEX >= 0x03000000
 static struct PyModuleDef _chuck_moduledef = {
     PyModuleDef_HEAD_INIT,
@@ -2374,6 +5373,7 @@ MOD_INIT(_chuck)
 {
     PyObject *m;
     import_array();
+    import_umath();
     #if PY_VERSION_HEX >= 0x03000000
     m = PyModule_Create(&_chuck_moduledef);
     #else
@@ -2382,6 +5382,14 @@ MOD_INIT(_chuck)
     if (m == NULL) {
         return MOD_ERROR;
     }
+    if (math_ufuncs_add(m) < 0) {
+        return MOD_ERROR;
+    }
+    /* Register the 'SoundFileWriter' class */
+    if (PyType_Ready(&PySoundFileWriter_Type)) {
+        return MOD_ERROR;
+    }
+    PyModule_AddObject(m, (char *) "SoundFileWriter", (PyObject *) &PySoundFileWriter_Type);
     /* Register the 'Chuck_Carrier' class */
     if (PyType_Ready(&PyChuck_Carrier_Type)) {
         return MOD_ERROR;
@@ -2403,11 +5411,21 @@ MOD_INIT(_chuck)
         return MOD_ERROR;
     }
     PyModule_AddObject(m, (char *) "Chuck", (PyObject *) &PyChucK_Type);
+    /* Register the 'ChuckMixer' class */
+    if (PyType_Ready(&PyChuckMixer_Type)) {
+        return MOD_ERROR;
+    }
+    PyModule_AddObject(m, (char *) "ChuckMixer", (PyObject *) &PyChuckMixer_Type);
     /* Register the 'RtAudio' class */
     if (PyType_Ready(&PyRtAudio_Type)) {
         return MOD_ERROR;
     }
     PyModule_AddObject(m, (char *) "RtAudio", (PyObject *) &PyRtAudio_Type);
+    /* Register the 'AudioTap' class */
+    if (PyType_Ready(&PyAudioTap_Type)) {
+        return MOD_ERROR;
+    }
+    PyModule_AddObject(m, (char *) "Tap", (PyObject *) &PyAudioTap_Type);
     /* Register the 'ChuckAudio' class */
 
     PyChuckAudioMeta_Type.tp_base = Py_TYPE(&PyBaseObject_Type);
@@ -0,0 +1,67 @@
+"""
+Check that importing chuckpy stays cheap and free of side effects.
+
+Imports chuckpy in fresh interpreters and reports the best and median wall
+time of the import, along with what it pulled in. The script exits non-zero
+if the median exceeds --budget-ms, or if the import loaded the _chuck
+extension or NumPy or installed a SIGINT handler.
+
+    python benchmarks/import_time.py --budget-ms 50
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = '''
+import json, signal, sys, time
+default_handler = signal.getsignal(signal.SIGINT)
+start = time.perf_counter()
+import chuckpy
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'import_ms': elapsed * 1000,
+    'loaded_extension': '_chuck' in sys.modules,
+    'loaded_numpy': 'numpy' in sys.modules,
+    'changed_sigint': signal.getsignal(signal.SIGINT) is not default_handler,
+}))
+'''
+
+
+def probe():
+    output = subprocess.check_output([sys.executable, '-c', PROBE])
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    # The first run warms the filesystem and bytecode caches
+    probe()
+    results = [probe() for _ in range(args.runs)]
+    times = [result['import_ms'] for result in results]
+    report = {
+        'runs': args.runs,
+        'best_ms': min(times),
+        'median_ms': statistics.median(times),
+        'budget_ms': args.budget_ms,
+        'loaded_extension': any(result['loaded_extension'] for result in results),
+        'loaded_numpy': any(result['loaded_numpy'] for result in results),
+        'changed_sigint': any(result['changed_sigint'] for result in results),
+    }
+    print(json.dumps(report, indent=2))
+    failed = (
+        report['median_ms'] > args.budget_ms
+        or report['loaded_extension']
+        or report['loaded_numpy']
+        or report['changed_sigint']
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure what profiling costs, and show what it reports.
+
+Renders the example programs, one shred each, with profiling never turned
+on, turned on, and turned off again, and prints the realtime factor of each
+along with the profile taken while it was on.
+
+    python benchmarks/profiling.py --seconds 10
+"""
+import argparse
+import json
+from time import perf_counter
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+    ChuckError,
+    chuck_sources,
+)
+
+SAMPLE_RATE = 48000
+NUM_CHANNELS = 2
+
+
+def make_chuck():
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, SAMPLE_RATE)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    if not chuck.init():
+        raise ChuckError('Failed to initialize Chuck')
+    for code in chuck_sources:
+        chuck.compile_code(code, '', 1)
+    chuck.start()
+    return chuck
+
+
+def realtime_factor(chuck, seconds, block_size):
+    num_frames = int(seconds * SAMPLE_RATE)
+    start = perf_counter()
+    chuck.render(num_frames=num_frames, block_size=block_size)
+    return seconds / (perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0, help='seconds of audio rendered per run')
+    parser.add_argument('--block-size', type=int, default=256)
+    args = parser.parse_args()
+
+    chuck = make_chuck()
+    # Let the shreds start and allocate before anything is timed
+    chuck.render(num_frames=SAMPLE_RATE, block_size=args.block_size)
+
+    never = realtime_factor(chuck, args.seconds, args.block_size)
+    chuck.set_profiling(True)
+    on = realtime_factor(chuck, args.seconds, args.block_size)
+    profile = chuck.profile()
+    chuck.set_profiling(False)
+    off = realtime_factor(chuck, args.seconds, args.block_size)
+
+    total_ns = profile['total_ns'] or 1
+    print(json.dumps({
+        'realtime_factor': {'never_on': never, 'on': on, 'off_again': off},
+        'overhead_on': never / on - 1,
+        'overhead_off_again': never / off - 1,
+        'vm': profile['vm_ns'] / total_ns,
+        'ugen_shreds': {
+            str(shred): ns / total_ns
+            for shred, ns in sorted(profile['ugen_ns'].items(), key=lambda item: -item[1])
+        },
+        'ugens': sorted(
+            ({'type': u['type'], 'shred': u['shred'], 'share': u['ns'] / total_ns} for u in profile['ugens']),
+            key=lambda u: -u['share']
+        )[:10],
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Measure how fast Chuck.run renders offline, with no audio device.
+
+Every combination of graph, block size, channel count and shred count is
+run for the same amount of audio, timing each call to Chuck.run. The
+report, printed as JSON, has frames per second, the realtime factor (seconds
+of audio rendered per second of wall time) and per-block latency
+percentiles, so runs from different releases can be compared.
+
+    python benchmarks/realtime_factor.py --seconds 10 --output before.json
+"""
+import argparse
+import json
+import platform
+from itertools import product
+from time import perf_counter
+
+import numpy
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+    ChuckError,
+    chuck_sources,
+)
+
+SAMPLE_RATE = 48000
+
+GRAPHS = {
+    'sine': '''
+SinOsc s => dac;
+440 => s.freq;
+while (true) 1::second => now;
+''',
+    'biquad': chuck_sources[2],
+    'formants_jcrev': chuck_sources[0],
+    'sndbuf_nrev': '''
+SndBuf buf => NRev r => dac;
+"special:dope" => buf.read;
+0.1 => r.mix;
+while (true) {
+    0 => buf.pos;
+    250::ms => now;
+}
+''',
+}
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def make_chuck(code, num_channels, num_shreds):
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, SAMPLE_RATE)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, num_channels)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, num_channels)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    if not chuck.init():
+        raise ChuckError('Failed to initialize Chuck')
+    if not chuck.compile_code(code, '', num_shreds):
+        raise ChuckError('Failed to compile benchmark graph')
+    chuck.start()
+    return chuck
+
+
+def measure(graph, block_size, num_channels, num_shreds, seconds):
+    chuck = make_chuck(GRAPHS[graph], num_channels, num_shreds)
+    samples_in = numpy.zeros((block_size, num_channels), numpy.float32)
+    samples_out = numpy.zeros((block_size, num_channels), numpy.float32)
+    num_blocks = max(int(seconds * SAMPLE_RATE) // block_size, 1)
+    latencies = numpy.empty(num_blocks)
+
+    # Let the shreds start and allocate before anything is timed
+    chuck.run(samples_in, samples_out, block_size)
+    for i in range(num_blocks):
+        start = perf_counter()
+        chuck.run(samples_in, samples_out, block_size)
+        latencies[i] = perf_counter() - start
+
+    elapsed = latencies.sum()
+    num_frames = num_blocks * block_size
+    return {
+        'graph': graph,
+        'block_size': block_size,
+        'channels': num_channels,
+        'shreds': num_shreds,
+        'frames': num_frames,
+        'elapsed': elapsed,
+        'frames_per_second': num_frames / elapsed,
+        'realtime_factor': num_frames / SAMPLE_RATE / elapsed,
+        # Fraction of the block's duration spent rendering it; above 1 is an xrun
+        'block_load_max': latencies.max() * SAMPLE_RATE / block_size,
+        'latency_us': dict(
+            ('p%g' % p, value * 1e6)
+            for p, value in zip(PERCENTILES, numpy.percentile(latencies, PERCENTILES))
+        ),
+    }
+
+
+def int_list(value):
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0, help='seconds of audio rendered per configuration')
+    parser.add_argument('--graphs', type=lambda value: value.split(','), default=sorted(GRAPHS),
+                        help='comma-separated graphs to run, from: %s' % ', '.join(sorted(GRAPHS)))
+    parser.add_argument('--block-sizes', type=int_list, default=[64, 256, 1024])
+    parser.add_argument('--channels', type=int_list, default=[1, 2, 8])
+    parser.add_argument('--shreds', type=int_list, default=[1, 16])
+    parser.add_argument('--output', help='also write the report to this file')
+    args = parser.parse_args()
+
+    unknown = set(args.graphs) - set(GRAPHS)
+    if unknown:
+        parser.error('unknown graphs: %s' % ', '.join(sorted(unknown)))
+
+    results = [
+        measure(graph, block_size, num_channels, num_shreds, args.seconds)
+        for graph, block_size, num_channels, num_shreds
+        in product(args.graphs, args.block_sizes, args.channels, args.shreds)
+    ]
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'sample_rate': SAMPLE_RATE,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
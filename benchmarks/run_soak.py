@@ -0,0 +1,87 @@
+"""
+Soak test Chuck.run for memory growth.
+
+Calls Chuck.run many times on the same buffers and samples the resident set
+size as it goes. Chuck.run does not allocate or leak references on the fast
+path, so RSS should stay flat once the first calls have warmed it up; the
+script exits non-zero if it grows by more than --max-growth-mb.
+
+    python benchmarks/run_soak.py --calls 10000000
+"""
+import argparse
+import json
+import resource
+import sys
+
+import numpy
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+    ChuckError,
+)
+
+NUM_CHANNELS = 2
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2 ** 20
+    except OSError:
+        # Peak rather than current RSS, which still shows growth
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 2 ** 20 if sys.platform == 'darwin' else maxrss / 2 ** 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=10 ** 7)
+    parser.add_argument('--block-size', type=int, default=16)
+    parser.add_argument('--samples', type=int, default=20, help='number of RSS measurements')
+    parser.add_argument('--max-growth-mb', type=float, default=1.0)
+    parser.add_argument('--float64-input', action='store_true', help='exercise the input conversion path')
+    args = parser.parse_args()
+
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, 48000)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    if not chuck.init():
+        raise ChuckError('Failed to initialize Chuck')
+    chuck.compile_code('adc => Gain g => dac; SinOsc s => dac; 1::week => now;', '', 1)
+    chuck.start()
+
+    dtype = numpy.float64 if args.float64_input else numpy.float32
+    samples_in = numpy.zeros((args.block_size, NUM_CHANNELS), dtype)
+    samples_out = numpy.zeros((args.block_size, NUM_CHANNELS), numpy.float32)
+
+    # Warm up, so one-time allocations don't count as growth
+    for _ in range(1000):
+        chuck.run(samples_in, samples_out, args.block_size)
+
+    run = chuck.run
+    interval = max(1, args.calls // args.samples)
+    measurements = [rss_mb()]
+    for _ in range(args.samples):
+        for _ in range(interval):
+            run(samples_in, samples_out, args.block_size)
+        measurements.append(rss_mb())
+
+    growth = measurements[-1] - measurements[0]
+    print(json.dumps({
+        'calls': interval * args.samples,
+        'block_size': args.block_size,
+        'rss_mb': measurements,
+        'growth_mb': growth,
+    }, indent=2))
+    sys.exit(1 if growth > args.max_growth_mb else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare chuckpy.sweep with rendering the same variants in a Python loop.
+
+The loop sets up a VM per variant and calls Chuck.run block by block,
+which is what sweep replaces. Both render a patch whose cutoff is a
+global, for --variants cutoffs, and must produce the same audio.
+
+    python benchmarks/sweep.py --variants 64 --seconds 2
+"""
+import argparse
+import json
+import os
+from time import perf_counter
+
+import numpy
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+    ChuckError,
+    sweep,
+)
+
+SAMPLE_RATE = 48000
+NUM_CHANNELS = 2
+
+PATCH = '''
+global float cutoff;
+SawOsc s => LPF f => dac;
+110 => s.freq;
+0.2 => s.gain;
+cutoff => f.freq;
+while (true) 1::second => now;
+'''
+
+
+def render_loop(params, seconds, block_size):
+    num_frames = int(seconds * SAMPLE_RATE + 0.5)
+    variants = []
+    block = numpy.zeros((block_size, NUM_CHANNELS), numpy.float32)
+    for values in params:
+        chuck = Chuck()
+        chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, SAMPLE_RATE)
+        chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, NUM_CHANNELS)
+        chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, NUM_CHANNELS)
+        chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+        if not chuck.init():
+            raise ChuckError('Failed to initialize Chuck')
+        chuck.set_globals({'cutoff': float(values[0])})
+        chuck.compile_code(PATCH, '', 1)
+        chuck.start()
+        samples = numpy.empty((num_frames, NUM_CHANNELS), numpy.float32)
+        for start in range(0, num_frames, block_size):
+            n = min(block_size, num_frames - start)
+            chuck.run(None, block, n)
+            samples[start:start + n] = block[:n]
+        variants.append(samples)
+    return numpy.stack(variants)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variants', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=2.0, help='seconds of audio rendered per variant')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--block-size', type=int, default=256)
+    args = parser.parse_args()
+
+    params = numpy.geomspace(100, 8000, args.variants)[:, numpy.newaxis]
+
+    start = perf_counter()
+    expected = render_loop(params, args.seconds, args.block_size)
+    loop_elapsed = perf_counter() - start
+
+    start = perf_counter()
+    result = sweep(
+        PATCH,
+        params,
+        args.seconds,
+        names=['cutoff'],
+        sample_rate=SAMPLE_RATE,
+        num_channels=NUM_CHANNELS,
+        workers=args.workers,
+        block_size=args.block_size
+    )
+    sweep_elapsed = perf_counter() - start
+
+    audio_seconds = args.variants * args.seconds
+    print(json.dumps({
+        'variants': args.variants,
+        'workers': args.workers,
+        'loop': {'elapsed': loop_elapsed, 'realtime_factor': audio_seconds / loop_elapsed},
+        'sweep': {'elapsed': sweep_elapsed, 'realtime_factor': audio_seconds / sweep_elapsed},
+        'speedup': loop_elapsed / sweep_elapsed,
+        'max_abs_difference': float(numpy.abs(result.samples - expected).max()),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
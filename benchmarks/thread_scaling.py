@@ -0,0 +1,84 @@
+"""
+Measure how offline rendering scales across threads.
+
+Each worker thread owns a separate Chuck instance and renders the same
+patch with Chuck.render, which releases the GIL while the VM computes.
+With N threads on an otherwise idle machine of at least N cores, the
+speedup over a single thread should approach N.
+
+    python benchmarks/thread_scaling.py --seconds 30 --max-threads 8
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+    ChuckError,
+    chuck_sources,
+)
+
+SAMPLE_RATE = 48000
+NUM_CHANNELS = 2
+
+
+def make_chuck(code):
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, SAMPLE_RATE)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    if not chuck.init():
+        raise ChuckError('Failed to initialize Chuck')
+    chuck.compile_code(code, '', 1)
+    chuck.start()
+    return chuck
+
+
+def render_all(num_threads, seconds, block_size):
+    # Compile up front: the compiler holds the GIL and is not part of
+    # what this benchmark measures.
+    chucks = [make_chuck(chuck_sources[0]) for _ in range(num_threads)]
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        futures = [pool.submit(chuck.render, seconds=seconds, block_size=block_size) for chuck in chucks]
+        for future in futures:
+            future.result()
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0, help='seconds of audio rendered per thread')
+    parser.add_argument('--max-threads', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--block-size', type=int, default=256)
+    args = parser.parse_args()
+
+    results = []
+    baseline = None
+    num_threads = 1
+    while num_threads <= args.max_threads:
+        elapsed = render_all(num_threads, args.seconds, args.block_size)
+        # Work grows with the thread count, so perfect scaling keeps elapsed flat
+        throughput = num_threads * args.seconds / elapsed
+        if baseline is None:
+            baseline = throughput
+        results.append({
+            'threads': num_threads,
+            'elapsed': elapsed,
+            'realtime_factor': throughput,
+            'speedup': throughput / baseline,
+            'efficiency': throughput / baseline / num_threads,
+        })
+        num_threads *= 2
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
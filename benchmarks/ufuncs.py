@@ -0,0 +1,107 @@
+"""
+Compare the unit conversion ufuncs with applying ChucK's scalar formulas
+element by element, through numpy.vectorize and through a Python loop.
+
+The scalar versions transcribe ChucK's util_math.cpp, so the results must
+agree exactly.
+
+    python benchmarks/ufuncs.py --size 1000000
+"""
+import argparse
+import json
+import math
+from time import perf_counter
+
+import numpy
+
+import chuckpy
+
+LOGTEN = 2.302585092994
+
+
+def mtof(f):
+    if f <= -1500:
+        return 0.0
+    if f > 1499:
+        return mtof(1499)
+    return math.pow(2, (f - 69) / 12.0) * 440.0
+
+
+def ftom(f):
+    return math.log2(f / 440.0) * 12.0 + 69 if f > 0 else -1500.0
+
+
+def powtodb(f):
+    if f <= 0:
+        return 0.0
+    val = 100 + 10. / LOGTEN * math.log(f)
+    return 0.0 if val < 0 else val
+
+
+def rmstodb(f):
+    if f <= 0:
+        return 0.0
+    val = 100 + 20. / LOGTEN * math.log(f)
+    return 0.0 if val < 0 else val
+
+
+def dbtopow(f):
+    if f <= 0:
+        return 0.0
+    return math.exp((LOGTEN * 0.1) * (min(f, 870) - 100.))
+
+
+def dbtorms(f):
+    if f <= 0:
+        return 0.0
+    return math.exp((LOGTEN * 0.05) * (min(f, 485) - 100.))
+
+
+# Inputs spanning each function's interesting range, edges included
+RANGES = {
+    mtof: (-10, 140),
+    ftom: (-10, 20000),
+    powtodb: (-0.1, 2),
+    rmstodb: (-0.1, 2),
+    dbtopow: (-10, 140),
+    dbtorms: (-10, 140),
+}
+
+
+def timed(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000000, help='elements converted per call')
+    args = parser.parse_args()
+
+    rng = numpy.random.default_rng(0)
+    results = []
+    for scalar, (low, high) in RANGES.items():
+        ufunc = getattr(chuckpy, scalar.__name__)
+        values = rng.uniform(low, high, args.size)
+        out = numpy.empty_like(values)
+
+        ufunc_elapsed, _ = timed(ufunc, values, out)
+        float32_elapsed, _ = timed(ufunc, values.astype(numpy.float32))
+        vectorize_elapsed, vectorized = timed(numpy.vectorize(scalar, otypes=[numpy.float64]), values)
+        loop_elapsed, looped = timed(lambda: numpy.array([scalar(value) for value in values.tolist()]))
+        results.append({
+            'function': scalar.__name__,
+            'ufunc': ufunc_elapsed,
+            'ufunc_float32': float32_elapsed,
+            'vectorize': vectorize_elapsed,
+            'loop': loop_elapsed,
+            'speedup_over_vectorize': vectorize_elapsed / ufunc_elapsed,
+            'speedup_over_loop': loop_elapsed / ufunc_elapsed,
+            'matches': bool(numpy.array_equal(out, vectorized) and numpy.array_equal(out, looped)),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
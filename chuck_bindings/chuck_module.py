@@ -10,7 +10,12 @@ class ChuckModule(pybindgen.Module):
     def __init__(self):
         super(ChuckModule, self).__init__('_chuck')
         self.add_include('<stdio.h>')
+        self.add_include('<vector>')
+        self.add_include('<atomic>')
+        self.add_include('<thread>')
+        self.add_include('<chrono>')
         self.add_include('<numpy/arrayobject.h>')
+        self.add_include('<numpy/ufuncobject.h>')
 
         self.add_include('"chuck_def.h"')
 
@@ -25,6 +30,13 @@ class ChuckModule(pybindgen.Module):
 
         # self.add_include('"chuck_oo.h"')
         self.add_include('"chuck_carrier.h"')
+
+        self.add_include('"audio_tap.h"')
+        self.add_include('"sndfile_writer.h"')
+        self.add_include('"chuck_host.h"')
+        self.add_include('"chuck_mixer.h"')
+        self.add_include('"py_ugen.h"')
+        self.add_include('"timing_stats.h"')
         # self.add_include('"chuck_dl.h"')
         # self.add_include('"util_thread.h"')
 
@@ -32,9 +44,12 @@ class ChuckModule(pybindgen.Module):
 
         # Necessary for using numpy API
         self.before_init.write_code('import_array();')
+        self.before_init.write_code('import_umath();')
 
         self.add_global_functions()
+        self.add_sound_file_writer()
         self.add_chuck()
+        self.add_chuck_mixer()
         self.add_chuck_audio()
 
     @lru_cache()
@@ -46,8 +61,17 @@ class ChuckModule(pybindgen.Module):
     def add_global_functions(self):
         self.header.writeln(
             """
-            PyObject* samples_to_numpy_array(SAMPLE * samples, t_CKUINT count, t_CKUINT shape);
-            SAMPLE* numpy_array_to_samples(PyObject * npy_samples);
+            PyObject* samples_to_numpy_array(SAMPLE * samples, t_CKUINT num_frames, t_CKUINT num_channels);
+            void numpy_array_rebind_samples(PyObject * npy_samples, SAMPLE * samples);
+            int samples_get_buffer(
+                PyObject * obj,
+                Py_buffer * view,
+                npy_intp min_frames,
+                t_CKUINT num_channels,
+                bool writeable,
+                bool allow_double,
+                const char * name
+            );
             
             // Wrapper for f_audio_cb which calls a Python function
             void _wrap_f_audio_cb(
@@ -56,30 +80,246 @@ class ChuckModule(pybindgen.Module):
                 t_CKUINT num_frames,
                 t_CKUINT num_in_chans,
                 t_CKUINT num_out_chans,
-                void * py_cb
+                void * target
             );
             static void log_obj(PyObject * o);
+
+            // Append an update of global name to value, an int, float or 1-D
+            // sequence of floats, to updates. Returns 0, or -1 with an exception set.
+            int globals_append_update(std::vector<GlobalUpdate> & updates, PyObject * name, PyObject * value);
+
+            // Raise OSError with the error of a writer, returning NULL
+            PyObject * sound_file_writer_set_error(SoundFileWriter * writer);
+
+            // The counters of stats as a dict, with late only if include_late
+            PyObject * timing_stats_to_dict(const TimingStats & stats, bool include_late);
+
+            inline bool chuck_host_init(ChucK * chuck)
+            {
+                return ((ChuckHost *)chuck)->init_host();
+            }
+
+            inline bool chuck_host_replace_shred(ChucK * chuck, t_CKUINT xid, const std::string & code, const std::string & args_together, t_CKUINT fade_frames)
+            {
+                return ((ChuckHost *)chuck)->replace_shred(xid, code, args_together, fade_frames);
+            }
+
+            inline void chuck_host_remove_shred(ChucK * chuck, t_CKUINT xid, t_CKUINT fade_frames)
+            {
+                ((ChuckHost *)chuck)->remove_shred(xid, fade_frames);
+            }
+
+            inline t_CKUINT chuck_host_add_shred(ChucK * chuck, const std::string & code, const std::string & args_together)
+            {
+                return ((ChuckHost *)chuck)->add_shred(code, args_together);
+            }
+
+            inline t_CKUINT chuck_host_request_status(ChucK * chuck)
+            {
+                return ((ChuckHost *)chuck)->request_status();
+            }
+
+            inline bool chuck_host_shred_running(ChucK * chuck, t_CKUINT xid)
+            {
+                return ((ChuckHost *)chuck)->shred_running(xid);
+            }
+
+            inline void chuck_host_set_notify_fd(ChucK * chuck, int fd, t_CKUINT tick_frames)
+            {
+                ((ChuckHost *)chuck)->notifier().set_fd(fd, tick_frames);
+            }
+
+            inline void chuck_host_watch_shred(ChucK * chuck, t_CKUINT xid)
+            {
+                ((ChuckHost *)chuck)->notifier().watch(xid);
+            }
+
+            inline void chuck_host_watch_applied(ChucK * chuck, t_CKUINT number)
+            {
+                ((ChuckHost *)chuck)->notifier().watch_applied(number);
+            }
+
+            inline double chuck_host_now(ChucK * chuck)
+            {
+                return ((ChuckHost *)chuck)->now();
+            }
+
+            inline void chuck_host_reset(ChucK * chuck)
+            {
+                ((ChuckHost *)chuck)->reset();
+            }
+
+            inline void chuck_host_clear_schedule(ChucK * chuck)
+            {
+                ((ChuckHost *)chuck)->schedule().clear();
+            }
+
+            inline void chuck_host_set_code_cache_size(ChucK * chuck, t_CKUINT size)
+            {
+                ((ChuckHost *)chuck)->code_cache().set_capacity(size);
+            }
+
+            inline void chuck_host_clear_code_cache(ChucK * chuck)
+            {
+                ((ChuckHost *)chuck)->code_cache().clear();
+            }
+
+            // The Chuck instance or mixer bound to chuck_audio, which is a
+            // singleton, so there is at most one
+            struct ChuckAudioTarget {
+                ChucK * chuck;
+                ChuckMixer * mixer;
+                t_CKUINT num_in_chans;
+                t_CKUINT num_out_chans;
+
+                // Or the Python callable, with the (input, output, num_frames,
+                // num_in_chans, num_out_chans) arguments it is called with. The
+                // tuple and the views in it are built once per stream and rebound
+                // to the current buffers in place on every callback.
+                PyObject * py_callback;
+                PyObject * py_callback_args;
+
+                // The Chuck, mixer or callable last bound, which this keeps
+                // alive until another one is
+                PyObject * py_bound;
+
+                // Optional tap receiving a copy of every output block. py_tap
+                // owns it; in_callback lets set_tap wait for the audio thread
+                // to let go of the previous tap before releasing it.
+                std::atomic<AudioTap *> tap;
+                std::atomic<bool> in_callback;
+                PyObject * py_tap;
+
+                // Timing of every callback, written only by the audio thread
+                TimingStats stats;
+                TimingStats::Clock::time_point last_callback;
+
+                TimingStats::Clock::time_point begin_callback(t_CKUINT num_frames)
+                {
+                    TimingStats::Clock::time_point now = TimingStats::Clock::now();
+                    // RtAudio's xrun status does not reach f_audio_cb, so infer
+                    // them: a callback more than half a buffer later than its
+                    // period after the previous one means the driver waited
+                    if (last_callback != TimingStats::Clock::time_point()) {
+                        double period = (double)num_frames / ChuckAudio::srate();
+                        if (std::chrono::duration<double>(now - last_callback).count() > period * 1.5) {
+                            stats.record_late();
+                        }
+                    }
+                    last_callback = now;
+                    return now;
+                }
+
+                void end_callback(TimingStats::Clock::time_point start, t_CKUINT num_frames)
+                {
+                    stats.record(start, num_frames, ChuckAudio::srate());
+                }
+            };
+            extern ChuckAudioTarget chuck_audio_target;
+
+            // Callback for chuck_audio which runs the bound ChucK instance
+            // without ever touching the interpreter
+            void _native_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            );
+
+            // Callback for chuck_audio which runs the bound mixer's VMs on its
+            // worker threads, again without touching the interpreter
+            void _mixer_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            );
+
+            // Choose the f_audio_cb for a Python callback argument of
+            // chuck_audio.initialize and set *data to its user data
+            f_audio_cb chuck_audio_bind(PyObject * callback, void ** data);
             """
         )
         self.body.writeln(
             """
+            // Wrap interleaved samples, without copying, as a (frames, channels) float32 array
             PyObject* samples_to_numpy_array(SAMPLE * samples, t_CKUINT num_frames, t_CKUINT num_channels) {
-                npy_intp dims[num_frames];
-                for (int i=0; i<num_frames; i++) {
-                     dims[i] = num_channels;
-                }
-                PyObject* npy_samples = PyArray_SimpleNewFromData(num_channels, dims, NPY_DOUBLE, samples);
+                npy_intp dims[2] = {(npy_intp)num_frames, (npy_intp)num_channels};
+                PyObject* npy_samples = PyArray_SimpleNewFromData(2, dims, NPY_FLOAT32, samples);
                 return npy_samples;
             }
-            
-            SAMPLE* numpy_array_to_samples(PyObject * npy_samples) {
-                SAMPLE * samples = (SAMPLE *)PyArray_DATA(npy_samples);
-                //npy_intp * dims = PyArray_DIMS(npy_samples);
-                //npy_int num_channels = dims[0];
-                //npy_int num_frames = dims[1];                
-                return samples;
+
+            // Point an array made by samples_to_numpy_array at another buffer of the same shape
+            void numpy_array_rebind_samples(PyObject * npy_samples, SAMPLE * samples) {
+                ((PyArrayObject_fields *)npy_samples)->data = (char *)samples;
             }
             
+            // The struct format character of a buffer with a single native-endian item type, else 0
+            static char samples_buffer_format(Py_buffer * view)
+            {
+                const char * format = view->format;
+                if (format == NULL) {
+                    return 'B';
+                }
+            #if PY_LITTLE_ENDIAN
+                if (*format == '@' || *format == '=' || *format == '<') {
+            #else
+                if (*format == '@' || *format == '=' || *format == '>' || *format == '!') {
+            #endif
+                    format++;
+                }
+                return format[0] != 0 && format[1] == 0 ? format[0] : 0;
+            }
+
+            // Get a view of obj, which must export a C-contiguous buffer of shape
+            // (frames, num_channels) with at least min_frames frames, i.e. the
+            // interleaved layout ChucK::run expects. Its items must be float32, or
+            // float64 as well if allow_double is set. Returns 0, or -1 with an
+            // exception set. On success the caller must PyBuffer_Release the view,
+            // which pins the memory until then.
+            int samples_get_buffer(
+                PyObject * obj,
+                Py_buffer * view,
+                npy_intp min_frames,
+                t_CKUINT num_channels,
+                bool writeable,
+                bool allow_double,
+                const char * name
+            )
+            {
+                int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+                if (writeable) {
+                    flags |= PyBUF_WRITABLE;
+                }
+                if (PyObject_GetBuffer(obj, view, flags) < 0) {
+                    return -1;
+                }
+                char format = samples_buffer_format(view);
+                if (!(format == 'f' && view->itemsize == 4) && !(allow_double && format == 'd' && view->itemsize == 8)) {
+                    PyErr_Format(
+                        PyExc_TypeError,
+                        allow_double ? "%s must contain float32 or float64 samples" : "%s must contain float32 samples",
+                        name
+                    );
+                } else if (view->ndim != 2 || view->shape[1] != (Py_ssize_t)num_channels) {
+                    PyErr_Format(PyExc_ValueError, "%s must have shape (frames, %lu)", name, num_channels);
+                } else if (view->shape[0] < min_frames) {
+                    PyErr_Format(
+                        PyExc_ValueError,
+                        "%s has %zd frames, at least %zd are required",
+                        name, view->shape[0], (Py_ssize_t)min_frames
+                    );
+                } else {
+                    return 0;
+                }
+                PyBuffer_Release(view);
+                return -1;
+            }
+
             // Wrapper for f_audio_cb which calls a Python function
             void _wrap_f_audio_cb(
                 SAMPLE * input,
@@ -87,29 +327,235 @@ class ChuckModule(pybindgen.Module):
                 t_CKUINT num_frames,
                 t_CKUINT num_in_chans,
                 t_CKUINT num_out_chans,
-                void * py_cb
+                void * target
             )
             {
+                ChuckAudioTarget * t = (ChuckAudioTarget *)target;
+                TimingStats::Clock::time_point start = t->begin_callback(num_frames);
+
                 // acquire the GIL prior to running the callback
                 PyGILState_STATE gil_state = PyGILState_Ensure();
-                PyObject* input_numpy_array = samples_to_numpy_array(input, num_frames, num_in_chans);
-                PyObject* output_numpy_array = samples_to_numpy_array(output, num_frames, num_out_chans);
-                
-                //PyArray_UpdateFlags((PyArrayObject *)input_numpy_array, NPY_ARRAY_OWNDATA);
-                Py_XINCREF(input_numpy_array);
-                //PyArray_UpdateFlags((PyArrayObject *)output_numpy_array, NPY_ARRAY_OWNDATA);
-                Py_XINCREF(output_numpy_array);
-                
-                PyObject *callback = (PyObject*) py_cb;
-                //log_obj(callback);
-                PyObject *args = Py_BuildValue("(OOkkk)", input_numpy_array, output_numpy_array, num_frames, num_in_chans, num_out_chans);
-                
-                PyEval_CallObject(callback, args);
-                
-                Py_XDECREF(input_numpy_array);
-                Py_XDECREF(output_numpy_array);
-                Py_XDECREF(args);
+
+                PyObject * args = t->py_callback_args;
+                if (args != NULL && PyLong_AsUnsignedLong(PyTuple_GET_ITEM(args, 2)) == num_frames) {
+                    numpy_array_rebind_samples(PyTuple_GET_ITEM(args, 0), input);
+                    numpy_array_rebind_samples(PyTuple_GET_ITEM(args, 1), output);
+                } else {
+                    // First callback of the stream, or the buffer size changed
+                    Py_CLEAR(t->py_callback_args);
+                    PyObject* input_numpy_array = samples_to_numpy_array(input, num_frames, num_in_chans);
+                    PyObject* output_numpy_array = samples_to_numpy_array(output, num_frames, num_out_chans);
+                    if (input_numpy_array != NULL && output_numpy_array != NULL) {
+                        t->py_callback_args = Py_BuildValue("(OOkkk)", input_numpy_array, output_numpy_array, num_frames, num_in_chans, num_out_chans);
+                    }
+                    Py_XDECREF(input_numpy_array);
+                    Py_XDECREF(output_numpy_array);
+                    args = t->py_callback_args;
+                }
+
+                PyObject * result = NULL;
+                if (args != NULL) {
+                    result = PyObject_Call(t->py_callback, args, NULL);
+                }
+                if (result == NULL) {
+                    // There is no caller to raise to from the audio thread
+                    PyErr_WriteUnraisable(t->py_callback);
+                    memset(output, 0, num_frames * num_out_chans * sizeof(SAMPLE));
+                }
+                Py_XDECREF(result);
                 PyGILState_Release(gil_state);
+                t->end_callback(start, num_frames);
+            }
+
+            // Zero-initialized, since it has static storage
+            ChuckAudioTarget chuck_audio_target;
+
+            void _native_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            )
+            {
+                ChuckAudioTarget * t = (ChuckAudioTarget *)target;
+                TimingStats::Clock::time_point start = t->begin_callback(num_frames);
+                if (num_in_chans != t->num_in_chans || num_out_chans != t->num_out_chans) {
+                    // The VM would read and write past the ends of the buffers
+                    memset(output, 0, num_frames * num_out_chans * sizeof(SAMPLE));
+                    t->end_callback(start, num_frames);
+                    return;
+                }
+                ((ChuckHost *)t->chuck)->run_timed(input, output, num_frames);
+
+                t->in_callback.store(true);
+                AudioTap * tap = t->tap.load();
+                if (tap != NULL) {
+                    tap->write(output, num_frames);
+                }
+                t->in_callback.store(false);
+                t->end_callback(start, num_frames);
+            }
+
+            void _mixer_f_audio_cb(
+                SAMPLE * input,
+                SAMPLE * output,
+                t_CKUINT num_frames,
+                t_CKUINT num_in_chans,
+                t_CKUINT num_out_chans,
+                void * target
+            )
+            {
+                ChuckAudioTarget * t = (ChuckAudioTarget *)target;
+                TimingStats::Clock::time_point start = t->begin_callback(num_frames);
+                if (num_in_chans != t->num_in_chans || num_out_chans != t->num_out_chans) {
+                    memset(output, 0, num_frames * num_out_chans * sizeof(SAMPLE));
+                    t->end_callback(start, num_frames);
+                    return;
+                }
+                t->mixer->run(input, output, num_frames);
+
+                t->in_callback.store(true);
+                AudioTap * tap = t->tap.load();
+                if (tap != NULL) {
+                    tap->write(output, num_frames);
+                }
+                t->in_callback.store(false);
+                t->end_callback(start, num_frames);
+            }
+
+            f_audio_cb chuck_audio_bind(PyObject * callback, void ** data)
+            {
+                f_audio_cb cb;
+                if (PyObject_TypeCheck(callback, &PyChucK_Type)) {
+                    ChuckHost * chuck = (ChuckHost *)((PyChucK *)callback)->obj;
+                    if (chuck->sample_rate() == 0) {
+                        PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before binding it to chuck_audio");
+                        return NULL;
+                    }
+                    chuck_audio_target.chuck = chuck;
+                    chuck_audio_target.mixer = NULL;
+                    chuck_audio_target.num_in_chans = chuck->num_in_chans();
+                    chuck_audio_target.num_out_chans = chuck->num_out_chans();
+                    chuck_audio_target.py_callback = NULL;
+                    cb = _native_f_audio_cb;
+                } else if (PyObject_TypeCheck(callback, &PyChuckMixer_Type)) {
+                    ChuckMixer * mixer = ((PyChuckMixer *)callback)->obj;
+                    if (mixer->size() == 0) {
+                        PyErr_SetString(PyExc_RuntimeError, "a ChuckMixer needs at least one Chuck before binding it to chuck_audio");
+                        return NULL;
+                    }
+                    chuck_audio_target.chuck = NULL;
+                    chuck_audio_target.mixer = mixer;
+                    chuck_audio_target.num_in_chans = mixer->num_in_chans();
+                    chuck_audio_target.num_out_chans = mixer->num_out_chans();
+                    chuck_audio_target.py_callback = NULL;
+                    cb = _mixer_f_audio_cb;
+                } else if (PyCallable_Check(callback)) {
+                    chuck_audio_target.chuck = NULL;
+                    chuck_audio_target.mixer = NULL;
+                    chuck_audio_target.py_callback = callback;
+                    Py_CLEAR(chuck_audio_target.py_callback_args);
+                    cb = _wrap_f_audio_cb;
+                } else {
+                    PyErr_SetString(PyExc_TypeError, "f_audio_cb parameter must be a Chuck instance, a ChuckMixer or callable");
+                    return NULL;
+                }
+                Py_INCREF(callback);
+                Py_XDECREF(chuck_audio_target.py_bound);
+                chuck_audio_target.py_bound = callback;
+                *data = (void *)&chuck_audio_target;
+                return cb;
+            }
+
+            int globals_append_update(std::vector<GlobalUpdate> & updates, PyObject * name, PyObject * value)
+            {
+                if (!PyUnicode_Check(name)) {
+                    PyErr_SetString(PyExc_TypeError, "global names must be strings");
+                    return -1;
+                }
+                GlobalUpdate update;
+                update.name = PyUnicode_AsUTF8(name);
+                if (PyFloat_Check(value)) {
+                    update.kind = GlobalUpdate::FLOAT;
+                    update.float_value = PyFloat_AS_DOUBLE(value);
+                } else if (PyLong_Check(value)) {
+                    update.kind = GlobalUpdate::INT;
+                    update.int_value = PyLong_AsLong(value);
+                    if (update.int_value == -1 && PyErr_Occurred()) {
+                        return -1;
+                    }
+                } else if (PyArray_IsScalar(value, Floating) || PyArray_IsScalar(value, Integer)) {
+                    update.kind = PyArray_IsScalar(value, Integer) ? GlobalUpdate::INT : GlobalUpdate::FLOAT;
+                    update.float_value = PyFloat_AsDouble(value);
+                    update.int_value = (t_CKINT)update.float_value;
+                    if (update.float_value == -1.0 && PyErr_Occurred()) {
+                        return -1;
+                    }
+                } else {
+                    PyArrayObject * array = (PyArrayObject *)PyArray_FROM_OTF(value, NPY_FLOAT64, NPY_ARRAY_IN_ARRAY);
+                    if (array == NULL) {
+                        return -1;
+                    }
+                    if (PyArray_NDIM(array) != 1) {
+                        PyErr_Format(PyExc_ValueError, "global %s must be an int, a float or a 1-D array of floats", update.name.c_str());
+                        Py_DECREF(array);
+                        return -1;
+                    }
+                    update.kind = GlobalUpdate::FLOAT_ARRAY;
+                    const double * data = (const double *)PyArray_DATA(array);
+                    update.values.assign(data, data + PyArray_DIM(array, 0));
+                    Py_DECREF(array);
+                }
+                updates.push_back(GlobalUpdate());
+                std::swap(updates.back(), update);
+                return 0;
+            }
+
+            PyObject * sound_file_writer_set_error(SoundFileWriter * writer)
+            {
+                std::string error = writer->error();
+                PyErr_SetString(PyExc_OSError, error.empty() ? "sound file is closed" : error.c_str());
+                return NULL;
+            }
+
+            PyObject * timing_stats_to_dict(const TimingStats & stats, bool include_late)
+            {
+                PyObject * histogram = PyList_New(TimingStats::NUM_BUCKETS);
+                PyObject * bounds = PyList_New(TimingStats::NUM_BUCKETS);
+                if (histogram == NULL || bounds == NULL) {
+                    Py_XDECREF(histogram);
+                    Py_XDECREF(bounds);
+                    return NULL;
+                }
+                for (int i = 0; i < TimingStats::NUM_BUCKETS; i++) {
+                    PyList_SET_ITEM(histogram, i, PyLong_FromUnsignedLong(stats.histogram(i)));
+                    PyList_SET_ITEM(
+                        bounds, i,
+                        PyFloat_FromDouble(i < TimingStats::NUM_BUCKETS - 1 ? (double)(1UL << i) : Py_HUGE_VAL)
+                    );
+                }
+                t_CKUINT calls = stats.calls();
+                PyObject * dict = Py_BuildValue(
+                    "{s:k,s:k,s:k,s:k,s:d,s:k,s:N,s:N}",
+                    "calls", calls,
+                    "frames", stats.frames(),
+                    "total_ns", stats.total_ns(),
+                    "max_ns", stats.max_ns(),
+                    "avg_ns", calls ? (double)stats.total_ns() / calls : 0.0,
+                    "overruns", stats.overruns(),
+                    "histogram", histogram,
+                    "histogram_bounds_us", bounds
+                );
+                if (dict != NULL && include_late) {
+                    PyObject * late = PyLong_FromUnsignedLong(stats.late());
+                    if (late == NULL || PyDict_SetItemString(dict, "late", late) < 0) {
+                        Py_CLEAR(dict);
+                    }
+                    Py_XDECREF(late);
+                }
+                return dict;
             }
 
             static void log_obj(PyObject * o)
@@ -136,15 +582,111 @@ class ChuckModule(pybindgen.Module):
             ],
             custom_name='set_error_message_log_level'
         )
-        self.add_function('mtof', retval('double'), [param('double', 'f')])
-        self.add_function('ftom', retval('double'), [param('double', 'f')])
-        self.add_function('powtodb', retval('double'), [param('double', 'f')])
-        self.add_function('rmstodb', retval('double'), [param('double', 'f')])
-        self.add_function('dbtopow', retval('double'), [param('double', 'f')])
-        self.add_function('dbtorms', retval('double'), [param('double', 'f')])
+        self.add_math_ufuncs()
         self.add_function('nextpow2', retval('unsigned long'), [param('unsigned long', 'i')])
         self.add_function('ensurepow2', retval('unsigned long'), [param('unsigned long', 'i')])
 
+    @lru_cache()
+    def add_math_ufuncs(self):
+        # ChucK's unit conversions, as NumPy ufuncs so whole arrays convert
+        # in C; scalars work too, and return NumPy scalars
+        self.header.writeln(
+            """
+            // Add mtof, ftom, powtodb, rmstodb, dbtopow and dbtorms to module
+            // as ufuncs. Returns 0, or -1 with an exception set.
+            int math_ufuncs_add(PyObject * module);
+            """
+        )
+        self.body.writeln(
+            """
+            // The inner loop of a ufunc, applying F along a strided run of T.
+            // float32 is computed in double too, as ChucK computes, so every
+            // element gets exactly ChucK's result, rounded to T.
+            template <double (*F)(double), typename T>
+            static void math_ufunc_loop(
+                char ** args,
+                npy_intp const * dimensions,
+                npy_intp const * steps,
+                void * PYBINDGEN_UNUSED(data)
+            )
+            {
+                char * in = args[0];
+                char * out = args[1];
+                npy_intp in_step = steps[0];
+                npy_intp out_step = steps[1];
+                for (npy_intp i = 0; i < dimensions[0]; i++) {
+                    *(T *)out = (T)F((double)*(T *)in);
+                    in += in_step;
+                    out += out_step;
+                }
+            }
+
+            struct MathUfunc
+            {
+                const char * name;
+                PyUFuncGenericFunction loops[2];
+                const char * doc;
+            };
+
+            // Input and output types of each loop, in the order of MathUfunc::loops
+            static char math_ufunc_types[] = {NPY_FLOAT, NPY_FLOAT, NPY_DOUBLE, NPY_DOUBLE};
+            static void * math_ufunc_data[] = {NULL, NULL};
+
+            // NumPy keeps pointers into these for the life of the process
+            static MathUfunc math_ufuncs[] = {
+                {
+                    "mtof",
+                    {math_ufunc_loop<mtof, float>, math_ufunc_loop<mtof, double>},
+                    "Convert MIDI note numbers to frequencies in Hz, as ChucK's Std.mtof."
+                },
+                {
+                    "ftom",
+                    {math_ufunc_loop<ftom, float>, math_ufunc_loop<ftom, double>},
+                    "Convert frequencies in Hz to MIDI note numbers, as ChucK's Std.ftom."
+                },
+                {
+                    "powtodb",
+                    {math_ufunc_loop<powtodb, float>, math_ufunc_loop<powtodb, double>},
+                    "Convert power to decibels, 100 being unity, as ChucK's Std.powtodb."
+                },
+                {
+                    "rmstodb",
+                    {math_ufunc_loop<rmstodb, float>, math_ufunc_loop<rmstodb, double>},
+                    "Convert RMS amplitude to decibels, 100 being unity, as ChucK's Std.rmstodb."
+                },
+                {
+                    "dbtopow",
+                    {math_ufunc_loop<dbtopow, float>, math_ufunc_loop<dbtopow, double>},
+                    "Convert decibels, 100 being unity, to power, as ChucK's Std.dbtopow."
+                },
+                {
+                    "dbtorms",
+                    {math_ufunc_loop<dbtorms, float>, math_ufunc_loop<dbtorms, double>},
+                    "Convert decibels, 100 being unity, to RMS amplitude, as ChucK's Std.dbtorms."
+                },
+            };
+
+            int math_ufuncs_add(PyObject * module)
+            {
+                for (size_t i = 0; i < sizeof(math_ufuncs) / sizeof(math_ufuncs[0]); i++) {
+                    MathUfunc & u = math_ufuncs[i];
+                    PyObject * ufunc = PyUFunc_FromFuncAndData(
+                        u.loops, math_ufunc_data, math_ufunc_types, 2, 1, 1, PyUFunc_None, u.name, u.doc, 0
+                    );
+                    if (ufunc == NULL) {
+                        return -1;
+                    }
+                    if (PyModule_AddObject(module, u.name, ufunc) < 0) {
+                        Py_DECREF(ufunc);
+                        return -1;
+                    }
+                }
+                return 0;
+            }
+            """
+        )
+        self.after_init.write_error_check('math_ufuncs_add(m) < 0')
+
     @lru_cache()
     def add_rt_audio(self):
         RtAudio = self.add_class('RtAudio')
@@ -152,61 +694,639 @@ class ChuckModule(pybindgen.Module):
         return RtAudio
 
     @lru_cache()
-    def add_chuck_audio(self):
-        self.add_rt_audio()
+    def add_audio_tap(self):
+        self.header.writeln(
+            """
+            PyObject * audio_tap_read(AudioTap * tap, t_CKUINT num_frames);
+            PyObject * _wrap_PyAudioTap__tp_iternext(PyAudioTap *self);
+            """
+        )
+        self.body.writeln(
+            """
+            // Drain up to num_frames frames from the tap into a new (frames, channels) array
+            PyObject * audio_tap_read(AudioTap * tap, t_CKUINT num_frames)
+            {
+                t_CKUINT available = tap->available();
+                if (num_frames > available) {
+                    num_frames = available;
+                }
+                npy_intp dims[2] = {(npy_intp)num_frames, (npy_intp)tap->num_channels()};
+                PyObject * samples = PyArray_SimpleNew(2, dims, NPY_FLOAT32);
+                if (samples == NULL) {
+                    return NULL;
+                }
+                tap->read((SAMPLE *)PyArray_DATA((PyArrayObject *)samples), num_frames);
+                return samples;
+            }
 
-        # ChuckAudio is a global, shared singleton, not a constructable class, so lets snake-case it
-        chuck_audio = self.add_class('ChuckAudio', is_singleton=True, custom_name='chuck_audio')
+            // Iterating a tap yields whatever has been rendered since the previous
+            // block, waiting for the audio thread if nothing has, until it is closed
+            PyObject * _wrap_PyAudioTap__tp_iternext(PyAudioTap *self)
+            {
+                AudioTap * tap = self->obj;
+                while (tap->available() == 0) {
+                    if (tap->closed()) {
+                        return NULL;
+                    }
+                    Py_BEGIN_ALLOW_THREADS
+                    std::this_thread::sleep_for(std::chrono::milliseconds(1));
+                    Py_END_ALLOW_THREADS
+                    if (PyErr_CheckSignals()) {
+                        return NULL;
+                    }
+                }
+                return audio_tap_read(tap, tap->available());
+            }
+            """
+        )
 
-        chuck_audio.add_static_attribute('m_dac_n', 't_CKUINT')
-        chuck_audio.add_static_attribute('m_adc_n', 't_CKUINT')
-        chuck_audio.add_method(
-            'initialize',
-            retval('t_CKBOOL'),
+        AudioTap = self.add_class('AudioTap', custom_name='Tap')
+        AudioTap.add_constructor(
             [
-                param('t_CKUINT', 'num_dac_channels'),
-                param('t_CKUINT', 'num_adc_channels'),
-                param('t_CKUINT', 'sample_rate'),
-                param('t_CKUINT', 'buffer_size'),
-                param('t_CKUINT', 'num_buffers'),
-                param('f_audio_cb', 'callback'),
-                # Note that we omit the data argument; it is not supported because
-                # we use it to pass the python callback via _wrap_f_audio_cb,
-                # This should be fine, because presumably you have access in your
-                # python callback to whatever data you want to use
-                # in the callback.
-                # param('PyObject*', 'data', transfer_ownership=True),
-                param('t_CKBOOL', 'force_srate'),
-            ],
-            is_static=True,
-            custom_name='initialize'
+                param('t_CKUINT', 'num_frames'),
+                param('t_CKUINT', 'num_channels'),
+            ]
         )
+        AudioTap.add_method('capacity', retval('t_CKUINT'), [], is_const=True)
+        AudioTap.add_method('num_channels', retval('t_CKUINT'), [], is_const=True)
+        AudioTap.add_method('available', retval('t_CKUINT'), [], is_const=True)
+        AudioTap.add_method('overflows', retval('t_CKUINT'), [], is_const=True)
+        AudioTap.add_method('closed', retval('bool'), [], is_const=True)
+        AudioTap.add_method('close', retval('void'), [])
 
-        chuck_audio.add_method('shutdown', retval('void'),[], is_static=True)
-        chuck_audio.add_method('start', retval('t_CKBOOL'),[], is_static=True)
-        chuck_audio.add_method('stop', retval('t_CKBOOL'),[], is_static=True)
-        chuck_audio.add_method('watchdog_start', retval('t_CKBOOL'),[], is_static=True)
-        chuck_audio.add_method('watchdog_stop', retval('t_CKBOOL'),[], is_static=True)
-        chuck_audio.add_method('probe', retval('void'),[], is_static=True)
+        tap_read_body = '''
+        PyObject * _wrap_PyAudioTap_read__inner(
+            PyAudioTap *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_num_frames = Py_None;
+            const char *keywords[] = {"num_frames", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "|O", (char **) keywords, &py_num_frames)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            t_CKUINT num_frames = self->obj->capacity();
+            if (py_num_frames != Py_None) {
+                num_frames = PyLong_AsUnsignedLong(py_num_frames);
+                if (PyErr_Occurred()) {
+                    return NULL;
+                }
+            }
+            return audio_tap_read(self->obj, num_frames);
+        }
+        '''
+        AudioTap.add_custom_method_wrapper(
+            'read',
+            '_wrap_PyAudioTap_read__inner',
+            tap_read_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "read(num_frames=None)\\n\\n"
+                "Return up to num_frames of the frames buffered so far, or all of them, "
+                "as a (frames, num_channels) float32 array. Never blocks."
+            ),
+        )
 
-        chuck_audio.add_method('srate', retval('t_CKUINT'),[], is_static=True, custom_name='get_sample_rate')
-        chuck_audio.add_method('num_channels_out', retval('t_CKUINT'),[], is_static=True, custom_name='get_num_channels_out')
-        chuck_audio.add_method('num_channels_in', retval('t_CKUINT'),[], is_static=True, custom_name='get_num_channels_in')
-        chuck_audio.add_method('dac_num', retval('t_CKUINT'),[], is_static=True, custom_name='get_dac_num')
-        chuck_audio.add_method('adc_num', retval('t_CKUINT'),[], is_static=True, custom_name='get_adc_num')
-        # This method appears to be unused and ChuckAudio::m_bps never gets initialized so its an undefined symbol
-        # chuck_audio.add_method('bps', retval('t_CKUINT'),[], is_static=True, custom_name='get_bps')
-        chuck_audio.add_method('buffer_size', retval('t_CKUINT'),[], is_static=True, custom_name='get_buffer_size')
-        chuck_audio.add_method('num_buffers', retval('t_CKUINT'),[], is_static=True, custom_name='get_num_buffers')
+        tap_readinto_body = '''
+        PyObject * _wrap_PyAudioTap_readinto__inner(
+            PyAudioTap *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* output_numpy_array;
+            const char *keywords[] = {"out", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &output_numpy_array)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, 0, self->obj->num_channels(), true, false, "out") < 0) {
+                return NULL;
+            }
+            t_CKUINT num_frames = self->obj->read((SAMPLE *)output_view.buf, output_view.shape[0]);
+            PyBuffer_Release(&output_view);
+            return PyLong_FromUnsignedLong(num_frames);
+        }
+        '''
+        AudioTap.add_custom_method_wrapper(
+            'readinto',
+            '_wrap_PyAudioTap_readinto__inner',
+            tap_readinto_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "readinto(out)\\n\\n"
+                "Fill out, a (frames, num_channels) float32 buffer, with as many buffered "
+                "frames as are available and fit, and return how many were read. Never blocks."
+            ),
+        )
 
-        chuck_audio.add_method('audio', retval('RtAudio *', caller_owns_return=True), [], is_static=True, custom_name='get_rt_audio')
+        AudioTap.slots['tp_iter'] = 'PyObject_SelfIter'
+        AudioTap.slots['tp_iternext'] = '_wrap_PyAudioTap__tp_iternext'
+        return AudioTap
 
-        # for things like audicle
-        chuck_audio.add_method(
-            'set_extern',
-            retval('void'),
+    @lru_cache()
+    def add_sound_file_writer(self):
+        # Streams to a sound file through ChucK's bundled libsndfile, with a
+        # fixed amount of buffering; Chuck.render_to renders straight into it
+        SoundFileWriter = self.add_class('SoundFileWriter')
+        SoundFileWriter.add_constructor(
             [
-                param('SAMPLE *', 'in'),
+                param('const std::string &', 'path'),
+                param('t_CKUINT', 'sample_rate'),
+                param('t_CKUINT', 'num_channels'),
+                param('int', 'format'),
+                param('t_CKUINT', 'buffer_frames'),
+                param('t_CKUINT', 'num_buffers'),
+            ]
+        )
+        SoundFileWriter.add_method('num_channels', retval('t_CKUINT'), [], is_const=True)
+        SoundFileWriter.add_method('frames_written', retval('t_CKUINT'), [])
+        SoundFileWriter.add_method('failed', retval('bool'), [])
+        SoundFileWriter.add_method('closed', retval('bool'), [])
+        SoundFileWriter.add_method('error', retval('std::string'), [])
+
+        sound_file_writer_write_body = '''
+        PyObject * _wrap_PySoundFileWriter_write__inner(
+            PySoundFileWriter *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* input_numpy_array;
+            const char *keywords[] = {"samples", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &input_numpy_array)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            SoundFileWriter * writer = self->obj;
+            Py_buffer input_view;
+            if (samples_get_buffer(input_numpy_array, &input_view, 0, writer->num_channels(), false, false, "samples") < 0) {
+                return NULL;
+            }
+            bool ok;
+            // Waits for the writer thread when the buffers are full
+            Py_BEGIN_ALLOW_THREADS
+            ok = writer->write((const SAMPLE *)input_view.buf, input_view.shape[0]);
+            Py_END_ALLOW_THREADS
+            PyBuffer_Release(&input_view);
+            if (!ok) {
+                return sound_file_writer_set_error(writer);
+            }
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        SoundFileWriter.add_custom_method_wrapper(
+            'write',
+            '_wrap_PySoundFileWriter_write__inner',
+            sound_file_writer_write_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "write(samples)\\n\\n"
+                "Queue samples, a (frames, num_channels) float32 buffer, to be written. "
+                "Raises OSError if the file is closed or a write has failed."
+            ),
+        )
+
+        sound_file_writer_close_body = '''
+        PyObject * _wrap_PySoundFileWriter_close__inner(
+            PySoundFileWriter *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            bool ok;
+            Py_BEGIN_ALLOW_THREADS
+            ok = self->obj->close();
+            Py_END_ALLOW_THREADS
+            if (!ok) {
+                return sound_file_writer_set_error(self->obj);
+            }
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        SoundFileWriter.add_custom_method_wrapper(
+            'close',
+            '_wrap_PySoundFileWriter_close__inner',
+            sound_file_writer_close_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "close()\\n\\n"
+                "Write everything queued and close the file. Raises OSError if any write failed."
+            ),
+        )
+        return SoundFileWriter
+
+    @lru_cache()
+    def add_chuck_mixer(self):
+        # Depends on:
+        self.add_chuck()
+
+        self.header.writeln(
+            """
+            // A reference to obj that is released, with the GIL, when the last
+            // copy of the pointer goes
+            std::shared_ptr<void> py_object_owner(PyObject * obj);
+            """
+        )
+        self.body.writeln(
+            """
+            static void py_object_owner_release(void * obj)
+            {
+                PyGILState_STATE gil_state = PyGILState_Ensure();
+                Py_DECREF((PyObject *)obj);
+                PyGILState_Release(gil_state);
+            }
+
+            std::shared_ptr<void> py_object_owner(PyObject * obj)
+            {
+                Py_INCREF(obj);
+                return std::shared_ptr<void>(obj, py_object_owner_release);
+            }
+            """
+        )
+
+        # Several VMs rendered in parallel on worker threads and summed; can
+        # be bound to chuck_audio like a single Chuck
+        ChuckMixer = self.add_class('ChuckMixer')
+        ChuckMixer.add_constructor(
+            [
+                param('t_CKUINT', 'num_threads'),
+                param('bool', 'pin', default_value='true'),
+            ]
+        )
+        ChuckMixer.add_method('size', retval('t_CKUINT'), [], is_const=True)
+        ChuckMixer.add_method('num_threads', retval('t_CKUINT'), [], is_const=True)
+
+        chuck_mixer_add_body = '''
+        PyObject * _wrap_PyChuckMixer_add__inner(
+            PyChuckMixer *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_chuck;
+            float gain = 1.0;
+            const char *keywords[] = {"chuck", "gain", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!|f", (char **) keywords, &PyChucK_Type, &py_chuck, &gain)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckMixer * mixer = self->obj;
+            ChuckHost * chuck = (ChuckHost *)((PyChucK *)py_chuck)->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before adding it to a mixer");
+                return NULL;
+            }
+            // The mixer keeps the Chuck alive for as long as it exists
+            if (!mixer->add(chuck, gain, py_object_owner(py_chuck))) {
+                PyErr_SetString(PyExc_ValueError, "every Chuck in a mixer must have the same sample rate and channel counts");
+                return NULL;
+            }
+            return PyLong_FromUnsignedLong(mixer->size() - 1);
+        }
+        '''
+        ChuckMixer.add_custom_method_wrapper(
+            'add',
+            '_wrap_PyChuckMixer_add__inner',
+            chuck_mixer_add_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "add(chuck, gain=1.0)\\n\\n"
+                "Mix chuck, an initialized Chuck, in at gain, and return its index. Every Chuck "
+                "must have the same sample rate and channel counts. Only call while nothing is "
+                "running the mixer."
+            ),
+        )
+
+        chuck_mixer_set_gain_body = '''
+        PyObject * _wrap_PyChuckMixer_set_gain__inner(
+            PyChuckMixer *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            unsigned long index;
+            float gain;
+            const char *keywords[] = {"index", "gain", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "kf", (char **) keywords, &index, &gain)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (index >= self->obj->size()) {
+                PyErr_SetString(PyExc_IndexError, "mixer index out of range");
+                return NULL;
+            }
+            self->obj->set_gain(index, gain);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        ChuckMixer.add_custom_method_wrapper(
+            'set_gain',
+            '_wrap_PyChuckMixer_set_gain__inner',
+            chuck_mixer_set_gain_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "set_gain(index, gain)\\n\\n"
+                "Set the gain of the Chuck at index, taking effect from the next block. "
+                "Safe while the mixer is running."
+            ),
+        )
+
+        chuck_mixer_run_body = '''
+        PyObject * _wrap_PyChuckMixer_run__inner(
+            PyChuckMixer *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* input_numpy_array;
+            PyObject* output_numpy_array;
+            int numFrames = -1;
+            const char *keywords[] = {"input", "output", "numFrames", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "OO|i", (char **) keywords, &input_numpy_array, &output_numpy_array, &numFrames)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckMixer * mixer = self->obj;
+            if (mixer->size() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "the mixer has no Chuck instances");
+                return NULL;
+            }
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, numFrames < 0 ? 0 : numFrames, mixer->num_out_chans(), true, false, "output") < 0) {
+                return NULL;
+            }
+            if (numFrames < 0) {
+                numFrames = output_view.shape[0];
+            }
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, numFrames, mixer->num_in_chans(), false, false, "input") < 0) {
+                    PyBuffer_Release(&output_view);
+                    return NULL;
+                }
+            }
+
+            Py_BEGIN_ALLOW_THREADS
+            mixer->run(input_view.obj == NULL ? NULL : (SAMPLE *)input_view.buf, (SAMPLE *)output_view.buf, numFrames);
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            PyBuffer_Release(&output_view);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        ChuckMixer.add_custom_method_wrapper(
+            'run',
+            '_wrap_PyChuckMixer_run__inner',
+            chuck_mixer_run_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "run(input, output, numFrames=None)\\n\\n"
+                "Compute numFrames frames of every Chuck in parallel and write their mix to output, "
+                "a C-contiguous (frames, OUTPUT_CHANNELS) float32 buffer. input, a (frames, "
+                "INPUT_CHANNELS) float32 buffer or None for silence, is fed to every Chuck."
+            ),
+        )
+
+        chuck_mixer_stats_body = '''
+        PyObject * _wrap_PyChuckMixer_stats__inner(
+            PyChuckMixer *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ChuckMixer * mixer = self->obj;
+            PyObject * instances = PyList_New(mixer->size());
+            if (instances == NULL) {
+                return NULL;
+            }
+            for (t_CKUINT i = 0; i < mixer->size(); i++) {
+                PyObject * stats = timing_stats_to_dict(mixer->chuck(i)->run_stats(), false);
+                if (stats == NULL) {
+                    Py_DECREF(instances);
+                    return NULL;
+                }
+                PyList_SET_ITEM(instances, i, stats);
+                PyObject * gain = PyFloat_FromDouble(mixer->gain(i));
+                PyObject * missed = PyLong_FromUnsignedLong(mixer->missed(i));
+                int failed = gain == NULL || missed == NULL
+                    || PyDict_SetItemString(stats, "gain", gain) < 0
+                    || PyDict_SetItemString(stats, "missed", missed) < 0;
+                Py_XDECREF(gain);
+                Py_XDECREF(missed);
+                if (failed) {
+                    Py_DECREF(instances);
+                    return NULL;
+                }
+            }
+            return Py_BuildValue("{s:N,s:N}", "mix", timing_stats_to_dict(mixer->stats(), false), "instances", instances);
+        }
+        '''
+        ChuckMixer.add_custom_method_wrapper(
+            'stats',
+            '_wrap_PyChuckMixer_stats__inner',
+            chuck_mixer_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "stats()\\n\\n"
+                "Return a dict with the timing of whole mixed blocks under mix, like Chuck.stats(), "
+                "and a list under instances with each Chuck's own stats plus its gain and the number "
+                "of blocks it finished after their duration had elapsed (missed)."
+            ),
+        )
+        return ChuckMixer
+
+    @lru_cache()
+    def add_chuck_audio(self):
+        self.add_rt_audio()
+        self.add_audio_tap()
+
+        # ChuckAudio is a global, shared singleton, not a constructable class, so lets snake-case it
+        chuck_audio = self.add_class('ChuckAudio', is_singleton=True, custom_name='chuck_audio')
+
+        chuck_audio.add_static_attribute('m_dac_n', 't_CKUINT')
+        chuck_audio.add_static_attribute('m_adc_n', 't_CKUINT')
+        chuck_audio.add_method(
+            'initialize',
+            retval('t_CKBOOL'),
+            [
+                param('t_CKUINT', 'num_dac_channels'),
+                param('t_CKUINT', 'num_adc_channels'),
+                param('t_CKUINT', 'sample_rate'),
+                param('t_CKUINT', 'buffer_size'),
+                param('t_CKUINT', 'num_buffers'),
+                # Either a Chuck instance or ChuckMixer, which the audio thread
+                # runs natively, or a Python callable taking
+                # (input, output, num_frames, num_in_chans, num_out_chans)
+                param('f_audio_cb', 'callback'),
+                # Note that we omit the data argument; it is not supported because
+                # we use it to pass the python callback via _wrap_f_audio_cb,
+                # This should be fine, because presumably you have access in your
+                # python callback to whatever data you want to use
+                # in the callback.
+                # param('PyObject*', 'data', transfer_ownership=True),
+                param('t_CKBOOL', 'force_srate'),
+            ],
+            is_static=True,
+            custom_name='initialize'
+        )
+
+        chuck_audio_set_tap_body = '''
+        PyObject * _wrap_PyChuckAudio_set_tap__inner(
+            PyChuckAudio *PYBINDGEN_UNUSED(dummy),
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_tap;
+            const char *keywords[] = {"tap", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_tap)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            AudioTap * tap = NULL;
+            if (py_tap == Py_None) {
+                py_tap = NULL;
+            } else {
+                if (!PyObject_TypeCheck(py_tap, &PyAudioTap_Type)) {
+                    PyErr_SetString(PyExc_TypeError, "tap must be a Tap or None");
+                    return NULL;
+                }
+                tap = ((PyAudioTap *)py_tap)->obj;
+                if (chuck_audio_target.chuck == NULL && chuck_audio_target.mixer == NULL) {
+                    PyErr_SetString(PyExc_RuntimeError, "taps require a Chuck instance or ChuckMixer bound with chuck_audio.initialize");
+                    return NULL;
+                }
+                if (tap->num_channels() != chuck_audio_target.num_out_chans) {
+                    PyErr_Format(PyExc_ValueError, "tap must have %lu channels", chuck_audio_target.num_out_chans);
+                    return NULL;
+                }
+                Py_INCREF(py_tap);
+            }
+
+            PyObject * previous = chuck_audio_target.py_tap;
+            chuck_audio_target.py_tap = py_tap;
+            chuck_audio_target.tap.store(tap);
+
+            // The audio thread may still be writing to the previous tap
+            Py_BEGIN_ALLOW_THREADS
+            while (chuck_audio_target.in_callback.load()) {
+                std::this_thread::yield();
+            }
+            Py_END_ALLOW_THREADS
+
+            if (previous != NULL) {
+                ((PyAudioTap *)previous)->obj->close();
+                Py_DECREF(previous);
+            }
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        chuck_audio.add_custom_method_wrapper(
+            'set_tap',
+            '_wrap_PyChuckAudio_set_tap__inner',
+            chuck_audio_set_tap_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS", "METH_STATIC"],
+            docstring=(
+                "set_tap(tap)\\n\\n"
+                "Copy every block the bound Chuck instance renders into tap, a Tap with "
+                "OUTPUT_CHANNELS channels, replacing and closing any previous tap. "
+                "Pass None to detach."
+            ),
+        )
+
+        chuck_audio_stats_body = '''
+        PyObject * _wrap_PyChuckAudio_stats__inner(
+            PyChuckAudio *PYBINDGEN_UNUSED(dummy),
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            return timing_stats_to_dict(chuck_audio_target.stats, true);
+        }
+        '''
+        chuck_audio.add_custom_method_wrapper(
+            'stats',
+            '_wrap_PyChuckAudio_stats__inner',
+            chuck_audio_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS", "METH_STATIC"],
+            docstring=(
+                "stats()\\n\\n"
+                "Return a dict of counters for the audio callbacks so far: calls, frames, total_ns, "
+                "max_ns, avg_ns, overruns (callbacks that took longer than their buffer lasts), "
+                "late (callbacks that arrived over half a buffer late), and a histogram of callback "
+                "durations with the upper bound of each bucket in histogram_bounds_us."
+            ),
+        )
+
+        chuck_audio.add_method('shutdown', retval('void'),[], is_static=True)
+        chuck_audio.add_method('start', retval('t_CKBOOL'),[], is_static=True)
+        chuck_audio.add_method('stop', retval('t_CKBOOL'),[], is_static=True)
+        chuck_audio.add_method('watchdog_start', retval('t_CKBOOL'),[], is_static=True)
+        chuck_audio.add_method('watchdog_stop', retval('t_CKBOOL'),[], is_static=True)
+        chuck_audio.add_method('probe', retval('void'),[], is_static=True)
+
+        chuck_audio.add_method('srate', retval('t_CKUINT'),[], is_static=True, custom_name='get_sample_rate')
+        chuck_audio.add_method('num_channels_out', retval('t_CKUINT'),[], is_static=True, custom_name='get_num_channels_out')
+        chuck_audio.add_method('num_channels_in', retval('t_CKUINT'),[], is_static=True, custom_name='get_num_channels_in')
+        chuck_audio.add_method('dac_num', retval('t_CKUINT'),[], is_static=True, custom_name='get_dac_num')
+        chuck_audio.add_method('adc_num', retval('t_CKUINT'),[], is_static=True, custom_name='get_adc_num')
+        # This method appears to be unused and ChuckAudio::m_bps never gets initialized so its an undefined symbol
+        # chuck_audio.add_method('bps', retval('t_CKUINT'),[], is_static=True, custom_name='get_bps')
+        chuck_audio.add_method('buffer_size', retval('t_CKUINT'),[], is_static=True, custom_name='get_buffer_size')
+        chuck_audio.add_method('num_buffers', retval('t_CKUINT'),[], is_static=True, custom_name='get_num_buffers')
+
+        chuck_audio.add_method('audio', retval('RtAudio *', caller_owns_return=True), [], is_static=True, custom_name='get_rt_audio')
+
+        # for things like audicle
+        chuck_audio.add_method(
+            'set_extern',
+            retval('void'),
+            [
+                param('SAMPLE *', 'in'),
                 param('SAMPLE *', 'out'),
             ],
             is_static=True,
@@ -300,8 +1420,45 @@ class ChuckModule(pybindgen.Module):
         # Depends on:
         self.add_chuck_vm()
 
+        self.header.writeln(
+            """
+            // The PyUGenCall behind Chuck.register_ugen: call callable as
+            // callable(input, output) with (num_frames,) float32 views
+            bool py_ugen_call(void * callable, SAMPLE * input, SAMPLE * output, t_CKUINT num_frames);
+            """
+        )
+        self.body.writeln(
+            """
+            bool py_ugen_call(void * callable, SAMPLE * input, SAMPLE * output, t_CKUINT num_frames)
+            {
+                PyGILState_STATE gil_state = PyGILState_Ensure();
+                npy_intp dims[1] = {(npy_intp)num_frames};
+                PyObject * py_input = PyArray_SimpleNewFromData(1, dims, NPY_FLOAT32, input);
+                PyObject * py_output = PyArray_SimpleNewFromData(1, dims, NPY_FLOAT32, output);
+                PyObject * result = NULL;
+                if (py_input != NULL && py_output != NULL) {
+                    // Only the output is the function's to write
+                    PyArray_CLEARFLAGS((PyArrayObject *)py_input, NPY_ARRAY_WRITEABLE);
+                    result = PyObject_CallFunctionObjArgs((PyObject *)callable, py_input, py_output, NULL);
+                }
+                bool ok = result != NULL;
+                if (!ok) {
+                    // There is no caller to raise to; print it like an exception in a thread
+                    PyErr_WriteUnraisable((PyObject *)callable);
+                }
+                Py_XDECREF(result);
+                Py_XDECREF(py_input);
+                Py_XDECREF(py_output);
+                PyGILState_Release(gil_state);
+                return ok;
+            }
+            """
+        )
+
         Chuck = self.add_class('ChucK', custom_name='Chuck')
-        Chuck.add_constructor([])
+        # Every Chuck is a ChuckHost, which keeps the per-instance state of
+        # the bindings next to the VM
+        Chuck.add_function_as_constructor('new ChuckHost', retval('ChucK *', caller_owns_return=True), [])
         Chuck.add_method(
             'setParam',
             retval('bool'),
@@ -312,98 +1469,778 @@ class ChuckModule(pybindgen.Module):
             custom_name='set_param'
         )
 
-        Chuck.add_method(
-            'setParamFloat',
+        Chuck.add_method(
+            'setParamFloat',
+            retval('bool'),
+            [
+                param('const std::string &', 'name'),
+                param('t_CKFLOAT', 'value')
+            ],
+            custom_name='set_param_float'
+        )
+
+        Chuck.add_method(
+            'setParam',
+            retval('bool'),
+            [
+                param('const std::string &', 'name'),
+                param('const std::string &', 'value'),
+            ],
+            custom_name='set_param'
+        )
+
+        Chuck.add_method(
+            'setParam',
+            retval('bool'),
+            [
+                param('const std::string &', 'name'),
+                param('const std::list< std::string > &', 'value'),
+            ],
+            custom_name='set_param'
+        )
+
+        Chuck.add_method(
+            'getParamInt',
+            retval('t_CKINT'),
+            [
+                param('const std::string &', 'key'),
+            ],
+            custom_name='get_param_int'
+        )
+
+        Chuck.add_method(
+            'getParamFloat',
+            retval('t_CKFLOAT'),
+            [
+                param('const std::string &', 'key'),
+            ],
+            custom_name='get_param_float'
+        )
+
+        Chuck.add_method(
+            'getParamString',
+            retval('std::string'),
+            [
+                param('const std::string &', 'key'),
+            ],
+            custom_name='get_param_string'
+        )
+
+        Chuck.add_method(
+            'getParamStringList',
+            retval('std::list< std::string >'),
+            [
+                param('const std::string &', 'key'),
+            ],
+            custom_name='get_param_string_list'
+        )
+
+        Chuck.add_method(
+            'compileFile',
+            retval('bool'),
+            [
+                param('const std::string &', 'path'),
+                param('const std::string &', 'argsTogether'),
+                param('int', 'count', 1)
+            ],
+            custom_name='compile_file'
+        )
+
+        # Compiled programs are cached per instance, keyed on the source and
+        # compiler settings, so compiling the same code again only sporks it
+        chuck_compile_code_body = '''
+        PyObject * _wrap_PyChucK_compile_code__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            const char *code = NULL;
+            Py_ssize_t code_len;
+            const char *argsTogether = "";
+            Py_ssize_t argsTogether_len = 0;
+            int count = 1;
+            const char *keywords[] = {"code", "argsTogether", "count", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#|s#i", (char **) keywords, &code, &code_len, &argsTogether, &argsTogether_len, &count)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (!chuck->compile_code(std::string(code, code_len), std::string(argsTogether, argsTogether_len), count)) {
+                return PyList_New(0);
+            }
+            const std::vector<t_CKUINT> & sporked = chuck->sporked();
+            PyObject * ids = PyList_New(sporked.size());
+            if (ids == NULL) {
+                return NULL;
+            }
+            for (size_t i = 0; i < sporked.size(); i++) {
+                PyList_SET_ITEM(ids, i, PyLong_FromUnsignedLong(sporked[i]));
+            }
+            return ids;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'compile_code',
+            '_wrap_PyChucK_compile_code__inner',
+            chuck_compile_code_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "compile_code(code, argsTogether='', count=1)\\n\\n"
+                "Compile code and spork count shreds of it. Return the list of their ids, "
+                "which is empty if the code does not compile. The shreds are sporked right away, "
+                "so this is only safe while no other thread is running the VM; while one is, "
+                "queue them with add_shred instead."
+            ),
+        )
+
+        # Hot-swapping: commands are queued and applied by the thread running
+        # the VM at the start of its next block, optionally fading the output
+        # out before and back in after
+        Chuck.add_function_as_method(
+            'chuck_host_replace_shred',
+            retval('bool'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('t_CKUINT', 'shred_id'),
+                param('const std::string &', 'code'),
+                param('const std::string &', 'argsTogether', default_value='""'),
+                param('t_CKUINT', 'fade_frames', default_value='0'),
+            ],
+            custom_name='replace_shred'
+        )
+
+        Chuck.add_function_as_method(
+            'chuck_host_remove_shred',
+            retval('void'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('t_CKUINT', 'shred_id'),
+                param('t_CKUINT', 'fade_frames', default_value='0'),
+            ],
+            custom_name='remove_shred'
+        )
+
+        # The in-process equivalent of OTF add and status, queued with the
+        # commands above; status snapshots are collected by shred_status
+        Chuck.add_function_as_method(
+            'chuck_host_add_shred',
+            retval('t_CKUINT'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('const std::string &', 'code'),
+                param('const std::string &', 'argsTogether', default_value='""'),
+            ],
+            custom_name='add_shred'
+        )
+
+        Chuck.add_function_as_method(
+            'chuck_host_request_status',
+            retval('t_CKUINT'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+            ],
+            custom_name='request_status'
+        )
+
+        chuck_shreds_body = '''
+        PyObject * _wrap_PyChucK_shreds__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                return PyList_New(0);
+            }
+            Chuck_VM_Status status;
+            chuck->vm()->shreduler()->status(&status);
+            PyObject * shreds = PyList_New(status.list.size());
+            if (shreds == NULL) {
+                return NULL;
+            }
+            for (size_t i = 0; i < status.list.size(); i++) {
+                Chuck_VM_Shred_Status * shred = status.list[i];
+                PyObject * item = Py_BuildValue(
+                    "{s:k,s:s,s:d,s:O}",
+                    "id", shred->xid,
+                    "name", shred->name.c_str(),
+                    "start", (double)(shred->start - chuck->epoch()),
+                    "waiting", shred->has_event ? Py_True : Py_False
+                );
+                if (item == NULL) {
+                    Py_DECREF(shreds);
+                    return NULL;
+                }
+                PyList_SET_ITEM(shreds, i, item);
+            }
+            return shreds;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'shreds',
+            '_wrap_PyChucK_shreds__inner',
+            chuck_shreds_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "shreds()\\n\\n"
+                "Return a dict for every shred in the VM, with its id, name, start time in samples "
+                "as returned by now(), and whether it is waiting on an event. Only safe while no "
+                "other thread is running the VM."
+            ),
+        )
+
+        chuck_shred_status_body = '''
+        PyObject * _wrap_PyChucK_shred_status__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            ShredStatus status;
+            if (!chuck->shred_control().collect_status(status)) {
+                Py_INCREF(Py_None);
+                return Py_None;
+            }
+            PyObject * shreds = PyList_New(status.shreds.size());
+            PyObject * added = PyDict_New();
+            if (shreds == NULL || added == NULL) {
+                Py_XDECREF(shreds);
+                Py_XDECREF(added);
+                return NULL;
+            }
+            for (size_t i = 0; i < status.shreds.size(); i++) {
+                ShredInfo & shred = status.shreds[i];
+                PyObject * item = Py_BuildValue(
+                    "{s:k,s:s,s:d,s:O}",
+                    "id", shred.xid,
+                    "name", shred.name.c_str(),
+                    "start", (double)(shred.start - chuck->epoch()),
+                    "waiting", shred.waiting ? Py_True : Py_False
+                );
+                if (item == NULL) {
+                    Py_DECREF(shreds);
+                    Py_DECREF(added);
+                    return NULL;
+                }
+                PyList_SET_ITEM(shreds, i, item);
+            }
+            for (size_t i = 0; i < status.added.size(); i++) {
+                PyObject * number = PyLong_FromUnsignedLong(status.added[i].first);
+                PyObject * xid = PyLong_FromUnsignedLong(status.added[i].second);
+                bool failed = number == NULL || xid == NULL || PyDict_SetItem(added, number, xid) < 0;
+                Py_XDECREF(number);
+                Py_XDECREF(xid);
+                if (failed) {
+                    Py_DECREF(shreds);
+                    Py_DECREF(added);
+                    return NULL;
+                }
+            }
+            return Py_BuildValue(
+                "{s:k,s:d,s:N,s:N}",
+                "applied", status.applied,
+                "now", (double)(status.now - chuck->epoch()),
+                "shreds", shreds,
+                "added", added
+            );
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'shred_status',
+            '_wrap_PyChucK_shred_status__inner',
+            chuck_shred_status_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "shred_status()\\n\\n"
+                "Return the snapshot taken by the last request_status applied, or None if there is "
+                "none yet: a dict with the number of commands applied up to and including it, now(), "
+                "a shreds() entry for every shred, and added, mapping the number of every add_shred "
+                "applied since the last call to the id of its shred. Safe while another thread is "
+                "running the VM."
+            ),
+        )
+
+        chuck_shred_control_stats_body = '''
+        PyObject * _wrap_PyChucK_shred_control_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ShredControl & control = ((ChuckHost *)self->obj)->shred_control();
+            return Py_BuildValue(
+                "{s:k,s:k}",
+                "pending", control.pending(),
+                "applied", control.applied()
+            );
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'shred_control_stats',
+            '_wrap_PyChucK_shred_control_stats__inner',
+            chuck_shred_control_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "shred_control_stats()\\n\\n"
+                "Return a dict with the number of add_shred, remove_shred, replace_shred and "
+                "request_status commands pending and applied so far."
+            ),
+        )
+
+        # Batched globals: updates are queued and applied together at the
+        # start of the next block; tracked globals are sampled after every block
+        chuck_set_globals_body = '''
+        PyObject * _wrap_PyChucK_set_globals__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* values;
+            const char *keywords[] = {"values", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!", (char **) keywords, &PyDict_Type, &values)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            std::vector<GlobalUpdate> updates;
+            updates.reserve(PyDict_Size(values));
+            PyObject * name;
+            PyObject * value;
+            Py_ssize_t pos = 0;
+            while (PyDict_Next(values, &pos, &name, &value)) {
+                if (globals_append_update(updates, name, value) < 0) {
+                    return NULL;
+                }
+            }
+            ((ChuckHost *)self->obj)->globals().commit(updates);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'set_globals',
+            '_wrap_PyChucK_set_globals__inner',
+            chuck_set_globals_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "set_globals(values)\\n\\n"
+                "Set the globals named by the keys of the dict values, which are ints, floats "
+                "or 1-D arrays of floats, all at the start of the next block."
+            ),
+        )
+
+        chuck_set_global_float_array_body = '''
+        PyObject * _wrap_PyChucK_set_global_float_array__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* name;
+            PyObject* values;
+            const char *keywords[] = {"name", "values", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "UO", (char **) keywords, &name, &values)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            std::vector<GlobalUpdate> updates;
+            if (globals_append_update(updates, name, values) < 0) {
+                return NULL;
+            }
+            if (updates[0].kind != GlobalUpdate::FLOAT_ARRAY) {
+                PyErr_SetString(PyExc_TypeError, "values must be a 1-D array of floats");
+                return NULL;
+            }
+            ((ChuckHost *)self->obj)->globals().commit(updates);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'set_global_float_array',
+            '_wrap_PyChucK_set_global_float_array__inner',
+            chuck_set_global_float_array_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "set_global_float_array(name, values)\\n\\n"
+                "Set the global float array name to values, a 1-D array, at the start of the next block."
+            ),
+        )
+
+        chuck_track_globals_body = '''
+        PyObject * _wrap_PyChucK_track_globals__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_names;
+            const char *keywords[] = {"names", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_names)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            PyObject * seq = PySequence_Fast(py_names, "names must be a sequence of strings");
+            if (seq == NULL) {
+                return NULL;
+            }
+            std::vector<std::string> names;
+            for (Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(seq); i++) {
+                PyObject * name = PySequence_Fast_GET_ITEM(seq, i);
+                if (!PyUnicode_Check(name)) {
+                    PyErr_SetString(PyExc_TypeError, "names must be a sequence of strings");
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                names.push_back(PyUnicode_AsUTF8(name));
+            }
+            Py_DECREF(seq);
+            ((ChuckHost *)self->obj)->globals().track(names);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'track_globals',
+            '_wrap_PyChucK_track_globals__inner',
+            chuck_track_globals_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "track_globals(names)\\n\\n"
+                "Sample the int or float globals names at the end of every block, for get_globals."
+            ),
+        )
+
+        chuck_get_globals_body = '''
+        PyObject * _wrap_PyChucK_get_globals__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            GlobalsBridge & globals = ((ChuckHost *)self->obj)->globals();
+            npy_intp dims[1] = {(npy_intp)globals.num_tracked()};
+            PyObject * values = PyArray_SimpleNew(1, dims, NPY_FLOAT64);
+            if (values == NULL) {
+                return NULL;
+            }
+            globals.read((double *)PyArray_DATA((PyArrayObject *)values));
+            return values;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'get_globals',
+            '_wrap_PyChucK_get_globals__inner',
+            chuck_get_globals_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "get_globals()\\n\\n"
+                "Return the tracked globals as of the end of the last block, as a float64 array "
+                "in the order given to track_globals, with NaN for any not declared yet."
+            ),
+        )
+
+        # Sample-accurate control: run and render split each block at the
+        # times of the scheduled events that fall inside it
+        chuck_schedule_body = '''
+        PyObject * _wrap_PyChucK_schedule__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_events;
+            const char *keywords[] = {"events", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O", (char **) keywords, &py_events)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            PyObject * seq = PySequence_Fast(py_events, "events must be a sequence of (sample_time, name, value) tuples");
+            if (seq == NULL) {
+                return NULL;
+            }
+            Py_ssize_t num_events = PySequence_Fast_GET_SIZE(seq);
+            std::vector<ScheduledEvent> events(num_events);
+            std::vector<GlobalUpdate> updates;
+            for (Py_ssize_t i = 0; i < num_events; i++) {
+                PyObject * event = PySequence_Fast_GET_ITEM(seq, i);
+                if (!PyTuple_Check(event) || PyTuple_GET_SIZE(event) != 3) {
+                    PyErr_SetString(PyExc_TypeError, "events must be a sequence of (sample_time, name, value) tuples");
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                double frame = PyFloat_AsDouble(PyTuple_GET_ITEM(event, 0));
+                if (frame == -1.0 && PyErr_Occurred()) {
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                PyObject * name = PyTuple_GET_ITEM(event, 1);
+                PyObject * value = PyTuple_GET_ITEM(event, 2);
+                // Global events are triggered by the value "signal" or "broadcast"
+                if (PyUnicode_Check(value) && PyUnicode_Check(name)) {
+                    const char * action = PyUnicode_AsUTF8(value);
+                    GlobalUpdate update;
+                    update.name = PyUnicode_AsUTF8(name);
+                    if (strcmp(action, "signal") == 0) {
+                        update.kind = GlobalUpdate::SIGNAL_EVENT;
+                    } else if (strcmp(action, "broadcast") == 0) {
+                        update.kind = GlobalUpdate::BROADCAST_EVENT;
+                    } else {
+                        PyErr_Format(PyExc_ValueError, "event %s must be \\"signal\\" or \\"broadcast\\"", update.name.c_str());
+                        Py_DECREF(seq);
+                        return NULL;
+                    }
+                    updates.push_back(GlobalUpdate());
+                    std::swap(updates.back(), update);
+                } else if (globals_append_update(updates, name, value) < 0) {
+                    Py_DECREF(seq);
+                    return NULL;
+                }
+                events[i].frame = frame < 0 ? 0 : (t_CKUINT)(frame + 0.5);
+                std::swap(events[i].update, updates.back());
+                updates.pop_back();
+            }
+            Py_DECREF(seq);
+            ((ChuckHost *)self->obj)->schedule().post(events);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'schedule',
+            '_wrap_PyChucK_schedule__inner',
+            chuck_schedule_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "schedule(events)\\n\\n"
+                "Schedule (sample_time, name, value) events, where sample_time is in samples "
+                "as returned by now(). value is an int, float or 1-D float array to set the global "
+                "name to, or 'signal' or 'broadcast' to trigger the global event name. "
+                "Blocks are split so that each event lands on its exact sample."
+            ),
+        )
+
+        Chuck.add_function_as_method(
+            'chuck_host_clear_schedule',
+            retval('void'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+            ],
+            custom_name='clear_schedule'
+        )
+
+        # Remove all shreds and globals and restart now() from 0, keeping
+        # chugins and cached code; only safe while no other thread runs the VM
+        Chuck.add_function_as_method(
+            'chuck_host_reset',
+            retval('void'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+            ],
+            custom_name='reset'
+        )
+
+        Chuck.add_function_as_method(
+            'chuck_host_now',
+            retval('double'),
+            [
+                param('ChucK *', 'chuck', transfer_ownership=False),
+            ],
+            custom_name='now'
+        )
+
+        chuck_schedule_stats_body = '''
+        PyObject * _wrap_PyChucK_schedule_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            EventSchedule & schedule = ((ChuckHost *)self->obj)->schedule();
+            return Py_BuildValue(
+                "{s:k,s:k,s:k,s:k,s:k}",
+                "pending", schedule.pending(),
+                "splits", schedule.splits(),
+                "last_splits", schedule.last_splits(),
+                "blocks_split", schedule.blocks_split(),
+                "late", schedule.late()
+            );
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'schedule_stats',
+            '_wrap_PyChucK_schedule_stats__inner',
+            chuck_schedule_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "schedule_stats()\\n\\n"
+                "Return a dict with the number of events pending, the sub-block splits they caused in "
+                "total (splits) and in the last block (last_splits), the number of blocks split, and "
+                "the number of events applied after their time (late)."
+            ),
+        )
+
+        chuck_sporked_body = '''
+        PyObject * _wrap_PyChucK_sporked__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            const std::vector<t_CKUINT> & sporked = ((ChuckHost *)self->obj)->sporked();
+            PyObject * ids = PyList_New(sporked.size());
+            if (ids == NULL) {
+                return NULL;
+            }
+            for (size_t i = 0; i < sporked.size(); i++) {
+                PyList_SET_ITEM(ids, i, PyLong_FromUnsignedLong(sporked[i]));
+            }
+            return ids;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'sporked',
+            '_wrap_PyChucK_sporked__inner',
+            chuck_sporked_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "sporked()\\n\\n"
+                "Return the ids of the shreds sporked by the last call to compile_code."
+            ),
+        )
+
+        # Whether a shred is still in the VM; only safe while no other
+        # thread is running the VM
+        Chuck.add_function_as_method(
+            'chuck_host_shred_running',
             retval('bool'),
             [
-                param('const std::string &', 'name'),
-                param('t_CKFLOAT', 'value')
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('t_CKUINT', 'shred_id'),
             ],
-            custom_name='set_param_float'
+            custom_name='shred_running'
         )
 
-        Chuck.add_method(
-            'setParam',
-            retval('bool'),
+        # Event notifications for asyncio sessions: after each block, the
+        # thread running the VM writes (kind, value) uint64 pairs to fd for
+        # watched shreds that have finished, every tick_frames frames and
+        # once the watched number of shred commands have been applied
+        Chuck.add_function_as_method(
+            'chuck_host_set_notify_fd',
+            retval('void'),
             [
-                param('const std::string &', 'name'),
-                param('const std::string &', 'value'),
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('int', 'fd'),
+                param('t_CKUINT', 'tick_frames', default_value='0'),
             ],
-            custom_name='set_param'
+            custom_name='set_notify_fd'
         )
 
-        Chuck.add_method(
-            'setParam',
-            retval('bool'),
+        Chuck.add_function_as_method(
+            'chuck_host_watch_shred',
+            retval('void'),
             [
-                param('const std::string &', 'name'),
-                param('const std::list< std::string > &', 'value'),
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('t_CKUINT', 'shred_id'),
             ],
-            custom_name='set_param'
+            custom_name='watch_shred'
         )
 
-        Chuck.add_method(
-            'getParamInt',
-            retval('t_CKINT'),
+        Chuck.add_function_as_method(
+            'chuck_host_watch_applied',
+            retval('void'),
             [
-                param('const std::string &', 'key'),
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('t_CKUINT', 'number'),
             ],
-            custom_name='get_param_int'
+            custom_name='watch_applied'
         )
 
-        Chuck.add_method(
-            'getParamFloat',
-            retval('t_CKFLOAT'),
+        Chuck.add_function_as_method(
+            'chuck_host_set_code_cache_size',
+            retval('void'),
             [
-                param('const std::string &', 'key'),
+                param('ChucK *', 'chuck', transfer_ownership=False),
+                param('t_CKUINT', 'size'),
             ],
-            custom_name='get_param_float'
+            custom_name='set_code_cache_size'
         )
 
-        Chuck.add_method(
-            'getParamString',
-            retval('std::string'),
+        Chuck.add_function_as_method(
+            'chuck_host_clear_code_cache',
+            retval('void'),
             [
-                param('const std::string &', 'key'),
+                param('ChucK *', 'chuck', transfer_ownership=False),
             ],
-            custom_name='get_param_string'
+            custom_name='clear_code_cache'
         )
 
-        Chuck.add_method(
-            'getParamStringList',
-            retval('std::list< std::string >'),
-            [
-                param('const std::string &', 'key'),
-            ],
-            custom_name='get_param_string_list'
+        chuck_code_cache_stats_body = '''
+        PyObject * _wrap_PyChucK_code_cache_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
         )
-
-        Chuck.add_method(
-            'compileFile',
-            retval('bool'),
-            [
-                param('const std::string &', 'path'),
-                param('const std::string &', 'argsTogether'),
-                param('int', 'count', 1)
-            ],
-            custom_name='compile_file'
+        {
+            CodeCache & cache = ((ChuckHost *)self->obj)->code_cache();
+            return Py_BuildValue(
+                "{s:k,s:k,s:k,s:k,s:k}",
+                "hits", cache.hits(),
+                "misses", cache.misses(),
+                "evictions", cache.evictions(),
+                "size", cache.size(),
+                "capacity", cache.capacity()
+            );
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'code_cache_stats',
+            '_wrap_PyChucK_code_cache_stats__inner',
+            chuck_code_cache_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "code_cache_stats()\\n\\n"
+                "Return a dict of the compiled-program cache's hits, misses, evictions, size and capacity."
+            ),
         )
 
-        Chuck.add_method(
-            'compileCode',
+        Chuck.add_function_as_method(
+            'chuck_host_init',
             retval('bool'),
             [
-                param('const std::string &', 'code'),
-                param('const std::string &', 'argsTogether'),
-                param('int', 'count', 1)
+                param('ChucK *', 'chuck', transfer_ownership=False),
             ],
-            custom_name='compile_code'
-        )
-
-        Chuck.add_method(
-            'init',
-            retval('bool'),
-            []
+            custom_name='init'
         )
 
         Chuck.add_method(
@@ -423,31 +2260,498 @@ class ChuckModule(pybindgen.Module):
         {
             PyObject* input_numpy_array;
             PyObject* output_numpy_array;
-            int numFrames;
+            int numFrames = -1;
             const char *keywords[] = {"input", "output", "numFrames", NULL};
-            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "OOi", (char **) keywords, &input_numpy_array, &output_numpy_array, &numFrames)) {
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "OO|i", (char **) keywords, &input_numpy_array, &output_numpy_array, &numFrames)) {
                 PyObject *exc_type, *traceback;
                 PyErr_Fetch(&exc_type, return_exception, &traceback);
                 Py_XDECREF(exc_type);
                 Py_XDECREF(traceback);
                 return NULL;
             }
-            SAMPLE * input = numpy_array_to_samples(input_numpy_array);
-            SAMPLE * output = numpy_array_to_samples(output_numpy_array);
-        
-            Py_XINCREF(input_numpy_array);
-            Py_XINCREF(output_numpy_array);
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before run()");
+                return NULL;
+            }
 
-            //PyArray_UpdateFlags((PyArrayObject *)input_numpy_array, NPY_ARRAY_OWNDATA);
-            //PyArray_UpdateFlags((PyArrayObject *)output_numpy_array, NPY_ARRAY_OWNDATA);
-            
-            self->obj->run(input, output, numFrames);
-            
+            // Acquiring the buffers pins them for the duration of the call,
+            // since other threads may run while the VM computes without the GIL
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, numFrames < 0 ? 0 : numFrames, chuck->num_out_chans(), true, false, "output") < 0) {
+                return NULL;
+            }
+            if (numFrames < 0) {
+                numFrames = output_view.shape[0];
+            }
+
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            SAMPLE * input = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, numFrames, chuck->num_in_chans(), false, true, "input") < 0) {
+                    PyBuffer_Release(&output_view);
+                    return NULL;
+                }
+            }
+
+            Py_BEGIN_ALLOW_THREADS
+            if (input_view.obj == NULL) {
+                input = chuck->silence(numFrames);
+            } else if (input_view.itemsize != sizeof(SAMPLE)) {
+                input = chuck->convert_input((const double *)input_view.buf, numFrames);
+            } else {
+                input = (SAMPLE *)input_view.buf;
+            }
+            chuck->run_timed(input, (SAMPLE *)output_view.buf, numFrames);
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            PyBuffer_Release(&output_view);
+
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        # run and render release the GIL while the VM computes, so separate
+        # Chuck instances can render in parallel threads. Calls into the
+        # compiler (init, compile_code, compile_file) keep the GIL, because the
+        # lexer and parser share global state across all VMs.
+        Chuck.add_custom_method_wrapper(
+            'run',
+            '_wrap_PyChucK_run__inner',
+            chuck_run_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "run(input, output, numFrames=None)\\n\\n"
+                "Compute numFrames frames, by default as many as output holds. output is a "
+                "C-contiguous (frames, OUTPUT_CHANNELS) float32 buffer; input is a "
+                "(frames, INPUT_CHANNELS) float32 or float64 buffer, or None for silence."
+            ),
+        )
+
+        # Offline rendering: drive the VM block by block from C++ into a
+        # preallocated (frames, channels) float32 array, as fast as the CPU allows.
+        chuck_render_body = '''
+        #define CHUCKPY_RENDER_BLOCK_SIZE_DEFAULT 256
+
+        PyObject * _wrap_PyChucK_render__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_seconds = Py_None;
+            PyObject* py_num_frames = Py_None;
+            PyObject* input_numpy_array = Py_None;
+            PyObject* output_numpy_array = Py_None;
+            unsigned long block_size = CHUCKPY_RENDER_BLOCK_SIZE_DEFAULT;
+            const char *keywords[] = {"seconds", "num_frames", "input", "out", "block_size", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "|OOOOk", (char **) keywords, &py_seconds, &py_num_frames, &input_numpy_array, &output_numpy_array, &block_size)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (block_size == 0) {
+                PyErr_SetString(PyExc_ValueError, "block_size must be positive");
+                return NULL;
+            }
+
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before render()");
+                return NULL;
+            }
+            t_CKUINT num_in_chans = chuck->num_in_chans();
+            t_CKUINT num_out_chans = chuck->num_out_chans();
+
+            // -1 means as many frames as out holds
+            npy_intp num_frames = -1;
+            if (py_num_frames != Py_None) {
+                num_frames = PyLong_AsSsize_t(py_num_frames);
+                if (num_frames == -1 && PyErr_Occurred()) {
+                    return NULL;
+                }
+            } else if (py_seconds != Py_None) {
+                double seconds = PyFloat_AsDouble(py_seconds);
+                if (seconds == -1.0 && PyErr_Occurred()) {
+                    return NULL;
+                }
+                num_frames = (npy_intp)(seconds * chuck->sample_rate() + 0.5);
+            } else if (output_numpy_array == Py_None) {
+                PyErr_SetString(PyExc_TypeError, "render() requires seconds, num_frames or out");
+                return NULL;
+            }
+            if (num_frames < 0 && (py_num_frames != Py_None || py_seconds != Py_None)) {
+                PyErr_SetString(PyExc_ValueError, "cannot render a negative number of frames");
+                return NULL;
+            }
+
+            if (output_numpy_array == Py_None) {
+                npy_intp dims[2] = {num_frames, (npy_intp)num_out_chans};
+                output_numpy_array = PyArray_ZEROS(2, dims, NPY_FLOAT32, 0);
+                if (output_numpy_array == NULL) {
+                    return NULL;
+                }
+            } else {
+                Py_INCREF(output_numpy_array);
+            }
+            Py_buffer output_view;
+            if (samples_get_buffer(output_numpy_array, &output_view, num_frames < 0 ? 0 : num_frames, num_out_chans, true, false, "out") < 0) {
+                Py_DECREF(output_numpy_array);
+                return NULL;
+            }
+            if (num_frames < 0) {
+                num_frames = output_view.shape[0];
+            }
+
+            // Without an input buffer the adc is fed silence
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, num_frames, num_in_chans, false, true, "input") < 0) {
+                    PyBuffer_Release(&output_view);
+                    Py_DECREF(output_numpy_array);
+                    return NULL;
+                }
+            }
+            SAMPLE * output = (SAMPLE *)output_view.buf;
+
+            // Both buffers stay pinned while the GIL is released
+            Py_BEGIN_ALLOW_THREADS
+            for (npy_intp frame = 0; frame < num_frames; frame += block_size) {
+                npy_intp n = num_frames - frame;
+                if (n > (npy_intp)block_size) {
+                    n = block_size;
+                }
+                SAMPLE * input;
+                if (input_view.obj == NULL) {
+                    input = chuck->silence(n);
+                } else if (input_view.itemsize != sizeof(SAMPLE)) {
+                    input = chuck->convert_input((const double *)input_view.buf + frame * num_in_chans, n);
+                } else {
+                    input = (SAMPLE *)input_view.buf + frame * num_in_chans;
+                }
+                chuck->run_timed(input, output + frame * num_out_chans, n);
+            }
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            PyBuffer_Release(&output_view);
+            return output_numpy_array;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'render',
+            '_wrap_PyChucK_render__inner',
+            chuck_render_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "render(seconds=None, num_frames=None, input=None, out=None, block_size=256)\\n\\n"
+                "Run the VM offline for the given duration and return the output as a "
+                "(frames, OUTPUT_CHANNELS) float32 array, filling out if it is given. "
+                "input, if given, is a (frames, INPUT_CHANNELS) float32 or float64 buffer fed to the adc."
+            ),
+        )
+        chuck_stats_body = '''
+        PyObject * _wrap_PyChucK_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            return timing_stats_to_dict(((ChuckHost *)self->obj)->run_stats(), false);
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'stats',
+            '_wrap_PyChucK_stats__inner',
+            chuck_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "stats()\\n\\n"
+                "Return a dict of counters for the blocks computed so far by run, render and "
+                "chuck_audio: calls, frames, total_ns, max_ns, avg_ns, overruns (blocks that took "
+                "longer to compute than to play), and a histogram of block durations with the "
+                "upper bound of each bucket in histogram_bounds_us."
+            ),
+        )
+
+        # Profiling: off by default, when it costs a relaxed load per block.
+        # When on, UGen ticks are timed and charged to the shreds owning them.
+        chuck_set_profiling_body = '''
+        PyObject * _wrap_PyChucK_set_profiling__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            int enabled;
+            unsigned long ring_rows = 0;
+            const char *keywords[] = {"enabled", "ring_rows", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "p|k", (char **) keywords, &enabled, &ring_rows)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            ((ChuckHost *)self->obj)->profiler().set_enabled(enabled != 0, ring_rows);
             Py_INCREF(Py_None);
             return Py_None;
         }
         '''
-        Chuck.add_custom_method_wrapper('run', '_wrap_PyChucK_run__inner', chuck_run_body, flags=["METH_VARARGS", "METH_KEYWORDS"],)
+        Chuck.add_custom_method_wrapper(
+            'set_profiling',
+            '_wrap_PyChucK_set_profiling__inner',
+            chuck_set_profiling_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "set_profiling(enabled, ring_rows=0)\\n\\n"
+                "Turn profiling on or off from the next block. Turning it on starts the counts "
+                "returned by profile() from zero, and keeps the last ring_rows rows for read_profile(); "
+                "older rows are overwritten and counted in profile()'s dropped."
+            ),
+        )
+
+        chuck_profile_body = '''
+        PyObject * _wrap_PyChucK_profile__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            ProfileSnapshot snapshot;
+            ((ChuckHost *)self->obj)->profiler().snapshot(snapshot);
+            PyObject * ugen_ns = PyDict_New();
+            PyObject * ugens = PyList_New(snapshot.ugens.size());
+            if (ugen_ns == NULL || ugens == NULL) {
+                Py_XDECREF(ugen_ns);
+                Py_XDECREF(ugens);
+                return NULL;
+            }
+            for (size_t i = 0; i < snapshot.ugen_ns.size(); i++) {
+                PyObject * xid = PyLong_FromUnsignedLong(snapshot.ugen_ns[i].first);
+                PyObject * ns = PyLong_FromUnsignedLong(snapshot.ugen_ns[i].second);
+                bool failed = xid == NULL || ns == NULL || PyDict_SetItem(ugen_ns, xid, ns) < 0;
+                Py_XDECREF(xid);
+                Py_XDECREF(ns);
+                if (failed) {
+                    Py_DECREF(ugen_ns);
+                    Py_DECREF(ugens);
+                    return NULL;
+                }
+            }
+            for (size_t i = 0; i < snapshot.ugens.size(); i++) {
+                UGenProfile & ugen = snapshot.ugens[i];
+                PyObject * item = Py_BuildValue(
+                    "{s:s,s:k,s:k,s:k}",
+                    "type", ugen.type.c_str(),
+                    "shred", ugen.shred,
+                    "ticks", ugen.ticks,
+                    "ns", ugen.ns
+                );
+                if (item == NULL) {
+                    Py_DECREF(ugen_ns);
+                    Py_DECREF(ugens);
+                    return NULL;
+                }
+                PyList_SET_ITEM(ugens, i, item);
+            }
+            return Py_BuildValue(
+                "{s:O,s:k,s:k,s:k,s:k,s:k,s:N,s:N}",
+                "enabled", ((ChuckHost *)self->obj)->profiler().enabled() ? Py_True : Py_False,
+                "blocks", snapshot.blocks,
+                "frames", snapshot.frames,
+                "total_ns", snapshot.total_ns,
+                "vm_ns", snapshot.vm_ns,
+                "dropped", snapshot.dropped,
+                "ugen_ns", ugen_ns,
+                "ugens", ugens
+            );
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'profile',
+            '_wrap_PyChucK_profile__inner',
+            chuck_profile_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "profile()\\n\\n"
+                "Return a dict with the blocks, frames and total_ns profiled since set_profiling "
+                "turned profiling on; ugen_ns, mapping shred ids to the ns spent ticking the UGens "
+                "they created, with UGens no live shred owns under 0; vm_ns, the rest of total_ns, "
+                "which includes running every shred's code, as ChucK cannot time shreds apart; "
+                "ugens, the type, shred, ticks and ns of every UGen in the graph; and dropped, the "
+                "ring rows lost before read_profile() read them."
+            ),
+        )
+
+        chuck_read_profile_body = '''
+        PyObject * _wrap_PyChucK_read_profile__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            std::vector<ProfileRow> rows;
+            ((ChuckHost *)self->obj)->profiler().drain(rows);
+            npy_intp dims[2] = {(npy_intp)rows.size(), 3};
+            PyObject * array = PyArray_SimpleNew(2, dims, NPY_UINT64);
+            if (array == NULL) {
+                return NULL;
+            }
+            npy_uint64 * data = (npy_uint64 *)PyArray_DATA((PyArrayObject *)array);
+            for (size_t i = 0; i < rows.size(); i++) {
+                data[i * 3] = rows[i].now;
+                data[i * 3 + 1] = rows[i].shred;
+                data[i * 3 + 2] = rows[i].ns;
+            }
+            return array;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'read_profile',
+            '_wrap_PyChucK_read_profile__inner',
+            chuck_read_profile_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "read_profile()\\n\\n"
+                "Drain the profiling ring and return it as an (n, 3) uint64 array of rows "
+                "(now, shred id, ns), oldest first: for each block profiled, one row per shred whose "
+                "UGens took time, with now() at the start of the block and the ns spent ticking them."
+            ),
+        )
+
+        # Like render, but into a SoundFileWriter, so the output never
+        # has to fit in memory
+        chuck_render_to_body = '''
+        PyObject * _wrap_PyChucK_render_to__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            PyObject* py_writer;
+            PyObject* py_seconds = Py_None;
+            PyObject* py_num_frames = Py_None;
+            PyObject* input_numpy_array = Py_None;
+            unsigned long block_size = CHUCKPY_RENDER_BLOCK_SIZE_DEFAULT;
+            const char *keywords[] = {"writer", "seconds", "num_frames", "input", "block_size", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "O!|OOOk", (char **) keywords, &PySoundFileWriter_Type, &py_writer, &py_seconds, &py_num_frames, &input_numpy_array, &block_size)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (block_size == 0) {
+                PyErr_SetString(PyExc_ValueError, "block_size must be positive");
+                return NULL;
+            }
+            ChuckHost * chuck = (ChuckHost *)self->obj;
+            if (chuck->sample_rate() == 0) {
+                PyErr_SetString(PyExc_RuntimeError, "Chuck.init() must be called before render_to()");
+                return NULL;
+            }
+            SoundFileWriter * writer = ((PySoundFileWriter *)py_writer)->obj;
+            t_CKUINT num_in_chans = chuck->num_in_chans();
+            t_CKUINT num_out_chans = chuck->num_out_chans();
+            if (writer->num_channels() != num_out_chans) {
+                PyErr_Format(PyExc_ValueError, "writer must have %lu channels", num_out_chans);
+                return NULL;
+            }
+
+            npy_intp num_frames;
+            if (py_num_frames != Py_None) {
+                num_frames = PyLong_AsSsize_t(py_num_frames);
+                if (num_frames == -1 && PyErr_Occurred()) {
+                    return NULL;
+                }
+            } else if (py_seconds != Py_None) {
+                double seconds = PyFloat_AsDouble(py_seconds);
+                if (seconds == -1.0 && PyErr_Occurred()) {
+                    return NULL;
+                }
+                num_frames = (npy_intp)(seconds * chuck->sample_rate() + 0.5);
+            } else {
+                PyErr_SetString(PyExc_TypeError, "render_to() requires seconds or num_frames");
+                return NULL;
+            }
+            if (num_frames < 0) {
+                PyErr_SetString(PyExc_ValueError, "cannot render a negative number of frames");
+                return NULL;
+            }
+
+            Py_buffer input_view;
+            input_view.obj = NULL;
+            if (input_numpy_array != Py_None) {
+                if (samples_get_buffer(input_numpy_array, &input_view, num_frames, num_in_chans, false, true, "input") < 0) {
+                    return NULL;
+                }
+            }
+
+            // Render straight into the writer's buffers, waiting for the
+            // writer thread whenever they are all full
+            npy_intp frame = 0;
+            Py_BEGIN_ALLOW_THREADS
+            while (frame < num_frames && !writer->failed()) {
+                t_CKUINT n = num_frames - frame;
+                if (n > block_size) {
+                    n = block_size;
+                }
+                SAMPLE * output = writer->reserve(n);
+                if (output == NULL) {
+                    break;
+                }
+                SAMPLE * input;
+                if (input_view.obj == NULL) {
+                    input = chuck->silence(n);
+                } else if (input_view.itemsize != sizeof(SAMPLE)) {
+                    input = chuck->convert_input((const double *)input_view.buf + frame * num_in_chans, n);
+                } else {
+                    input = (SAMPLE *)input_view.buf + frame * num_in_chans;
+                }
+                chuck->run_timed(input, output, n);
+                writer->commit(n);
+                frame += n;
+            }
+            Py_END_ALLOW_THREADS
+
+            if (input_view.obj != NULL) {
+                PyBuffer_Release(&input_view);
+            }
+            if (frame < num_frames) {
+                return sound_file_writer_set_error(writer);
+            }
+            return PyLong_FromSsize_t(frame);
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'render_to',
+            '_wrap_PyChucK_render_to__inner',
+            chuck_render_to_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "render_to(writer, seconds=None, num_frames=None, input=None, block_size=256)\\n\\n"
+                "Run the VM offline for the given duration, streaming the output to writer, a "
+                "SoundFileWriter with OUTPUT_CHANNELS channels, and return the number of frames "
+                "rendered. Raises OSError if writing fails."
+            ),
+        )
+
         # Chuck.add_method(
         #     'run',
         #     retval('void'),
@@ -490,4 +2794,118 @@ class ChuckModule(pybindgen.Module):
             retval('bool'),
             []
         )
+
+        chuck_register_ugen_body = '''
+        PyObject * _wrap_PyChucK_register_ugen__inner(
+            PyChucK *self,
+            PyObject *args,
+            PyObject *kwargs,
+            PyObject **return_exception
+        )
+        {
+            const char *name;
+            Py_ssize_t name_len;
+            PyObject* function;
+            unsigned long block_size = CHUCKPY_PY_UGEN_BLOCK_SIZE_DEFAULT;
+            PyObject* py_deadline = Py_None;
+            const char *keywords[] = {"name", "function", "block_size", "deadline", NULL};
+            if (!PyArg_ParseTupleAndKeywords(args, kwargs, (char *) "s#O|kO", (char **) keywords, &name, &name_len, &function, &block_size, &py_deadline)) {
+                PyObject *exc_type, *traceback;
+                PyErr_Fetch(&exc_type, return_exception, &traceback);
+                Py_XDECREF(exc_type);
+                Py_XDECREF(traceback);
+                return NULL;
+            }
+            if (!PyCallable_Check(function)) {
+                PyErr_SetString(PyExc_TypeError, "function must be callable");
+                return NULL;
+            }
+            if (block_size == 0) {
+                PyErr_SetString(PyExc_ValueError, "block_size must be at least 1");
+                return NULL;
+            }
+            double deadline = CHUCKPY_PY_UGEN_DEADLINE_DEFAULT;
+            if (py_deadline != Py_None) {
+                deadline = PyFloat_AsDouble(py_deadline);
+                if (deadline == -1.0 && PyErr_Occurred()) {
+                    return NULL;
+                }
+                if (!(deadline > 0)) {
+                    PyErr_SetString(PyExc_ValueError, "deadline must be a positive number of seconds, math.inf or None");
+                    return NULL;
+                }
+            }
+            // The registry keeps function alive, and releases it with the GIL
+            std::shared_ptr<PyUGenFunction> ugen_function(
+                new PyUGenFunction(py_object_owner(function), py_ugen_call, block_size, deadline)
+            );
+            ((ChuckHost *)self->obj)->py_ugens().add(std::string(name, name_len), ugen_function);
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'register_ugen',
+            '_wrap_PyChucK_register_ugen__inner',
+            chuck_register_ugen_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "register_ugen(name, function, block_size=256, deadline=None)\\n\\n"
+                "Let PyUGens in this VM that set func to name compute their output by calling "
+                "function(input, output) once per block_size frames, with (block_size,) float32 views "
+                "that are only valid during the call. A block whose call takes longer than deadline "
+                "seconds plays as silence; math.inf waits for every call however long it takes. "
+                "deadline defaults to half the block's duration if CHUCK_PARAM_HINT_IS_REALTIME_AUDIO "
+                "is set when the VM is initialized, and to math.inf otherwise, so that render, "
+                "render_to and process_file output never depends on how long calls take."
+            ),
+        )
+
+        chuck_ugen_stats_body = '''
+        PyObject * _wrap_PyChucK_ugen_stats__inner(
+            PyChucK *self,
+            PyObject *PYBINDGEN_UNUSED(args),
+            PyObject *PYBINDGEN_UNUSED(kwargs),
+            PyObject **PYBINDGEN_UNUSED(return_exception)
+        )
+        {
+            PyUGenRegistry & registry = ((ChuckHost *)self->obj)->py_ugens();
+            std::map<std::string, std::shared_ptr<PyUGenFunction>> functions = registry.functions();
+            PyObject * stats = PyDict_New();
+            if (stats == NULL) {
+                return NULL;
+            }
+            std::map<std::string, std::shared_ptr<PyUGenFunction>>::iterator it;
+            for (it = functions.begin(); it != functions.end(); ++it) {
+                PyUGenFunction & function = *it->second;
+                PyObject * entry = Py_BuildValue(
+                    "{s:k,s:k,s:k,s:k,s:d}",
+                    "calls", function.calls.load(),
+                    "overruns", function.overruns.load(),
+                    "errors", function.errors.load(),
+                    "block_size", function.block_size,
+                    "deadline", py_ugen_deadline(function, registry.frame_deadline())
+                );
+                if (entry == NULL || PyDict_SetItemString(stats, it->first.c_str(), entry) < 0) {
+                    Py_XDECREF(entry);
+                    Py_DECREF(stats);
+                    return NULL;
+                }
+                Py_DECREF(entry);
+            }
+            return stats;
+        }
+        '''
+        Chuck.add_custom_method_wrapper(
+            'ugen_stats',
+            '_wrap_PyChucK_ugen_stats__inner',
+            chuck_ugen_stats_body,
+            flags=["METH_VARARGS", "METH_KEYWORDS"],
+            docstring=(
+                "ugen_stats()\\n\\n"
+                "Return a dict with an entry for every function registered with register_ugen, counting "
+                "its calls, the blocks played as silence because a call was late (overruns) and the "
+                "calls that raised (errors)."
+            ),
+        )
         return Chuck
\ No newline at end of file
@@ -84,24 +84,23 @@ def configure_chuck_types():
         def convert_python_to_c(self, wrapper):
             assert isinstance(wrapper, ForwardWrapperBase)
             py_cb = wrapper.declarations.declare_variable("PyObject*", self.name)
+            cb = wrapper.declarations.declare_variable("f_audio_cb", self.name + "_fn")
+            cb_data = wrapper.declarations.declare_variable("void*", self.name + "_data")
             wrapper.parse_params.add_parameter('O', ['&' + py_cb], self.name)
+
+            # The callback is either a Chuck instance, which the RtAudio callback
+            # then drives natively without entering the interpreter, or a Python
+            # callable, which is wrapped with _wrap_f_audio_cb. In both cases
+            # userData is replaced by what the chosen C callback needs, so it
+            # can't be used for other purposes. chuck_audio_bind takes a
+            # reference to py_cb, since it is (presumably) stored in
+            # ChuckAudio::m_cb_user_data. It will never get Py_DECREF'd
+            # completely, I guess that's a memory leak but I'm not sure what
+            # to do about it right now.
             wrapper.before_call.write_error_check(
-                "!PyCallable_Check(%s)" % py_cb,
-                """PyErr_SetString(PyExc_TypeError, "f_audio_cb parameter must be callable");""")
-
-            # Increase the ref count for py_cb since it will be (presumably) stored in
-            # ChuckAudio::m_cb_user_data.
-            # It will never get Py_DECREF'd completely, I guess that's a memory leak
-            # but I'm not sure what to do about it right now.
-            wrapper.before_call.write_code("Py_XINCREF(%s);" % py_cb)
-
-            # Rather than pass f_audio_cb as the callback parameter,
-            # pass _wrap_f_audio_cb, and replace userData with a pointer
-            # to the python callback. This means userData can't be used
-            # for other purposes. It feels a bit hacky to me, but allows
-            # us to wrap f_audio_cb with python object conversions.
-            wrapper.call_params.append('_wrap_f_audio_cb')
-            wrapper.call_params.append('(void*)' + py_cb)
+                "!(%s = chuck_audio_bind(%s, &%s))" % (cb, py_cb, cb_data))
+            wrapper.call_params.append(cb)
+            wrapper.call_params.append(cb_data)
 
         def convert_c_to_python(self, wrapper):
             raise NotImplementedError
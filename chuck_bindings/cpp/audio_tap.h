@@ -0,0 +1,103 @@
+// Single-producer/single-consumer ring buffer of interleaved sample frames.
+//
+// The audio thread writes each block it renders, one Python thread drains
+// it. Neither side ever blocks or takes a lock: when the reader falls behind
+// the block is dropped and counted as an overflow instead.
+#ifndef __CHUCKPY_AUDIO_TAP_H__
+#define __CHUCKPY_AUDIO_TAP_H__
+
+#include <atomic>
+#include <vector>
+#include <string.h>
+
+#include "chuck_def.h"
+#include "util_math.h"
+
+
+class AudioTap
+{
+public:
+    // num_frames is rounded up to a power of two
+    AudioTap(t_CKUINT num_frames, t_CKUINT num_channels)
+        : m_capacity(num_frames > 1 ? nextpow2(num_frames - 1) : 1),
+          m_num_channels(num_channels),
+          m_buffer(m_capacity * num_channels),
+          m_write(0),
+          m_read(0),
+          m_overflows(0),
+          m_closed(false)
+    {
+    }
+
+    // Producer side, called from the audio thread
+    void write(const SAMPLE * samples, t_CKUINT num_frames)
+    {
+        if (m_closed.load(std::memory_order_relaxed)) {
+            return;
+        }
+        t_CKUINT write = m_write.load(std::memory_order_relaxed);
+        t_CKUINT read = m_read.load(std::memory_order_acquire);
+        if (m_capacity - (write - read) < num_frames) {
+            m_overflows.fetch_add(1, std::memory_order_relaxed);
+            return;
+        }
+        copy_in(write, samples, num_frames);
+        m_write.store(write + num_frames, std::memory_order_release);
+    }
+
+    // Consumer side: copies up to num_frames frames into samples and
+    // returns the number of frames copied
+    t_CKUINT read(SAMPLE * samples, t_CKUINT num_frames)
+    {
+        t_CKUINT read = m_read.load(std::memory_order_relaxed);
+        t_CKUINT write = m_write.load(std::memory_order_acquire);
+        if (num_frames > write - read) {
+            num_frames = write - read;
+        }
+        copy_out(read, samples, num_frames);
+        m_read.store(read + num_frames, std::memory_order_release);
+        return num_frames;
+    }
+
+    t_CKUINT available() const
+    {
+        return m_write.load(std::memory_order_acquire) - m_read.load(std::memory_order_relaxed);
+    }
+
+    t_CKUINT capacity() const { return m_capacity; }
+    t_CKUINT num_channels() const { return m_num_channels; }
+    t_CKUINT overflows() const { return m_overflows.load(std::memory_order_relaxed); }
+
+    // A closed tap receives no more blocks; readers drain what is left
+    void close() { m_closed.store(true, std::memory_order_release); }
+    bool closed() const { return m_closed.load(std::memory_order_acquire); }
+
+private:
+    void copy_in(t_CKUINT position, const SAMPLE * samples, t_CKUINT num_frames)
+    {
+        t_CKUINT offset = position & (m_capacity - 1);
+        t_CKUINT first = m_capacity - offset < num_frames ? m_capacity - offset : num_frames;
+        memcpy(&m_buffer[offset * m_num_channels], samples, first * m_num_channels * sizeof(SAMPLE));
+        memcpy(&m_buffer[0], samples + first * m_num_channels, (num_frames - first) * m_num_channels * sizeof(SAMPLE));
+    }
+
+    void copy_out(t_CKUINT position, SAMPLE * samples, t_CKUINT num_frames)
+    {
+        t_CKUINT offset = position & (m_capacity - 1);
+        t_CKUINT first = m_capacity - offset < num_frames ? m_capacity - offset : num_frames;
+        memcpy(samples, &m_buffer[offset * m_num_channels], first * m_num_channels * sizeof(SAMPLE));
+        memcpy(samples + first * m_num_channels, &m_buffer[0], (num_frames - first) * m_num_channels * sizeof(SAMPLE));
+    }
+
+    const t_CKUINT m_capacity;
+    const t_CKUINT m_num_channels;
+    std::vector<SAMPLE> m_buffer;
+    // Frame counters, which only ever increase; the ring position is the
+    // counter modulo capacity
+    std::atomic<t_CKUINT> m_write;
+    std::atomic<t_CKUINT> m_read;
+    std::atomic<t_CKUINT> m_overflows;
+    std::atomic<bool> m_closed;
+};
+
+#endif
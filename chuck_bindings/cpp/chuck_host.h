@@ -0,0 +1,317 @@
+// The ChucK subclass behind chuckpy.Chuck. It holds the per-instance state
+// the bindings need, so that the hot paths (run, render and the audio
+// callback) never look anything up or allocate.
+#ifndef __CHUCKPY_CHUCK_HOST_H__
+#define __CHUCKPY_CHUCK_HOST_H__
+
+#include <string>
+#include <vector>
+
+#include "chuck.h"
+#include "util_string.h"
+
+#include "code_cache.h"
+#include "event_schedule.h"
+#include "globals_bridge.h"
+#include "py_ugen.h"
+#include "shred_control.h"
+#include "shred_notifier.h"
+#include "shred_profiler.h"
+#include "timing_stats.h"
+
+#define CHUCKPY_CODE_CACHE_SIZE_DEFAULT 128
+
+
+class ChuckHost : public ChucK
+{
+public:
+    ChuckHost()
+        : m_sample_rate(0),
+          m_num_in_chans(0),
+          m_num_out_chans(0),
+          m_epoch(0),
+          m_code_cache(CHUCKPY_CODE_CACHE_SIZE_DEFAULT),
+          m_public_types(false)
+    {
+    }
+
+    // Initialize the VM and add the PyUGen class to it, then cache the
+    // parameters that are fixed from then on
+    bool init_host()
+    {
+        if (!init()) {
+            return false;
+        }
+        m_py_ugens.attach(this);
+        if (!bind(py_ugen_query, "PyUGen")) {
+            return false;
+        }
+        m_sample_rate = getParamInt(CHUCK_PARAM_SAMPLE_RATE);
+        m_num_in_chans = getParamInt(CHUCK_PARAM_INPUT_CHANNELS);
+        m_num_out_chans = getParamInt(CHUCK_PARAM_OUTPUT_CHANNELS);
+        return true;
+    }
+
+    t_CKUINT sample_rate() const { return m_sample_rate; }
+    t_CKUINT num_in_chans() const { return m_num_in_chans; }
+    t_CKUINT num_out_chans() const { return m_num_out_chans; }
+
+    // compileCode, reusing the code compiled by an earlier call with the same
+    // source and compiler settings instead of compiling it again. The ids of
+    // the shreds it sporks are in sporked() until the next call. It sporks
+    // them directly, so it is only safe while no other thread is running
+    // the VM; add_shred queues them instead.
+    bool compile_code(const std::string & code, const std::string & args_together, int count)
+    {
+        m_sporked.clear();
+        if (m_sample_rate == 0) {
+            // Let ChucK report the error
+            return compileCode(code, args_together, count);
+        }
+        std::vector<std::string> args;
+        Chuck_VM_Code * vm_code = compile(code, args_together, args);
+        if (vm_code == NULL) {
+            return false;
+        }
+
+        if (count < 1) {
+            count = 1;
+        }
+        for (int i = 0; i < count; i++) {
+            Chuck_VM_Shred * shred = vm()->spork(vm_code, NULL);
+            shred->args = args;
+            m_sporked.push_back(shred->xid);
+        }
+        return true;
+    }
+
+    // Replace the shred with id xid by a shred of code, which keeps the id,
+    // at the start of the next block, fading the output out and back in over
+    // fade_frames frames each if it is not 0. Returns false if code does not
+    // compile.
+    bool replace_shred(t_CKUINT xid, const std::string & code, const std::string & args_together, t_CKUINT fade_frames)
+    {
+        if (m_sample_rate == 0) {
+            return false;
+        }
+        ShredCommand command;
+        command.code = compile(code, args_together, command.args);
+        if (command.code == NULL) {
+            return false;
+        }
+        command.code->add_ref();
+        command.kind = ShredCommand::REPLACE;
+        command.xid = xid;
+        command.fade_frames = fade_frames;
+        m_shreds.post(command);
+        return true;
+    }
+
+    // Spork a shred of code at the start of the next block. Returns the
+    // command's number, or 0 if code does not compile; the shred's id
+    // comes back with the next collected status.
+    t_CKUINT add_shred(const std::string & code, const std::string & args_together)
+    {
+        if (m_sample_rate == 0) {
+            return 0;
+        }
+        ShredCommand command;
+        command.code = compile(code, args_together, command.args);
+        if (command.code == NULL) {
+            return 0;
+        }
+        command.code->add_ref();
+        command.kind = ShredCommand::ADD;
+        return m_shreds.post(command);
+    }
+
+    // Remove the shred with id xid at the start of the next block, fading
+    // like replace_shred
+    void remove_shred(t_CKUINT xid, t_CKUINT fade_frames)
+    {
+        ShredCommand command;
+        command.kind = ShredCommand::REMOVE;
+        command.xid = xid;
+        command.fade_frames = fade_frames;
+        m_shreds.post(command);
+    }
+
+    // Snapshot the shreds at the start of the next block, after the
+    // commands posted before. Returns the command's number.
+    t_CKUINT request_status()
+    {
+        ShredCommand command;
+        command.kind = ShredCommand::STATUS;
+        return m_shreds.post(command);
+    }
+
+    ShredControl & shred_control() { return m_shreds; }
+
+    const std::vector<t_CKUINT> & sporked() const { return m_sporked; }
+
+    // Whether the shred with id xid is in the VM. Only safe while no other
+    // thread is computing blocks.
+    bool shred_running(t_CKUINT xid) { return vm()->shreduler()->lookup(xid) != NULL; }
+
+    ShredNotifier & notifier() { return m_notifier; }
+
+    CodeCache & code_cache() { return m_code_cache; }
+
+    // run, applying shred_control() commands and globals() before the block
+    // and sampling globals() after it, fading its output, splitting it
+    // at the events in schedule(), recording how long it took in run_stats()
+    // and, if it is on, where the time went in profiler(), and posting any
+    // events that are due to notifier()
+    void run_timed(SAMPLE * input, SAMPLE * output, t_CKINT num_frames)
+    {
+        TimingStats::Clock::time_point start = TimingStats::Clock::now();
+        m_shreds.before_block(vm());
+        m_globals.before_block(this);
+        m_profiler.before_block(vm(), (t_CKUINT)now());
+        m_schedule.run(this, (t_CKUINT)now(), input, output, num_frames, m_num_in_chans, m_num_out_chans);
+        m_profiler.after_block(num_frames);
+        m_globals.after_block(vm());
+        m_shreds.after_block(output, num_frames, m_num_out_chans);
+        m_run_stats.record(start, num_frames, m_sample_rate);
+        m_notifier.after_block(vm(), num_frames, m_shreds.applied());
+    }
+
+    GlobalsBridge & globals() { return m_globals; }
+    EventSchedule & schedule() { return m_schedule; }
+    ShredProfiler & profiler() { return m_profiler; }
+    // The Python functions PyUGens in this VM can call
+    PyUGenRegistry & py_ugens() { return m_py_ugens; }
+
+    // Samples computed since init or the last reset. Until a reset, this
+    // is ChucK's now / samp.
+    t_CKTIME now() { return vm()->shreduler()->now_system - m_epoch; }
+    // ChucK's now at the last reset
+    t_CKTIME epoch() const { return m_epoch; }
+
+    // Remove every shred, global and public type and drop scheduled events,
+    // tracked globals, shred watches and profile counts, leaving the VM as if
+    // freshly initialized, but with chugins loaded. Compiled code stays
+    // cached unless it declares public types or was compiled after code that
+    // did, since it may refer to them. now() restarts from 0; ChucK's own
+    // now keeps counting, since UGens use it to tell whether they have
+    // already computed the current sample. Only safe while no other thread
+    // is running the VM.
+    void reset()
+    {
+        Chuck_Msg * msg = new Chuck_Msg;
+        msg->type = MSG_CLEARVM;
+        // The VM deletes msg
+        vm()->process_msg(msg);
+        m_code_cache.reset();
+        m_public_types = false;
+        m_shreds.clear();
+        m_globals.reset();
+        m_schedule.clear();
+        m_profiler.clear();
+        m_notifier.reset();
+        m_sporked.clear();
+        m_epoch = vm()->shreduler()->now_system;
+    }
+
+    const TimingStats & run_stats() const { return m_run_stats; }
+
+    // Convert num_frames frames of float64 input to SAMPLEs in a scratch
+    // buffer that only ever grows, and return it
+    SAMPLE * convert_input(const double * input, t_CKUINT num_frames)
+    {
+        t_CKUINT num_samples = num_frames * m_num_in_chans;
+        if (m_input_scratch.size() < num_samples + 1) {
+            m_input_scratch.resize(num_samples + 1);
+        }
+        SAMPLE * samples = &m_input_scratch[0];
+        for (t_CKUINT i = 0; i < num_samples; i++) {
+            samples[i] = (SAMPLE)input[i];
+        }
+        return samples;
+    }
+
+    // A buffer of at least num_frames frames of input silence
+    SAMPLE * silence(t_CKUINT num_frames)
+    {
+        t_CKUINT num_samples = num_frames * m_num_in_chans;
+        if (m_silence.size() < num_samples + 1) {
+            m_silence.resize(num_samples + 1, 0);
+        }
+        return &m_silence[0];
+    }
+
+private:
+    // The compiled code for code, cached or compiled now, and the arguments
+    // in args_together; NULL if it does not compile
+    Chuck_VM_Code * compile(const std::string & code, const std::string & args_together, std::vector<std::string> & args)
+    {
+        std::string filename;
+        if (!extract_args("code:" + args_together, filename, args)) {
+            return NULL;
+        }
+
+        std::string key;
+        Chuck_VM_Code * vm_code = NULL;
+        if (m_code_cache.capacity() != 0) {
+            key = code_cache_key(code);
+            vm_code = m_code_cache.get(key);
+        }
+        if (vm_code == NULL) {
+            std::string full_path = getParamString(CHUCK_PARAM_WORKING_DIRECTORY) + "/compiled.code";
+            if (!compiler()->go("<result of compileCode()>", NULL, code.c_str(), full_path)) {
+                return NULL;
+            }
+            vm_code = compiler()->output();
+            vm_code->name = vm_code->name + "compiled.code";
+            m_public_types = m_public_types || declares_public_types(code);
+            m_code_cache.put(key, vm_code, !m_public_types);
+        }
+        return vm_code;
+    }
+
+    // Whether code may declare a public class. Comments and strings are not
+    // skipped, which only means some code is dropped from the cache on reset
+    // that could have been kept.
+    static bool declares_public_types(const std::string & code)
+    {
+        for (size_t at = code.find("public"); at != std::string::npos; at = code.find("public", at + 6)) {
+            size_t next = code.find_first_not_of(" \t\r\n", at + 6);
+            if (next != std::string::npos && next != at + 6 && code.compare(next, 5, "class") == 0) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // The source plus every setting that changes what it compiles to. Chugins
+    // are loaded once by init(), so they are the same for every entry.
+    std::string code_cache_key(const std::string & code)
+    {
+        std::string key = getParamString(CHUCK_PARAM_WORKING_DIRECTORY);
+        key += '\0';
+        key += std::to_string(getParamInt(CHUCK_PARAM_DEPRECATE_LEVEL));
+        key += '\0';
+        key += code;
+        return key;
+    }
+
+    t_CKUINT m_sample_rate;
+    t_CKUINT m_num_in_chans;
+    t_CKUINT m_num_out_chans;
+    t_CKTIME m_epoch;
+    std::vector<SAMPLE> m_input_scratch;
+    std::vector<SAMPLE> m_silence;
+    CodeCache m_code_cache;
+    // Whether code declaring public types was compiled since the last reset
+    bool m_public_types;
+    TimingStats m_run_stats;
+    ShredNotifier m_notifier;
+    GlobalsBridge m_globals;
+    EventSchedule m_schedule;
+    ShredControl m_shreds;
+    ShredProfiler m_profiler;
+    std::vector<t_CKUINT> m_sporked;
+    PyUGenRegistry m_py_ugens;
+};
+
+#endif
@@ -0,0 +1,236 @@
+// Several VMs computing each block in parallel, summed into one output.
+//
+// A single ChucK VM runs on one thread. A mixer owns worker threads, each
+// pinned to a core where the platform allows, and splits its VMs between
+// them and the calling thread, which is normally the audio thread. Every
+// block, the calling thread wakes the workers, computes its own share and
+// then waits for the rest, so the block costs as much as the slowest share
+// rather than the sum of them. Each VM renders into a buffer of its own,
+// and the buffers are summed into the output with per-VM gains.
+//
+// Gains may be set from any thread at any time. Adding VMs is only safe
+// while no thread is running the mixer.
+#ifndef __CHUCKPY_CHUCK_MIXER_H__
+#define __CHUCKPY_CHUCK_MIXER_H__
+
+#ifdef __linux__
+#include <pthread.h>
+#include <sched.h>
+#endif
+
+#include <string.h>
+
+#include <atomic>
+#include <condition_variable>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+#include "chuck_host.h"
+#include "timing_stats.h"
+
+
+class ChuckMixer
+{
+public:
+    // num_threads workers besides the calling thread; with pin, worker i
+    // runs on core i + 1, leaving core 0 to the calling thread
+    ChuckMixer(t_CKUINT num_threads, bool pin)
+        : m_num_in_chans(0),
+          m_num_out_chans(0),
+          m_sample_rate(0),
+          m_generation(0),
+          m_stop(false),
+          m_remaining(0),
+          m_input(NULL),
+          m_num_frames(0)
+    {
+        for (t_CKUINT i = 0; i < num_threads; i++) {
+            m_workers.push_back(std::thread(&ChuckMixer::work, this, i + 1, pin));
+        }
+    }
+
+    ~ChuckMixer()
+    {
+        {
+            std::lock_guard<std::mutex> lock(m_lock);
+            m_stop = true;
+        }
+        m_wake.notify_all();
+        for (size_t i = 0; i < m_workers.size(); i++) {
+            m_workers[i].join();
+        }
+    }
+
+    // Add chuck, which must be initialized with the same sample rate and
+    // channel counts as any added before it, mixed in at gain. owner is
+    // kept until the mixer is destroyed, so chuck outlives it.
+    bool add(ChuckHost * chuck, float gain, std::shared_ptr<void> owner)
+    {
+        if (chuck->sample_rate() == 0) {
+            return false;
+        }
+        if (m_voices.empty()) {
+            m_sample_rate = chuck->sample_rate();
+            m_num_in_chans = chuck->num_in_chans();
+            m_num_out_chans = chuck->num_out_chans();
+        } else if (chuck->sample_rate() != m_sample_rate
+                   || chuck->num_in_chans() != m_num_in_chans
+                   || chuck->num_out_chans() != m_num_out_chans) {
+            return false;
+        }
+        m_voices.push_back(std::unique_ptr<Voice>(new Voice(chuck, gain, owner)));
+        return true;
+    }
+
+    t_CKUINT size() const { return m_voices.size(); }
+    t_CKUINT num_threads() const { return m_workers.size(); }
+    t_CKUINT sample_rate() const { return m_sample_rate; }
+    t_CKUINT num_in_chans() const { return m_num_in_chans; }
+    t_CKUINT num_out_chans() const { return m_num_out_chans; }
+
+    void set_gain(t_CKUINT i, float gain) { m_voices[i]->gain.store(gain, std::memory_order_relaxed); }
+    float gain(t_CKUINT i) const { return m_voices[i]->gain.load(std::memory_order_relaxed); }
+
+    ChuckHost * chuck(t_CKUINT i) const { return m_voices[i]->chuck; }
+
+    // Blocks in which the VM finished computing after the block's duration
+    // had elapsed, i.e. it would have made a realtime stream underflow
+    t_CKUINT missed(t_CKUINT i) const { return m_voices[i]->missed.load(std::memory_order_relaxed); }
+
+    // Timing of whole blocks, from waking the workers to the mixed output
+    const TimingStats & stats() const { return m_stats; }
+
+    // Compute num_frames frames of every VM, feeding each the same input,
+    // or silence if input is NULL, and write their mix to output
+    void run(SAMPLE * input, SAMPLE * output, t_CKUINT num_frames)
+    {
+        TimingStats::Clock::time_point start = TimingStats::Clock::now();
+        t_CKUINT num_samples = num_frames * m_num_out_chans;
+        for (size_t i = 0; i < m_voices.size(); i++) {
+            // Only allocates when the block size grows
+            if (m_voices[i]->output.size() < num_samples) {
+                m_voices[i]->output.resize(num_samples);
+            }
+        }
+        m_input = input;
+        m_num_frames = num_frames;
+        m_deadline = start + std::chrono::nanoseconds((long long)(num_frames * 1e9 / (m_sample_rate ? m_sample_rate : 1)));
+
+        // Worker i computes VMs i, i + stride, ...; those past the last VM idle
+        t_CKUINT num_busy = m_voices.size() == 0 ? 0 : m_voices.size() - 1;
+        if (num_busy > m_workers.size()) {
+            num_busy = m_workers.size();
+        }
+        if (num_busy != 0) {
+            m_remaining.store(num_busy, std::memory_order_relaxed);
+            {
+                std::lock_guard<std::mutex> lock(m_lock);
+                m_generation++;
+            }
+            m_wake.notify_all();
+        }
+        render_share(0);
+        while (m_remaining.load(std::memory_order_acquire) != 0) {
+            std::this_thread::yield();
+        }
+
+        memset(output, 0, num_samples * sizeof(SAMPLE));
+        for (size_t i = 0; i < m_voices.size(); i++) {
+            mix(output, &m_voices[i]->output[0], m_voices[i]->gain.load(std::memory_order_relaxed), num_samples);
+        }
+        m_stats.record(start, num_frames, m_sample_rate);
+    }
+
+private:
+    struct Voice
+    {
+        Voice(ChuckHost * chuck, float gain, std::shared_ptr<void> owner)
+            : chuck(chuck), gain(gain), missed(0), owner(owner)
+        {
+        }
+
+        ChuckHost * chuck;
+        std::atomic<float> gain;
+        std::atomic<t_CKUINT> missed;
+        std::vector<SAMPLE> output;
+        std::shared_ptr<void> owner;
+    };
+
+    // A plain loop over restrict pointers, which the compiler vectorizes
+    static void mix(SAMPLE * __restrict output, const SAMPLE * __restrict input, SAMPLE gain, t_CKUINT n)
+    {
+        for (t_CKUINT i = 0; i < n; i++) {
+            output[i] += gain * input[i];
+        }
+    }
+
+    // Compute the VMs of thread index, 0 being the calling thread
+    void render_share(t_CKUINT index)
+    {
+        t_CKUINT stride = m_workers.size() + 1;
+        for (t_CKUINT i = index; i < m_voices.size(); i += stride) {
+            Voice & voice = *m_voices[i];
+            SAMPLE * input = m_input != NULL ? m_input : voice.chuck->silence(m_num_frames);
+            voice.chuck->run_timed(input, &voice.output[0], m_num_frames);
+            if (TimingStats::Clock::now() > m_deadline) {
+                voice.missed.store(voice.missed.load(std::memory_order_relaxed) + 1, std::memory_order_relaxed);
+            }
+        }
+    }
+
+    void work(t_CKUINT index, bool pin)
+    {
+#ifdef __linux__
+        if (pin) {
+            unsigned int num_cores = std::thread::hardware_concurrency();
+            if (num_cores > 1) {
+                cpu_set_t cpus;
+                CPU_ZERO(&cpus);
+                CPU_SET(index % num_cores, &cpus);
+                pthread_setaffinity_np(pthread_self(), sizeof(cpus), &cpus);
+            }
+        }
+#else
+        (void)pin;
+#endif
+        t_CKUINT seen = 0;
+        while (true) {
+            {
+                std::unique_lock<std::mutex> lock(m_lock);
+                m_wake.wait(lock, [&] { return m_stop || m_generation != seen; });
+                if (m_stop) {
+                    return;
+                }
+                seen = m_generation;
+            }
+            // Workers without a VM are not counted in m_remaining
+            if (index < m_voices.size()) {
+                render_share(index);
+                m_remaining.fetch_sub(1, std::memory_order_release);
+            }
+        }
+    }
+
+    std::vector<std::unique_ptr<Voice>> m_voices;
+    std::vector<std::thread> m_workers;
+    t_CKUINT m_num_in_chans;
+    t_CKUINT m_num_out_chans;
+    t_CKUINT m_sample_rate;
+
+    std::mutex m_lock;
+    std::condition_variable m_wake;
+    t_CKUINT m_generation;
+    bool m_stop;
+    std::atomic<t_CKUINT> m_remaining;
+
+    // The current block, set before the workers are woken
+    SAMPLE * m_input;
+    t_CKUINT m_num_frames;
+    TimingStats::Clock::time_point m_deadline;
+
+    TimingStats m_stats;
+};
+
+#endif
@@ -0,0 +1,127 @@
+// LRU cache of compiled ChucK programs.
+//
+// Compiled code refers to types and functions in the environment of the VM
+// that compiled it, so a cache belongs to a single VM. Resetting the VM
+// removes the public types programs declared, so entries that may refer to
+// them are dropped then.
+#ifndef __CHUCKPY_CODE_CACHE_H__
+#define __CHUCKPY_CODE_CACHE_H__
+
+#include <list>
+#include <string>
+#include <unordered_map>
+
+#include "chuck_vm.h"
+
+
+class CodeCache
+{
+public:
+    explicit CodeCache(t_CKUINT capacity)
+        : m_capacity(capacity),
+          m_hits(0),
+          m_misses(0),
+          m_evictions(0)
+    {
+    }
+
+    ~CodeCache()
+    {
+        clear();
+    }
+
+    // Look up the code compiled for key, counting a hit or a miss
+    Chuck_VM_Code * get(const std::string & key)
+    {
+        Entries::iterator found = m_entries.find(key);
+        if (found == m_entries.end()) {
+            m_misses++;
+            return NULL;
+        }
+        m_hits++;
+        // Move to the front of the LRU list
+        m_lru.splice(m_lru.begin(), m_lru, found->second.lru);
+        return found->second.code;
+    }
+
+    // Cache code for key, evicting the least recently used entries beyond
+    // capacity. Unless keep_on_reset, reset() drops the entry.
+    void put(const std::string & key, Chuck_VM_Code * code, bool keep_on_reset)
+    {
+        if (m_capacity == 0 || m_entries.count(key)) {
+            return;
+        }
+        code->add_ref();
+        m_lru.push_front(key);
+        Entry & entry = m_entries[key];
+        entry.lru = m_lru.begin();
+        entry.code = code;
+        entry.keep_on_reset = keep_on_reset;
+        shrink();
+    }
+
+    void set_capacity(t_CKUINT capacity)
+    {
+        m_capacity = capacity;
+        shrink();
+    }
+
+    void clear()
+    {
+        for (Entries::iterator it = m_entries.begin(); it != m_entries.end(); ++it) {
+            it->second.code->release();
+        }
+        m_entries.clear();
+        m_lru.clear();
+    }
+
+    // Drop the entries not put with keep_on_reset
+    void reset()
+    {
+        for (Entries::iterator it = m_entries.begin(); it != m_entries.end(); ) {
+            if (it->second.keep_on_reset) {
+                ++it;
+                continue;
+            }
+            it->second.code->release();
+            m_lru.erase(it->second.lru);
+            it = m_entries.erase(it);
+        }
+    }
+
+    t_CKUINT capacity() const { return m_capacity; }
+    t_CKUINT size() const { return m_entries.size(); }
+    t_CKUINT hits() const { return m_hits; }
+    t_CKUINT misses() const { return m_misses; }
+    t_CKUINT evictions() const { return m_evictions; }
+
+private:
+    struct Entry
+    {
+        std::list<std::string>::iterator lru;
+        Chuck_VM_Code * code;
+        bool keep_on_reset;
+    };
+    typedef std::unordered_map<std::string, Entry> Entries;
+
+    void shrink()
+    {
+        while (m_entries.size() > m_capacity) {
+            Entries::iterator oldest = m_entries.find(m_lru.back());
+            oldest->second.code->release();
+            m_entries.erase(oldest);
+            m_lru.pop_back();
+            m_evictions++;
+        }
+    }
+
+    t_CKUINT m_capacity;
+    // Most recently used first
+    std::list<std::string> m_lru;
+    Entries m_entries;
+    t_CKUINT m_hits;
+    t_CKUINT m_misses;
+    t_CKUINT m_evictions;
+};
+
+#endif
@@ -0,0 +1,146 @@
+// Global updates and events scheduled at sample times, for sample-accurate
+// control of a VM that is run in large blocks.
+//
+// Python posts events sorted by time under a lock. The thread computing
+// blocks splits each block at the times of the events that fall inside it,
+// applying them between sub-blocks. It only try-locks: if Python is posting
+// at that moment, the events due in that block are applied at the start of
+// the next one and counted as late.
+#ifndef __CHUCKPY_EVENT_SCHEDULE_H__
+#define __CHUCKPY_EVENT_SCHEDULE_H__
+
+#include <algorithm>
+#include <atomic>
+#include <mutex>
+#include <vector>
+
+#include "chuck.h"
+
+#include "globals_bridge.h"
+
+
+struct ScheduledEvent
+{
+    // Host time in samples, see ChuckHost::now
+    t_CKUINT frame;
+    GlobalUpdate update;
+};
+
+
+class EventSchedule
+{
+public:
+    EventSchedule()
+        : m_next(0),
+          m_num_pending(0),
+          m_splits(0),
+          m_blocks_split(0),
+          m_last_splits(0),
+          m_late(0)
+    {
+    }
+
+    // Python side: add events, in any order
+    void post(std::vector<ScheduledEvent> & events)
+    {
+        std::stable_sort(events.begin(), events.end(), earlier);
+        std::lock_guard<std::mutex> lock(m_lock);
+        // Free the events the computing thread has applied here, not there
+        m_events.erase(m_events.begin(), m_events.begin() + m_next);
+        m_next = 0;
+        size_t middle = m_events.size();
+        for (size_t i = 0; i < events.size(); i++) {
+            m_events.push_back(ScheduledEvent());
+            std::swap(m_events.back(), events[i]);
+        }
+        std::inplace_merge(m_events.begin(), m_events.begin() + middle, m_events.end(), earlier);
+        m_num_pending.store(m_events.size(), std::memory_order_relaxed);
+    }
+
+    // Python side: drop every event not applied yet
+    void clear()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        m_events.clear();
+        m_next = 0;
+        m_num_pending.store(0, std::memory_order_relaxed);
+    }
+
+    t_CKUINT pending() const { return m_num_pending.load(std::memory_order_relaxed); }
+    // Sub-blocks added by splitting, in total and in the last block
+    t_CKUINT splits() const { return m_splits.load(std::memory_order_relaxed); }
+    t_CKUINT last_splits() const { return m_last_splits.load(std::memory_order_relaxed); }
+    // Blocks split at least once
+    t_CKUINT blocks_split() const { return m_blocks_split.load(std::memory_order_relaxed); }
+    // Events applied after their time
+    t_CKUINT late() const { return m_late.load(std::memory_order_relaxed); }
+
+    // Computing thread: run num_frames frames of chuck, starting at frame
+    // start, applying every event at its frame
+    void run(ChucK * chuck, t_CKUINT start, SAMPLE * input, SAMPLE * output, t_CKUINT num_frames,
+             t_CKUINT num_in_chans, t_CKUINT num_out_chans)
+    {
+        std::unique_lock<std::mutex> lock(m_lock, std::defer_lock);
+        if (m_num_pending.load(std::memory_order_relaxed) == 0 || !lock.try_lock()) {
+            chuck->run(input, output, num_frames);
+            m_last_splits.store(0, std::memory_order_relaxed);
+            return;
+        }
+
+        t_CKUINT end = start + num_frames;
+        t_CKUINT splits = 0;
+        t_CKUINT late = 0;
+        t_CKUINT done = 0;
+        while (done < num_frames) {
+            t_CKUINT now = start + done;
+            for (; m_next < m_events.size() && m_events[m_next].frame <= now; m_next++) {
+                if (m_events[m_next].frame < now) {
+                    late++;
+                }
+                GlobalsBridge::apply(chuck, m_events[m_next].update);
+            }
+            t_CKUINT n = num_frames - done;
+            if (m_next < m_events.size() && m_events[m_next].frame < end) {
+                n = m_events[m_next].frame - now;
+                splits++;
+            }
+            chuck->run(input + done * num_in_chans, output + done * num_out_chans, n);
+            done += n;
+        }
+
+        m_num_pending.store(m_events.size() - m_next, std::memory_order_relaxed);
+        m_last_splits.store(splits, std::memory_order_relaxed);
+        if (splits != 0) {
+            bump(m_splits, splits);
+            bump(m_blocks_split, 1);
+        }
+        if (late != 0) {
+            bump(m_late, late);
+        }
+    }
+
+private:
+    static bool earlier(const ScheduledEvent & a, const ScheduledEvent & b)
+    {
+        return a.frame < b.frame;
+    }
+
+    // Only the computing thread writes the counters
+    static void bump(std::atomic<t_CKUINT> & counter, t_CKUINT n)
+    {
+        counter.store(counter.load(std::memory_order_relaxed) + n, std::memory_order_relaxed);
+    }
+
+    std::mutex m_lock;
+    // Sorted by frame; those before m_next have been applied, and are freed
+    // by the next post
+    std::vector<ScheduledEvent> m_events;
+    size_t m_next;
+    std::atomic<t_CKUINT> m_num_pending;
+    std::atomic<t_CKUINT> m_splits;
+    std::atomic<t_CKUINT> m_blocks_split;
+    std::atomic<t_CKUINT> m_last_splits;
+    std::atomic<t_CKUINT> m_late;
+};
+
+#endif
@@ -0,0 +1,219 @@
+// Batched access to a VM's global variables.
+//
+// Python commits a batch of updates under one lock; the thread computing
+// blocks applies everything committed so far at the start of its next
+// block, so a batch never lands across two blocks. Globals being tracked
+// are sampled at the end of every block, and Python reads the latest
+// sample. The computing thread only ever try-locks: if Python holds the
+// lock, it catches up on the next block.
+//
+// Everything is looked up on the computing thread, which is the only one
+// that creates globals, so nothing races with the VM's tables.
+#ifndef __CHUCKPY_GLOBALS_BRIDGE_H__
+#define __CHUCKPY_GLOBALS_BRIDGE_H__
+
+#include <math.h>
+
+#include <atomic>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include "chuck.h"
+#include "chuck_oo.h"
+#include "chuck_vm.h"
+
+
+struct GlobalUpdate
+{
+    enum Kind { FLOAT, INT, FLOAT_ARRAY, SIGNAL_EVENT, BROADCAST_EVENT };
+
+    Kind kind;
+    std::string name;
+    t_CKFLOAT float_value;
+    t_CKINT int_value;
+    std::vector<t_CKFLOAT> values;
+};
+
+
+class GlobalsBridge
+{
+public:
+    GlobalsBridge()
+        : m_num_applied(0),
+          m_num_pending(0),
+          m_num_tracked(0)
+    {
+    }
+
+    // Python side: queue updates to be applied at the next block
+    void commit(std::vector<GlobalUpdate> & updates)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        // Free what the computing thread has applied here, not there
+        m_pending.erase(m_pending.begin(), m_pending.begin() + m_num_applied);
+        m_num_applied = 0;
+        for (size_t i = 0; i < updates.size(); i++) {
+            m_pending.push_back(GlobalUpdate());
+            std::swap(m_pending.back(), updates[i]);
+        }
+        m_num_pending.store(m_pending.size(), std::memory_order_relaxed);
+    }
+
+    // Python side: sample these globals, int or float, after every block
+    void track(const std::vector<std::string> & names)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        m_tracked.assign(names.size(), Tracked());
+        for (size_t i = 0; i < names.size(); i++) {
+            m_tracked[i].name = names[i];
+        }
+        m_values.assign(names.size(), NAN);
+        m_num_tracked.store(names.size(), std::memory_order_relaxed);
+    }
+
+    // Python side: copy the latest sample of the tracked globals, NaN for
+    // any not yet declared, into values, which holds num_tracked() doubles
+    void read(double * values)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        for (size_t i = 0; i < m_values.size(); i++) {
+            values[i] = m_values[i];
+        }
+    }
+
+    // Python side: drop pending updates and tracked globals, e.g. because
+    // the VM's globals have been cleared
+    void reset()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        m_pending.clear();
+        m_num_applied = 0;
+        m_num_pending.store(0, std::memory_order_relaxed);
+        m_tracked.clear();
+        m_values.clear();
+        m_num_tracked.store(0, std::memory_order_relaxed);
+    }
+
+    t_CKUINT num_tracked()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        return m_tracked.size();
+    }
+
+    // Computing thread, before each block
+    void before_block(ChucK * chuck)
+    {
+        if (m_num_pending.load(std::memory_order_relaxed) == 0) {
+            return;
+        }
+        std::unique_lock<std::mutex> lock(m_lock, std::try_to_lock);
+        if (!lock.owns_lock()) {
+            return;
+        }
+        for (size_t i = m_num_applied; i < m_pending.size(); i++) {
+            apply(chuck, m_pending[i]);
+        }
+        m_num_applied = m_pending.size();
+        m_num_pending.store(0, std::memory_order_relaxed);
+    }
+
+    // Computing thread, after each block
+    void after_block(Chuck_VM * vm)
+    {
+        if (m_num_tracked.load(std::memory_order_relaxed) == 0) {
+            return;
+        }
+        std::unique_lock<std::mutex> lock(m_lock, std::try_to_lock);
+        if (!lock.owns_lock()) {
+            return;
+        }
+        for (size_t i = 0; i < m_tracked.size(); i++) {
+            Tracked & tracked = m_tracked[i];
+            if (tracked.float_ptr == NULL && tracked.int_ptr == NULL) {
+                if (vm->is_global_float(tracked.name)) {
+                    tracked.float_ptr = vm->get_ptr_to_global_float(tracked.name);
+                } else if (vm->is_global_int(tracked.name)) {
+                    tracked.int_ptr = vm->get_ptr_to_global_int(tracked.name);
+                } else {
+                    continue;
+                }
+            }
+            m_values[i] = tracked.float_ptr != NULL ? *tracked.float_ptr : (double)*tracked.int_ptr;
+        }
+    }
+
+    // Computing thread, between blocks: write declared globals in place,
+    // converting between int and float to match the declaration. Globals
+    // that are not declared yet, and events, go through ChucK's own queue,
+    // which it handles at the start of the next block.
+    static void apply(ChucK * chuck, GlobalUpdate & update)
+    {
+        Chuck_VM * vm = chuck->vm();
+        switch (update.kind) {
+        case GlobalUpdate::FLOAT:
+            if (vm->is_global_float(update.name)) {
+                *vm->get_ptr_to_global_float(update.name) = update.float_value;
+            } else if (vm->is_global_int(update.name)) {
+                *vm->get_ptr_to_global_int(update.name) = (t_CKINT)update.float_value;
+            } else {
+                chuck->setGlobalFloat(update.name.c_str(), update.float_value);
+            }
+            break;
+        case GlobalUpdate::INT:
+            if (vm->is_global_int(update.name)) {
+                *vm->get_ptr_to_global_int(update.name) = update.int_value;
+            } else if (vm->is_global_float(update.name)) {
+                *vm->get_ptr_to_global_float(update.name) = (t_CKFLOAT)update.int_value;
+            } else {
+                chuck->setGlobalInt(update.name.c_str(), update.int_value);
+            }
+            break;
+        case GlobalUpdate::FLOAT_ARRAY:
+            if (vm->is_global_array(update.name)) {
+                Chuck_Array8 * array = dynamic_cast<Chuck_Array8 *>(vm->get_global_array(update.name));
+                if (array != NULL) {
+                    array->set_size(update.values.size());
+                    for (size_t i = 0; i < update.values.size(); i++) {
+                        array->set(i, update.values[i]);
+                    }
+                    break;
+                }
+            }
+            chuck->setGlobalFloatArray(
+                update.name.c_str(),
+                update.values.empty() ? NULL : &update.values[0],
+                update.values.size()
+            );
+            break;
+        case GlobalUpdate::SIGNAL_EVENT:
+            chuck->signalGlobalEvent(update.name.c_str());
+            break;
+        case GlobalUpdate::BROADCAST_EVENT:
+            chuck->broadcastGlobalEvent(update.name.c_str());
+            break;
+        }
+    }
+
+private:
+    struct Tracked
+    {
+        Tracked() : float_ptr(NULL), int_ptr(NULL) {}
+
+        std::string name;
+        t_CKFLOAT * float_ptr;
+        t_CKINT * int_ptr;
+    };
+
+    std::mutex m_lock;
+    // Updates in m_pending before m_num_applied have been applied, and are
+    // freed by the next commit
+    std::vector<GlobalUpdate> m_pending;
+    size_t m_num_applied;
+    std::atomic<size_t> m_num_pending;
+    std::vector<Tracked> m_tracked;
+    std::vector<double> m_values;
+    std::atomic<size_t> m_num_tracked;
+};
+
+#endif
@@ -0,0 +1,482 @@
+// PyUGen, a UGen that ChucK code patches like any other, whose samples are
+// computed a block at a time by a Python function.
+//
+// Functions are registered with a VM under a name, and a PyUGen picks one
+// with its func() method. It collects its input a block at a time; when a
+// block is full, the thread computing the VM hands it to a worker thread,
+// which takes the GIL and calls the function, and waits for the output.
+// The PyUGen plays that output while collecting the next block, so it
+// delays its input by one block.
+//
+// The computing thread never takes the GIL itself. It waits at most the
+// function's deadline for each block; when the function is late the PyUGen
+// plays silence for the block, and until the late call returns it plays
+// silence rather than queue up further blocks behind it. By default the
+// deadline is half the block's duration in a VM hinted to be driven by the
+// audio device, so a slow or blocked call cannot stall it, and there is
+// none in any other VM, so offline renders do not depend on how long the
+// calls happen to take.
+#ifndef __CHUCKPY_PY_UGEN_H__
+#define __CHUCKPY_PY_UGEN_H__
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cmath>
+#include <condition_variable>
+#include <deque>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "chuck.h"
+#include "chuck_carrier.h"
+#include "chuck_dl.h"
+#include "chuck_errmsg.h"
+#include "chuck_vm.h"
+
+#define CHUCKPY_PY_UGEN_BLOCK_SIZE_DEFAULT 256
+// The default deadline of a realtime VM, as a fraction of the duration of
+// a block
+#define CHUCKPY_PY_UGEN_DEADLINE_BLOCKS_DEFAULT 0.5
+// The deadline of a function that uses its VM's default
+#define CHUCKPY_PY_UGEN_DEADLINE_DEFAULT -1.0
+
+
+// Call callable on num_frames frames of input, writing its output, with
+// the GIL. Returns false if it raised.
+typedef bool (*PyUGenCall)(void * callable, SAMPLE * input, SAMPLE * output, t_CKUINT num_frames);
+
+
+struct PyUGenFunction
+{
+    PyUGenFunction(std::shared_ptr<void> callable, PyUGenCall call, t_CKUINT block_size, double deadline)
+        : callable(callable),
+          call(call),
+          block_size(block_size),
+          deadline(deadline),
+          calls(0),
+          overruns(0),
+          errors(0)
+    {
+    }
+
+    std::shared_ptr<void> callable;
+    PyUGenCall call;
+    t_CKUINT block_size;
+    // Seconds to wait for each block, infinity to always wait, or
+    // CHUCKPY_PY_UGEN_DEADLINE_DEFAULT
+    double deadline;
+
+    std::atomic<t_CKUINT> calls;
+    // Blocks played as silence because a call was late
+    std::atomic<t_CKUINT> overruns;
+    // Calls that raised, whose blocks were played as silence
+    std::atomic<t_CKUINT> errors;
+};
+
+
+class PyUGenInstance;
+
+
+// The seconds to wait for each block of function, given the default
+// deadline per frame of the VM it runs in
+inline double py_ugen_deadline(const PyUGenFunction & function, double frame_deadline)
+{
+    if (function.deadline == CHUCKPY_PY_UGEN_DEADLINE_DEFAULT) {
+        return frame_deadline * function.block_size;
+    }
+    return function.deadline;
+}
+
+
+// The thread calling Python for the PyUGens of a VM. It is detached and
+// shares its queue with them, so that destroying the VM never waits for a
+// Python call, which may itself be waiting for the GIL.
+class PyUGenWorker
+{
+public:
+    PyUGenWorker() : m_queue(std::make_shared<Queue>()), m_started(false) {}
+
+    ~PyUGenWorker()
+    {
+        {
+            std::lock_guard<std::mutex> lock(m_queue->lock);
+            m_queue->stop = true;
+        }
+        m_queue->wake.notify_all();
+    }
+
+    void start()
+    {
+        if (!m_started) {
+            std::thread(&PyUGenWorker::work, m_queue).detach();
+            m_started = true;
+        }
+    }
+
+    void post(std::shared_ptr<PyUGenInstance> instance)
+    {
+        {
+            std::lock_guard<std::mutex> lock(m_queue->lock);
+            m_queue->instances.push_back(instance);
+        }
+        m_queue->wake.notify_one();
+    }
+
+private:
+    struct Queue
+    {
+        Queue() : stop(false) {}
+
+        std::mutex lock;
+        std::condition_variable wake;
+        std::deque<std::shared_ptr<PyUGenInstance>> instances;
+        bool stop;
+    };
+
+    static void work(std::shared_ptr<Queue> queue);
+
+    std::shared_ptr<Queue> m_queue;
+    bool m_started;
+};
+
+
+// The state of one PyUGen, shared with the worker while a call is running
+class PyUGenInstance : public std::enable_shared_from_this<PyUGenInstance>
+{
+public:
+    // frame_deadline is the default deadline per frame of block
+    PyUGenInstance(std::shared_ptr<PyUGenWorker> worker, double frame_deadline)
+        : m_worker(worker),
+          m_frame_deadline(frame_deadline),
+          m_has_next(false),
+          m_pos(0),
+          m_posted(0),
+          m_done(0),
+          m_overruns(0)
+    {
+    }
+
+    // Computing thread: use function from the next block on, or as soon as
+    // a late call has returned
+    void set_function(std::shared_ptr<PyUGenFunction> function)
+    {
+        m_next_function = function;
+        m_has_next = true;
+        if (!busy()) {
+            apply_next();
+        }
+    }
+
+    SAMPLE tick(SAMPLE in)
+    {
+        if (m_function == NULL) {
+            if (m_has_next && !busy()) {
+                apply_next();
+            }
+            return 0;
+        }
+        m_input[m_pos] = in;
+        SAMPLE out = m_output[m_pos];
+        if (++m_pos == m_function->block_size) {
+            m_pos = 0;
+            end_block();
+        }
+        return out;
+    }
+
+    t_CKUINT overruns() const { return m_overruns.load(std::memory_order_relaxed); }
+
+    // Worker thread: call the function on the posted block
+    void compute()
+    {
+        PyUGenFunction & function = *m_job_function;
+        // Whatever the function leaves unwritten plays as silence
+        std::fill(m_job_output.begin(), m_job_output.end(), 0);
+        if (!function.call(function.callable.get(), &m_job_input[0], &m_job_output[0], function.block_size)) {
+            std::fill(m_job_output.begin(), m_job_output.end(), 0);
+            function.errors++;
+        }
+        function.calls++;
+        {
+            std::lock_guard<std::mutex> lock(m_lock);
+            m_done.store(m_posted.load(std::memory_order_relaxed), std::memory_order_release);
+        }
+        m_finished.notify_all();
+    }
+
+private:
+    bool busy() const { return m_done.load(std::memory_order_acquire) != m_posted.load(std::memory_order_relaxed); }
+
+    // Only while the worker is not computing for this instance
+    void apply_next()
+    {
+        m_function = m_next_function;
+        m_next_function.reset();
+        m_has_next = false;
+        m_pos = 0;
+        t_CKUINT block_size = m_function == NULL ? 0 : m_function->block_size;
+        m_input.assign(block_size, 0);
+        m_output.assign(block_size, 0);
+        m_job_input.assign(block_size, 0);
+        m_job_output.assign(block_size, 0);
+    }
+
+    void end_block()
+    {
+        PyUGenFunction & function = *m_function;
+        if (busy()) {
+            // The call for an earlier block is still running
+            std::fill(m_output.begin(), m_output.end(), 0);
+            function.overruns++;
+            m_overruns++;
+            return;
+        }
+        if (m_has_next) {
+            apply_next();
+            return;
+        }
+
+        std::swap(m_input, m_job_input);
+        m_job_function = m_function;
+        t_CKUINT posted = m_posted.load(std::memory_order_relaxed) + 1;
+        m_posted.store(posted, std::memory_order_relaxed);
+        m_worker->post(shared_from_this());
+
+        double deadline = py_ugen_deadline(function, m_frame_deadline);
+        bool done;
+        {
+            std::unique_lock<std::mutex> lock(m_lock);
+            auto returned = [&] { return m_done.load(std::memory_order_relaxed) == posted; };
+            if (std::isinf(deadline)) {
+                m_finished.wait(lock, returned);
+                done = true;
+            } else {
+                done = m_finished.wait_for(lock, std::chrono::duration<double>(deadline), returned);
+            }
+        }
+        if (done) {
+            std::swap(m_output, m_job_output);
+        } else {
+            std::fill(m_output.begin(), m_output.end(), 0);
+            function.overruns++;
+            m_overruns++;
+        }
+    }
+
+    std::shared_ptr<PyUGenWorker> m_worker;
+    const double m_frame_deadline;
+
+    // Only touched by the computing thread
+    std::shared_ptr<PyUGenFunction> m_function;
+    std::shared_ptr<PyUGenFunction> m_next_function;
+    bool m_has_next;
+    std::vector<SAMPLE> m_input;
+    std::vector<SAMPLE> m_output;
+    t_CKUINT m_pos;
+
+    // Handed to the worker with each block, and only touched by it until
+    // the call returns
+    std::shared_ptr<PyUGenFunction> m_job_function;
+    std::vector<SAMPLE> m_job_input;
+    std::vector<SAMPLE> m_job_output;
+
+    std::mutex m_lock;
+    std::condition_variable m_finished;
+    std::atomic<t_CKUINT> m_posted;
+    std::atomic<t_CKUINT> m_done;
+    std::atomic<t_CKUINT> m_overruns;
+};
+
+
+inline void PyUGenWorker::work(std::shared_ptr<Queue> queue)
+{
+    while (true) {
+        std::shared_ptr<PyUGenInstance> instance;
+        {
+            std::unique_lock<std::mutex> lock(queue->lock);
+            queue->wake.wait(lock, [&] { return queue->stop || !queue->instances.empty(); });
+            if (queue->stop) {
+                return;
+            }
+            instance = queue->instances.front();
+            queue->instances.pop_front();
+        }
+        instance->compute();
+    }
+}
+
+
+// The functions registered with a VM, by name, and its worker
+class PyUGenRegistry
+{
+public:
+    PyUGenRegistry()
+        : m_chuck(NULL),
+          m_frame_deadline(INFINITY),
+          m_worker(std::make_shared<PyUGenWorker>())
+    {
+    }
+
+    ~PyUGenRegistry()
+    {
+        detach();
+    }
+
+    // Let PyUGens created by chuck's VM find this registry, once its
+    // parameters are final
+    void attach(ChucK * chuck)
+    {
+        std::lock_guard<std::mutex> lock(registries_lock());
+        registries()[chuck] = this;
+        m_chuck = chuck;
+        if (chuck->getParamInt(CHUCK_PARAM_HINT_IS_REALTIME_AUDIO)) {
+            m_frame_deadline = CHUCKPY_PY_UGEN_DEADLINE_BLOCKS_DEFAULT / chuck->getParamInt(CHUCK_PARAM_SAMPLE_RATE);
+        } else {
+            m_frame_deadline = INFINITY;
+        }
+    }
+
+    void detach()
+    {
+        std::lock_guard<std::mutex> lock(registries_lock());
+        if (m_chuck != NULL) {
+            registries().erase(m_chuck);
+            m_chuck = NULL;
+        }
+    }
+
+    static PyUGenRegistry * of(ChucK * chuck)
+    {
+        std::lock_guard<std::mutex> lock(registries_lock());
+        std::map<ChucK *, PyUGenRegistry *>::iterator it = registries().find(chuck);
+        return it == registries().end() ? NULL : it->second;
+    }
+
+    // Register function as name, replacing any function already registered
+    // under it for PyUGens that set it from then on
+    void add(const std::string & name, std::shared_ptr<PyUGenFunction> function)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        m_functions[name] = function;
+        m_worker->start();
+    }
+
+    std::shared_ptr<PyUGenFunction> get(const std::string & name)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        std::map<std::string, std::shared_ptr<PyUGenFunction>>::iterator it = m_functions.find(name);
+        return it == m_functions.end() ? std::shared_ptr<PyUGenFunction>() : it->second;
+    }
+
+    std::map<std::string, std::shared_ptr<PyUGenFunction>> functions()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        return m_functions;
+    }
+
+    std::shared_ptr<PyUGenWorker> worker() const { return m_worker; }
+
+    // The default deadline per frame of a block: infinite unless the VM is
+    // hinted to be driven by the audio device
+    double frame_deadline() const { return m_frame_deadline; }
+
+private:
+    static std::mutex & registries_lock()
+    {
+        static std::mutex lock;
+        return lock;
+    }
+
+    static std::map<ChucK *, PyUGenRegistry *> & registries()
+    {
+        static std::map<ChucK *, PyUGenRegistry *> registries;
+        return registries;
+    }
+
+    ChucK * m_chuck;
+    double m_frame_deadline;
+    std::mutex m_lock;
+    std::map<std::string, std::shared_ptr<PyUGenFunction>> m_functions;
+    std::shared_ptr<PyUGenWorker> m_worker;
+};
+
+
+// The ChucK class, bound into each VM by ChuckHost::init_host
+
+// Offset of the member holding a std::shared_ptr<PyUGenInstance> *
+static t_CKUINT py_ugen_offset_data = 0;
+
+static PyUGenInstance * py_ugen_instance(Chuck_Object * self)
+{
+    std::shared_ptr<PyUGenInstance> * instance = (std::shared_ptr<PyUGenInstance> *)OBJ_MEMBER_INT(self, py_ugen_offset_data);
+    return instance == NULL ? NULL : instance->get();
+}
+
+CK_DLL_CTOR(py_ugen_ctor)
+{
+    OBJ_MEMBER_INT(SELF, py_ugen_offset_data) = 0;
+    PyUGenRegistry * registry = PyUGenRegistry::of(VM->carrier()->chuck);
+    if (registry != NULL) {
+        OBJ_MEMBER_INT(SELF, py_ugen_offset_data) = (t_CKINT)new std::shared_ptr<PyUGenInstance>(
+            new PyUGenInstance(registry->worker(), registry->frame_deadline())
+        );
+    }
+}
+
+CK_DLL_DTOR(py_ugen_dtor)
+{
+    // The worker keeps the instance until any call it is making returns
+    delete (std::shared_ptr<PyUGenInstance> *)OBJ_MEMBER_INT(SELF, py_ugen_offset_data);
+    OBJ_MEMBER_INT(SELF, py_ugen_offset_data) = 0;
+}
+
+CK_DLL_TICK(py_ugen_tick)
+{
+    PyUGenInstance * instance = py_ugen_instance(SELF);
+    *out = instance == NULL ? 0 : instance->tick(in);
+    return TRUE;
+}
+
+CK_DLL_MFUN(py_ugen_set_func)
+{
+    Chuck_String * name = GET_NEXT_STRING(ARGS);
+    RETURN->v_string = name;
+    PyUGenInstance * instance = py_ugen_instance(SELF);
+    PyUGenRegistry * registry = PyUGenRegistry::of(VM->carrier()->chuck);
+    if (instance == NULL || registry == NULL || name == NULL) {
+        return;
+    }
+    std::shared_ptr<PyUGenFunction> function = registry->get(name->str);
+    if (function == NULL) {
+        EM_log(CK_LOG_SEVERE, "PyUGen: no function registered as '%s'", name->str.c_str());
+        return;
+    }
+    instance->set_function(function);
+}
+
+CK_DLL_MFUN(py_ugen_overruns)
+{
+    PyUGenInstance * instance = py_ugen_instance(SELF);
+    RETURN->v_int = instance == NULL ? 0 : instance->overruns();
+}
+
+static t_CKBOOL CK_DLL_CALL py_ugen_query(Chuck_DL_Query * QUERY)
+{
+    QUERY->begin_class(QUERY, "PyUGen", "UGen");
+    QUERY->add_ctor(QUERY, py_ugen_ctor);
+    QUERY->add_dtor(QUERY, py_ugen_dtor);
+    QUERY->add_ugen_func(QUERY, py_ugen_tick, NULL);
+    py_ugen_offset_data = QUERY->add_mvar(QUERY, "int", "@py_ugen_data", FALSE);
+    QUERY->add_mfun(QUERY, py_ugen_set_func, "string", "func");
+    QUERY->add_arg(QUERY, "string", "name");
+    QUERY->add_mfun(QUERY, py_ugen_overruns, "int", "overruns");
+    QUERY->end_class(QUERY);
+    return TRUE;
+}
+
+#endif
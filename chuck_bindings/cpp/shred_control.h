@@ -0,0 +1,287 @@
+// Adding, removing and replacing running shreds without stopping the VM,
+// the way the OTF server does, but without a socket.
+//
+// Python posts commands under a lock; the thread computing blocks applies
+// them through the VM's own message handling at the start of its next
+// block, so a swap never lands inside a block. It only try-locks: if
+// Python is posting at that moment, the commands wait for the next block.
+//
+// A command with a fade first ramps the whole output down to silence over
+// that many frames, is applied at the next block boundary, and then ramps
+// the output back up. Shreds all feed the same dac, so the output of one
+// cannot be faded on its own. Commands after a fading one wait for it.
+//
+// Commands are numbered from 1 in the order they are posted, and applied
+// in that order. A status command takes a snapshot of the shreds, which
+// Python collects later with the ids of the shreds added since.
+#ifndef __CHUCKPY_SHRED_CONTROL_H__
+#define __CHUCKPY_SHRED_CONTROL_H__
+
+#include <atomic>
+#include <mutex>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "chuck.h"
+#include "chuck_vm.h"
+
+
+struct ShredCommand
+{
+    enum Kind { REMOVE, REPLACE, ADD, STATUS };
+
+    ShredCommand() : kind(REMOVE), number(0), xid(0), code(NULL), fade_frames(0) {}
+
+    Kind kind;
+    // Set by post
+    t_CKUINT number;
+    t_CKUINT xid;
+    // The code to spork or replace the shred with, referenced until applied
+    Chuck_VM_Code * code;
+    std::vector<std::string> args;
+    t_CKUINT fade_frames;
+};
+
+
+struct ShredInfo
+{
+    t_CKUINT xid;
+    std::string name;
+    t_CKTIME start;
+    bool waiting;
+};
+
+
+// The shreds in the VM when a status command was applied
+struct ShredStatus
+{
+    ShredStatus() : taken(false), applied(0), now(0) {}
+
+    bool taken;
+    // Commands applied before the snapshot, the status command included
+    t_CKUINT applied;
+    // ChucK's now, in samples
+    t_CKTIME now;
+    std::vector<ShredInfo> shreds;
+    // (command number, shred id) for each add command applied since the
+    // last collect_status
+    std::vector<std::pair<t_CKUINT, t_CKUINT>> added;
+};
+
+
+class ShredControl
+{
+public:
+    ShredControl()
+        : m_next(0),
+          m_num_posted(0),
+          m_num_pending(0),
+          m_applied(0),
+          m_state(IDLE),
+          m_fade_frames(0),
+          m_fade_pos(0)
+    {
+    }
+
+    ~ShredControl()
+    {
+        clear();
+    }
+
+    // Python side: queue command, taking over its reference to code, and
+    // return its number
+    t_CKUINT post(ShredCommand & command)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        // Free the commands the computing thread has applied here, not there
+        m_commands.erase(m_commands.begin(), m_commands.begin() + m_next);
+        m_next = 0;
+        command.number = ++m_num_posted;
+        m_commands.push_back(ShredCommand());
+        std::swap(m_commands.back(), command);
+        m_num_pending.store(m_commands.size(), std::memory_order_relaxed);
+        return m_commands.back().number;
+    }
+
+    // Python side: move the latest snapshot into status, with the shreds
+    // added since the last call. Returns false if no status command has
+    // been applied since init or the last clear.
+    bool collect_status(ShredStatus & status)
+    {
+        std::lock_guard<std::mutex> lock(m_status_lock);
+        if (!m_status.taken) {
+            return false;
+        }
+        status = m_status;
+        m_status.added.clear();
+        return true;
+    }
+
+    // Drop every command not applied yet and any fade in progress. Only
+    // safe while no other thread is computing blocks.
+    void clear()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        for (size_t i = m_next; i < m_commands.size(); i++) {
+            if (m_commands[i].code != NULL) {
+                m_commands[i].code->release();
+            }
+        }
+        m_commands.clear();
+        m_next = 0;
+        m_num_pending.store(0, std::memory_order_relaxed);
+        // Dropped commands count as applied, so no one waits for them
+        m_applied.store(m_num_posted, std::memory_order_relaxed);
+        m_state = IDLE;
+        std::lock_guard<std::mutex> status_lock(m_status_lock);
+        m_status = ShredStatus();
+    }
+
+    t_CKUINT pending() const { return m_num_pending.load(std::memory_order_relaxed); }
+    // Commands applied so far
+    t_CKUINT applied() const { return m_applied.load(std::memory_order_relaxed); }
+
+    // Computing thread, before each block
+    void before_block(Chuck_VM * vm)
+    {
+        if (m_state == FADING_OUT || m_state == FADING_IN) {
+            return;
+        }
+        if (m_num_pending.load(std::memory_order_relaxed) == 0) {
+            return;
+        }
+        std::unique_lock<std::mutex> lock(m_lock, std::try_to_lock);
+        if (!lock.owns_lock()) {
+            // A silent output stays silent until the swap
+            return;
+        }
+        if (m_state == SILENT) {
+            // The output has faded out; swap, then fade back in
+            apply(vm, m_commands[m_next++]);
+            m_state = FADING_IN;
+            m_fade_pos = 0;
+        } else {
+            for (; m_next < m_commands.size(); m_next++) {
+                ShredCommand & command = m_commands[m_next];
+                if (command.fade_frames != 0) {
+                    m_state = FADING_OUT;
+                    m_fade_frames = command.fade_frames;
+                    m_fade_pos = 0;
+                    break;
+                }
+                apply(vm, command);
+            }
+        }
+        m_num_pending.store(m_commands.size() - m_next, std::memory_order_relaxed);
+    }
+
+    // Computing thread, after each block: apply the fade to its output
+    void after_block(SAMPLE * output, t_CKUINT num_frames, t_CKUINT num_chans)
+    {
+        if (m_state == IDLE) {
+            return;
+        }
+        for (t_CKUINT i = 0; i < num_frames; i++) {
+            SAMPLE gain;
+            if (m_state == FADING_OUT) {
+                gain = (SAMPLE)(m_fade_frames - m_fade_pos) / m_fade_frames;
+                if (++m_fade_pos >= m_fade_frames) {
+                    m_state = SILENT;
+                }
+            } else if (m_state == FADING_IN) {
+                gain = (SAMPLE)m_fade_pos / m_fade_frames;
+                if (++m_fade_pos >= m_fade_frames) {
+                    m_state = IDLE;
+                }
+            } else if (m_state == SILENT) {
+                gain = 0;
+            } else {
+                break;
+            }
+            SAMPLE * frame = output + i * num_chans;
+            for (t_CKUINT c = 0; c < num_chans; c++) {
+                frame[c] *= gain;
+            }
+        }
+    }
+
+private:
+    enum State { IDLE, FADING_OUT, SILENT, FADING_IN };
+
+    // Hand command to the VM, as the OTF server would
+    void apply(Chuck_VM * vm, ShredCommand & command)
+    {
+        t_CKUINT applied = m_applied.load(std::memory_order_relaxed) + 1;
+        if (command.kind == ShredCommand::ADD) {
+            Chuck_VM_Shred * shred = vm->spork(command.code, NULL);
+            shred->args = command.args;
+            command.code->release();
+            command.code = NULL;
+            std::lock_guard<std::mutex> lock(m_status_lock);
+            m_status.added.push_back(std::make_pair(command.number, shred->xid));
+        } else if (command.kind == ShredCommand::STATUS) {
+            take_status(vm, applied);
+        } else {
+            send(vm, command);
+        }
+        m_applied.store(applied, std::memory_order_relaxed);
+    }
+
+    // Snapshot the shreduler, outside the lock, then publish it
+    void take_status(Chuck_VM * vm, t_CKUINT applied)
+    {
+        Chuck_VM_Status vm_status;
+        vm->shreduler()->status(&vm_status);
+        std::vector<ShredInfo> shreds(vm_status.list.size());
+        for (size_t i = 0; i < shreds.size(); i++) {
+            Chuck_VM_Shred_Status * shred = vm_status.list[i];
+            shreds[i].xid = shred->xid;
+            shreds[i].name = shred->name;
+            shreds[i].start = shred->start;
+            shreds[i].waiting = shred->has_event != 0;
+        }
+        std::lock_guard<std::mutex> lock(m_status_lock);
+        m_status.taken = true;
+        m_status.applied = applied;
+        m_status.now = vm->shreduler()->now_system;
+        m_status.shreds.swap(shreds);
+    }
+
+    void send(Chuck_VM * vm, ShredCommand & command)
+    {
+        Chuck_Msg * msg = new Chuck_Msg;
+        msg->param = command.xid;
+        if (command.kind == ShredCommand::REPLACE) {
+            // The replacement keeps the id of the shred it replaces
+            msg->type = MSG_REPLACE;
+            msg->code = command.code;
+            msg->set(command.args);
+        } else {
+            msg->type = MSG_REMOVE;
+        }
+        // The VM deletes msg, and logs an error if the shred is gone
+        vm->process_msg(msg);
+        if (command.code != NULL) {
+            command.code->release();
+            command.code = NULL;
+        }
+    }
+
+    std::mutex m_lock;
+    // Those before m_next have been applied, and are freed by the next post
+    std::vector<ShredCommand> m_commands;
+    size_t m_next;
+    t_CKUINT m_num_posted;
+    std::atomic<t_CKUINT> m_num_pending;
+    std::atomic<t_CKUINT> m_applied;
+    // Only touched by the computing thread
+    State m_state;
+    t_CKUINT m_fade_frames;
+    t_CKUINT m_fade_pos;
+    // Held only to publish or collect a snapshot
+    std::mutex m_status_lock;
+    ShredStatus m_status;
+};
+
+#endif
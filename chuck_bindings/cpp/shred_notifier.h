@@ -0,0 +1,155 @@
+// Posts events about a VM to a file descriptor, normally the write end of a
+// non-blocking pipe that an event loop watches, so Python can wait on the VM
+// without polling it.
+//
+// Every event is one 16-byte write, (kind, value) as native uint64s, which
+// is atomic on a pipe. Events are posted from the thread computing blocks,
+// after each block; if the pipe is full they are dropped.
+#ifndef __CHUCKPY_SHRED_NOTIFIER_H__
+#define __CHUCKPY_SHRED_NOTIFIER_H__
+
+#include <stdint.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <atomic>
+#include <mutex>
+#include <vector>
+
+#include "chuck_vm.h"
+
+
+class ShredNotifier
+{
+public:
+    enum Event {
+        // value is the id of a watched shred that has finished
+        EVENT_SHRED_DONE = 1,
+        // value is the number of frames computed so far
+        EVENT_TICK = 2,
+        // value is the number of shred commands applied so far, which has
+        // reached the number watched
+        EVENT_APPLIED = 3,
+    };
+
+    ShredNotifier()
+        : m_fd(-1),
+          m_tick_frames(0),
+          m_tick_elapsed(0),
+          m_frames(0),
+          m_num_watched(0),
+          m_applied_watched(0)
+    {
+    }
+
+    // Post events to fd from now on, or to nothing if fd is -1, with a tick
+    // every tick_frames frames if it is not 0. Once this returns, the
+    // previous fd is no longer written to and may be closed.
+    void set_fd(int fd, t_CKUINT tick_frames)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        m_fd = fd;
+        m_tick_frames.store(tick_frames, std::memory_order_relaxed);
+        if (fd < 0) {
+            m_watched.clear();
+            m_num_watched.store(0, std::memory_order_relaxed);
+            m_applied_watched.store(0, std::memory_order_relaxed);
+        }
+    }
+
+    // Post EVENT_SHRED_DONE once the shred with id xid is no longer in the VM
+    void watch(t_CKUINT xid)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        if (std::find(m_watched.begin(), m_watched.end(), xid) == m_watched.end()) {
+            m_watched.push_back(xid);
+            m_num_watched.store(m_watched.size(), std::memory_order_relaxed);
+        }
+    }
+
+    // Post EVENT_APPLIED once number shred commands have been applied. Only
+    // the lowest number watched is kept, and it is forgotten once posted.
+    void watch_applied(t_CKUINT number)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        t_CKUINT watched = m_applied_watched.load(std::memory_order_relaxed);
+        if (watched == 0 || number < watched) {
+            m_applied_watched.store(number, std::memory_order_relaxed);
+        }
+    }
+
+    // Stop watching every shred, posting EVENT_SHRED_DONE for each, since
+    // they are gone and their ids may be reused. For when the VM is reset.
+    void reset()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        if (m_fd >= 0) {
+            for (size_t i = 0; i < m_watched.size(); i++) {
+                post(EVENT_SHRED_DONE, m_watched[i]);
+            }
+        }
+        m_watched.clear();
+        m_num_watched.store(0, std::memory_order_relaxed);
+    }
+
+    // Called by the computing thread after each block, with the number of
+    // shred commands applied so far. Never blocks: if Python holds the
+    // lock, events wait for the next block.
+    void after_block(Chuck_VM * vm, t_CKUINT num_frames, t_CKUINT applied)
+    {
+        m_frames += num_frames;
+        m_tick_elapsed += num_frames;
+        t_CKUINT tick_frames = m_tick_frames.load(std::memory_order_relaxed);
+        bool tick = tick_frames != 0 && m_tick_elapsed >= tick_frames;
+        t_CKUINT applied_watched = m_applied_watched.load(std::memory_order_relaxed);
+        bool applied_due = applied_watched != 0 && applied >= applied_watched;
+        if (!tick && !applied_due && m_num_watched.load(std::memory_order_relaxed) == 0) {
+            return;
+        }
+        std::unique_lock<std::mutex> lock(m_lock, std::try_to_lock);
+        if (!lock.owns_lock() || m_fd < 0) {
+            return;
+        }
+        for (size_t i = 0; i < m_watched.size(); ) {
+            if (vm->shreduler()->lookup(m_watched[i]) == NULL) {
+                post(EVENT_SHRED_DONE, m_watched[i]);
+                m_watched[i] = m_watched.back();
+                m_watched.pop_back();
+            } else {
+                i++;
+            }
+        }
+        m_num_watched.store(m_watched.size(), std::memory_order_relaxed);
+        applied_watched = m_applied_watched.load(std::memory_order_relaxed);
+        if (applied_watched != 0 && applied >= applied_watched) {
+            m_applied_watched.store(0, std::memory_order_relaxed);
+            post(EVENT_APPLIED, applied);
+        }
+        if (tick) {
+            m_tick_elapsed %= tick_frames;
+            post(EVENT_TICK, m_frames);
+        }
+    }
+
+private:
+    void post(uint64_t kind, uint64_t value)
+    {
+        uint64_t event[2] = {kind, value};
+        // Nothing can be done from here about a full pipe
+        ssize_t written = ::write(m_fd, event, sizeof(event));
+        (void)written;
+    }
+
+    std::mutex m_lock;
+    int m_fd;
+    std::atomic<t_CKUINT> m_tick_frames;
+    // Only touched by the computing thread
+    t_CKUINT m_tick_elapsed;
+    t_CKUINT m_frames;
+    std::vector<t_CKUINT> m_watched;
+    std::atomic<t_CKUINT> m_num_watched;
+    // The number of applied commands to post EVENT_APPLIED at, or 0
+    std::atomic<t_CKUINT> m_applied_watched;
+};
+
+#endif
@@ -0,0 +1,443 @@
+// Opt-in accounting of where a VM's blocks spend their time.
+//
+// While profiling is on, every UGen reachable from the dac, adc and
+// blackhole has its tick function swapped for one that times the original.
+// Each UGen's time is charged to the shred that created it, or to shred 0
+// if no live shred owns it. The rest of each block (running shred code,
+// scheduling and the timing itself) is counted as VM time, and not split
+// by shred: ChucK runs every shred due inside ChucK::run without a hook in
+// between, so a shred's own code cannot be timed apart from the others'.
+// The graph is walked again every rescan_frames frames, so UGens created in
+// between are counted from the next walk on.
+//
+// The computing thread keeps the counts in storage sized when the graph is
+// walked, so profiled blocks do not allocate. After each block it try-locks
+// to publish a snapshot and append one (now, shred id, ns) row per shred
+// whose UGens took time to a ring that Python drains, overwriting the
+// oldest rows when it is full. If Python holds the lock at that moment,
+// the block's rows are dropped instead. Either way the lost rows are
+// counted. While profiling is off, a block costs one relaxed load.
+#ifndef __CHUCKPY_SHRED_PROFILER_H__
+#define __CHUCKPY_SHRED_PROFILER_H__
+
+#include <atomic>
+#include <chrono>
+#include <map>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+
+#include "chuck_def.h"
+#include "chuck_dl.h"
+#include "chuck_type.h"
+#include "chuck_ugen.h"
+#include "chuck_vm.h"
+
+#define CHUCKPY_PROFILE_RESCAN_FRAMES_DEFAULT 4096
+
+
+// The time spent in one UGen's tick function
+struct UGenProfile
+{
+    UGenProfile() : shred(0), ticks(0), ns(0) {}
+
+    std::string type;
+    t_CKUINT shred;
+    t_CKUINT ticks;
+    t_CKUINT ns;
+};
+
+
+// One row of the ring: the time spent ticking a shred's UGens in the block
+// starting at now
+struct ProfileRow
+{
+    t_CKUINT now;
+    t_CKUINT shred;
+    t_CKUINT ns;
+};
+
+
+struct ProfileSnapshot
+{
+    ProfileSnapshot() : blocks(0), frames(0), total_ns(0), vm_ns(0), dropped(0) {}
+
+    t_CKUINT blocks;
+    t_CKUINT frames;
+    t_CKUINT total_ns;
+    // The part of total_ns not spent ticking UGens
+    t_CKUINT vm_ns;
+    // Ring rows lost, overwritten while the ring was full or never
+    // recorded because it was locked
+    t_CKUINT dropped;
+    // (shred id, ns spent ticking the UGens it created) for every shred
+    // seen, with the UGens no live shred owns under 0
+    std::vector<std::pair<t_CKUINT, t_CKUINT>> ugen_ns;
+    std::vector<UGenProfile> ugens;
+};
+
+
+class ShredProfiler;
+
+// The profiler of the block the calling thread is computing, if any
+inline ShredProfiler *& shred_profiler_current()
+{
+    static thread_local ShredProfiler * current = NULL;
+    return current;
+}
+
+CK_DLL_TICK(shred_profiler_tick);
+
+
+class ShredProfiler
+{
+public:
+    typedef std::chrono::steady_clock Clock;
+
+    ShredProfiler()
+        : m_enabled(false),
+          m_active(false),
+          m_rescan_frames(CHUCKPY_PROFILE_RESCAN_FRAMES_DEFAULT),
+          m_since_rescan(0),
+          m_now(0),
+          m_block_ugen_ns(0),
+          m_blocks(0),
+          m_frames(0),
+          m_total_ns(0),
+          m_vm_ns(0),
+          m_dropped(0),
+          m_ring_start(0),
+          m_ring_size(0)
+    {
+    }
+
+    // Python side: turn profiling on or off from the next block. Turning it
+    // on starts the counts from zero and keeps the last ring_rows rows.
+    void set_enabled(bool enabled, t_CKUINT ring_rows)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        if (enabled) {
+            m_ring.assign(ring_rows, ProfileRow());
+            m_ring_start = 0;
+            m_ring_size = 0;
+        }
+        m_enabled.store(enabled, std::memory_order_relaxed);
+    }
+
+    bool enabled() const { return m_enabled.load(std::memory_order_relaxed); }
+
+    // Python side: copy out the counts as of the last block published
+    void snapshot(ProfileSnapshot & snapshot)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        snapshot = m_snapshot;
+    }
+
+    // Python side: move the rows in the ring into rows, oldest first
+    void drain(std::vector<ProfileRow> & rows)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        rows.resize(m_ring_size);
+        for (size_t i = 0; i < m_ring_size; i++) {
+            rows[i] = m_ring[(m_ring_start + i) % m_ring.size()];
+        }
+        m_ring_start = 0;
+        m_ring_size = 0;
+    }
+
+    // Forget the counts. Only safe while no other thread is computing blocks.
+    void clear()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        m_snapshot = ProfileSnapshot();
+        m_ring_start = 0;
+        m_ring_size = 0;
+        m_ugens.clear();
+        clear_counts();
+        m_active = false;
+    }
+
+    // Computing thread, before each block starting at now
+    void before_block(Chuck_VM * vm, t_CKUINT now)
+    {
+        if (!m_enabled.load(std::memory_order_relaxed)) {
+            if (m_active) {
+                // Leave the graph as it was; UGens since disconnected keep
+                // the profiling tick, which then only forwards
+                walk(vm, false);
+                m_ugens.clear();
+                m_active = false;
+            }
+            return;
+        }
+        if (!m_active) {
+            std::lock_guard<std::mutex> lock(m_lock);
+            m_snapshot = ProfileSnapshot();
+            clear_counts();
+            m_active = true;
+        }
+        if (m_since_rescan == 0) {
+            walk(vm, true);
+        }
+        m_now = now;
+        m_block_ugen_ns = 0;
+        for (size_t i = 0; i < m_slots.size(); i++) {
+            m_slots[i].block_ns = 0;
+        }
+        shred_profiler_current() = this;
+        m_start = Clock::now();
+    }
+
+    // Computing thread, after each block
+    void after_block(t_CKUINT num_frames)
+    {
+        if (!m_active) {
+            return;
+        }
+        t_CKUINT total_ns = (t_CKUINT)std::chrono::duration_cast<std::chrono::nanoseconds>(Clock::now() - m_start).count();
+        shred_profiler_current() = NULL;
+        m_since_rescan += num_frames;
+        if (m_since_rescan >= m_rescan_frames) {
+            m_since_rescan = 0;
+        }
+        m_blocks++;
+        m_frames += num_frames;
+        m_total_ns += total_ns;
+        // Timing the ticks makes the block slower than the ticks it times
+        m_vm_ns += total_ns > m_block_ugen_ns ? total_ns - m_block_ugen_ns : 0;
+
+        std::unique_lock<std::mutex> lock(m_lock, std::try_to_lock);
+        if (!lock.owns_lock()) {
+            // Counted in the next snapshot published, but not in the ring
+            if (!m_ring.empty()) {
+                for (size_t i = 0; i < m_slots.size(); i++) {
+                    m_dropped += m_slots[i].block_ns != 0;
+                }
+            }
+            return;
+        }
+        publish();
+    }
+
+    // Charge ns spent ticking ugen
+    void charge(Chuck_Object * ugen, t_CKUINT ns)
+    {
+        m_block_ugen_ns += ns;
+        size_t slot = 0;
+        std::unordered_map<Chuck_Object *, TrackedUGen>::iterator it = m_ugens.find(ugen);
+        // Not found if patched while profiling before, and connected since
+        // the last walk
+        if (it != m_ugens.end()) {
+            it->second.profile.ticks++;
+            it->second.profile.ns += ns;
+            slot = it->second.slot;
+        }
+        m_slots[slot].block_ns += ns;
+        m_slots[slot].total_ns += ns;
+    }
+
+private:
+    struct TrackedUGen
+    {
+        UGenProfile profile;
+        // Index into m_slots of the shred it is charged to
+        size_t slot;
+    };
+
+    // The UGen time of one shred, in the block and since profiling started
+    struct ShredSlot
+    {
+        ShredSlot(t_CKUINT xid) : xid(xid), block_ns(0), total_ns(0) {}
+
+        t_CKUINT xid;
+        t_CKUINT block_ns;
+        t_CKUINT total_ns;
+    };
+
+    // Visit every UGen connected to the dac, adc or blackhole, swapping in
+    // the profiling tick if profile, else putting the original back. When
+    // profiling, this is where slots for new shreds are added, so blocks
+    // never have to.
+    void walk(Chuck_VM * vm, bool profile)
+    {
+        std::unordered_map<Chuck_UGen *, t_CKUINT> owners;
+        std::unordered_map<t_CKUINT, size_t> slots;
+        if (profile) {
+            for (size_t i = 0; i < m_slots.size(); i++) {
+                slots[m_slots[i].xid] = i;
+            }
+            Chuck_VM_Status status;
+            vm->shreduler()->status(&status);
+            for (size_t i = 0; i < status.list.size(); i++) {
+                Chuck_VM_Shred * shred = vm->shreduler()->lookup(status.list[i]->xid);
+                if (shred == NULL) {
+                    continue;
+                }
+                std::map<Chuck_UGen *, Chuck_UGen *>::iterator it;
+                for (it = shred->m_ugen_map.begin(); it != shred->m_ugen_map.end(); ++it) {
+                    owners[it->first] = shred->xid;
+                }
+                if (slots.insert(std::make_pair(shred->xid, m_slots.size())).second) {
+                    m_slots.push_back(ShredSlot(shred->xid));
+                }
+            }
+        }
+
+        std::unordered_set<Chuck_UGen *> seen;
+        // Only the UGens found are kept, so freed ones are forgotten
+        std::unordered_map<Chuck_Object *, TrackedUGen> found;
+        std::vector<std::pair<Chuck_UGen *, t_CKUINT>> stack;
+        Chuck_VM_Shreduler * shreduler = vm->shreduler();
+        Chuck_UGen * roots[] = {shreduler->m_dac, shreduler->m_adc, shreduler->m_bunghole};
+        for (size_t i = 0; i < sizeof(roots) / sizeof(roots[0]); i++) {
+            if (roots[i] != NULL) {
+                stack.push_back(std::make_pair(roots[i], (t_CKUINT)0));
+            }
+        }
+        while (!stack.empty()) {
+            Chuck_UGen * ugen = stack.back().first;
+            t_CKUINT shred = stack.back().second;
+            stack.pop_back();
+            if (!seen.insert(ugen).second) {
+                continue;
+            }
+            std::unordered_map<Chuck_UGen *, t_CKUINT>::iterator owner = owners.find(ugen);
+            if (owner != owners.end()) {
+                shred = owner->second;
+            }
+            if (profile) {
+                track(ugen, shred, slots[shred], found);
+            } else if (ugen->tick == shred_profiler_tick) {
+                ugen->tick = ugen->type_ref->ugen_info->tick;
+            }
+            // The channels of a multichannel UGen belong to its shred
+            for (t_CKUINT j = 0; j < ugen->m_multi_chan_size; j++) {
+                stack.push_back(std::make_pair(ugen->m_multi_chan[j], shred));
+            }
+            for (t_CKUINT j = 0; j < ugen->m_num_src; j++) {
+                stack.push_back(std::make_pair(ugen->m_src_list[j], (t_CKUINT)0));
+            }
+        }
+        m_ugens.swap(found);
+    }
+
+    void track(Chuck_UGen * ugen, t_CKUINT shred, size_t slot, std::unordered_map<Chuck_Object *, TrackedUGen> & found)
+    {
+        if (ugen->tick == NULL) {
+            return;
+        }
+        TrackedUGen & tracked = found[ugen];
+        std::unordered_map<Chuck_Object *, TrackedUGen>::iterator it = m_ugens.find(ugen);
+        const std::string & type = ugen->type_ref->name;
+        if (ugen->tick == shred_profiler_tick && it != m_ugens.end() && it->second.profile.type == type && it->second.profile.shred == shred) {
+            tracked.profile = it->second.profile;
+        } else {
+            // A new UGen, possibly where a freed one was
+            tracked.profile.type = type;
+            tracked.profile.shred = shred;
+            ugen->tick = shred_profiler_tick;
+        }
+        tracked.slot = slot;
+    }
+
+    // Start the counts from zero, with only the slot of shred 0
+    void clear_counts()
+    {
+        m_slots.assign(1, ShredSlot(0));
+        m_since_rescan = 0;
+        m_blocks = 0;
+        m_frames = 0;
+        m_total_ns = 0;
+        m_vm_ns = 0;
+        m_dropped = 0;
+    }
+
+    // With m_lock held: copy the counts into the snapshot, and add the
+    // block just finished to the ring. The snapshot's vectors only grow
+    // after a walk has grown the counts.
+    void publish()
+    {
+        for (size_t i = 0; i < m_slots.size() && !m_ring.empty(); i++) {
+            if (m_slots[i].block_ns == 0) {
+                continue;
+            }
+            if (m_ring_size == m_ring.size()) {
+                // Make room by dropping the oldest row
+                m_ring_start = (m_ring_start + 1) % m_ring.size();
+                m_ring_size--;
+                m_dropped++;
+            }
+            ProfileRow & row = m_ring[(m_ring_start + m_ring_size) % m_ring.size()];
+            row.now = m_now;
+            row.shred = m_slots[i].xid;
+            row.ns = m_slots[i].block_ns;
+            m_ring_size++;
+        }
+
+        m_snapshot.blocks = m_blocks;
+        m_snapshot.frames = m_frames;
+        m_snapshot.total_ns = m_total_ns;
+        m_snapshot.vm_ns = m_vm_ns;
+        m_snapshot.dropped = m_dropped;
+        m_snapshot.ugen_ns.resize(m_slots.size());
+        for (size_t i = 0; i < m_slots.size(); i++) {
+            m_snapshot.ugen_ns[i] = std::make_pair(m_slots[i].xid, m_slots[i].total_ns);
+        }
+        m_snapshot.ugens.resize(m_ugens.size());
+        std::unordered_map<Chuck_Object *, TrackedUGen>::iterator it;
+        size_t i = 0;
+        for (it = m_ugens.begin(); it != m_ugens.end(); ++it) {
+            // Assigning over the previous copy reuses its type string
+            m_snapshot.ugens[i++] = it->second.profile;
+        }
+    }
+
+    std::atomic<bool> m_enabled;
+
+    // Only touched by the computing thread
+    bool m_active;
+    t_CKUINT m_rescan_frames;
+    t_CKUINT m_since_rescan;
+    t_CKUINT m_now;
+    Clock::time_point m_start;
+    t_CKUINT m_block_ugen_ns;
+    std::unordered_map<Chuck_Object *, TrackedUGen> m_ugens;
+    // Slot 0 is shred 0; the others are added by walk and kept, so a
+    // finished shred's total stays in the snapshot
+    std::vector<ShredSlot> m_slots;
+    // Counts since profiling was turned on, copied into the snapshot
+    t_CKUINT m_blocks;
+    t_CKUINT m_frames;
+    t_CKUINT m_total_ns;
+    t_CKUINT m_vm_ns;
+    t_CKUINT m_dropped;
+
+    // Shared, under m_lock
+    std::mutex m_lock;
+    ProfileSnapshot m_snapshot;
+    std::vector<ProfileRow> m_ring;
+    size_t m_ring_start;
+    size_t m_ring_size;
+};
+
+
+// Stands in for the tick function of every profiled UGen. The original is
+// the one the UGen's type declares, which the profiler never changes.
+CK_DLL_TICK(shred_profiler_tick)
+{
+    Chuck_UGen * ugen = (Chuck_UGen *)SELF;
+    f_tick tick = ugen->type_ref->ugen_info->tick;
+    ShredProfiler * profiler = shred_profiler_current();
+    if (profiler == NULL) {
+        return tick(SELF, in, out, API);
+    }
+    ShredProfiler::Clock::time_point start = ShredProfiler::Clock::now();
+    t_CKBOOL result = tick(SELF, in, out, API);
+    profiler->charge(SELF, (t_CKUINT)std::chrono::duration_cast<std::chrono::nanoseconds>(ShredProfiler::Clock::now() - start).count());
+    return result;
+}
+
+#endif
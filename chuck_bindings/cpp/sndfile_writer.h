@@ -0,0 +1,227 @@
+// Streams interleaved frames to a sound file from a background thread.
+//
+// Frames are written into one of a fixed number of fixed-size buffers; full
+// buffers are handed to the writer thread, and the producer waits for one
+// to be written when all of them are full. Memory use is therefore
+// num_buffers * buffer_frames frames however long the file gets.
+#ifndef __CHUCKPY_SNDFILE_WRITER_H__
+#define __CHUCKPY_SNDFILE_WRITER_H__
+
+#include <string.h>
+
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "chuck_def.h"
+#include "util_sndfile.h"
+
+
+class SoundFileWriter
+{
+public:
+    // format is a libsndfile SF_FORMAT_*, e.g. SF_FORMAT_WAV | SF_FORMAT_PCM_16.
+    // If the file cannot be opened, error() says why.
+    SoundFileWriter(const std::string & path, t_CKUINT sample_rate, t_CKUINT num_channels, int format,
+                    t_CKUINT buffer_frames, t_CKUINT num_buffers)
+        : m_file(NULL),
+          m_num_channels(num_channels),
+          m_buffer_frames(buffer_frames ? buffer_frames : 1),
+          m_current(NO_BUFFER),
+          m_frames_written(0),
+          m_closed(false)
+    {
+        SF_INFO info;
+        memset(&info, 0, sizeof(info));
+        info.samplerate = (int)sample_rate;
+        info.channels = (int)num_channels;
+        info.format = format;
+        if (!sf_format_check(&info)) {
+            m_error = "unsupported sound file format";
+            m_closed = true;
+            return;
+        }
+        m_file = sf_open(path.c_str(), SFM_WRITE, &info);
+        if (m_file == NULL) {
+            m_error = sf_strerror(NULL);
+            m_closed = true;
+            return;
+        }
+        if (num_buffers < 2) {
+            num_buffers = 2;
+        }
+        m_buffers.resize(num_buffers);
+        m_fill.resize(num_buffers, 0);
+        for (size_t i = 0; i < num_buffers; i++) {
+            m_buffers[i].resize(m_buffer_frames * m_num_channels);
+            m_free.push_back(i);
+        }
+        m_thread = std::thread(&SoundFileWriter::write_buffers, this);
+    }
+
+    ~SoundFileWriter()
+    {
+        close();
+    }
+
+    // Producer side: return where the next num_frames frames go, lowering
+    // num_frames to what fits in the current buffer. Waits for the writer
+    // thread if every buffer is full. Returns NULL once closed.
+    SAMPLE * reserve(t_CKUINT & num_frames)
+    {
+        std::unique_lock<std::mutex> lock(m_lock);
+        if (m_closed) {
+            return NULL;
+        }
+        if (m_current == NO_BUFFER) {
+            m_cond.wait(lock, [this] { return !m_free.empty(); });
+            m_current = m_free.front();
+            m_free.pop_front();
+            m_fill[m_current] = 0;
+        }
+        t_CKUINT space = m_buffer_frames - m_fill[m_current];
+        if (num_frames > space) {
+            num_frames = space;
+        }
+        return &m_buffers[m_current][m_fill[m_current] * m_num_channels];
+    }
+
+    // Producer side: num_frames frames have been written where reserve said
+    void commit(t_CKUINT num_frames)
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        if (m_current == NO_BUFFER) {
+            return;
+        }
+        m_fill[m_current] += num_frames;
+        if (m_fill[m_current] == m_buffer_frames) {
+            queue_current();
+        }
+    }
+
+    // Producer side: copy frames in; false once closed or failed
+    bool write(const SAMPLE * samples, t_CKUINT num_frames)
+    {
+        while (num_frames > 0) {
+            t_CKUINT n = num_frames;
+            SAMPLE * buffer = reserve(n);
+            if (buffer == NULL) {
+                return false;
+            }
+            memcpy(buffer, samples, n * m_num_channels * sizeof(SAMPLE));
+            commit(n);
+            samples += n * m_num_channels;
+            num_frames -= n;
+        }
+        return !failed();
+    }
+
+    // Write everything buffered and close the file; false if anything failed
+    bool close()
+    {
+        {
+            std::lock_guard<std::mutex> lock(m_lock);
+            if (m_closed) {
+                return m_error.empty();
+            }
+            if (m_current != NO_BUFFER) {
+                queue_current();
+            }
+            m_closed = true;
+        }
+        m_cond.notify_all();
+        m_thread.join();
+        if (sf_close(m_file) != 0 && m_error.empty()) {
+            m_error = "failed to close sound file";
+        }
+        m_file = NULL;
+        return m_error.empty();
+    }
+
+    bool failed()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        return !m_error.empty();
+    }
+
+    std::string error()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        return m_error;
+    }
+
+    bool closed()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        return m_closed;
+    }
+
+    t_CKUINT num_channels() const { return m_num_channels; }
+
+    t_CKUINT frames_written()
+    {
+        std::lock_guard<std::mutex> lock(m_lock);
+        return m_frames_written;
+    }
+
+private:
+    static const size_t NO_BUFFER = (size_t)-1;
+
+    // With m_lock held
+    void queue_current()
+    {
+        m_full.push_back(m_current);
+        m_current = NO_BUFFER;
+        m_cond.notify_all();
+    }
+
+    // The writer thread
+    void write_buffers()
+    {
+        std::unique_lock<std::mutex> lock(m_lock);
+        while (true) {
+            m_cond.wait(lock, [this] { return !m_full.empty() || m_closed; });
+            if (m_full.empty()) {
+                return;
+            }
+            size_t i = m_full.front();
+            m_full.pop_front();
+            t_CKUINT num_frames = m_fill[i];
+            // After an error, buffers are only recycled
+            bool ok = m_error.empty();
+
+            lock.unlock();
+            sf_count_t written = ok ? sf_writef_float(m_file, &m_buffers[i][0], num_frames) : 0;
+            lock.lock();
+
+            if (ok && written != (sf_count_t)num_frames) {
+                m_error = sf_strerror(m_file);
+            }
+            if (written > 0) {
+                m_frames_written += written;
+            }
+            m_free.push_back(i);
+            m_cond.notify_all();
+        }
+    }
+
+    SNDFILE * m_file;
+    const t_CKUINT m_num_channels;
+    const t_CKUINT m_buffer_frames;
+    std::vector<std::vector<SAMPLE> > m_buffers;
+    std::vector<t_CKUINT> m_fill;
+    std::deque<size_t> m_free;
+    std::deque<size_t> m_full;
+    size_t m_current;
+    t_CKUINT m_frames_written;
+    bool m_closed;
+    std::string m_error;
+    std::mutex m_lock;
+    std::condition_variable m_cond;
+    std::thread m_thread;
+};
+
+#endif
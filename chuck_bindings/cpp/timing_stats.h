@@ -0,0 +1,95 @@
+// Counters and a latency histogram for blocks of audio computed on one
+// thread and read from any other.
+//
+// Only the computing thread writes, so updates are plain relaxed loads and
+// stores: no locks and no read-modify-write instructions on the audio
+// thread. Readers may see the counters of a block that is only partly
+// recorded. The counters only ever increase, so take differences between
+// two readings to measure an interval.
+#ifndef __CHUCKPY_TIMING_STATS_H__
+#define __CHUCKPY_TIMING_STATS_H__
+
+#include <atomic>
+#include <chrono>
+
+#include "chuck_def.h"
+
+
+class TimingStats
+{
+public:
+    // Bucket i counts blocks computed in under 2^i microseconds (and at
+    // least 2^(i-1)); the last bucket also counts everything slower
+    static const int NUM_BUCKETS = 24;
+
+    typedef std::chrono::steady_clock Clock;
+
+    TimingStats()
+        : m_calls(0),
+          m_frames(0),
+          m_total_ns(0),
+          m_max_ns(0),
+          m_overruns(0),
+          m_late(0)
+    {
+        for (int i = 0; i < NUM_BUCKETS; i++) {
+            m_histogram[i].store(0, std::memory_order_relaxed);
+        }
+    }
+
+    // Record a block of num_frames frames that took from start until now to
+    // compute. A block that takes longer to compute than to play back at
+    // sample_rate is an overrun: in realtime, the output underflows.
+    void record(Clock::time_point start, t_CKUINT num_frames, t_CKUINT sample_rate)
+    {
+        t_CKUINT ns = (t_CKUINT)std::chrono::duration_cast<std::chrono::nanoseconds>(Clock::now() - start).count();
+        bump(m_calls, 1);
+        bump(m_frames, num_frames);
+        bump(m_total_ns, ns);
+        if (ns > m_max_ns.load(std::memory_order_relaxed)) {
+            m_max_ns.store(ns, std::memory_order_relaxed);
+        }
+        if ((double)ns * sample_rate > (double)num_frames * 1e9) {
+            bump(m_overruns, 1);
+        }
+        bump(m_histogram[bucket(ns)], 1);
+    }
+
+    // Record that a block was requested late, i.e. the driver had to wait
+    void record_late() { bump(m_late, 1); }
+
+    t_CKUINT calls() const { return m_calls.load(std::memory_order_relaxed); }
+    t_CKUINT frames() const { return m_frames.load(std::memory_order_relaxed); }
+    t_CKUINT total_ns() const { return m_total_ns.load(std::memory_order_relaxed); }
+    t_CKUINT max_ns() const { return m_max_ns.load(std::memory_order_relaxed); }
+    t_CKUINT overruns() const { return m_overruns.load(std::memory_order_relaxed); }
+    t_CKUINT late() const { return m_late.load(std::memory_order_relaxed); }
+    t_CKUINT histogram(int i) const { return m_histogram[i].load(std::memory_order_relaxed); }
+
+private:
+    static void bump(std::atomic<t_CKUINT> & counter, t_CKUINT n)
+    {
+        counter.store(counter.load(std::memory_order_relaxed) + n, std::memory_order_relaxed);
+    }
+
+    static int bucket(t_CKUINT ns)
+    {
+        t_CKUINT us = ns / 1000;
+        int i = 0;
+        while (us != 0 && i < NUM_BUCKETS - 1) {
+            us >>= 1;
+            i++;
+        }
+        return i;
+    }
+
+    std::atomic<t_CKUINT> m_calls;
+    std::atomic<t_CKUINT> m_frames;
+    std::atomic<t_CKUINT> m_total_ns;
+    std::atomic<t_CKUINT> m_max_ns;
+    std::atomic<t_CKUINT> m_overruns;
+    std::atomic<t_CKUINT> m_late;
+    std::atomic<t_CKUINT> m_histogram[NUM_BUCKETS];
+};
+
+#endif
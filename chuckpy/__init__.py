@@ -1,12 +1,17 @@
+"""
+ChucK bindings for Python.
+
+Importing chuckpy is cheap and has no side effects: the _chuck extension,
+NumPy and the submodules are only loaded when one of their names is first
+used, e.g. chuckpy.Chuck.
+"""
+import importlib
 import logging
 import platform
 import signal
 import sys
 from time import sleep
 
-import numpy
-from _chuck import Chuck, chuck_audio, ensurepow2, nextpow2, set_error_message_log_level
-
 logger = logging.getLogger('chuckpy')
 
 CHUCK_PARAM_SAMPLE_RATE = "SAMPLE_RATE"
@@ -34,6 +39,8 @@ CHUCK_PARAM_HINT_IS_REALTIME_AUDIO = "HINT_IS_REALTIME_AUDIO"
 
 NUM_CHANNELS_DEFAULT = 2
 NUM_BUFFERS_DEFAULT = 8
+# Fraction of the CPU that go(auto_tune=True) keeps free
+BUFFER_HEADROOM_DEFAULT = 0.5
 DEVICE_NUM_OUT_DEFAULT = 0
 DEVICE_NUM_IN_DEFAULT = 0
 
@@ -76,107 +83,6 @@ class ChuckError(Exception):
     pass
 
 
-chuck_sources = [
-    '''
-// run each stooge, or run three stooges concurrently
-// %> chuck moe++ larry++ curly++
-
-// impulse to filter to dac
-SndBuf i => BiQuad f => Gain g => JCRev r => dac;
-// second formant
-i => BiQuad f2 => g;
-// third formant
-i => BiQuad f3 => g;
-
-// set the filter's pole radius
-0.800 => f.prad; .995 => f2.prad; .995 => f3.prad;
-// set equal gain zeroes
-1 => f.eqzs; 1 => f2.eqzs; 1 => f3.eqzs;
-// initialize float variable
-0.0 => float v => float v2;
-// set filter gain
-.1 => f.gain; .1 => f2.gain; .01 => f3.gain;
-0.05 => r.mix;
-// load glottal pop
-"special:glot_pop" => i.read;
-// play
-1.0 => i.rate;
-  
-// infinite time-loop   
-while( true )
-{
-    // set the current sample/impulse
-    0 => i.pos;
-    // sweep the filter resonant frequency
-    250.0 + Math.sin(v*100.0)*20.0 => v2 => f.pfreq;
-    2290.0 + Math.sin(v*200.0)*50.0 => f2.pfreq;
-    3010.0 + Math.sin(v*300.0)*80.0 => f3.pfreq;
-    // increment v
-    v + .05 => v;
-    // gain
-    0.2 + Math.sin(v)*.1 => g.gain;
-    // advance time
-    (1000.0 + Math.random2f(-100.0, 100.0))::ms => now;
-}
-''',
-'''
-// run each stooge, or run three stooges concurrently
-// %> chuck moe++ larry++ curly++
-
-// impulse to filter to dac
-SndBuf i => NRev r => dac;
-
-// load glottal ooo
-"special:glot_ooo" => i.read;
-// play 
-//5.0 => i.rate;
-.1 => r.mix;
-
-0.0 => float v;
-  
-// infinite time-loop   
-while( true )
-{
-    // set the current sample/impulse
-    0 => i.pos;
-    // control gain
-    Math.cos(v) => i.gain;
-    // increment v
-    .05 +=> v;
-    // advance time
-    81.0::ms => now;
-}
-''',
-'''
-// run each stooge, or run three stooges concurrently
-// %> chuck moe larry curly
-
-// impulse to filter to dac
-Impulse i => BiQuad f => dac;
-// set the filter's pole radius
-.99 => f.prad; 
-// set equal gain zeros
-1 => f.eqzs;
-// initialize float variable
-0.0 => float v;
-// set filter gain
-.5 => f.gain;
-  
-// infinite time-loop   
-while( true )
-{
-    // set the current sample/impulse
-    1.0 => i.next;
-    // sweep the filter resonant frequency
-    Std.fabs(Math.sin(v)) * 4000.0 => f.pfreq;
-    // increment v
-    v + .1 => v;
-    // advance time
-    100::ms => now;
-}
-'''
-]
-
 def go(
     sample_rate=SAMPLE_RATE_DEFAULT,
     dac_chans=NUM_CHANNELS_DEFAULT,
@@ -185,29 +91,59 @@ def go(
     dac=0,
     adc=0,
     port=PORT_DEFAULT,
+    otf=False,
     dump=True,
     chugins=None,
     chugin_paths=None,
     use_realtime_audio=True,
     num_buffers=NUM_BUFFERS_DEFAULT,
     buffer_size=BUFFER_SIZE_DEFAULT,
-    log_level=CK_LOG_CORE
+    log_level=CK_LOG_CORE,
+    auto_tune=False,
+    headroom=BUFFER_HEADROOM_DEFAULT
 ):
+    from _chuck import Chuck, chuck_audio, ensurepow2, nextpow2, set_error_message_log_level
+    from chuckpy.examples import chuck_sources
+
+    # Only the blocking demo takes over Ctrl+C, never a plain import
+    signal.signal(signal.SIGINT, signalint_handler)
+
     if chugins is None:
         chugins = []
     if chugin_paths is None:
         chugin_paths = []
 
+    if auto_tune and use_realtime_audio:
+        # Replaces buffer_size and num_buffers with what the demo needs
+        from chuckpy.tuning import tune_buffers
+        tuning = tune_buffers(
+            chuck_sources,
+            sample_rate=sample_rate,
+            dac_chans=dac_chans,
+            adc_chans=adc_chans,
+            headroom=headroom,
+            params={
+                CHUCK_PARAM_USER_CHUGINS: chugins,
+                CHUCK_PARAM_USER_CHUGIN_DIRECTORIES: chugin_paths,
+            }
+        )
+        buffer_size = tuning.buffer_size
+        num_buffers = tuning.num_buffers
+        logger.info('Auto-tuned buffers: %s' % tuning.reason)
+
     if not ensurepow2(buffer_size):
         buffer_size = nextpow2(buffer_size)
 
     chuck = Chuck()
     chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, sample_rate)
-    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, dac_chans)
-    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, adc_chans)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, adc_chans)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, dac_chans)
     chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    # Shreds are managed in process with add_shred, replace_shred and
+    # remove_shred; the OTF server, listening on port, is only for the
+    # command line tools
     chuck.set_param(CHUCK_PARAM_OTF_PORT, port)
-    chuck.set_param(CHUCK_PARAM_OTF_ENABLE, True)
+    chuck.set_param(CHUCK_PARAM_OTF_ENABLE, otf)
     chuck.set_param(CHUCK_PARAM_DUMP_INSTRUCTIONS, dump)
     chuck.set_param(CHUCK_PARAM_AUTO_DEPEND, False)
     chuck.set_param(CHUCK_PARAM_DEPRECATE_LEVEL, 1)  # warn only
@@ -223,24 +159,21 @@ def go(
     if not chuck.init():
         raise ChuckError('Failed to initialize Chuck')
 
-    def callback(sample_in, sample_out, num_frames, num_in_chans, num_out_chans):
-        # print('in callback', sample_in, sample_out)
-        # print('here', sample_in, sample_out, num_frames, num_in_chans, num_out_chans)
-        chuck.run(sample_in, sample_out, num_frames)
-
     logger.info('Initializing Audio IO')
     logger.info('Probing \'%s\' audio subsystem...' % ('real-time' if use_realtime_audio else 'fake-time'))
     if use_realtime_audio:
         chuck_audio.m_adc_n = adc
         chuck_audio.m_dac_n = dac
         force_srate = sample_rate != SAMPLE_RATE_DEFAULT
+        # Bind the VM itself, so the audio callback runs it natively
+        # without acquiring the GIL
         initialized = chuck_audio.initialize(
             dac_chans,
             adc_chans,
             sample_rate,
             buffer_size,
             num_buffers,
-            callback,
+            chuck,
             force_srate
         )
         if not initialized:
@@ -251,11 +184,6 @@ def go(
     chuck.start()
     if not chuck_audio.start():
         raise ChuckError('Could not start chuck audio')
-
-    # RtAudio uses an interleaved data format, so we use the shape
-    # (buffer_size, dac_chans) rather than (dac_chans, buffer_size)
-    samples_in = numpy.zeros((buffer_size, dac_chans), numpy.single)
-    samples_out = numpy.zeros((buffer_size, adc_chans), numpy.single)
     while chuck.running():
         sleep(100)
 
@@ -265,4 +193,52 @@ def signalint_handler(sig, frame):
     sys.exit(0)
 
 
-signal.signal(signal.SIGINT, signalint_handler)
\ No newline at end of file
+# Names loaded on first use, and the modules they come from
+_LAZY_NAMES = {
+    'Chuck': '_chuck',
+    'ChuckMixer': '_chuck',
+    'SoundFileWriter': '_chuck',
+    'Tap': '_chuck',
+    'chuck_audio': '_chuck',
+    'dbtopow': '_chuck',
+    'dbtorms': '_chuck',
+    'ensurepow2': '_chuck',
+    'ftom': '_chuck',
+    'mtof': '_chuck',
+    'nextpow2': '_chuck',
+    'powtodb': '_chuck',
+    'rmstodb': '_chuck',
+    'set_error_message_log_level': '_chuck',
+    'chuck_sources': 'chuckpy.examples',
+    'RenderJob': 'chuckpy.farm',
+    'RenderResult': 'chuckpy.farm',
+    'RenderResults': 'chuckpy.farm',
+    'RenderTimeout': 'chuckpy.farm',
+    'render_many': 'chuckpy.farm',
+    'format_prometheus': 'chuckpy.stats',
+    'Session': 'chuckpy.session',
+    'open_writer': 'chuckpy.soundfile',
+    'render_to_file': 'chuckpy.soundfile',
+    'process_file': 'chuckpy.process',
+    'ChuckPool': 'chuckpy.pool',
+    'PoolTimeout': 'chuckpy.pool',
+    'BufferTuning': 'chuckpy.tuning',
+    'tune_buffers': 'chuckpy.tuning',
+    'SweepResult': 'chuckpy.sweeps',
+    'sweep': 'chuckpy.sweeps',
+}
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache it, so this is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
@@ -0,0 +1,284 @@
+"""
+Render batches of ChucK programs offline on a pool of worker processes.
+
+Each job renders into its own slice of a single shared memory block, so the
+audio is never pickled back to the parent process.
+"""
+import os
+from collections import deque, namedtuple
+from multiprocessing import Pipe, Process, shared_memory
+from multiprocessing.connection import wait
+from time import monotonic
+
+import numpy
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    NUM_CHANNELS_DEFAULT,
+    SAMPLE_RATE_DEFAULT,
+    Chuck,
+    ChuckError,
+)
+
+RENDER_BLOCK_SIZE_DEFAULT = 256
+
+
+class RenderJob(namedtuple('RenderJob', 'code seconds args sample_rate num_channels params')):
+    """
+    A ChucK program to render offline for the given number of seconds.
+
+    params maps additional CHUCK_PARAM_* names to values set before init().
+    """
+    def __new__(cls, code, seconds, args='', sample_rate=SAMPLE_RATE_DEFAULT,
+                num_channels=NUM_CHANNELS_DEFAULT, params=None):
+        return super(RenderJob, cls).__new__(cls, code, seconds, args, sample_rate, num_channels, params or {})
+
+    @property
+    def num_frames(self):
+        return int(self.seconds * self.sample_rate + 0.5)
+
+
+RenderResult = namedtuple('RenderResult', 'index job samples error')
+
+
+class RenderTimeout(ChuckError):
+    pass
+
+
+class RenderResults(object):
+    """
+    The results of render_many, in job order.
+
+    The samples of each result are (frames, num_channels) float32 views of
+    shared memory owned by this object. They are valid until close(), so copy
+    any you need longer. Closing while views are still referenced raises
+    BufferError.
+    """
+    def __init__(self, shm, results):
+        self._shm = shm
+        self._results = results
+
+    def __len__(self):
+        return len(self._results)
+
+    def __getitem__(self, index):
+        return self._results[index]
+
+    def __iter__(self):
+        return iter(self._results)
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._results = [result._replace(samples=None) for result in self._results]
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# The shared memory block of the batch this worker process renders for
+_worker_shm = None
+
+
+def _init_worker(shm_name):
+    global _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # The parent owns the block; don't let this process's resource
+        # tracker unlink it when the worker exits.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(_worker_shm._name, 'shared_memory')
+    except (ImportError, AttributeError):
+        pass
+
+
+def _render_job(index, job, offset, block_size):
+    """Render job into the shared block at byte offset; return (index, error)."""
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, job.sample_rate)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, job.num_channels)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, job.num_channels)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    for name, value in job.params.items():
+        if isinstance(value, float):
+            chuck.set_param_float(name, value)
+        else:
+            chuck.set_param(name, value)
+    if not chuck.init():
+        return index, ChuckError('Failed to initialize Chuck')
+    if not chuck.compile_code(job.code, job.args, 1):
+        return index, ChuckError('Failed to compile job %d' % index)
+    chuck.start()
+
+    samples = numpy.ndarray(
+        (job.num_frames, job.num_channels),
+        numpy.float32,
+        buffer=_worker_shm.buf,
+        offset=offset
+    )
+    chuck.render(out=samples, block_size=block_size)
+    return index, None
+
+
+def _worker_main(shm_name, conn):
+    """Render the jobs sent over conn, one at a time, until sent None."""
+    _init_worker(shm_name)
+    # Tell the parent the worker is ready, so start up isn't counted
+    # against the first job's timeout
+    conn.send(None)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        try:
+            result = _render_job(*task)
+        except Exception as e:
+            result = task[0], e
+        try:
+            conn.send(result)
+        except Exception as e:
+            # The exception didn't pickle
+            conn.send((task[0], ChuckError('%s: %s' % (type(e).__name__, result[1]))))
+
+
+class _Worker(object):
+    """A worker process and the job it is rendering, if any."""
+    def __init__(self, shm_name):
+        self.conn, child_conn = Pipe()
+        self.process = Process(target=_worker_main, args=(shm_name, child_conn), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.index = None
+        self.deadline = None
+
+    def submit(self, task, timeout):
+        self.index = task[0]
+        self.deadline = None if timeout is None else monotonic() + timeout
+        self.conn.send(task)
+
+    def done(self):
+        self.index = self.deadline = None
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def render_many(jobs, workers=None, timeout=None, progress=None, ordered=True,
+                block_size=RENDER_BLOCK_SIZE_DEFAULT):
+    """
+    Render RenderJobs in parallel worker processes, each with its own VM.
+
+    workers defaults to the number of CPUs. timeout limits each job's
+    render time in seconds: a job still rendering at its deadline fails with
+    RenderTimeout, and the worker process rendering it is killed and
+    replaced. progress, if given, is called as progress(num_done, num_jobs,
+    result) as each job finishes. Results are in job order, or in completion
+    order if ordered is False; a failed job has an error and no samples.
+    Returns RenderResults, which owns the shared memory holding the audio.
+    """
+    jobs = list(jobs)
+    offsets = []
+    size = 0
+    for job in jobs:
+        offsets.append(size)
+        size += job.num_frames * job.num_channels * numpy.dtype(numpy.float32).itemsize
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    pool = []
+    try:
+        results = [None] * len(jobs)
+        completed = []
+
+        def finish(index, error):
+            job = jobs[index]
+            samples = None
+            if error is None:
+                samples = numpy.ndarray(
+                    (job.num_frames, job.num_channels),
+                    numpy.float32,
+                    buffer=shm.buf,
+                    offset=offsets[index]
+                )
+            result = RenderResult(index, job, samples, error)
+            results[index] = result
+            completed.append(result)
+            if progress is not None:
+                progress(len(completed), len(jobs), result)
+
+        def replace(worker):
+            worker.kill()
+            pool[pool.index(worker)] = _Worker(shm.name)
+
+        # Longest jobs first, so short ones fill in at the end and every
+        # core stays busy until the batch is done
+        schedule = deque(sorted(range(len(jobs)), key=lambda i: jobs[i].num_frames, reverse=True))
+        pool.extend(_Worker(shm.name) for _ in range(min(workers or os.cpu_count(), len(jobs))))
+        while len(completed) < len(jobs):
+            for worker in pool:
+                if worker.ready and worker.index is None and schedule:
+                    i = schedule.popleft()
+                    worker.submit((i, jobs[i], offsets[i], block_size), timeout)
+
+            deadlines = [worker.deadline for worker in pool if worker.deadline is not None]
+            wait_timeout = max(min(deadlines) - monotonic(), 0) if deadlines else None
+            ready = wait([worker.conn for worker in pool], wait_timeout)
+            for worker in list(pool):
+                if worker.conn not in ready:
+                    continue
+                try:
+                    message = worker.conn.recv()
+                except EOFError:
+                    if worker.index is None:
+                        raise ChuckError('Worker process exited with code %s' % worker.process.exitcode)
+                    index = worker.index
+                    replace(worker)
+                    finish(index, ChuckError(
+                        'Worker process exited with code %s rendering job %d' % (worker.process.exitcode, index)
+                    ))
+                    continue
+                except Exception as e:
+                    # The worker's exception didn't unpickle
+                    message = worker.index, e
+                if message is None:
+                    worker.ready = True
+                else:
+                    worker.done()
+                    finish(*message)
+
+            now = monotonic()
+            for worker in list(pool):
+                if worker.deadline is not None and now >= worker.deadline:
+                    index = worker.index
+                    replace(worker)
+                    finish(index, RenderTimeout('Job %d timed out after %g seconds' % (index, timeout)))
+    except BaseException:
+        for worker in pool:
+            worker.kill()
+        # Drop every view of the block before closing it
+        results = completed = finish = None
+        shm.close()
+        shm.unlink()
+        raise
+    for worker in pool:
+        worker.close()
+    return RenderResults(shm, results if ordered else completed)
@@ -0,0 +1,129 @@
+"""
+A pool of initialized Chuck instances, kept warm between uses.
+
+Creating a VM means setting its parameters, init() (which loads chugins)
+and start(). A pool pays that once per VM; handing a VM back only costs a
+reset, which removes its shreds and globals.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    NUM_CHANNELS_DEFAULT,
+    SAMPLE_RATE_DEFAULT,
+    Chuck,
+    ChuckError,
+)
+
+
+class PoolTimeout(ChuckError):
+    pass
+
+
+class ChuckPool(object):
+    """
+    size started Chuck instances, all initialized with params, a dict of
+    CHUCK_PARAM_* names to values.
+
+        pool = ChuckPool(8, {CHUCK_PARAM_SAMPLE_RATE: 48000})
+        with pool.acquire() as chuck:
+            chuck.compile_code(code, '', 1)
+            samples = chuck.render(seconds=10)
+
+    Acquire and release from any thread. A VM must not be used after it
+    has been released.
+    """
+    def __init__(self, size, params=None):
+        self.params = {
+            CHUCK_PARAM_SAMPLE_RATE: SAMPLE_RATE_DEFAULT,
+            CHUCK_PARAM_INPUT_CHANNELS: NUM_CHANNELS_DEFAULT,
+            CHUCK_PARAM_OUTPUT_CHANNELS: NUM_CHANNELS_DEFAULT,
+            CHUCK_PARAM_VM_HALT: False,
+        }
+        self.params.update(params or {})
+        self.size = size
+        # Most recently used first, so busy periods reuse warm caches
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._acquires = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._resets = 0
+        self._reset_total = 0.0
+        self._reset_max = 0.0
+        for _ in range(size):
+            self._idle.put(self._make_chuck())
+
+    def _make_chuck(self):
+        chuck = Chuck()
+        for name, value in self.params.items():
+            if isinstance(value, float):
+                chuck.set_param_float(name, value)
+            else:
+                chuck.set_param(name, value)
+        if not chuck.init():
+            raise ChuckError('Failed to initialize Chuck')
+        chuck.start()
+        return chuck
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Borrow a VM for the duration of the with block, waiting up to
+        timeout seconds, or forever, for one to be free.
+        """
+        chuck = self.get(timeout)
+        try:
+            yield chuck
+        finally:
+            self.put(chuck)
+
+    def get(self, timeout=None):
+        """Take a VM out of the pool; give it back with put()."""
+        start = perf_counter()
+        try:
+            chuck = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeout('No Chuck was free within %g seconds' % timeout)
+        wait = perf_counter() - start
+        with self._lock:
+            self._acquires += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        return chuck
+
+    def put(self, chuck):
+        """Reset a VM taken with get() and return it to the pool."""
+        start = perf_counter()
+        chuck.reset()
+        elapsed = perf_counter() - start
+        with self._lock:
+            self._resets += 1
+            self._reset_total += elapsed
+            self._reset_max = max(self._reset_max, elapsed)
+        self._idle.put(chuck)
+
+    def idle(self):
+        return self._idle.qsize()
+
+    def metrics(self):
+        """Counts and times, in seconds, of acquires and resets so far."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': self._idle.qsize(),
+                'acquires': self._acquires,
+                'acquire_wait_total': self._wait_total,
+                'acquire_wait_avg': self._wait_total / self._acquires if self._acquires else 0.0,
+                'acquire_wait_max': self._wait_max,
+                'resets': self._resets,
+                'reset_total': self._reset_total,
+                'reset_avg': self._reset_total / self._resets if self._resets else 0.0,
+                'reset_max': self._reset_max,
+            }
@@ -0,0 +1,187 @@
+"""
+Run ChucK programs as effects over sound files.
+
+The source WAV file is memory-mapped and fed to the VM's adc a chunk at a
+time, without copying float32 samples; the dac output is streamed to the
+destination by a SoundFileWriter. Memory use stays constant however large
+the files are.
+"""
+import mmap
+import os
+import struct
+
+import numpy
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+    ChuckError,
+)
+from chuckpy.soundfile import BUFFER_FRAMES_DEFAULT, open_writer
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+CHUNK_FRAMES_DEFAULT = 65536
+
+
+class WavInfo(object):
+    def __init__(self, sample_rate, num_channels, format_tag, bits, offset, num_frames):
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.format_tag = format_tag
+        self.bits = bits
+        self.offset = offset
+        self.num_frames = num_frames
+
+    @property
+    def subtype(self):
+        if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            return 'float'
+        return 'pcm%d' % self.bits
+
+
+def read_wav_info(f):
+    """Parse the header of a RIFF/WAVE file, returning a WavInfo."""
+    riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+    if riff != b'RIFF' or wave != b'WAVE':
+        raise ChuckError('%s is not a WAV file' % getattr(f, 'name', f))
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ChuckError('%s has no data chunk' % f.name)
+        chunk_id, size = struct.unpack('<4sI', header)
+        if chunk_id == b'fmt ':
+            data = f.read(size + (size & 1))
+            format_tag, num_channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', data[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                format_tag = struct.unpack('<H', data[24:26])[0]
+            fmt = format_tag, num_channels, sample_rate, bits
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ChuckError('%s has no fmt chunk before its data' % f.name)
+            format_tag, num_channels, sample_rate, bits = fmt
+            if (format_tag, bits) not in ((WAVE_FORMAT_PCM, 16), (WAVE_FORMAT_PCM, 24), (WAVE_FORMAT_PCM, 32),
+                                          (WAVE_FORMAT_IEEE_FLOAT, 32), (WAVE_FORMAT_IEEE_FLOAT, 64)):
+                raise ChuckError('%s has unsupported sample format %#x/%d bits' % (f.name, format_tag, bits))
+            offset = f.tell()
+            available = os.fstat(f.fileno()).st_size - offset
+            # Streamed files may leave the size unset
+            if size == 0 or size == 0xFFFFFFFF or size > available:
+                size = available
+            frame_size = num_channels * bits // 8
+            return WavInfo(sample_rate, num_channels, format_tag, bits, offset, size // frame_size)
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _wav_frames(buf, info):
+    """A (frames, channels) view of the samples of a mapped WAV file."""
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        dtype = numpy.float32 if info.bits == 32 else numpy.float64
+    elif info.bits == 24:
+        # Converted chunk by chunk in _float_chunk
+        dtype = numpy.dtype((numpy.uint8, 3))
+    else:
+        dtype = numpy.int16 if info.bits == 16 else numpy.int32
+    count = info.num_frames * info.num_channels
+    samples = numpy.frombuffer(buf, dtype=dtype, count=count, offset=info.offset)
+    return samples.reshape((info.num_frames, info.num_channels) + samples.shape[1:])
+
+
+def _float_chunk(chunk, info, out, wide=None):
+    """
+    chunk as float32 samples Chuck.run accepts: chunk itself if it already
+    is aligned float32, otherwise converted into the start of out. 24-bit
+    chunks are widened in wide, whose first byte of each sample is zero.
+    """
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        if info.bits == 32 and chunk.flags.aligned:
+            return chunk
+        # float64, or float32 after an odd-sized chunk, is copied
+        out = out[:len(chunk)]
+        numpy.copyto(out, chunk, casting='same_kind')
+        return out
+    out = out[:len(chunk)]
+    if info.bits == 24:
+        # Sign-extend little-endian 3-byte samples into int32
+        wide = wide[:len(chunk)]
+        wide[..., 1:] = chunk
+        chunk = wide.view('<i4')[..., 0]
+        scale = 2.0 ** 31
+    else:
+        scale = 2.0 ** (info.bits - 1)
+    return numpy.multiply(chunk, 1.0 / scale, out=out, dtype=numpy.float32)
+
+
+def process_file(src, dst, code, args='', block_size=256, tail=0.0, num_channels=None, subtype=None,
+                 chunk_frames=CHUNK_FRAMES_DEFAULT, buffer_frames=BUFFER_FRAMES_DEFAULT, params=None):
+    """
+    Run code as an effect over the WAV file src, writing the dac to dst.
+
+    The VM runs at the sample rate of src, with its channels on the adc.
+    The output has num_channels channels, by default as many as src, and
+    the sample subtype of src unless subtype is given; tail seconds of
+    silence are processed after src ends, to let effects ring out. params
+    maps additional CHUCK_PARAM_* names to values set before init().
+    Returns the number of frames written.
+    """
+    with open(src, 'rb') as f:
+        info = read_wav_info(f)
+        num_channels = num_channels or info.num_channels
+
+        chuck = Chuck()
+        chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, info.sample_rate)
+        chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, info.num_channels)
+        chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, num_channels)
+        chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+        for name, value in (params or {}).items():
+            if isinstance(value, float):
+                chuck.set_param_float(name, value)
+            else:
+                chuck.set_param(name, value)
+        if not chuck.init():
+            raise ChuckError('Failed to initialize Chuck')
+        if not chuck.compile_code(code, args, 1):
+            raise ChuckError('Failed to compile effect')
+        chuck.start()
+
+        extension = os.path.splitext(dst)[1].lower()
+        writer = open_writer(
+            dst,
+            info.sample_rate,
+            num_channels,
+            format='aiff' if extension in ('.aif', '.aiff') else 'wav',
+            subtype=subtype or info.subtype,
+            buffer_frames=buffer_frames
+        )
+        num_tail_frames = int(tail * info.sample_rate + 0.5)
+        try:
+            if info.num_frames:
+                _process_mapped(chuck, writer, f, info, chunk_frames, block_size)
+            if num_tail_frames:
+                chuck.render_to(writer, num_frames=num_tail_frames, block_size=block_size)
+        finally:
+            writer.close()
+    return info.num_frames + num_tail_frames
+
+
+def _process_mapped(chuck, writer, f, info, chunk_frames, block_size):
+    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    frames = _wav_frames(buf, info)
+    # Scratch space for converted chunks, reused for each of them
+    chunk_frames = min(chunk_frames, info.num_frames)
+    out = numpy.empty((chunk_frames, info.num_channels), numpy.float32)
+    wide = numpy.zeros((chunk_frames, info.num_channels, 4), numpy.uint8) if info.bits == 24 else None
+    for start in range(0, info.num_frames, chunk_frames):
+        chunk = _float_chunk(frames[start:start + chunk_frames], info, out, wide)
+        chuck.render_to(writer, num_frames=len(chunk), input=chunk, block_size=block_size)
+    # Drop every view of the mapping before closing it; on error, it is
+    # unmapped once the views are collected
+    del frames, chunk
+    buf.close()
@@ -0,0 +1,324 @@
+"""
+Run ChucK VMs from asyncio.
+
+The thread running a session's VM writes events to a pipe that the event
+loop watches, so waiting on shreds and stats never polls and one event loop
+can manage many VMs.
+"""
+import asyncio
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from chuckpy import (
+    BUFFER_SIZE_DEFAULT,
+    CHUCK_PARAM_HINT_IS_REALTIME_AUDIO,
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    NUM_BUFFERS_DEFAULT,
+    NUM_CHANNELS_DEFAULT,
+    SAMPLE_RATE_DEFAULT,
+    Chuck,
+    ChuckError,
+    chuck_audio,
+    ensurepow2,
+    nextpow2,
+)
+
+RENDER_BLOCK_SIZE_DEFAULT = 256
+
+# Events written by the VM's ShredNotifier, as (kind, value) uint64 pairs
+EVENT_SHRED_DONE = 1
+EVENT_TICK = 2
+EVENT_APPLIED = 3
+_EVENT = struct.Struct('=QQ')
+
+
+class Session(object):
+    """
+    A Chuck instance managed from an asyncio event loop.
+
+        async with Session() as session:
+            shred_ids = await session.compile(code)
+            await session.wait_for_shred(shred_ids[0])
+
+    A realtime session binds its VM to chuck_audio and starts the audio
+    device, so only one can be open at a time. Otherwise the VM only
+    advances while render is awaited. Calls that use the VM run one at a
+    time, in order, on a thread of the session's own.
+
+    params maps additional CHUCK_PARAM_* names to values set before init().
+    """
+    def __init__(
+        self,
+        sample_rate=SAMPLE_RATE_DEFAULT,
+        dac_chans=NUM_CHANNELS_DEFAULT,
+        adc_chans=NUM_CHANNELS_DEFAULT,
+        realtime=True,
+        dac=0,
+        adc=0,
+        buffer_size=BUFFER_SIZE_DEFAULT,
+        num_buffers=NUM_BUFFERS_DEFAULT,
+        stats_interval=1.0,
+        params=None
+    ):
+        self.sample_rate = sample_rate
+        self.dac_chans = dac_chans
+        self.adc_chans = adc_chans
+        self.realtime = realtime
+        self.dac = dac
+        self.adc = adc
+        self.buffer_size = buffer_size if ensurepow2(buffer_size) else nextpow2(buffer_size)
+        self.num_buffers = num_buffers
+        self.stats_interval = stats_interval
+        self.params = params or {}
+        self.chuck = None
+        self._loop = None
+        self._executor = None
+        self._read_fd = None
+        self._write_fd = None
+        self._shred_waiters = {}
+        # (command number, future) for each wait on shred commands applied
+        self._applied_waiters = []
+        # Ids of shreds added by the audio thread, by add_shred command number
+        self._added = {}
+        self._stats_queues = []
+        self._audio_started = False
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self):
+        if self.chuck is not None:
+            raise ChuckError('Session is already open')
+        self._loop = asyncio.get_running_loop()
+
+        chuck = Chuck()
+        chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, self.sample_rate)
+        chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, self.adc_chans)
+        chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, self.dac_chans)
+        chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+        chuck.set_param(CHUCK_PARAM_HINT_IS_REALTIME_AUDIO, self.realtime)
+        for name, value in self.params.items():
+            if isinstance(value, float):
+                chuck.set_param_float(name, value)
+            else:
+                chuck.set_param(name, value)
+        if not chuck.init():
+            raise ChuckError('Failed to initialize Chuck')
+
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+        self._loop.add_reader(self._read_fd, self._read_events)
+        chuck.set_notify_fd(self._write_fd, 0)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.chuck = chuck
+        chuck.start()
+
+        if self.realtime:
+            chuck_audio.m_adc_n = self.adc
+            chuck_audio.m_dac_n = self.dac
+            # Bind the VM itself, so the audio callback runs it natively
+            initialized = chuck_audio.initialize(
+                self.dac_chans,
+                self.adc_chans,
+                self.sample_rate,
+                self.buffer_size,
+                self.num_buffers,
+                chuck,
+                self.sample_rate != SAMPLE_RATE_DEFAULT
+            )
+            if not initialized:
+                await self.close()
+                raise ChuckError('Cannot initialize Audio IO')
+            self._audio_started = True
+            if not chuck_audio.start():
+                await self.close()
+                raise ChuckError('Could not start chuck audio')
+
+    async def close(self):
+        if self.chuck is None:
+            return
+        if self._audio_started:
+            chuck_audio.stop()
+            chuck_audio.shutdown()
+            self._audio_started = False
+        # Wait for calls already queued on the VM's thread
+        await self._loop.run_in_executor(self._executor, int)
+        self._executor.shutdown()
+
+        # No more events are written once this returns
+        self.chuck.set_notify_fd(-1, 0)
+        self._loop.remove_reader(self._read_fd)
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+        self._read_fd = self._write_fd = None
+
+        for waiters in self._shred_waiters.values():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(ChuckError('Session closed'))
+        self._shred_waiters.clear()
+        for number, waiter in self._applied_waiters:
+            if not waiter.done():
+                waiter.set_exception(ChuckError('Session closed'))
+        self._applied_waiters = []
+        for queue in self._stats_queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self.chuck = None
+
+    def _call(self, fn, *args, **kwargs):
+        if self.chuck is None:
+            raise ChuckError('Session is not open')
+        return self._loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def compile(self, code, args='', count=1):
+        """Compile code and spork count shreds of it; return their ids."""
+        if not self.realtime:
+            shred_ids = await self._call(self.chuck.compile_code, code, args, count)
+            if not shred_ids:
+                raise ChuckError('Failed to compile code')
+            return shred_ids
+
+        # The audio thread is running the VM, so it sporks the shreds itself
+        # at the start of its next block and reports their ids with a status
+        numbers = []
+        for _ in range(max(count, 1)):
+            number = await self._call(self.chuck.add_shred, code, args)
+            if not number:
+                raise ChuckError('Failed to compile code')
+            numbers.append(number)
+        await self._wait_applied(await self._call(self.chuck.request_status))
+        status = await self._call(self.chuck.shred_status)
+        # Other compiles may be waiting on ids collected with these
+        self._added.update(status['added'])
+        return [self._added.pop(number) for number in numbers]
+
+    async def replace(self, shred_id, code, args='', fade=0.0):
+        """
+        Replace the shred with id shred_id by a shred of code, keeping its
+        id, at the start of the next block. With fade, the output fades out
+        over fade seconds before the swap and back in after it.
+        """
+        fade_frames = int(fade * self.sample_rate)
+        if not await self._call(self.chuck.replace_shred, shred_id, code, args, fade_frames):
+            raise ChuckError('Failed to compile code')
+
+    async def remove(self, shred_id, fade=0.0):
+        """Remove the shred with id shred_id, fading like replace."""
+        await self._call(self.chuck.remove_shred, shred_id, int(fade * self.sample_rate))
+
+    async def render(self, seconds=None, num_frames=None, input=None, out=None,
+                     block_size=RENDER_BLOCK_SIZE_DEFAULT):
+        """
+        Advance the VM of an offline session, returning its output like
+        Chuck.render. The event loop keeps running meanwhile.
+        """
+        if self.realtime:
+            raise ChuckError('The audio device runs the VM of a realtime session')
+        return await self._call(
+            self.chuck.render,
+            seconds=seconds,
+            num_frames=num_frames,
+            input=input,
+            out=out,
+            block_size=block_size
+        )
+
+    async def wait_for_shred(self, shred_id):
+        """Wait until the shred with id shred_id has finished."""
+        if self.chuck is None:
+            raise ChuckError('Session is not open')
+        waiter = self._loop.create_future()
+        self._shred_waiters.setdefault(shred_id, []).append(waiter)
+        self.chuck.watch_shred(shred_id)
+        if not self.realtime:
+            # The VM is idle between renders, so nothing would report a
+            # shred that has already finished
+            if not await self._call(self.chuck.shred_running, shred_id):
+                self._shred_done(shred_id)
+        return await waiter
+
+    async def _wait_applied(self, number):
+        """Wait until number shred commands have been applied."""
+        waiter = self._loop.create_future()
+        self._applied_waiters.append((number, waiter))
+        self.chuck.watch_applied(number)
+        # It may have been applied before the watch
+        self._commands_applied(self.chuck.shred_control_stats()['applied'])
+        return await waiter
+
+    def stats(self):
+        """Chuck.stats() of the VM, plus chuck_audio.stats() if realtime."""
+        stats = {'chuck': self.chuck.stats()}
+        if self.realtime:
+            stats['audio'] = chuck_audio.stats()
+        return stats
+
+    async def stats_events(self):
+        """
+        Yield stats() every stats_interval seconds of audio the VM computes,
+        until the session closes. Stats are dropped, not queued, while the
+        consumer is busy.
+        """
+        queue = asyncio.Queue(maxsize=1)
+        self._stats_queues.append(queue)
+        if len(self._stats_queues) == 1:
+            self.chuck.set_notify_fd(self._write_fd, max(int(self.stats_interval * self.sample_rate), 1))
+        try:
+            while True:
+                stats = await queue.get()
+                if stats is None:
+                    return
+                yield stats
+        finally:
+            self._stats_queues.remove(queue)
+            if not self._stats_queues and self.chuck is not None:
+                self.chuck.set_notify_fd(self._write_fd, 0)
+
+    def _read_events(self):
+        try:
+            data = os.read(self._read_fd, _EVENT.size * 256)
+        except BlockingIOError:
+            return
+        tick = False
+        for kind, value in _EVENT.iter_unpack(data):
+            if kind == EVENT_SHRED_DONE:
+                self._shred_done(value)
+            elif kind == EVENT_TICK:
+                tick = True
+            elif kind == EVENT_APPLIED:
+                self._commands_applied(value)
+        if tick and self._stats_queues:
+            stats = self.stats()
+            for queue in self._stats_queues:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(stats)
+
+    def _commands_applied(self, applied):
+        waiting = []
+        for number, waiter in self._applied_waiters:
+            if number > applied:
+                waiting.append((number, waiter))
+            elif not waiter.done():
+                waiter.set_result(None)
+        self._applied_waiters = waiting
+        if waiting:
+            # Only the lowest number is watched at a time
+            self.chuck.watch_applied(min(number for number, waiter in waiting))
+
+    def _shred_done(self, shred_id):
+        for waiter in self._shred_waiters.pop(shred_id, ()):
+            if not waiter.done():
+                waiter.set_result(None)
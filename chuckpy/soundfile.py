@@ -0,0 +1,71 @@
+"""
+Stream audio to sound files through ChucK's bundled libsndfile.
+
+A SoundFileWriter buffers a fixed number of frames and writes them from a
+background thread, so Chuck.render_to can render hours of audio to disk in
+constant memory.
+"""
+from _chuck import SoundFileWriter
+
+from chuckpy import (
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+)
+
+# libsndfile major formats and sample subtypes. The libsndfile bundled with
+# ChucK has no FLAC codec.
+FORMATS = {
+    'wav': 0x010000,
+    'aiff': 0x020000,
+}
+SUBTYPES = {
+    'pcm16': 0x0002,
+    'pcm24': 0x0003,
+    'pcm32': 0x0004,
+    'float': 0x0006,
+}
+
+BUFFER_FRAMES_DEFAULT = 65536
+NUM_BUFFERS_DEFAULT = 4
+
+
+def open_writer(path, sample_rate, num_channels, format='wav', subtype='pcm16',
+                buffer_frames=BUFFER_FRAMES_DEFAULT, num_buffers=NUM_BUFFERS_DEFAULT):
+    """
+    Open path for writing as a SoundFileWriter.
+
+    At most num_buffers * buffer_frames frames are held in memory; writers
+    wait for the disk beyond that. Raises OSError if the file can't be opened.
+    """
+    try:
+        sf_format = FORMATS[format] | SUBTYPES[subtype]
+    except KeyError:
+        raise ValueError('Unsupported format %r/%r, choose from %s and %s' % (
+            format, subtype, ', '.join(sorted(FORMATS)), ', '.join(sorted(SUBTYPES))))
+    writer = SoundFileWriter(path, sample_rate, num_channels, sf_format, buffer_frames, num_buffers)
+    if writer.failed():
+        raise OSError('Cannot open %s: %s' % (path, writer.error()))
+    return writer
+
+
+def render_to_file(chuck, path, seconds=None, num_frames=None, input=None, format='wav', subtype='pcm16',
+                   block_size=256, buffer_frames=BUFFER_FRAMES_DEFAULT, num_buffers=NUM_BUFFERS_DEFAULT):
+    """
+    Render an initialized Chuck offline for the given duration straight to
+    the sound file at path. Returns the number of frames rendered.
+    """
+    writer = open_writer(
+        path,
+        chuck.get_param_int(CHUCK_PARAM_SAMPLE_RATE),
+        chuck.get_param_int(CHUCK_PARAM_OUTPUT_CHANNELS),
+        format=format,
+        subtype=subtype,
+        buffer_frames=buffer_frames,
+        num_buffers=num_buffers
+    )
+    try:
+        num_frames = chuck.render_to(writer, seconds=seconds, num_frames=num_frames, input=input,
+                                     block_size=block_size)
+    finally:
+        writer.close()
+    return num_frames
@@ -0,0 +1,43 @@
+"""
+Export the dicts returned by Chuck.stats() and chuck_audio.stats() in the
+Prometheus text exposition format.
+"""
+
+COUNTERS = ('calls', 'frames', 'overruns', 'late')
+
+
+def _format_labels(labels, **extra):
+    items = sorted(labels.items()) + sorted(extra.items())
+    if not items:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                             for key, value in items)
+
+
+def format_prometheus(stats, name, labels=None):
+    """
+    Format stats as Prometheus metrics named name_*, e.g. chuckpy_audio_calls_total,
+    with the block durations as the histogram name_block_seconds.
+    """
+    labels = labels or {}
+    lines = []
+    for counter in COUNTERS:
+        if counter in stats:
+            metric = '%s_%s_total' % (name, counter)
+            lines.append('# TYPE %s counter' % metric)
+            lines.append('%s%s %d' % (metric, _format_labels(labels), stats[counter]))
+
+    metric = '%s_block_max_seconds' % name
+    lines.append('# TYPE %s gauge' % metric)
+    lines.append('%s%s %.9f' % (metric, _format_labels(labels), stats['max_ns'] / 1e9))
+
+    metric = '%s_block_seconds' % name
+    lines.append('# TYPE %s histogram' % metric)
+    cumulative = 0
+    for count, bound in zip(stats['histogram'], stats['histogram_bounds_us']):
+        cumulative += count
+        le = '+Inf' if bound == float('inf') else '%g' % (bound / 1e6)
+        lines.append('%s_bucket%s %d' % (metric, _format_labels(labels, le=le), cumulative))
+    lines.append('%s_sum%s %.9f' % (metric, _format_labels(labels), stats['total_ns'] / 1e9))
+    lines.append('%s_count%s %d' % (metric, _format_labels(labels), stats['calls']))
+    return '\n'.join(lines) + '\n'
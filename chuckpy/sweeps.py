@@ -0,0 +1,116 @@
+"""
+Render one ChucK program for many parameter values at once.
+
+Variants are spread over worker threads, each with a warm VM from a
+ChuckPool. Chuck.render releases the GIL, so the threads render in
+parallel, each straight into its own slice of one preallocated array.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+from chuckpy import (
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    NUM_CHANNELS_DEFAULT,
+    SAMPLE_RATE_DEFAULT,
+    ChuckError,
+    ChuckPool,
+)
+from chuckpy.farm import RENDER_BLOCK_SIZE_DEFAULT
+
+# How often a variant is checked for having no shreds left, in frames
+FINISH_CHECK_FRAMES = 4096
+
+
+SweepResult = namedtuple('SweepResult', 'samples finished')
+SweepResult.__doc__ = """
+The output of sweep. samples is a (variants, frames, channels) float32
+array; finished holds, for each variant, the number of frames rendered
+before its last shred exited, to within FINISH_CHECK_FRAMES, or frames if
+it was still running at the end.
+"""
+
+
+def _render_variant(pool, code, names, values, samples, block_size):
+    with pool.acquire() as chuck:
+        if names is None:
+            args = ':'.join(repr(float(value)) for value in values)
+        else:
+            args = ''
+            # Applied at the start of the first block, before the shred runs
+            chuck.set_globals(dict(zip(names, (float(value) for value in values))))
+        # Compiled the first time each VM sees the code, then cached
+        if not chuck.compile_code(code, args, 1):
+            raise ChuckError('Failed to compile code')
+        num_frames = len(samples)
+        for start in range(0, num_frames, FINISH_CHECK_FRAMES):
+            end = min(start + FINISH_CHECK_FRAMES, num_frames)
+            chuck.render(out=samples[start:end], block_size=block_size)
+            if not chuck.shreds():
+                # Nothing is left to make sound; skip computing the silence
+                samples[end:] = 0
+                return end
+        return num_frames
+
+
+def sweep(
+    code,
+    params,
+    seconds,
+    names=None,
+    sample_rate=SAMPLE_RATE_DEFAULT,
+    num_channels=NUM_CHANNELS_DEFAULT,
+    workers=None,
+    block_size=RENDER_BLOCK_SIZE_DEFAULT,
+    chuck_params=None,
+    out=None
+):
+    """
+    Render code for seconds once per row of params, a (variants, P) array,
+    and return a SweepResult.
+
+    With names, a list of P global names, each row sets those globals
+    before the program starts; otherwise the row is passed as the shred's
+    arguments, read with Std.atof(me.arg(i)). workers defaults to the
+    number of CPUs, and chuck_params maps additional CHUCK_PARAM_* names to
+    values set before init(). out, if given, is a C-contiguous (variants,
+    frames, num_channels) float32 array to fill.
+    """
+    params = numpy.asarray(params, numpy.float64)
+    if params.ndim == 1:
+        params = params[:, numpy.newaxis]
+    if params.ndim != 2:
+        raise ValueError('params must be a (variants, P) array')
+    if names is not None and len(names) != params.shape[1]:
+        raise ValueError('names must have one entry per column of params')
+    num_variants = params.shape[0]
+    num_frames = int(seconds * sample_rate + 0.5)
+    shape = (num_variants, num_frames, num_channels)
+    if out is None:
+        out = numpy.empty(shape, numpy.float32)
+    elif out.shape != shape or out.dtype != numpy.float32 or not out.flags.c_contiguous:
+        raise ValueError('out must be a C-contiguous float32 array of shape %r' % (shape,))
+    finished = numpy.full(num_variants, num_frames, numpy.int64)
+    if num_variants == 0:
+        return SweepResult(out, finished)
+
+    pool_params = {
+        CHUCK_PARAM_SAMPLE_RATE: sample_rate,
+        CHUCK_PARAM_INPUT_CHANNELS: num_channels,
+        CHUCK_PARAM_OUTPUT_CHANNELS: num_channels,
+    }
+    pool_params.update(chuck_params or {})
+    num_workers = min(workers or os.cpu_count() or 1, num_variants)
+    pool = ChuckPool(num_workers, pool_params)
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(_render_variant, pool, code, names, params[i], out[i], block_size)
+            for i in range(num_variants)
+        ]
+        for i, future in enumerate(futures):
+            finished[i] = future.result()
+    return SweepResult(out, finished)
@@ -0,0 +1,150 @@
+"""
+Choose realtime buffer settings from the measured cost of a program.
+
+The program is rendered offline on a VM of its own for a short calibration
+window at every power-of-two block size in range. The smallest size whose
+blocks compute within the CPU budget left by the target headroom wins; the
+buffer count then covers the slowest block seen at that size.
+"""
+import math
+from collections import namedtuple
+from time import perf_counter
+
+import numpy
+
+from chuckpy import (
+    BUFFER_HEADROOM_DEFAULT,
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    NUM_BUFFERS_DEFAULT,
+    NUM_CHANNELS_DEFAULT,
+    SAMPLE_RATE_DEFAULT,
+    Chuck,
+    ChuckError,
+    ensurepow2,
+    nextpow2,
+)
+
+CALIBRATION_SECONDS_DEFAULT = 0.25
+MIN_BUFFER_SIZE_DEFAULT = 16
+MAX_BUFFER_SIZE_DEFAULT = 4096
+
+# The share of blocks that must compute within budget
+PERCENTILE = 99
+
+
+BufferTuning = namedtuple('BufferTuning', 'buffer_size num_buffers cost_per_frame_ns loads reason')
+BufferTuning.__doc__ = """
+The settings chosen by tune_buffers. loads maps every block size measured
+to the 99th percentile of its block compute times as a fraction of a
+block's duration; reason explains the choice.
+"""
+
+
+def _pow2(n):
+    return n if ensurepow2(n) else nextpow2(n)
+
+
+def _calibration_chuck(code, count, sample_rate, dac_chans, adc_chans, params):
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, sample_rate)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, adc_chans)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, dac_chans)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    for name, value in (params or {}).items():
+        if isinstance(value, float):
+            chuck.set_param_float(name, value)
+        else:
+            chuck.set_param(name, value)
+    if not chuck.init():
+        raise ChuckError('Failed to initialize Chuck')
+    for source in ([code] if isinstance(code, str) else code):
+        if not chuck.compile_code(source, '', count):
+            raise ChuckError('Failed to compile code')
+    chuck.start()
+    return chuck
+
+
+def _block_costs(chuck, block_size, num_blocks, dac_chans):
+    """Compute time of each of num_blocks blocks of block_size frames, in seconds."""
+    output = numpy.zeros((block_size, dac_chans), numpy.float32)
+    costs = numpy.empty(num_blocks)
+    # Let the first block at this size allocate before anything is timed
+    chuck.run(None, output, block_size)
+    for i in range(num_blocks):
+        start = perf_counter()
+        chuck.run(None, output, block_size)
+        costs[i] = perf_counter() - start
+    return costs
+
+
+def tune_buffers(
+    code,
+    sample_rate=SAMPLE_RATE_DEFAULT,
+    dac_chans=NUM_CHANNELS_DEFAULT,
+    adc_chans=NUM_CHANNELS_DEFAULT,
+    count=1,
+    headroom=BUFFER_HEADROOM_DEFAULT,
+    seconds=CALIBRATION_SECONDS_DEFAULT,
+    min_buffer_size=MIN_BUFFER_SIZE_DEFAULT,
+    max_buffer_size=MAX_BUFFER_SIZE_DEFAULT,
+    max_num_buffers=NUM_BUFFERS_DEFAULT,
+    params=None
+):
+    """
+    Measure code, a ChucK program or a list of them with count shreds each,
+    and return a BufferTuning with the smallest power-of-two buffer_size
+    that leaves headroom, the fraction of the CPU to keep free, in 99% of
+    blocks.
+
+    Each block size is rendered for seconds of audio, offline, on a VM set
+    up like the realtime one, with params mapping additional CHUCK_PARAM_*
+    names to values set before init().
+    """
+    if not 0 <= headroom < 1:
+        raise ValueError('headroom must be at least 0 and less than 1')
+    min_buffer_size = _pow2(max(min_buffer_size, 1))
+    max_buffer_size = max(_pow2(max_buffer_size), min_buffer_size)
+    chuck = _calibration_chuck(code, count, sample_rate, dac_chans, adc_chans, params)
+
+    loads = {}
+    buffer_size = min_buffer_size
+    while True:
+        period = buffer_size / sample_rate
+        num_blocks = max(int(seconds / period), 8)
+        costs = _block_costs(chuck, buffer_size, num_blocks, dac_chans)
+        loads[buffer_size] = numpy.percentile(costs, PERCENTILE) / period
+        if loads[buffer_size] <= 1 - headroom or buffer_size >= max_buffer_size:
+            break
+        buffer_size *= 2
+
+    load = loads[buffer_size]
+    budget = period * (1 - headroom)
+    # A block that runs over budget eats into the ones queued behind it;
+    # queue enough that the slowest one seen is covered
+    slowest = costs.max()
+    num_buffers = min(max(int(math.ceil(slowest / budget)) + 1, 2), max_num_buffers)
+    cost_per_frame_ns = costs.sum() / (num_blocks * buffer_size) * 1e9
+
+    if load <= 1 - headroom:
+        reason = (
+            'buffer_size %d: %d%% of blocks computed in %.0f%% of their %.2f ms, within the %.0f%% '
+            'budget left by %.0f%% headroom' % (
+                buffer_size, PERCENTILE, load * 100, period * 1000, (1 - headroom) * 100, headroom * 100
+            )
+        )
+        if buffer_size > min_buffer_size:
+            reason += '; %d frames took %.0f%%' % (buffer_size // 2, loads[buffer_size // 2] * 100)
+    else:
+        reason = (
+            'buffer_size %d: the largest allowed, but %d%% of blocks took %.0f%% of their %.2f ms, '
+            'over the %.0f%% budget' % (buffer_size, PERCENTILE, load * 100, period * 1000, (1 - headroom) * 100)
+        )
+    reason += '. num_buffers %d: the slowest block took %.0f%% of the budget' % (
+        num_buffers, slowest / budget * 100
+    )
+    if slowest > budget * (num_buffers - 1):
+        reason += ', more than %d buffers can absorb' % num_buffers
+    return BufferTuning(buffer_size, num_buffers, cost_per_frame_ns, loads, reason)
@@ -1,3 +1,4 @@
+import os
 import platform
 
 import subprocess
@@ -101,6 +102,7 @@ INCLUDE_DIRS = [
     'chuck-external/src',
     'chuck-external/src/core',
     'chuck-external/src/core/lo',
+    'chuck_bindings/cpp',
     numpy.get_include(),
 ]
 
@@ -115,11 +117,12 @@ EXTENSION_CONFIG = dict(
 CFLAGS_DARWIN = ['-D__MACOSX_CORE__']
 
 
-DEBUG = True
+# Build with debug symbols and no optimization with CHUCKPY_DEBUG=1.
+# Leave it off when benchmarking.
+DEBUG = os.environ.get('CHUCKPY_DEBUG') == '1'
 if DEBUG:
     CFLAGS_DARWIN += ['-g', '-O0']
     # Build chuck with debug symbols
-    import os
     os.environ['CHUCK_DEBUG'] = '1'
 
 
@@ -0,0 +1,27 @@
+"""
+Importing chuckpy must stay free of side effects. How long it takes is
+checked by benchmarks/import_time.py.
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+PROBE = '''
+import json, signal, sys
+import chuckpy
+print(json.dumps({
+    'modules': sorted(name for name in ('_chuck', 'numpy') if name in sys.modules),
+    'default_sigint': signal.getsignal(signal.SIGINT) is signal.default_int_handler,
+}))
+'''
+
+
+def test_import_has_no_side_effects():
+    # A fresh interpreter, since this one may already have loaded either
+    output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=ROOT)
+    result = json.loads(output)
+    assert result['modules'] == []
+    assert result['default_sigint']
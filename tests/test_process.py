@@ -0,0 +1,177 @@
+"""
+process_file's WAV parsing and sample conversion, on files built here.
+"""
+import mmap
+import struct
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('_chuck')
+
+from chuckpy import ChuckError  # noqa: E402
+from chuckpy.process import (  # noqa: E402
+    WAVE_FORMAT_EXTENSIBLE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_PCM,
+    _float_chunk,
+    _wav_frames,
+    read_wav_info,
+)
+
+SAMPLE_RATE = 44100
+NUM_CHANNELS = 2
+NUM_FRAMES = 100
+
+
+def chunk(chunk_id, data, size=None):
+    size = len(data) if size is None else size
+    return struct.pack('<4sI', chunk_id, size) + data + b'\0' * (len(data) & 1)
+
+
+def fmt_chunk(format_tag, bits, num_channels=NUM_CHANNELS, extensible=False):
+    block_align = num_channels * bits // 8
+    data = struct.pack('<HHIIHH', WAVE_FORMAT_EXTENSIBLE if extensible else format_tag, num_channels,
+                       SAMPLE_RATE, SAMPLE_RATE * block_align, block_align, bits)
+    if extensible:
+        data += struct.pack('<HHIH14s', 22, bits, 0, format_tag, b'\0' * 14)
+    return chunk(b'fmt ', data)
+
+
+def write_wav(path, chunks):
+    body = b'WAVE' + b''.join(chunks)
+    path.write_bytes(struct.pack('<4sI', b'RIFF', len(body)) + body)
+    return path
+
+
+def pcm_bytes(values, bits):
+    """Little-endian signed bits-bit samples."""
+    size = bits // 8
+    return b''.join(int(value).to_bytes(size, 'little', signed=True) for value in values.ravel())
+
+
+def expected_values(bits):
+    """Samples spanning the whole range of a bits-bit int, extremes included."""
+    top = 2 ** (bits - 1)
+    values = numpy.linspace(-top, top - 1, NUM_FRAMES * NUM_CHANNELS).round().astype(numpy.int64)
+    return values.reshape(NUM_FRAMES, NUM_CHANNELS)
+
+
+def read_floats(path, chunk_frames=32):
+    """Convert path a chunk at a time, as process_file does."""
+    with open(path, 'rb') as f:
+        info = read_wav_info(f)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            frames = _wav_frames(buf, info)
+            out = numpy.empty((chunk_frames, info.num_channels), numpy.float32)
+            wide = numpy.zeros((chunk_frames, info.num_channels, 4), numpy.uint8) if info.bits == 24 else None
+            chunks = []
+            for start in range(0, info.num_frames, chunk_frames):
+                converted = _float_chunk(frames[start:start + chunk_frames], info, out, wide)
+                assert converted.dtype == numpy.float32
+                assert converted.flags.aligned and converted.flags.c_contiguous
+                chunks.append(converted.copy())
+            del frames, converted
+        finally:
+            buf.close()
+    return info, numpy.concatenate(chunks)
+
+
+@pytest.mark.parametrize('bits', [16, 24, 32])
+@pytest.mark.parametrize('extensible', [False, True])
+def test_pcm(tmp_path, bits, extensible):
+    values = expected_values(bits)
+    path = write_wav(tmp_path / 'pcm.wav', [
+        fmt_chunk(WAVE_FORMAT_PCM, bits, extensible=extensible),
+        chunk(b'data', pcm_bytes(values, bits)),
+    ])
+    info, samples = read_floats(path)
+    assert (info.sample_rate, info.num_channels, info.format_tag, info.bits) == \
+        (SAMPLE_RATE, NUM_CHANNELS, WAVE_FORMAT_PCM, bits)
+    assert info.num_frames == NUM_FRAMES
+    assert info.subtype == 'pcm%d' % bits
+    numpy.testing.assert_allclose(samples, values / 2.0 ** (bits - 1), rtol=1e-6, atol=0)
+    assert samples.min() == -1.0
+
+
+@pytest.mark.parametrize('dtype', [numpy.float32, numpy.float64])
+def test_float(tmp_path, dtype):
+    values = numpy.linspace(-1, 1, NUM_FRAMES * NUM_CHANNELS).reshape(NUM_FRAMES, NUM_CHANNELS)
+    bits = numpy.dtype(dtype).itemsize * 8
+    path = write_wav(tmp_path / 'float.wav', [
+        fmt_chunk(WAVE_FORMAT_IEEE_FLOAT, bits),
+        chunk(b'data', values.astype('<f%d' % (bits // 8)).tobytes()),
+    ])
+    info, samples = read_floats(path)
+    assert info.subtype == 'float'
+    numpy.testing.assert_array_equal(samples, values.astype(numpy.float32))
+
+
+def test_float32_read_in_place(tmp_path):
+    values = numpy.ones((NUM_FRAMES, NUM_CHANNELS), '<f4')
+    path = write_wav(tmp_path / 'float.wav', [fmt_chunk(WAVE_FORMAT_IEEE_FLOAT, 32), chunk(b'data', values.tobytes())])
+    with open(path, 'rb') as f:
+        info = read_wav_info(f)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    frames = _wav_frames(buf, info)
+    out = numpy.empty((NUM_FRAMES, NUM_CHANNELS), numpy.float32)
+    assert _float_chunk(frames, info, out) is frames
+    del frames
+    buf.close()
+
+
+@pytest.mark.parametrize('format_tag, bits', [(WAVE_FORMAT_PCM, 16), (WAVE_FORMAT_PCM, 24),
+                                              (WAVE_FORMAT_IEEE_FLOAT, 32), (WAVE_FORMAT_IEEE_FLOAT, 64)])
+def test_odd_chunk_before_data(tmp_path, format_tag, bits):
+    # A chunk of odd size is padded to an even one, which leaves the data
+    # unaligned for 32- and 64-bit samples
+    if format_tag == WAVE_FORMAT_PCM:
+        values = expected_values(bits)
+        data = pcm_bytes(values, bits)
+        expected = values / 2.0 ** (bits - 1)
+    else:
+        expected = numpy.linspace(-1, 1, NUM_FRAMES * NUM_CHANNELS).reshape(NUM_FRAMES, NUM_CHANNELS)
+        data = expected.astype('<f%d' % (bits // 8)).tobytes()
+    path = write_wav(tmp_path / 'odd.wav', [
+        fmt_chunk(format_tag, bits),
+        chunk(b'LIST', b'abcde'),
+        chunk(b'data', data),
+    ])
+    info, samples = read_floats(path)
+    assert info.offset % 4 == 2
+    assert info.num_frames == NUM_FRAMES
+    numpy.testing.assert_allclose(samples, expected, rtol=1e-6, atol=0)
+
+
+@pytest.mark.parametrize('size', [None, 0, 0xFFFFFFFF])
+def test_truncated_data(tmp_path, size):
+    values = expected_values(16)
+    data = pcm_bytes(values, 16)
+    # The last frame is cut in half, and the header claims more than is there
+    path = write_wav(tmp_path / 'truncated.wav', [
+        fmt_chunk(WAVE_FORMAT_PCM, 16),
+        chunk(b'data', data[:-2], size=len(data) * 2 if size is None else size),
+    ])
+    info, samples = read_floats(path)
+    assert info.num_frames == NUM_FRAMES - 1
+    numpy.testing.assert_array_equal(samples, values[:-1] / 2.0 ** 15)
+
+
+def test_unsupported_format(tmp_path):
+    path = write_wav(tmp_path / 'alaw.wav', [fmt_chunk(0x0006, 8), chunk(b'data', b'\0' * 16)])
+    with open(path, 'rb') as f, pytest.raises(ChuckError, match='unsupported sample format'):
+        read_wav_info(f)
+
+
+def test_no_data_chunk(tmp_path):
+    path = write_wav(tmp_path / 'empty.wav', [fmt_chunk(WAVE_FORMAT_PCM, 16)])
+    with open(path, 'rb') as f, pytest.raises(ChuckError, match='no data chunk'):
+        read_wav_info(f)
+
+
+def test_not_wav(tmp_path):
+    path = tmp_path / 'not.wav'
+    path.write_bytes(b'\0' * 64)
+    with open(path, 'rb') as f, pytest.raises(ChuckError, match='not a WAV file'):
+        read_wav_info(f)
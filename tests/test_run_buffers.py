@@ -0,0 +1,121 @@
+"""
+Chuck.run's checks of its buffer arguments, and its memory use.
+
+The soak test proper, 10**7 calls, is benchmarks/run_soak.py; this runs a
+short version of it.
+"""
+import os
+import sys
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+pytest.importorskip('_chuck')
+
+from chuckpy import (  # noqa: E402
+    CHUCK_PARAM_INPUT_CHANNELS,
+    CHUCK_PARAM_OUTPUT_CHANNELS,
+    CHUCK_PARAM_SAMPLE_RATE,
+    CHUCK_PARAM_VM_HALT,
+    Chuck,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'benchmarks'))
+from run_soak import rss_mb  # noqa: E402
+
+NUM_CHANNELS = 2
+BLOCK_SIZE = 16
+
+
+@pytest.fixture
+def chuck():
+    chuck = Chuck()
+    chuck.set_param(CHUCK_PARAM_SAMPLE_RATE, 48000)
+    chuck.set_param(CHUCK_PARAM_INPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_OUTPUT_CHANNELS, NUM_CHANNELS)
+    chuck.set_param(CHUCK_PARAM_VM_HALT, False)
+    assert chuck.init()
+    # Output is input, so conversions show up in it
+    assert chuck.compile_code('adc => dac; 1::week => now;', '', 1)
+    chuck.start()
+    return chuck
+
+
+def samples(dtype=numpy.float32, frames=BLOCK_SIZE, channels=NUM_CHANNELS):
+    return numpy.zeros((frames, channels), dtype)
+
+
+def test_run(chuck):
+    samples_out = samples()
+    assert chuck.run(samples(), samples_out, BLOCK_SIZE) is None
+    assert chuck.run(None, samples_out) is None
+
+
+@pytest.mark.parametrize('name, dtype', [('output', numpy.float64), ('output', numpy.int16), ('input', numpy.int16)])
+def test_run_wrong_dtype(chuck, name, dtype):
+    buffers = {'input': samples(), 'output': samples()}
+    buffers[name] = samples(dtype)
+    with pytest.raises(TypeError, match='%s must contain float32' % name):
+        chuck.run(buffers['input'], buffers['output'], BLOCK_SIZE)
+
+
+@pytest.mark.parametrize('name', ['input', 'output'])
+def test_run_not_contiguous(chuck, name):
+    buffers = {'input': samples(), 'output': samples()}
+    buffers[name] = samples(frames=BLOCK_SIZE * 2)[::2]
+    with pytest.raises(ValueError, match='not C-contiguous'):
+        chuck.run(buffers['input'], buffers['output'], BLOCK_SIZE)
+
+
+@pytest.mark.parametrize('name', ['input', 'output'])
+@pytest.mark.parametrize('shape', [
+    (BLOCK_SIZE * NUM_CHANNELS,),
+    (BLOCK_SIZE, NUM_CHANNELS + 1),
+    (BLOCK_SIZE, 1),
+    (BLOCK_SIZE, NUM_CHANNELS, 1),
+])
+def test_run_wrong_shape(chuck, name, shape):
+    buffers = {'input': samples(), 'output': samples()}
+    buffers[name] = numpy.zeros(shape, numpy.float32)
+    with pytest.raises(ValueError, match=r'%s must have shape \(frames, %d\)' % (name, NUM_CHANNELS)):
+        chuck.run(buffers['input'], buffers['output'], BLOCK_SIZE)
+
+
+@pytest.mark.parametrize('name', ['input', 'output'])
+def test_run_too_few_frames(chuck, name):
+    buffers = {'input': samples(), 'output': samples()}
+    buffers[name] = samples(frames=BLOCK_SIZE - 1)
+    with pytest.raises(ValueError, match='%s has %d frames' % (name, BLOCK_SIZE - 1)):
+        chuck.run(buffers['input'], buffers['output'], BLOCK_SIZE)
+
+
+def test_run_read_only_output(chuck):
+    samples_out = samples()
+    samples_out.flags.writeable = False
+    with pytest.raises(ValueError, match='read-only'):
+        chuck.run(samples(), samples_out, BLOCK_SIZE)
+
+
+def test_run_float64_input(chuck):
+    samples_in = numpy.linspace(-1, 1, BLOCK_SIZE * NUM_CHANNELS).reshape(BLOCK_SIZE, NUM_CHANNELS)
+    samples_out = samples()
+    # Run a few blocks of each, so the output no longer depends on what came before
+    for _ in range(4):
+        chuck.run(samples_in, samples_out, BLOCK_SIZE)
+    expected = samples()
+    for _ in range(4):
+        chuck.run(samples_in.astype(numpy.float32), expected, BLOCK_SIZE)
+    assert samples_out.any()
+    numpy.testing.assert_array_equal(samples_out, expected)
+
+
+@pytest.mark.parametrize('dtype', [numpy.float32, numpy.float64])
+def test_run_rss_flat(chuck, dtype):
+    samples_in = samples(dtype)
+    samples_out = samples()
+    for _ in range(1000):
+        chuck.run(samples_in, samples_out, BLOCK_SIZE)
+    before = rss_mb()
+    for _ in range(10 ** 5):
+        chuck.run(samples_in, samples_out, BLOCK_SIZE)
+    assert rss_mb() - before < 1.0